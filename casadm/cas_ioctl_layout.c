@@ -0,0 +1,200 @@
+/*
+* Copyright(c) 2025 Huawei Technologies
+* SPDX-License-Identifier: BSD-3-Clause
+*/
+
+/**
+ * @file
+ * @brief Generator of ioctl interface description for opencas.py.
+ *
+ * Prints ioctl numbers, sizes and field offsets of structures used by the
+ * python ioctl backend, so that it can talk to /dev/cas_ctrl directly without
+ * hardcoding layout of OCF structures embedded in them. Output is line based:
+ *
+ *	version <CAS version>
+ *	const <name> <value>
+ *	ioctl <name> <request number>
+ *	struct <name> <size>
+ *	field <struct> <field> <offset> <size> <kind> <count>
+ *	cache_state|core_state|cache_mode <name> <value>
+ *
+ * where kind is one of: u - unsigned integer, i - signed integer,
+ * s - NUL terminated string, p - pointer.
+ */
+
+#include <stdbool.h>
+#include <stddef.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <cas_ioctl_codes.h>
+
+#define FIELD_SIZE(type, field) sizeof(((struct type *)0)->field)
+
+#define FIELD_KIND(type, field) \
+	(((__typeof__(((struct type *)0)->field))-1) < 0 ? "i" : "u")
+
+#define PRINT_FIELD(type, field, kind, count) \
+	printf("field %s %s %zu %zu %s %zu\n", #type, #field, \
+		offsetof(struct type, field), FIELD_SIZE(type, field), \
+		kind, (size_t)(count))
+
+#define INT_FIELD(type, field) \
+	PRINT_FIELD(type, field, FIELD_KIND(type, field), 1)
+
+#define ARRAY_FIELD(type, field) \
+	PRINT_FIELD(type, field, FIELD_KIND(type, field[0]), \
+		FIELD_SIZE(type, field) / FIELD_SIZE(type, field[0]))
+
+#define STR_FIELD(type, field) PRINT_FIELD(type, field, "s", 1)
+
+#define PTR_FIELD(type, field) PRINT_FIELD(type, field, "p", 1)
+
+#define STAT_FIELD(field) \
+	do { \
+		INT_FIELD(kcas_get_stats, field.value); \
+		INT_FIELD(kcas_get_stats, field.fraction); \
+	} while (0)
+
+#define PRINT_STRUCT(type) printf("struct %s %zu\n", #type, sizeof(struct type))
+
+#define PRINT_IOCTL(name) printf("ioctl %s %lu\n", #name, (unsigned long)KCAS_IOCTL_##name)
+
+#define PRINT_CONST(name) printf("const %s %lld\n", #name, (long long)(name))
+
+#define PRINT_ENUM(group, name, value) printf("%s %s %d\n", group, name, (int)(value))
+
+static void print_stats_layout(void)
+{
+	PRINT_STRUCT(kcas_get_stats);
+	INT_FIELD(kcas_get_stats, cache_id);
+	INT_FIELD(kcas_get_stats, core_id);
+	INT_FIELD(kcas_get_stats, part_id);
+	INT_FIELD(kcas_get_stats, ext_err_code);
+
+	STAT_FIELD(usage.occupancy);
+	STAT_FIELD(usage.free);
+	STAT_FIELD(usage.clean);
+	STAT_FIELD(usage.dirty);
+
+	STAT_FIELD(req.rd_hits);
+	STAT_FIELD(req.rd_partial_misses);
+	STAT_FIELD(req.rd_full_misses);
+	STAT_FIELD(req.rd_total);
+	STAT_FIELD(req.wr_hits);
+	STAT_FIELD(req.wr_partial_misses);
+	STAT_FIELD(req.wr_full_misses);
+	STAT_FIELD(req.wr_total);
+	STAT_FIELD(req.rd_pt);
+	STAT_FIELD(req.wr_pt);
+	STAT_FIELD(req.serviced);
+	STAT_FIELD(req.total);
+
+	STAT_FIELD(blocks.core_volume_rd);
+	STAT_FIELD(blocks.core_volume_wr);
+	STAT_FIELD(blocks.core_volume_total);
+	STAT_FIELD(blocks.cache_volume_rd);
+	STAT_FIELD(blocks.cache_volume_wr);
+	STAT_FIELD(blocks.cache_volume_total);
+	STAT_FIELD(blocks.volume_rd);
+	STAT_FIELD(blocks.volume_wr);
+	STAT_FIELD(blocks.volume_total);
+
+	STAT_FIELD(errors.core_volume_rd);
+	STAT_FIELD(errors.core_volume_wr);
+	STAT_FIELD(errors.core_volume_total);
+	STAT_FIELD(errors.cache_volume_rd);
+	STAT_FIELD(errors.cache_volume_wr);
+	STAT_FIELD(errors.cache_volume_total);
+	STAT_FIELD(errors.total);
+}
+
+int main(void)
+{
+	printf("version %s\n", CAS_VERSION);
+
+	PRINT_CONST(MAX_STR_LEN);
+	PRINT_CONST(CACHE_LIST_ID_LIMIT);
+	PRINT_CONST(OCF_CORE_MAX);
+	PRINT_CONST(OCF_CORE_ID_INVALID);
+	PRINT_CONST(OCF_IO_CLASS_INVALID);
+
+	PRINT_IOCTL(GET_CACHE_COUNT);
+	PRINT_IOCTL(LIST_CACHE);
+	PRINT_IOCTL(CACHE_INFO);
+	PRINT_IOCTL(CORE_INFO);
+	PRINT_IOCTL(GET_CORE_POOL_COUNT);
+	PRINT_IOCTL(GET_CORE_POOL_PATHS);
+	PRINT_IOCTL(CACHE_CHECK_DEVICE);
+	PRINT_IOCTL(GET_STATS);
+
+	PRINT_STRUCT(kcas_cache_count);
+	INT_FIELD(kcas_cache_count, cache_count);
+	INT_FIELD(kcas_cache_count, ext_err_code);
+
+	PRINT_STRUCT(kcas_cache_list);
+	INT_FIELD(kcas_cache_list, id_position);
+	INT_FIELD(kcas_cache_list, in_out_num);
+	ARRAY_FIELD(kcas_cache_list, cache_id_tab);
+	INT_FIELD(kcas_cache_list, ext_err_code);
+
+	PRINT_STRUCT(kcas_cache_info);
+	INT_FIELD(kcas_cache_info, cache_id);
+	STR_FIELD(kcas_cache_info, cache_path_name);
+	ARRAY_FIELD(kcas_cache_info, core_id);
+	INT_FIELD(kcas_cache_info, info.state);
+	INT_FIELD(kcas_cache_info, info.standby_detached);
+	INT_FIELD(kcas_cache_info, info.core_count);
+	INT_FIELD(kcas_cache_info, info.cache_mode);
+	INT_FIELD(kcas_cache_info, info.dirty);
+	INT_FIELD(kcas_cache_info, info.flushed);
+	INT_FIELD(kcas_cache_info, ext_err_code);
+
+	PRINT_STRUCT(kcas_core_info);
+	STR_FIELD(kcas_core_info, core_path_name);
+	INT_FIELD(kcas_core_info, cache_id);
+	INT_FIELD(kcas_core_info, core_id);
+	INT_FIELD(kcas_core_info, info.dirty);
+	INT_FIELD(kcas_core_info, info.flushed);
+	INT_FIELD(kcas_core_info, state);
+	INT_FIELD(kcas_core_info, exp_obj_exists);
+	INT_FIELD(kcas_core_info, ext_err_code);
+
+	PRINT_STRUCT(kcas_core_pool_count);
+	INT_FIELD(kcas_core_pool_count, core_pool_count);
+	INT_FIELD(kcas_core_pool_count, ext_err_code);
+
+	PRINT_STRUCT(kcas_core_pool_path);
+	PTR_FIELD(kcas_core_pool_path, core_path_tab);
+	INT_FIELD(kcas_core_pool_path, core_pool_count);
+	INT_FIELD(kcas_core_pool_path, ext_err_code);
+
+	PRINT_STRUCT(kcas_cache_check_device);
+	STR_FIELD(kcas_cache_check_device, path_name);
+	INT_FIELD(kcas_cache_check_device, is_cache_device);
+	INT_FIELD(kcas_cache_check_device, metadata_compatible);
+	INT_FIELD(kcas_cache_check_device, clean_shutdown);
+	INT_FIELD(kcas_cache_check_device, cache_dirty);
+	INT_FIELD(kcas_cache_check_device, ext_err_code);
+
+	print_stats_layout();
+
+	PRINT_ENUM("cache_state", "Running", ocf_cache_state_running);
+	PRINT_ENUM("cache_state", "Stopping", ocf_cache_state_stopping);
+	PRINT_ENUM("cache_state", "Detached", ocf_cache_state_detached);
+	PRINT_ENUM("cache_state", "Incomplete", ocf_cache_state_incomplete);
+	PRINT_ENUM("cache_state", "Standby", ocf_cache_state_standby);
+
+	PRINT_ENUM("core_state", "Active", ocf_core_state_active);
+	PRINT_ENUM("core_state", "Inactive", ocf_core_state_inactive);
+
+	PRINT_ENUM("cache_mode", "wt", ocf_cache_mode_wt);
+	PRINT_ENUM("cache_mode", "wb", ocf_cache_mode_wb);
+	PRINT_ENUM("cache_mode", "wa", ocf_cache_mode_wa);
+	PRINT_ENUM("cache_mode", "pt", ocf_cache_mode_pt);
+#ifdef WI_AVAILABLE
+	PRINT_ENUM("cache_mode", "wi", ocf_cache_mode_wi);
+#endif
+	PRINT_ENUM("cache_mode", "wo", ocf_cache_mode_wo);
+
+	return 0;
+}
@@ -293,6 +293,7 @@ static struct name_to_val_mapping stats_filters_names[] = {
 static struct name_to_val_mapping output_formats_names[] = {
 	{ .short_name = "table", .value = OUTPUT_FORMAT_TABLE },
 	{ .short_name = "csv", .value = OUTPUT_FORMAT_CSV },
+	{ .short_name = "json", .value = OUTPUT_FORMAT_JSON },
 	{ NULL }
 };
 
@@ -470,6 +471,21 @@ int validate_str_output_format(const char* s)
 					OUTPUT_FORMAT_INVALID);
 }
 
+/* Returns statistics view format for one of OUTPUT_FORMAT values.
+ * csv_format is either CSV or RAW_CSV, depending on the command.
+ */
+int output_format_to_view(unsigned int output_format, int csv_format)
+{
+	switch (output_format) {
+	case OUTPUT_FORMAT_CSV:
+		return csv_format;
+	case OUTPUT_FORMAT_JSON:
+		return JSON;
+	default:
+		return TEXT;
+	}
+}
+
 void print_err(int error_code)
 {
 	const char *msg = cas_strerr(error_code);
@@ -2217,7 +2233,7 @@ int partition_list(unsigned int cache_id, unsigned int output_format)
 
 	fclose(intermediate_file[1]);
 	if (!result && stat_format_output(intermediate_file[0], stdout,
-					  use_csv?RAW_CSV:TEXT)) {
+			output_format_to_view(output_format, RAW_CSV))) {
 		cas_printf(LOG_ERR, "An error occurred during statistics formatting.\n");
 		result = FAILURE;
 	}
@@ -2757,7 +2773,10 @@ int list_caches(unsigned int list_format, bool by_id_path)
 	}
 
 	if (caches == NULL && !core_pool_path_cmd.core_pool_count) {
-		cas_printf(LOG_INFO, "No caches running\n");
+		if (OUTPUT_FORMAT_JSON == list_format)
+			printf("{\"records\": []}\n");
+		else
+			cas_printf(LOG_INFO, "No caches running\n");
 		return SUCCESS;
 	}
 
@@ -2770,7 +2789,7 @@ int list_caches(unsigned int list_format, bool by_id_path)
 
 	printout_ctx.intermediate = intermediate_file[0];
 	printout_ctx.out = stdout;
-	printout_ctx.type = (OUTPUT_FORMAT_CSV == list_format ? RAW_CSV : TEXT);
+	printout_ctx.type = output_format_to_view(list_format, RAW_CSV);
 
 	if (pthread_create(&thread, 0, list_printout, &printout_ctx)) {
 		cas_printf(LOG_ERR,"Failed to create thread.\n");
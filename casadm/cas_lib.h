@@ -67,6 +67,7 @@ enum output_format_t {
 	OUTPUT_FORMAT_INVALID = 0,
 	OUTPUT_FORMAT_TABLE = 1,
 	OUTPUT_FORMAT_CSV = 2,
+	OUTPUT_FORMAT_JSON = 3,
 	OUTPUT_FORMAT_DEFAULT = OUTPUT_FORMAT_TABLE
 };
 
@@ -286,6 +287,9 @@ int cas_module_version(char *buff, int size);
 int list_caches(unsigned int list_format, bool by_id_path);
 int cache_status(unsigned int cache_id, unsigned int core_id, int io_class_id,
 		 unsigned int stats_filters, unsigned int stats_format, bool by_id_path);
+int cache_status_all(unsigned int cache_id, int io_class_id,
+		     unsigned int stats_filters, unsigned int stats_format,
+		     bool by_id_path);
 int get_inactive_core_count(const struct kcas_cache_info *cache_info);
 
 int open_ctrl_device_quiet();
@@ -307,6 +311,7 @@ int validate_str_cln_policy(const char *s);
 int validate_str_promotion_policy(const char *s);
 int validate_str_stats_filters(const char* s);
 int validate_str_output_format(const char* s);
+int output_format_to_view(unsigned int output_format, int csv_format);
 
 /**
  * @brief clear metadata
@@ -16,6 +16,7 @@
 #include <fstab.h>
 #include <sys/ioctl.h>
 #include <sys/stat.h>
+#include <sys/wait.h>
 #include <linux/fs.h>
 #include "argp.h"
 #include "cas_lib.h"
@@ -62,6 +63,7 @@ struct command_args{
 	uint32_t params_count;
 	bool verbose;
 	bool by_id_path;
+	bool stats_all;
 };
 
 static struct command_args command_args_values = {
@@ -86,6 +88,7 @@ static struct command_args command_args_values = {
 		.cache_device = NULL,
 		.core_device = NULL,
 		.by_id_path = false,
+		.stats_all = false,
 
 		.params_type = 0,
 		.params_count = 0,
@@ -466,7 +469,7 @@ int handle_start()
 }
 
 static cli_option list_options[] = {
-	{'o', "output-format", "Output format: {table|csv}", 1, "FORMAT", 0},
+	{'o', "output-format", "Output format: {table|csv|json}", 1, "FORMAT", 0},
 	{'b', "by-id-path", "Display by-id path to disks instead of short form /dev/sdx"},
 	{0}
 };
@@ -477,12 +480,13 @@ int handle_list()
 }
 
 static cli_option stats_options[] = {
-	{'i', "cache-id", CACHE_ID_DESC, 1, "ID", CLI_OPTION_REQUIRED},
+	{'i', "cache-id", CACHE_ID_DESC, 1, "ID", 0},
 	{'j', "core-id", "Limit display of core-specific statistics to only ones pertaining to a specific core. If this option is not given, casadm will display statistics pertaining to all cores assigned to given cache instance.", 1, "ID", 0},
 	{'d', "io-class-id", "Display per IO class statistics", 1, "ID", CLI_OPTION_OPTIONAL_ARG},
 	{'f', "filter", "Apply filters from the following set: {all, conf, usage, req, blk, err}", 1, "FILTER-SPEC"},
-	{'o', "output-format", "Output format: {table|csv}", 1, "FORMAT"},
+	{'o', "output-format", "Output format: {table|csv|json}", 1, "FORMAT"},
 	{'b', "by-id-path", "Display by-id path to disks instead of short form /dev/sdx"},
+	{'a', "all", "Display statistics of all caches (or only given cache), all their cores and, if --io-class-id is given, IO classes at once"},
 	{0}
 };
 
@@ -525,6 +529,8 @@ int stats_command_handle_option(char *opt, const char **arg)
 		command_args_values.by_id_path = true;
 		if (command_args_values.by_id_path == false)
 			return FAILURE;
+	} else if (!strcmp(opt, "all")) {
+		command_args_values.stats_all = true;
 	} else {
 		return FAILURE;
 	}
@@ -534,6 +540,25 @@ int stats_command_handle_option(char *opt, const char **arg)
 
 int handle_stats()
 {
+	if (command_args_values.stats_all) {
+		if (command_args_values.core_id != OCF_CORE_ID_INVALID) {
+			cas_printf(LOG_ERR, "Use of 'all' with 'core-id'"
+					" simultaneously is forbidden.\n");
+			return FAILURE;
+		}
+
+		return cache_status_all(command_args_values.cache_id,
+					command_args_values.io_class_id,
+					command_args_values.stats_filters,
+					command_args_values.output_format,
+					command_args_values.by_id_path);
+	}
+
+	if (command_args_values.cache_id == OCF_CACHE_ID_INVALID) {
+		cas_printf(LOG_ERR, "Missing required option -i/--cache-id\n");
+		return FAILURE;
+	}
+
 	return cache_status(command_args_values.cache_id,
 			    command_args_values.core_id,
 			    command_args_values.io_class_id,
@@ -603,7 +628,7 @@ int handle_stop()
 	.options = { \
 		{'i', "cache-id", CACHE_ID_DESC, 1, "ID", CLI_OPTION_REQUIRED}, \
 		{'j', "core-id", CORE_ID_DESC, 1, "ID", CLI_OPTION_REQUIRED}, \
-		{'o', "output-format", "Output format: {table|csv}", 1, "FORMAT"}, \
+		{'o', "output-format", "Output format: {table|csv|json}", 1, "FORMAT"}, \
 	CORE_PARAMS_NS_END()
 
 #define CACHE_PARAMS_NS_BEGIN(_name, _desc) { \
@@ -619,7 +644,7 @@ int handle_stop()
 
 #define GET_CACHE_PARAMS_NS(_name, _desc) \
 	CACHE_PARAMS_NS_BEGIN(_name, _desc) \
-		{'o', "output-format", "Output format: {table|csv}", 1, "FORMAT"}, \
+		{'o', "output-format", "Output format: {table|csv|json}", 1, "FORMAT"}, \
 	CACHE_PARAMS_NS_END()
 
 
@@ -1148,13 +1173,10 @@ int get_param_namespace_handle_option(char *namespace, char *opt, const char **a
 
 int handle_get_param()
 {
-	int format = TEXT;
+	int format = output_format_to_view(command_args_values.output_format,
+					   RAW_CSV);
 	int err = 0;
 
-	if (OUTPUT_FORMAT_CSV == command_args_values.output_format) {
-		format = RAW_CSV;
-	}
-
 	switch (command_args_values.params_type) {
 	case PARAM_TYPE_CORE:
 		err = core_params_get(command_args_values.cache_id,
@@ -1372,7 +1394,7 @@ static cli_option io_class_params_options[] = {
 	[io_class_opt_output_format] = {
 		.short_name = 'o',
 		.long_name = "output-format",
-		.desc = "Output format: {table|csv}",
+		.desc = "Output format: {table|csv|json}",
 		.args_count = 1,
 		.arg = "FORMAT",
 		.priv = (1 << io_class_opt_subcmd_list)
@@ -1828,7 +1850,7 @@ static cli_option version_options[] = {
 	{
 		.short_name = 'o',
 		.long_name = "output-format",
-		.desc = "Output format: {table|csv}",
+		.desc = "Output format: {table|csv|json}",
 		.args_count = 1,
 		.arg = "FORMAT",
 	},
@@ -1870,10 +1892,8 @@ static int handle_version(void)
 	fprintf(intermediate_file[1], TAG(TABLE_ROW) OCF_LOGO " CLI Utility,");
 	fprintf(intermediate_file[1], "%s\n", CAS_VERSION);
 
-	int format = TEXT;
-	if (OUTPUT_FORMAT_CSV == command_args_values.output_format) {
-		format = RAW_CSV;
-	}
+	int format = output_format_to_view(command_args_values.output_format,
+					   RAW_CSV);
 
 	fclose(intermediate_file[1]);
 	stat_format_output(intermediate_file[0], stdout, format);
@@ -1883,6 +1903,7 @@ static int handle_version(void)
 }
 
 static int handle_help();
+static int handle_batch();
 
 /*******************************************************************************
  * Standby commands
@@ -2440,6 +2461,16 @@ static cli_command cas_commands[] = {
 			.flags = (CLI_COMMAND_HIDDEN | CLI_SU_REQUIRED),
 			.handle = script_handle,
 		},
+		{
+			.name = "batch",
+			.desc = "Execute commands read from standard input",
+			.long_desc = NULL,
+			.options = NULL,
+			.command_handle_opts = NULL,
+			.flags = (CLI_COMMAND_HIDDEN | CLI_SU_REQUIRED),
+			.handle = handle_batch,
+			.help = NULL
+		},
 		{0},
 };
 
@@ -2460,6 +2491,151 @@ static int handle_help()
 	return 0;
 }
 
+/*******************************************************************************
+ * Batch mode
+ ******************************************************************************/
+
+#define BATCH_MAX_ARGS 64
+
+/*
+ * Copy whole content of temporary file to stdout and truncate it, so it can
+ * be reused by the next command.
+ */
+static int batch_flush_file(FILE *file)
+{
+	char buf[4096];
+	size_t len;
+
+	rewind(file);
+	while ((len = fread(buf, 1, sizeof(buf), file)) > 0) {
+		if (fwrite(buf, 1, len, stdout) != len)
+			return FAILURE;
+	}
+
+	rewind(file);
+	if (ftruncate(fileno(file), 0))
+		return FAILURE;
+
+	return SUCCESS;
+}
+
+/*
+ * Execute single command in a child process. Child gets its own copy of
+ * all the global command state, so there is no need to reset it between
+ * subsequent commands. Output of the command is collected in temporary
+ * files and then written to stdout preceded by a frame header:
+ *
+ *     <exit code> <stdout length> <stderr length>\n
+ */
+static int batch_run_command(app *app_values, int argc, const char **argv,
+		FILE *out, FILE *err)
+{
+	int status, result;
+	long out_len, err_len;
+	pid_t pid;
+
+	fflush(stdout);
+	fflush(stderr);
+
+	pid = fork();
+	if (pid < 0) {
+		cas_printf(LOG_ERR, "Failed to execute command.\n");
+		return FAILURE;
+	}
+
+	if (pid == 0) {
+		int null_fd = open("/dev/null", O_RDONLY);
+
+		if (null_fd >= 0)
+			dup2(null_fd, STDIN_FILENO);
+		dup2(fileno(out), STDOUT_FILENO);
+		dup2(fileno(err), STDERR_FILENO);
+
+		exit(args_parse(app_values, cas_commands, argc, argv));
+	}
+
+	if (waitpid(pid, &status, 0) < 0)
+		return FAILURE;
+
+	result = WIFEXITED(status) ? WEXITSTATUS(status) : FAILURE;
+
+	fseek(out, 0, SEEK_END);
+	fseek(err, 0, SEEK_END);
+	out_len = ftell(out);
+	err_len = ftell(err);
+
+	printf("%d %ld %ld\n", result, out_len, err_len);
+	if (batch_flush_file(out) || batch_flush_file(err))
+		return FAILURE;
+	fflush(stdout);
+
+	return SUCCESS;
+}
+
+/*
+ * Read newline-delimited commands from stdin and execute them one by one,
+ * until EOF is reached. Arguments are separated by whitespace. Empty lines
+ * and lines with too many arguments are answered with failure frame.
+ */
+static int handle_batch()
+{
+	const char *argv[BATCH_MAX_ARGS];
+	char *line = NULL;
+	size_t line_size = 0;
+	FILE *out, *err;
+	int argc, result = SUCCESS;
+	app app_values;
+
+	app_values.name = MAN_PAGE;
+	app_values.info = "<command> [option...]";
+	app_values.title = HELP_HEADER;
+	app_values.doc = HELP_FOOTER;
+	app_values.man = MAN_PAGE;
+	app_values.block = 0;
+
+	out = tmpfile();
+	err = tmpfile();
+	if (!out || !err) {
+		cas_printf(LOG_ERR, "Failed to create temporary files.\n");
+		result = FAILURE;
+		goto close_files;
+	}
+
+	while (getline(&line, &line_size, stdin) >= 0) {
+		char *token, *saveptr = NULL;
+
+		argv[0] = MAN_PAGE;
+		argc = 1;
+		token = strtok_r(line, " \t\r\n", &saveptr);
+		while (token && argc < BATCH_MAX_ARGS) {
+			argv[argc++] = token;
+			token = strtok_r(NULL, " \t\r\n", &saveptr);
+		}
+
+		/* Every line gets its frame, so client can match responses to lines */
+		if (argc == 1 || token) {
+			printf("%d 0 0\n", FAILURE);
+			fflush(stdout);
+			continue;
+		}
+
+		if (batch_run_command(&app_values, argc, argv, out, err)) {
+			result = FAILURE;
+			break;
+		}
+	}
+
+	free(line);
+
+close_files:
+	if (out)
+		fclose(out);
+	if (err)
+		fclose(err);
+
+	return result;
+}
+
 int main(int argc, const char *argv[])
 {
 	int blocked = 0;
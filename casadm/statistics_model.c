@@ -124,6 +124,29 @@ static void begin_record(FILE *outfile)
 	fprintf(outfile, TAG(RECORD) "\n");
 }
 
+/**
+ * begin record of statistics. Records of bulk statistics (scoped) are
+ * additionally prefixed with ids of objects they pertain to.
+ */
+static void begin_stats_record(FILE *outfile, bool scoped, unsigned int cache_id,
+			       unsigned int core_id, int io_class_id)
+{
+	begin_record(outfile);
+
+	if (!scoped)
+		return;
+
+	print_kv_pair(outfile, "Target Cache Id", "%u", cache_id);
+	if (core_id == OCF_CORE_ID_INVALID)
+		print_kv_pair(outfile, "Target Core Id", "-");
+	else
+		print_kv_pair(outfile, "Target Core Id", "%u", core_id);
+	if (io_class_id == OCF_IO_CLASS_INVALID)
+		print_kv_pair(outfile, "Target IO class Id", "-");
+	else
+		print_kv_pair(outfile, "Target IO class Id", "%d", io_class_id);
+}
+
 static void print_table_header(FILE *outfile, uint32_t ncols, ...)
 {
 	va_list ap;
@@ -388,9 +411,10 @@ static void print_err_stats(const struct ocf_stats_errors *stats,
 
 void cache_stats_core_counters(const struct kcas_core_info *info,
 			struct kcas_get_stats *stats,
-			unsigned int stats_filters, FILE *outfile)
+			unsigned int stats_filters, FILE *outfile, bool scoped)
 {
-	begin_record(outfile);
+	begin_stats_record(outfile, scoped, info->cache_id, info->core_id,
+			   OCF_IO_CLASS_INVALID);
 
 	if (stats_filters & STATS_FILTER_CONF)
 		print_core_conf(info, outfile);
@@ -467,7 +491,7 @@ void print_stats_ioclass(struct kcas_io_class *io_class,
 int cache_stats_ioclasses(int ctrl_fd, const struct kcas_cache_info *cache_info,
 			  unsigned int cache_id, unsigned int core_id,
 			  int io_class_id, FILE *outfile,
-			  unsigned int stats_filters)
+			  unsigned int stats_filters, bool scoped)
 {
 	struct kcas_io_class info = {};
 	struct kcas_get_stats stats = {};
@@ -495,7 +519,8 @@ int cache_stats_ioclasses(int ctrl_fd, const struct kcas_cache_info *cache_info,
 		if (ioctl(ctrl_fd, KCAS_IOCTL_GET_STATS, &stats) < 0)
 			return FAILURE;
 
-		begin_record(outfile);
+		begin_stats_record(outfile, scoped, cache_id, core_id,
+				   io_class_id);
 
 		print_stats_ioclass(&info, &stats, cache_stats,
 				outfile, stats_filters);
@@ -522,7 +547,8 @@ int cache_stats_ioclasses(int ctrl_fd, const struct kcas_cache_info *cache_info,
 		if (ret)
 			return FAILURE;
 
-		begin_record(outfile);
+		begin_stats_record(outfile, scoped, cache_id, core_id,
+				   part_iter_id);
 
 		print_stats_ioclass(&info, &stats, cache_stats,
 				outfile, stats_filters);
@@ -629,7 +655,7 @@ void cache_stats_counters(struct kcas_get_stats *cache_stats, FILE *outfile,
 
 static int cache_stats(int ctrl_fd, const struct kcas_cache_info *cache_info,
 		      unsigned int cache_id, FILE *outfile, unsigned int stats_filters,
-		      bool by_id_path)
+		      bool by_id_path, bool scoped)
 {
 	struct kcas_get_stats cache_stats = {};
 	bool standby;
@@ -647,7 +673,8 @@ static int cache_stats(int ctrl_fd, const struct kcas_cache_info *cache_info,
 		}
 	}
 
-	begin_record(outfile);
+	begin_stats_record(outfile, scoped, cache_id, OCF_CORE_ID_INVALID,
+			   OCF_IO_CLASS_INVALID);
 
 	if (stats_filters & STATS_FILTER_CONF)
 		cache_stats_conf(ctrl_fd, cache_info, cache_id, outfile, by_id_path);
@@ -672,7 +699,8 @@ static int cache_stats(int ctrl_fd, const struct kcas_cache_info *cache_info,
 
 int cache_stats_cores(int ctrl_fd, const struct kcas_cache_info *cache_info,
 		      unsigned int cache_id, unsigned int core_id, int io_class_id,
-		      FILE *outfile, unsigned int stats_filters, bool by_id_path)
+		      FILE *outfile, unsigned int stats_filters, bool by_id_path,
+		      bool scoped)
 {
 	struct kcas_core_info core_info;
 	struct kcas_get_stats stats;
@@ -693,7 +721,8 @@ int cache_stats_cores(int ctrl_fd, const struct kcas_cache_info *cache_info,
 		return FAILURE;
 	}
 
-	cache_stats_core_counters(&core_info, &stats, stats_filters, outfile);
+	cache_stats_core_counters(&core_info, &stats, stats_filters, outfile,
+				  scoped);
 
 	return SUCCESS;
 }
@@ -764,7 +793,7 @@ int cache_status(unsigned int cache_id, unsigned int core_id, int io_class_id,
 	struct stats_printout_ctx printout_ctx;
 	printout_ctx.intermediate = intermediate_file[0];
 	printout_ctx.out = stdout;
-	printout_ctx.type = (OUTPUT_FORMAT_CSV == output_format ? CSV : TEXT);
+	printout_ctx.type = output_format_to_view(output_format, CSV);
 	pthread_t thread;
 	pthread_create(&thread, 0, stats_printout, &printout_ctx);
 
@@ -807,25 +836,203 @@ int cache_status(unsigned int cache_id, unsigned int core_id, int io_class_id,
 		if (cache_stats_ioclasses(ctrl_fd, &cache_info, cache_id,
 					core_id, io_class_id,
 					intermediate_file[1],
-					stats_filters)) {
+					stats_filters, false)) {
 			ret = FAILURE;
 			goto cleanup;
 		}
 	} else if (core_id == OCF_CORE_ID_INVALID) {
 		if (cache_stats(ctrl_fd, &cache_info, cache_id, intermediate_file[1],
-					stats_filters, by_id_path)) {
+					stats_filters, by_id_path, false)) {
 			ret = FAILURE;
 			goto cleanup;
 		}
 	} else {
 		if (cache_stats_cores(ctrl_fd, &cache_info, cache_id, core_id,
 					io_class_id, intermediate_file[1],
-					stats_filters, by_id_path)) {
+					stats_filters, by_id_path, false)) {
+			ret = FAILURE;
+			goto cleanup;
+		}
+	}
+
+cleanup:
+	close(ctrl_fd);
+	fclose(intermediate_file[1]);
+	pthread_join(thread, 0);
+	if (printout_ctx.result) {
+		ret = 1;
+	}
+
+	fclose(intermediate_file[0]);
+
+	return ret;
+}
+
+/**
+ * @brief print statistics of each core of given caches (or of each io class
+ *	  of each core, if io_classes is set)
+ */
+static int cache_status_all_cores(int ctrl_fd, struct kcas_cache_info *cache_info,
+				  int caches_count, int io_class_id, bool io_classes,
+				  FILE *outfile, unsigned int stats_filters,
+				  bool by_id_path)
+{
+	int i, j;
+
+	for (i = 0; i < caches_count; i++) {
+		if (cache_info[i].info.state & (1 << ocf_cache_state_standby))
+			continue;
+
+		for (j = 0; j < cache_info[i].info.core_count; j++) {
+			if (io_classes) {
+				if (cache_stats_ioclasses(ctrl_fd, &cache_info[i],
+						cache_info[i].cache_id,
+						cache_info[i].core_id[j],
+						io_class_id, outfile,
+						stats_filters, true))
+					return FAILURE;
+			} else {
+				if (cache_stats_cores(ctrl_fd, &cache_info[i],
+						cache_info[i].cache_id,
+						cache_info[i].core_id[j],
+						io_class_id, outfile,
+						stats_filters, by_id_path, true))
+					return FAILURE;
+			}
+		}
+	}
+
+	return SUCCESS;
+}
+
+/**
+ * @brief print statistics of all caches, their cores and io classes at once
+ *
+ * this routine implements -P (--stats) subcommand of casadm with --all option.
+ * Statistics are grouped into data sets of caches, cores and (if
+ * STATS_FILTER_IOCLASS is set) cache io classes and core io classes. Each
+ * record starts with "Target Cache Id", "Target Core Id" and
+ * "Target IO class Id" identifying object it pertains to.
+ * @param cache_id limit statistics to single cache, or OCF_CACHE_ID_INVALID
+ *        to print statistics of all running caches
+ *
+ * @return SUCCESS upon successful printing of statistic. FAILURE if any error happens
+ */
+int cache_status_all(unsigned int cache_id, int io_class_id,
+		     unsigned int stats_filters, unsigned int output_format,
+		     bool by_id_path)
+{
+	int ctrl_fd, i;
+	int ret = SUCCESS;
+	int caches_count = 0;
+	int *cache_ids = NULL;
+	struct kcas_cache_info *cache_info = NULL;
+	bool io_classes = (stats_filters & STATS_FILTER_IOCLASS);
+
+	ctrl_fd = open_ctrl_device();
+
+	if (ctrl_fd < 0) {
+		print_err(KCAS_ERR_SYSTEM);
+		return FAILURE;
+	}
+
+	if (cache_id == OCF_CACHE_ID_INVALID) {
+		cache_ids = get_cache_ids(&caches_count);
+	} else {
+		cache_ids = malloc(sizeof(*cache_ids));
+		if (cache_ids) {
+			cache_ids[0] = cache_id;
+			caches_count = 1;
+		}
+	}
+
+	if (caches_count) {
+		if (!cache_ids) {
+			close(ctrl_fd);
+			return FAILURE;
+		}
+		cache_info = calloc(caches_count, sizeof(*cache_info));
+		if (!cache_info) {
+			free(cache_ids);
+			close(ctrl_fd);
+			return FAILURE;
+		}
+	}
+
+	for (i = 0; i < caches_count; i++) {
+		cache_info[i].cache_id = cache_ids[i];
+		if (ioctl(ctrl_fd, KCAS_IOCTL_CACHE_INFO, &cache_info[i]) < 0) {
+			cas_printf(LOG_ERR, "Cache Id %d not running\n", cache_ids[i]);
+			free(cache_info);
+			free(cache_ids);
+			close(ctrl_fd);
+			return FAILURE;
+		}
+	}
+	free(cache_ids);
+
+	/* 1 is writing end, 0 is reading end of a pipe */
+	FILE *intermediate_file[2];
+
+	if (create_pipe_pair(intermediate_file)) {
+		cas_printf(LOG_ERR,"Failed to create unidirectional pipe.\n");
+		free(cache_info);
+		close(ctrl_fd);
+		return FAILURE;
+	}
+
+	struct stats_printout_ctx printout_ctx;
+	printout_ctx.intermediate = intermediate_file[0];
+	printout_ctx.out = stdout;
+	printout_ctx.type = output_format_to_view(output_format, CSV);
+	pthread_t thread;
+	pthread_create(&thread, 0, stats_printout, &printout_ctx);
+
+	fprintf(intermediate_file[1], TAG(DATA_SET) "Caches\n");
+	for (i = 0; i < caches_count; i++) {
+		if (cache_stats(ctrl_fd, &cache_info[i], cache_info[i].cache_id,
+				intermediate_file[1], stats_filters,
+				by_id_path, true)) {
+			ret = FAILURE;
+			goto cleanup;
+		}
+	}
+
+	fprintf(intermediate_file[1], TAG(DATA_SET) "Cores\n");
+	if (cache_status_all_cores(ctrl_fd, cache_info, caches_count,
+				   OCF_IO_CLASS_INVALID, false,
+				   intermediate_file[1], stats_filters,
+				   by_id_path)) {
+		ret = FAILURE;
+		goto cleanup;
+	}
+
+	if (!io_classes)
+		goto cleanup;
+
+	fprintf(intermediate_file[1], TAG(DATA_SET) "Cache IO classes\n");
+	for (i = 0; i < caches_count; i++) {
+		if (cache_info[i].info.state & (1 << ocf_cache_state_standby))
+			continue;
+
+		if (cache_stats_ioclasses(ctrl_fd, &cache_info[i],
+					  cache_info[i].cache_id,
+					  OCF_CORE_ID_INVALID, io_class_id,
+					  intermediate_file[1], stats_filters,
+					  true)) {
 			ret = FAILURE;
 			goto cleanup;
 		}
 	}
 
+	fprintf(intermediate_file[1], TAG(DATA_SET) "Core IO classes\n");
+	if (cache_status_all_cores(ctrl_fd, cache_info, caches_count,
+				   io_class_id, true, intermediate_file[1],
+				   stats_filters, by_id_path)) {
+		ret = FAILURE;
+		goto cleanup;
+	}
+
 cleanup:
 	close(ctrl_fd);
 	fclose(intermediate_file[1]);
@@ -835,6 +1042,7 @@ cleanup:
 	}
 
 	fclose(intermediate_file[0]);
+	free(cache_info);
 
 	return ret;
 }
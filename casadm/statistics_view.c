@@ -13,6 +13,7 @@
 #include "statistics_view_text.h"
 #include "statistics_view_csv.h"
 #include "statistics_view_raw_csv.h"
+#include "statistics_view_json.h"
 
 static struct view_t *construct_view(int format, FILE *outfile)
 {
@@ -34,6 +35,12 @@ static struct view_t *construct_view(int format, FILE *outfile)
 		out->construct = raw_csv_construct;
 		out->destruct = raw_csv_destruct;
 		break;
+	case JSON:
+		out->process_row = json_process_row;
+		out->end_input = json_end_input;
+		out->construct = json_construct;
+		out->destruct = json_destruct;
+		break;
 	case TEXT:
 		out->process_row = text_process_row;
 		out->end_input = text_end_input;
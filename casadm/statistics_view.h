@@ -34,6 +34,7 @@ enum format {
 	TEXT, /**< output in text (formatted tables) form */
 	CSV, /**< output in csv form */
 	RAW_CSV, /**< csv form without transformations */
+	JSON, /**< output in json form */
 	PLAIN /**<debug setting: print intermediate format */
 };
 
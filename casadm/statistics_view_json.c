@@ -0,0 +1,471 @@
+/*
+* Copyright(c) 2025 Huawei Technologies
+* SPDX-License-Identifier: BSD-3-Clause
+*/
+
+#define _GNU_SOURCE
+#include <stdio.h>
+#include <string.h>
+#include <stdlib.h>
+#include <stdbool.h>
+#include <ctype.h>
+#include "statistics_view.h"
+#include "statistics_view_structs.h"
+#include "statistics_view_json.h"
+
+/*
+ * JSON output is a single document:
+ *
+ * {"records": [
+ *	{
+ *		"<KV_PAIR title>": [{"value": 100, "unit": "4KiB Blocks"},
+ *				    {"value": 0.4, "unit": "GiB"}],
+ *		"<TABLE_HEADER title>": [{"<column title>": <value>, ...,
+ *					  "unit": "<unit>" | null}, ...],
+ *		"devices": [{"<column title>": <value>, ...,
+ *			     "children": [{"<column title>": <value>, ...}]}]
+ *	}
+ * ]}
+ *
+ * Each RECORD (or DATA_SET) starts a new record. Table rows and tree nodes
+ * are objects keyed by column titles of the preceding TABLE_HEADER or
+ * TREE_HEADER. Units are never part of values: unit cells ("[GiB]") and unit
+ * suffixes of cells ("20 [s]", "Wake up time [s]") are moved to "unit"
+ * field. Values which are valid JSON numbers are printed as numbers, others
+ * as strings.
+ */
+
+enum json_section {
+	JSON_SECTION_NONE,
+	JSON_SECTION_TABLE,
+	JSON_SECTION_TREE,
+};
+
+/**
+ * private data of JSON output formatter
+ */
+struct json_out_prv {
+	int records; /* number of printed records */
+	bool record_open;
+	int items; /* number of items in current record */
+	enum json_section section;
+	int rows; /* number of rows in current table or tree */
+	bool branch_open;
+	int leaves; /* number of leaves in current tree branch */
+	char **header; /* column titles of current table or tree */
+	int header_cols;
+};
+
+/**
+ * cell of intermediate format split into value and unit
+ */
+struct json_cell {
+	const char *value;
+	int value_len;
+	const char *unit;
+	int unit_len;
+};
+
+static inline struct json_out_prv *json_prv(struct view_t *this)
+{
+	return this->ctx.json_prv;
+}
+
+static bool json_is_number(const char *s, int len)
+{
+	int i = 0;
+
+	if (i < len && s[i] == '-')
+		i++;
+
+	if (i >= len || !isdigit(s[i]))
+		return false;
+
+	/* no leading zeros */
+	if (s[i] == '0' && i + 1 < len && isdigit(s[i + 1]))
+		return false;
+
+	while (i < len && isdigit(s[i]))
+		i++;
+
+	if (i < len && s[i] == '.') {
+		i++;
+		if (i >= len || !isdigit(s[i]))
+			return false;
+		while (i < len && isdigit(s[i]))
+			i++;
+	}
+
+	if (i < len && (s[i] == 'e' || s[i] == 'E')) {
+		i++;
+		if (i < len && (s[i] == '+' || s[i] == '-'))
+			i++;
+		if (i >= len || !isdigit(s[i]))
+			return false;
+		while (i < len && isdigit(s[i]))
+			i++;
+	}
+
+	return i == len;
+}
+
+static void json_print_string(struct view_t *this, const char *s, int len)
+{
+	int i;
+
+	putc('"', this->outfile);
+	for (i = 0; i < len; i++) {
+		unsigned char c = s[i];
+
+		if (c == '"' || c == '\\')
+			fprintf(this->outfile, "\\%c", c);
+		else if (c < 0x20)
+			fprintf(this->outfile, "\\u%04x", c);
+		else
+			putc(c, this->outfile);
+	}
+	putc('"', this->outfile);
+}
+
+static void json_print_value(struct view_t *this, const char *s, int len)
+{
+	if (json_is_number(s, len))
+		fprintf(this->outfile, "%.*s", len, s);
+	else
+		json_print_string(this, s, len);
+}
+
+static void json_trim(const char **s, int *len)
+{
+	while (*len && isspace(**s)) {
+		(*s)++;
+		(*len)--;
+	}
+	while (*len && isspace((*s)[*len - 1]))
+		(*len)--;
+}
+
+static bool json_is_unit(const char *s)
+{
+	int len = strlen(s);
+
+	json_trim(&s, &len);
+	return len >= 2 && s[0] == '[' && s[len - 1] == ']';
+}
+
+/**
+ * Split cell into value and unit. Cells consisting only of unit ("[GiB]")
+ * yield empty value, cells with unit suffix ("20 [s]") yield both. Cells
+ * with several units ("2 [m] 3 [s]") are human readable compositions and
+ * are kept whole as unitless value.
+ */
+static void json_parse_cell(const char *s, struct json_cell *cell)
+{
+	const char *unit;
+
+	cell->value = s;
+	cell->value_len = strlen(s);
+	cell->unit = NULL;
+	cell->unit_len = 0;
+
+	json_trim(&cell->value, &cell->value_len);
+	if (!cell->value_len || cell->value[cell->value_len - 1] != ']')
+		return;
+
+	unit = memrchr(cell->value, '[', cell->value_len);
+	if (!unit || unit + 2 >= cell->value + cell->value_len)
+		return;
+	if (unit != cell->value && !isspace(unit[-1]))
+		return;
+	if (memchr(cell->value, ']', unit - cell->value))
+		return;
+
+	cell->unit = unit + 1;
+	cell->unit_len = cell->value + cell->value_len - unit - 2;
+	cell->value_len = unit - cell->value;
+	json_trim(&cell->value, &cell->value_len);
+}
+
+static void json_print_unit(struct view_t *this, const struct json_cell *cell)
+{
+	if (cell->unit)
+		json_print_string(this, cell->unit, cell->unit_len);
+	else
+		fprintf(this->outfile, "null");
+}
+
+static void json_free_header(struct view_t *this)
+{
+	struct json_out_prv *prv = json_prv(this);
+	int i;
+
+	for (i = 0; i < prv->header_cols; i++)
+		free(prv->header[i]);
+	free(prv->header);
+	prv->header = NULL;
+	prv->header_cols = 0;
+}
+
+static int json_store_header(struct view_t *this, int num_fields, char *fields[])
+{
+	struct json_out_prv *prv = json_prv(this);
+	int i;
+
+	json_free_header(this);
+
+	prv->header = calloc(num_fields, sizeof(*prv->header));
+	if (!prv->header)
+		return 1;
+
+	for (i = 0; i < num_fields; i++) {
+		prv->header[i] = strdup(fields[i]);
+		if (!prv->header[i])
+			return 1;
+		prv->header_cols++;
+	}
+
+	return 0;
+}
+
+static void json_open_record(struct view_t *this)
+{
+	struct json_out_prv *prv = json_prv(this);
+
+	if (prv->record_open)
+		return;
+
+	fprintf(this->outfile, "%s\n{", prv->records ? "," : "");
+	prv->record_open = true;
+	prv->items = 0;
+}
+
+static void json_close_section(struct view_t *this)
+{
+	struct json_out_prv *prv = json_prv(this);
+
+	if (prv->branch_open)
+		fprintf(this->outfile, "]}");
+	prv->branch_open = false;
+
+	if (prv->section != JSON_SECTION_NONE)
+		fprintf(this->outfile, "]");
+	prv->section = JSON_SECTION_NONE;
+
+	json_free_header(this);
+}
+
+static void json_close_record(struct view_t *this)
+{
+	struct json_out_prv *prv = json_prv(this);
+
+	json_close_section(this);
+
+	if (!prv->record_open)
+		return;
+
+	fprintf(this->outfile, "\n}");
+	prv->record_open = false;
+	prv->records++;
+}
+
+static void json_begin_item(struct view_t *this, const char *key)
+{
+	struct json_out_prv *prv = json_prv(this);
+	int len = strlen(key);
+
+	json_open_record(this);
+	json_close_section(this);
+
+	fprintf(this->outfile, "%s\n\t", prv->items ? "," : "");
+	json_trim(&key, &len);
+	json_print_string(this, key, len);
+	fprintf(this->outfile, ": ");
+	prv->items++;
+}
+
+static int json_begin_section(struct view_t *this, const char *key,
+			      enum json_section section,
+			      int num_fields, char *fields[])
+{
+	struct json_out_prv *prv = json_prv(this);
+
+	json_begin_item(this, key);
+	fprintf(this->outfile, "[");
+	prv->section = section;
+	prv->rows = 0;
+	prv->leaves = 0;
+
+	return json_store_header(this, num_fields, fields);
+}
+
+/*
+ * KV_PAIR,Cache Size,10347970,[4KiB Blocks],39.47,[GiB]
+ * is printed as:
+ * "Cache Size": [{"value": 10347970, "unit": "4KiB Blocks"},
+ *		  {"value": 39.47, "unit": "GiB"}]
+ */
+static void json_print_kv_pair(struct view_t *this, int num_fields, char *fields[])
+{
+	struct json_cell cell, next;
+	bool first = true;
+	int i;
+
+	json_begin_item(this, fields[0]);
+	fprintf(this->outfile, "[");
+
+	for (i = 1; i < num_fields; i++) {
+		json_parse_cell(fields[i], &cell);
+		if (!cell.value_len && cell.unit)
+			continue;
+
+		if (!cell.unit && i + 1 < num_fields) {
+			json_parse_cell(fields[i + 1], &next);
+			if (!next.value_len && next.unit) {
+				cell.unit = next.unit;
+				cell.unit_len = next.unit_len;
+			}
+		}
+
+		fprintf(this->outfile, "%s{\"value\": ", first ? "" : ", ");
+		json_print_value(this, cell.value, cell.value_len);
+		fprintf(this->outfile, ", \"unit\": ");
+		json_print_unit(this, &cell);
+		fprintf(this->outfile, "}");
+		first = false;
+	}
+
+	fprintf(this->outfile, "]");
+}
+
+/*
+ * Print row as object keyed by column titles. Columns titled as unit
+ * ("[Units]") and unit suffixes are printed as "unit" field, which is always
+ * present in table rows.
+ */
+static void json_print_row(struct view_t *this, int num_fields, char *fields[],
+			   bool with_unit)
+{
+	struct json_out_prv *prv = json_prv(this);
+	struct json_cell cell, unit = { 0 };
+	bool first = true;
+	const char *key;
+	int key_len;
+	int i;
+
+	putc('{', this->outfile);
+
+	for (i = 0; i < num_fields; i++) {
+		json_parse_cell(fields[i], &cell);
+
+		if (cell.unit && !unit.unit)
+			unit = cell;
+
+		if (i >= prv->header_cols || json_is_unit(prv->header[i]))
+			continue;
+
+		key = prv->header[i];
+		key_len = strlen(key);
+		json_trim(&key, &key_len);
+
+		fprintf(this->outfile, "%s", first ? "" : ", ");
+		json_print_string(this, key, key_len);
+		fprintf(this->outfile, ": ");
+		json_print_value(this, cell.value, cell.value_len);
+		first = false;
+	}
+
+	if (unit.unit || with_unit) {
+		fprintf(this->outfile, "%s\"unit\": ", first ? "" : ", ");
+		json_print_unit(this, &unit);
+	}
+}
+
+int json_process_row(struct view_t *this, int type, int num_fields, char *fields[])
+{
+	struct json_out_prv *prv = json_prv(this);
+
+	switch (type) {
+	case DATA_SET:
+	case RECORD:
+		json_close_record(this);
+		break;
+	case KV_PAIR:
+		if (num_fields < 1)
+			break;
+		json_print_kv_pair(this, num_fields, fields);
+		break;
+	case TABLE_HEADER:
+		if (num_fields < 1)
+			break;
+		return json_begin_section(this, fields[0], JSON_SECTION_TABLE,
+					  num_fields, fields);
+	case TABLE_SECTION:
+	case TABLE_ROW:
+		if (prv->section != JSON_SECTION_TABLE)
+			return 1;
+		fprintf(this->outfile, "%s\n\t\t", prv->rows ? "," : "");
+		json_print_row(this, num_fields, fields, true);
+		putc('}', this->outfile);
+		prv->rows++;
+		break;
+	case TREE_HEADER:
+		return json_begin_section(this, "devices", JSON_SECTION_TREE,
+					  num_fields, fields);
+	case TREE_BRANCH:
+		if (prv->section != JSON_SECTION_TREE)
+			return 1;
+		if (prv->branch_open)
+			fprintf(this->outfile, "]}");
+		fprintf(this->outfile, "%s\n\t\t", prv->rows ? "," : "");
+		json_print_row(this, num_fields, fields, false);
+		fprintf(this->outfile, ", \"children\": [");
+		prv->branch_open = true;
+		prv->leaves = 0;
+		prv->rows++;
+		break;
+	case TREE_LEAF:
+		if (prv->section != JSON_SECTION_TREE)
+			return 1;
+		if (prv->branch_open) {
+			fprintf(this->outfile, "%s\n\t\t\t", prv->leaves ? "," : "");
+			prv->leaves++;
+		} else {
+			fprintf(this->outfile, "%s\n\t\t", prv->rows ? "," : "");
+			prv->rows++;
+		}
+		json_print_row(this, num_fields, fields, false);
+		putc('}', this->outfile);
+		break;
+	}
+
+	return 0;
+}
+
+int json_end_input(struct view_t *this)
+{
+	json_close_record(this);
+	fprintf(this->outfile, "\n]}\n");
+	fflush(this->outfile);
+	return 0;
+}
+
+int json_construct(struct view_t *this)
+{
+	struct json_out_prv *prv = calloc(sizeof(struct json_out_prv), 1);
+
+	if (!prv) {
+		return 1;
+	}
+	this->ctx.json_prv = prv;
+
+	fprintf(this->outfile, "{\"records\": [");
+
+	return 0;
+}
+
+int json_destruct(struct view_t *this)
+{
+	json_free_header(this);
+	free(this->ctx.json_prv);
+	return 0;
+}
@@ -9,6 +9,10 @@
 #include "classifier.h"
 #include "classifier_defs.h"
 #include <linux/namei.h>
+#include <linux/jhash.h>
+#include <linux/rcupdate.h>
+#include <linux/hash.h>
+#include <linux/sort.h>
 
 /* Kernel log prefix */
 #define CAS_CLS_LOG_PREFIX OCF_PREFIX_SHORT"[Classifier]"
@@ -33,6 +37,11 @@
 #define CAS_CLS_DEBUG_TRACE(format, ...) ({})
 #endif
 
+/* Lifetime of memoized per-inode classification result. File renames are
+ * not tracked, so they are picked up after this time - same as with
+ * periodic directory inode resolution. */
+#define CAS_CLS_MEMO_TTL HZ
+
 /* Done condition test - always accepts and stops evaluation */
 static cas_cls_eval_t _cas_cls_done_test(struct cas_classifier *cls,
 		struct cas_cls_condition *c, struct cas_cls_io *io,
@@ -318,6 +327,14 @@ static cas_cls_eval_t _cas_cls_file_size_test(
 	return _cas_cls_numeric_test_u(c, i_size_read(io->inode));
 }
 
+/* Invalidate memoized results after directory resolution change */
+static void _cas_cls_dir_gen_inc(struct cas_classifier *cls)
+{
+	/* Order against update of resolved inode */
+	smp_mb__before_atomic();
+	atomic_inc(&cls->dir_gen);
+}
+
 /* Resolve path to inode */
 static void _cas_cls_directory_resolve(struct cas_classifier *cls,
 		struct cas_cls_directory *ctx)
@@ -335,6 +352,7 @@ static void _cas_cls_directory_resolve(struct cas_classifier *cls,
 	if (error) {
 		ctx->resolved = 0;
 		if (o_res) {
+			_cas_cls_dir_gen_inc(cls);
 			CAS_CLS_DEBUG_MSG("Removed inode resolution for %s\n",
 					ctx->pathname);
 		}
@@ -346,6 +364,9 @@ static void _cas_cls_directory_resolve(struct cas_classifier *cls,
 	ctx->resolved = 1;
 	path_put(&path);
 
+	if (!o_res || o_ino != ctx->i_ino)
+		_cas_cls_dir_gen_inc(cls);
+
 	if (!o_res) {
 		CAS_CLS_DEBUG_MSG("Resolved %s to inode: %lu\n", ctx->pathname,
 				ctx->i_ino);
@@ -708,36 +729,47 @@ static cas_cls_eval_t _cas_cls_request_direction_test(
 	return _cas_cls_numeric_test_u(c, bio_data_dir(io->bio));
 }
 
-/* Array of condition handlers */
+/* Array of condition handlers. Cost ranks data needed by the test: bio or
+ * task fields (0), page or inode (1), dentry (2), directory tree walk (3).
+ * Per-inode flag is set for conditions which give the same result for all
+ * I/O to given file. */
 static struct cas_cls_condition_handler _handlers[] = {
-	{ "done", _cas_cls_done_test, _cas_cls_generic_ctr },
-	{ "metadata", _cas_cls_metadata_test, _cas_cls_generic_ctr },
-	{ "direct", _cas_cls_direct_test, _cas_cls_generic_ctr },
+	{ "done", _cas_cls_done_test, _cas_cls_generic_ctr, NULL,
+			0, cas_cls_index_none, 1 },
+	{ "metadata", _cas_cls_metadata_test, _cas_cls_generic_ctr, NULL,
+			1, cas_cls_index_none, 1 },
+	{ "direct", _cas_cls_direct_test, _cas_cls_generic_ctr, NULL,
+			1, cas_cls_index_none, 1 },
 	{ "io_class", _cas_cls_io_class_test, _cas_cls_numeric_ctr,
-			_cas_cls_generic_dtr },
+			_cas_cls_generic_dtr, 0, cas_cls_index_none, 1 },
 	{ "file_size", _cas_cls_file_size_test, _cas_cls_numeric_ctr,
-			_cas_cls_generic_dtr },
+			_cas_cls_generic_dtr, 1, cas_cls_index_file_size, 1 },
 	{ "directory", _cas_cls_directory_test, _cas_cls_directory_ctr,
-			_cas_cls_directory_dtr },
+			_cas_cls_directory_dtr, 3, cas_cls_index_none, 1 },
 	{ "core_id", _cas_cls_core_id_test, _cas_cls_core_id_ctr,
-			_cas_cls_core_id_dtr },
+			_cas_cls_core_id_dtr, 1, cas_cls_index_none, 0 },
 	{ "extension", _cas_cls_extension_test, _cas_cls_string_ctr,
-			_cas_cls_generic_dtr },
+			_cas_cls_generic_dtr, 2, cas_cls_index_extension, 1 },
 	{ "file_name_prefix", _cas_cls_file_name_prefix_test, _cas_cls_string_ctr,
-			_cas_cls_generic_dtr },
-	{ "lba", _cas_cls_lba_test, _cas_cls_numeric_ctr, _cas_cls_generic_dtr },
-	{ "pid", _cas_cls_pid_test, _cas_cls_numeric_ctr, _cas_cls_generic_dtr },
+			_cas_cls_generic_dtr, 2, cas_cls_index_file_name_prefix,
+			1 },
+	{ "lba", _cas_cls_lba_test, _cas_cls_numeric_ctr, _cas_cls_generic_dtr,
+			0, cas_cls_index_lba, 0 },
+	{ "pid", _cas_cls_pid_test, _cas_cls_numeric_ctr, _cas_cls_generic_dtr,
+			0, cas_cls_index_none, 0 },
 	{ "process_name", _cas_cls_process_name_test, _cas_cls_string_ctr,
-					_cas_cls_generic_dtr },
+					_cas_cls_generic_dtr, 1, cas_cls_index_none, 0 },
 	{ "file_offset", _cas_cls_file_offset_test, _cas_cls_numeric_ctr,
-					_cas_cls_generic_dtr },
+					_cas_cls_generic_dtr, 2, cas_cls_index_none, 0 },
 	{ "request_size", _cas_cls_request_size_test, _cas_cls_numeric_ctr,
-					_cas_cls_generic_dtr },
+					_cas_cls_generic_dtr, 0,
+					cas_cls_index_request_size, 0 },
 	{ "io_direction", _cas_cls_request_direction_test,
-			_cas_cls_direction_ctr,	_cas_cls_generic_dtr },
+			_cas_cls_direction_ctr,	_cas_cls_generic_dtr,
+			0, cas_cls_index_none, 0 },
 #ifdef CAS_WLTH_SUPPORT
 	{ "wlth", _cas_cls_wlth_test, _cas_cls_numeric_ctr,
-			_cas_cls_generic_dtr},
+			_cas_cls_generic_dtr, 0, cas_cls_index_none, 0 },
 #endif
 	{ NULL }
 };
@@ -927,6 +959,7 @@ static void _cas_cls_rule_destroy(struct cas_classifier *cls,
 		_cas_cls_free_condition(cls, c);
 	}
 
+	kfree(r->conds);
 	kfree(r);
 }
 
@@ -938,6 +971,138 @@ void cas_cls_rule_destroy(ocf_cache_t cache, struct cas_cls_rule *r)
 	_cas_cls_rule_destroy(cls, r);
 }
 
+/* Narrow @range down to values accepted by numeric condition. Returns 0 if
+ * condition operator cannot be expressed as an interval. */
+static int _cas_cls_range_narrow(struct cas_cls_range *range,
+		struct cas_cls_numeric *ctx)
+{
+	uint64_t lo = 0, hi = U64_MAX, v = ctx->v_u64;
+
+	switch (ctx->operator) {
+	case cas_cls_numeric_eq:
+		lo = hi = v;
+		break;
+	case cas_cls_numeric_lt:
+		if (v == 0) {
+			/* Nothing is lower than 0 - empty interval */
+			lo = 1;
+			hi = 0;
+		} else {
+			hi = v - 1;
+		}
+		break;
+	case cas_cls_numeric_gt:
+		if (v == U64_MAX) {
+			lo = 1;
+			hi = 0;
+		} else {
+			lo = v + 1;
+		}
+		break;
+	case cas_cls_numeric_le:
+		hi = v;
+		break;
+	case cas_cls_numeric_ge:
+		lo = v;
+		break;
+	default:
+		return 0;
+	}
+
+	range->lo = max(range->lo, lo);
+	range->hi = min(range->hi, hi);
+
+	return 1;
+}
+
+/* Try to resolve condition by rule set index. Returns 1 if condition
+ * doesn't need to be tested when evaluating rule. */
+static int _cas_cls_rule_index_condition(struct cas_cls_rule *r,
+		struct cas_cls_condition *c)
+{
+	enum cas_cls_index index = c->handler->index;
+
+	switch (index) {
+	case cas_cls_index_extension:
+		if (r->extension)
+			return 0;
+		r->extension = c->context;
+		return 1;
+	case cas_cls_index_file_name_prefix:
+		if (r->prefix)
+			return 0;
+		r->prefix = c->context;
+		return 1;
+	case cas_cls_index_file_size:
+	case cas_cls_index_lba:
+	case cas_cls_index_request_size:
+		if (!_cas_cls_range_narrow(&r->range[CAS_CLS_RANGE(index)],
+				c->context)) {
+			return 0;
+		}
+		r->range_mask |= 1 << CAS_CLS_RANGE(index);
+		return 1;
+	default:
+		return 0;
+	}
+}
+
+/* Compile rule for indexed evaluation. Conjunction of conditions is
+ * split into requirements resolved by rule set index (extension, file
+ * name prefix, numeric intervals) and remaining conditions, ordered from
+ * the cheapest one. Rules using "or" operator are left uncompiled. */
+static int _cas_cls_rule_compile(struct cas_cls_rule *r)
+{
+	struct cas_cls_condition *c, *done = NULL;
+	unsigned count = 0, i, j;
+
+	r->and_chain = 1;
+	list_for_each_entry(c, &r->conditions, list) {
+		if (count++ && c->l_op != cas_cls_logical_and)
+			r->and_chain = 0;
+	}
+
+	if (!r->and_chain)
+		return 0;
+
+	for (i = 0; i < CAS_CLS_RANGE_MAX; i++) {
+		r->range[i].lo = 0;
+		r->range[i].hi = U64_MAX;
+	}
+
+	r->conds = kcalloc(count, sizeof(*r->conds), GFP_KERNEL);
+	if (!r->conds)
+		return -ENOMEM;
+
+	list_for_each_entry(c, &r->conditions, list) {
+		/* Conditions past "done" are never evaluated */
+		if (c->handler->test == _cas_cls_done_test) {
+			done = c;
+			break;
+		}
+
+		if (_cas_cls_rule_index_condition(r, c))
+			continue;
+
+		/* Insertion sort, stable for conditions of equal cost */
+		for (j = r->nr_conds; j > 0; j--) {
+			if (r->conds[j - 1]->handler->cost <= c->handler->cost)
+				break;
+			r->conds[j] = r->conds[j - 1];
+		}
+		r->conds[j] = c;
+		r->nr_conds++;
+	}
+
+	if (done)
+		r->conds[r->nr_conds++] = done;
+
+	CAS_CLS_DEBUG_MSG("\t - Compiled rule with %u tested conditions\n",
+			r->nr_conds);
+
+	return 0;
+}
+
 /* Create rule from text description. @rule might be overwritten */
 static struct cas_cls_rule *_cas_cls_rule_create(struct cas_classifier *cls,
 		ocf_part_id_t part_id, char *rule)
@@ -948,13 +1113,15 @@ static struct cas_cls_rule *_cas_cls_rule_create(struct cas_classifier *cls,
 	if (part_id == 0 || rule[0] == '\0')
 		return NULL;
 
-	r = kmalloc(sizeof(*r), GFP_KERNEL);
+	r = kzalloc(sizeof(*r), GFP_KERNEL);
 	if (!r)
 		return ERR_PTR(-ENOMEM);
 
 	r->part_id = part_id;
 	INIT_LIST_HEAD(&r->conditions);
 	result = _cas_cls_parse_conditions(cls, r, rule);
+	if (!result)
+		result = _cas_cls_rule_compile(r);
 	if (result) {
 		_cas_cls_rule_destroy(cls, r);
 		return ERR_PTR(result);
@@ -963,19 +1130,189 @@ static struct cas_cls_rule *_cas_cls_rule_create(struct cas_classifier *cls,
 	return r;
 }
 
-/* Update rule associated with given io class */
-void cas_cls_rule_apply(ocf_cache_t cache,
+/* Find rules requiring given string in rule set index */
+static struct cas_cls_key *_cas_cls_ruleset_find(struct cas_cls_ruleset *rs,
+		enum cas_cls_index index, const char *string, uint32_t len,
+		uint32_t hash)
+{
+	struct cas_cls_key *key;
+
+	key = rs->buckets[hash % CAS_CLS_HASH_SIZE];
+	for (; key; key = key->next) {
+		if (key->hash == hash && key->index == index &&
+				key->string->len == len &&
+				!memcmp(key->string->string, string, len)) {
+			return key;
+		}
+	}
+
+	return NULL;
+}
+
+/* Get mask of rules requiring given string */
+static uint64_t _cas_cls_ruleset_lookup(struct cas_cls_ruleset *rs,
+		enum cas_cls_index index, const char *string, uint32_t len)
+{
+	struct cas_cls_key *key;
+
+	key = _cas_cls_ruleset_find(rs, index, string, len,
+			jhash(string, len, index));
+
+	return key ? key->mask : 0;
+}
+
+/* Add rule requirement to rule set string index */
+static void _cas_cls_ruleset_add_key(struct cas_cls_ruleset *rs,
+		enum cas_cls_index index, struct cas_cls_string *string,
+		uint64_t mask)
+{
+	struct cas_cls_key *key;
+	uint32_t hash;
+
+	hash = jhash(string->string, string->len, index);
+	key = _cas_cls_ruleset_find(rs, index, string->string, string->len,
+			hash);
+	if (key) {
+		key->mask |= mask;
+		return;
+	}
+
+	key = &rs->keys[rs->nr_keys++];
+	key->string = string;
+	key->index = index;
+	key->hash = hash;
+	key->mask = mask;
+	key->next = rs->buckets[hash % CAS_CLS_HASH_SIZE];
+	rs->buckets[hash % CAS_CLS_HASH_SIZE] = key;
+}
+
+static int _cas_cls_u64_cmp(const void *a, const void *b)
+{
+	uint64_t x = *(const uint64_t *)a, y = *(const uint64_t *)b;
+
+	return x < y ? -1 : x > y;
+}
+
+/* Add file size at which rule result might change. Returns 0 if there is
+ * no space left. */
+static int _cas_cls_ruleset_add_size_bound(struct cas_cls_ruleset *rs,
+		uint64_t bound)
+{
+	unsigned i;
+
+	for (i = 0; i < rs->nr_size_bounds; i++) {
+		if (rs->size_bounds[i] == bound)
+			return 1;
+	}
+
+	if (rs->nr_size_bounds == CAS_CLS_SIZE_BOUNDS_MAX)
+		return 0;
+
+	rs->size_bounds[rs->nr_size_bounds++] = bound;
+	return 1;
+}
+
+/* Check whether classification result of rule depends only on I/O target
+ * inode and collect its file size boundaries */
+static int _cas_cls_ruleset_rule_memoizable(struct cas_cls_ruleset *rs,
+		struct cas_cls_rule *r)
+{
+	struct cas_cls_condition *c;
+	struct cas_cls_numeric *ctx;
+
+	list_for_each_entry(c, &r->conditions, list) {
+		if (!c->handler->per_inode)
+			return 0;
+
+		if (c->handler->index != cas_cls_index_file_size)
+			continue;
+
+		/* Each numeric operator changes its result at v or v + 1 */
+		ctx = c->context;
+		if (!_cas_cls_ruleset_add_size_bound(rs, ctx->v_u64))
+			return 0;
+		if (ctx->v_u64 != U64_MAX && !_cas_cls_ruleset_add_size_bound(
+				rs, ctx->v_u64 + 1)) {
+			return 0;
+		}
+	}
+
+	return 1;
+}
+
+/* Build rule set index for current rules list */
+static void _cas_cls_ruleset_build(struct cas_classifier *cls,
+		struct cas_cls_ruleset *rs)
+{
+	struct cas_cls_rule *r;
+	uint64_t mask;
+	unsigned i;
+
+	memset(rs, 0, sizeof(*rs));
+	rs->version = ++cls->version;
+	rs->memoizable = 1;
+
+	list_for_each_entry(r, &cls->rules, list) {
+		if (rs->memoizable && !_cas_cls_ruleset_rule_memoizable(rs, r))
+			rs->memoizable = 0;
+
+		mask = 1ULL << rs->nr_rules;
+		rs->rules[rs->nr_rules++] = r;
+
+		if (r->extension) {
+			rs->extension_mask |= mask;
+			_cas_cls_ruleset_add_key(rs, cas_cls_index_extension,
+					r->extension, mask);
+		}
+
+		if (!r->prefix)
+			continue;
+
+		rs->prefix_mask |= mask;
+		_cas_cls_ruleset_add_key(rs, cas_cls_index_file_name_prefix,
+				r->prefix, mask);
+
+		for (i = 0; i < rs->nr_prefix_lens; i++) {
+			if (rs->prefix_lens[i] == r->prefix->len)
+				break;
+		}
+		if (i == rs->nr_prefix_lens)
+			rs->prefix_lens[rs->nr_prefix_lens++] = r->prefix->len;
+	}
+
+	sort(rs->size_bounds, rs->nr_size_bounds, sizeof(rs->size_bounds[0]),
+			_cas_cls_u64_cmp, NULL);
+
+	CAS_CLS_DEBUG_MSG("Built rule set %u with %u rules, memoizable: %d\n",
+			rs->version, rs->nr_rules, rs->memoizable);
+}
+
+/* Rebuild rule set and publish it to I/O path. Must be called with
+ * classifier lock held. Returns after all readers of previous rule set
+ * are done, so rules removed from the list can be safely destroyed. */
+static void _cas_cls_ruleset_publish(struct cas_classifier *cls)
+{
+	struct cas_cls_ruleset *rs;
+
+	rs = rcu_dereference_protected(cls->ruleset,
+			lockdep_is_held(&cls->lock));
+	rs = (rs == &cls->rulesets[0]) ? &cls->rulesets[1] : &cls->rulesets[0];
+
+	_cas_cls_ruleset_build(cls, rs);
+	rcu_assign_pointer(cls->ruleset, rs);
+
+	synchronize_rcu();
+}
+
+/* Replace rule associated with given io class on rules list. Must be called
+ * with classifier lock held. Returns previous rule, which can be destroyed
+ * only after new rule set is published. */
+static struct cas_cls_rule *_cas_cls_rule_replace(struct cas_classifier *cls,
 		ocf_part_id_t part_id, struct cas_cls_rule *new)
 {
-	struct cas_classifier *cls;
 	struct cas_cls_rule *old = NULL, *elem;
 	struct list_head *item, *_n;
 
-	cls = cas_get_classifier(cache);
-	BUG_ON(!cls);
-
-	write_lock(&cls->lock);
-
 	/* Walk through list of rules in reverse order (tail to head), visiting
 	 * rules from high to low part_id */
 	list_for_each_prev_safe(item, _n, &cls->rules) {
@@ -994,16 +1331,44 @@ void cas_cls_rule_apply(ocf_cache_t cache,
 	if (new)
 		list_add(&new->list, item);
 
-	write_unlock(&cls->lock);
+	return old;
+}
 
-	_cas_cls_rule_destroy(cls, old);
+/* Update rules associated with all io classes, rules[part_id] being the new
+ * rule of given io class (NULL removes it). Rule set is rebuilt and published
+ * once for all of them, so there is a single RCU grace period to wait for. */
+void cas_cls_rules_apply(ocf_cache_t cache, struct cas_cls_rule **rules)
+{
+	struct cas_classifier *cls;
+	struct cas_cls_rule *old[OCF_USER_IO_CLASS_MAX];
+	ocf_part_id_t part_id;
+	bool changed = false;
 
-	if (old)
-		CAS_CLS_DEBUG_MSG("Removed rule for class %d\n", part_id);
-	if (new)
-		CAS_CLS_DEBUG_MSG("New rule for class  %d\n", part_id);
+	cls = cas_get_classifier(cache);
+	BUG_ON(!cls);
 
-	return;
+	mutex_lock(&cls->lock);
+
+	for (part_id = 0; part_id < OCF_USER_IO_CLASS_MAX; part_id++) {
+		old[part_id] = _cas_cls_rule_replace(cls, part_id,
+				rules[part_id]);
+		if (old[part_id] || rules[part_id])
+			changed = true;
+	}
+
+	if (changed)
+		_cas_cls_ruleset_publish(cls);
+
+	mutex_unlock(&cls->lock);
+
+	for (part_id = 0; part_id < OCF_USER_IO_CLASS_MAX; part_id++) {
+		_cas_cls_rule_destroy(cls, old[part_id]);
+
+		if (old[part_id])
+			CAS_CLS_DEBUG_MSG("Removed rule for class %d\n", part_id);
+		if (rules[part_id])
+			CAS_CLS_DEBUG_MSG("New rule for class  %d\n", part_id);
+	}
 }
 
 /*
@@ -1025,8 +1390,10 @@ static int _cas_cls_rule_err_to_cass_err(int err)
 	}
 }
 
-/* Create and apply classification rule for given class id */
-static int _cas_cls_rule_init(ocf_cache_t cache, ocf_part_id_t part_id)
+/* Create classification rule for given class id. *rule is left NULL if io
+ * class doesn't exist */
+static int _cas_cls_rule_init(ocf_cache_t cache, ocf_part_id_t part_id,
+		struct cas_cls_rule **rule)
 {
 	struct cas_classifier *cls;
 	struct ocf_io_class_info *info;
@@ -1060,7 +1427,7 @@ static int _cas_cls_rule_init(ocf_cache_t cache, ocf_part_id_t part_id)
 		goto exit;
 	}
 
-	cas_cls_rule_apply(cache, part_id, r);
+	*rule = r;
 
 exit:
 	kfree(info);
@@ -1120,6 +1487,9 @@ void cas_cls_deinit(ocf_cache_t cache)
 	cls = cas_get_classifier(cache);
 	ENV_BUG_ON(!cls);
 
+	RCU_INIT_POINTER(cls->ruleset, NULL);
+	synchronize_rcu();
+
 	list_for_each_safe(item, n, &cls->rules) {
 		r = list_entry(item, struct cas_cls_rule, list);
 		list_del(item);
@@ -1128,6 +1498,7 @@ void cas_cls_deinit(ocf_cache_t cache)
 
 	destroy_workqueue(cls->wq);
 
+	free_percpu(cls->memo);
 	kfree(cls);
 	cas_set_classifier(cache, NULL);
 
@@ -1141,19 +1512,30 @@ static struct cas_classifier *_cas_cls_init(void)
 {
 	struct cas_classifier *cls;
 
+	/* Rule set masks have one bit per rule */
+	BUILD_BUG_ON(OCF_USER_IO_CLASS_MAX > 64);
+
 	cls = kzalloc(sizeof(*cls), GFP_KERNEL);
 	if (!cls)
 		return ERR_PTR(-ENOMEM);
 
 	INIT_LIST_HEAD(&cls->rules);
 
+	cls->memo = alloc_percpu(struct cas_cls_memo);
+	if (!cls->memo) {
+		kfree(cls);
+		return ERR_PTR(-ENOMEM);
+	}
+
 	cls->wq = alloc_workqueue("kcas_clsd", WQ_UNBOUND | WQ_FREEZABLE, 1);
 	if (!cls->wq) {
+		free_percpu(cls->memo);
 		kfree(cls);
 		return ERR_PTR(-ENOMEM);
 	}
 
-	rwlock_init(&cls->lock);
+	mutex_init(&cls->lock);
+	atomic_set(&cls->dir_gen, 0);
 
 	CAS_CLS_MSG(KERN_INFO, "Initialized IO classifier\n");
 
@@ -1164,6 +1546,7 @@ static struct cas_classifier *_cas_cls_init(void)
 int cas_cls_init(ocf_cache_t cache)
 {
 	struct cas_classifier *cls;
+	struct cas_cls_rule *rules[OCF_USER_IO_CLASS_MAX] = { NULL };
 	unsigned result = 0;
 	unsigned i;
 
@@ -1175,15 +1558,21 @@ int cas_cls_init(ocf_cache_t cache)
 	/* Update rules for all I/O classes except 0 - this is default for all
 	 * unclassified I/O */
 	for (i = 1; i < OCF_USER_IO_CLASS_MAX; i++) {
-		result = _cas_cls_rule_init(cache, i);
+		result = _cas_cls_rule_init(cache, i, &rules[i]);
 		if (result)
 			break;
 	}
 
-	if (result)
+	if (result) {
+		while (i--)
+			_cas_cls_rule_destroy(cls, rules[i]);
 		cas_cls_deinit(cache);
+		return result;
+	}
 
-	return result;
+	cas_cls_rules_apply(cache, rules);
+
+	return 0;
 }
 
 /* Determine whether io matches rule */
@@ -1194,8 +1583,26 @@ static cas_cls_eval_t cas_cls_process_rule(struct cas_classifier *cls,
 	struct list_head *item;
 	struct cas_cls_condition *c;
 	cas_cls_eval_t ret = cas_cls_eval_no, rr;
+	unsigned i;
 
 	CAS_CLS_DEBUG_TRACE(" Processing rule for class %d\n", r->part_id);
+
+	if (r->and_chain) {
+		/* Indexed requirements were already checked by rule set */
+		for (i = 0; i < r->nr_conds; i++) {
+			c = r->conds[i];
+			rr = c->handler->test(cls, c, io, *part_id);
+			CAS_CLS_DEBUG_TRACE("  Processing condition %s => %d, "
+					"stop:%d\n", c->handler->token, rr.yes,
+					rr.stop);
+			if (!rr.yes)
+				return cas_cls_eval_no;
+			if (rr.stop)
+				return rr;
+		}
+		return cas_cls_eval_yes;
+	}
+
 	list_for_each(item, &r->conditions) {
 
 		c = list_entry(item, struct cas_cls_condition, list);
@@ -1257,15 +1664,168 @@ static void _cas_cls_get_bio_context(struct bio *bio,
 	return;
 }
 
+/* Check whether I/O values fall into all intervals of compiled rule */
+static int _cas_cls_rule_ranges_match(struct cas_cls_rule *r,
+		uint64_t *value, unsigned valid)
+{
+	unsigned i;
+
+	if ((r->range_mask & valid) != r->range_mask)
+		return 0;
+
+	for (i = 0; i < CAS_CLS_RANGE_MAX; i++) {
+		if (!(r->range_mask & (1 << i)))
+			continue;
+		if (value[i] < r->range[i].lo || value[i] > r->range[i].hi)
+			return 0;
+	}
+
+	return 1;
+}
+
+/* Get mask of rules which might match I/O. Rules not selected are known
+ * not to match, without stopping evaluation. */
+static uint64_t _cas_cls_ruleset_candidates(struct cas_cls_ruleset *rs,
+		struct cas_cls_io *io)
+{
+	uint64_t extension_ok = ~rs->extension_mask;
+	uint64_t prefix_ok = ~rs->prefix_mask;
+	uint64_t candidates = 0;
+	uint64_t value[CAS_CLS_RANGE_MAX];
+	unsigned valid = 0;
+	struct dentry *dentry = NULL;
+	const char *name, *extension;
+	uint32_t len;
+	unsigned i;
+
+	if ((rs->extension_mask | rs->prefix_mask) && io->inode)
+		dentry = _cas_cls_dir_get_inode_dentry(io->inode);
+
+	if (dentry && dentry->d_name.name) {
+		name = (const char *)dentry->d_name.name;
+		len = dentry->d_name.len;
+
+		extension = strrchr(name, '.');
+		if (rs->extension_mask && extension) {
+			extension_ok |= _cas_cls_ruleset_lookup(rs,
+					cas_cls_index_extension, extension + 1,
+					len - (extension - name) - 1);
+		}
+
+		for (i = 0; i < rs->nr_prefix_lens; i++) {
+			if (rs->prefix_lens[i] > len)
+				continue;
+			prefix_ok |= _cas_cls_ruleset_lookup(rs,
+					cas_cls_index_file_name_prefix, name,
+					rs->prefix_lens[i]);
+		}
+	}
+
+	if (io->inode && S_ISREG(io->inode->i_mode)) {
+		value[CAS_CLS_RANGE(cas_cls_index_file_size)] =
+			i_size_read(io->inode);
+		valid |= 1 << CAS_CLS_RANGE(cas_cls_index_file_size);
+	}
+
+	value[CAS_CLS_RANGE(cas_cls_index_lba)] = CAS_BIO_BISECTOR(io->bio);
+	valid |= 1 << CAS_CLS_RANGE(cas_cls_index_lba);
+
+	value[CAS_CLS_RANGE(cas_cls_index_request_size)] =
+		CAS_BIO_BISIZE(io->bio);
+	valid |= 1 << CAS_CLS_RANGE(cas_cls_index_request_size);
+
+	for (i = 0; i < rs->nr_rules; i++) {
+		if (!(extension_ok & prefix_ok & (1ULL << i)))
+			continue;
+		if (rs->rules[i]->range_mask && !_cas_cls_rule_ranges_match(
+				rs->rules[i], value, valid)) {
+			continue;
+		}
+		candidates |= 1ULL << i;
+	}
+
+	return candidates;
+}
+
+/* Get index of file size interval between rule set size bounds */
+static uint32_t _cas_cls_memo_size_class(struct cas_cls_ruleset *rs,
+		struct inode *inode)
+{
+	uint64_t size = i_size_read(inode);
+	unsigned lo = 0, hi = rs->nr_size_bounds, mid;
+
+	/* Number of bounds lower or equal to file size */
+	while (lo < hi) {
+		mid = (lo + hi) / 2;
+		if (rs->size_bounds[mid] <= size)
+			lo = mid + 1;
+		else
+			hi = mid;
+	}
+
+	return lo;
+}
+
+/* Get memoized classification result for inode. Returns 1 if valid
+ * result was found. */
+static int _cas_cls_memo_lookup(struct cas_classifier *cls,
+		struct cas_cls_ruleset *rs, struct inode *inode,
+		uint32_t dir_gen, uint32_t size_class, ocf_part_id_t *part_id)
+{
+	struct cas_cls_memo_entry *e;
+	int found;
+
+	e = &get_cpu_ptr(cls->memo)->entries[
+			hash_ptr(inode, ilog2(CAS_CLS_MEMO_SIZE))];
+
+	found = e->inode == inode && e->i_ino == inode->i_ino &&
+		e->i_generation == inode->i_generation &&
+		e->version == rs->version && e->dir_gen == dir_gen &&
+		e->size_class == size_class &&
+		time_before(jiffies, e->expires);
+	if (found)
+		*part_id = e->part_id;
+
+	put_cpu_ptr(cls->memo);
+
+	return found;
+}
+
+/* Memoize classification result for inode */
+static void _cas_cls_memo_store(struct cas_classifier *cls,
+		struct cas_cls_ruleset *rs, struct inode *inode,
+		uint32_t dir_gen, uint32_t size_class, ocf_part_id_t part_id)
+{
+	struct cas_cls_memo_entry *e;
+
+	e = &get_cpu_ptr(cls->memo)->entries[
+			hash_ptr(inode, ilog2(CAS_CLS_MEMO_SIZE))];
+
+	e->inode = inode;
+	e->i_ino = inode->i_ino;
+	e->i_generation = inode->i_generation;
+	e->version = rs->version;
+	e->dir_gen = dir_gen;
+	e->size_class = size_class;
+	e->expires = jiffies + CAS_CLS_MEMO_TTL;
+	e->part_id = part_id;
+
+	put_cpu_ptr(cls->memo);
+}
+
 /* Determine I/O class for bio */
 ocf_part_id_t cas_cls_classify(ocf_cache_t cache, struct bio *bio)
 {
 	struct cas_classifier *cls;
 	struct cas_cls_io io = {};
-	struct list_head *item;
+	struct cas_cls_ruleset *rs;
 	struct cas_cls_rule *r;
 	ocf_part_id_t part_id = 0;
 	cas_cls_eval_t ret;
+	uint64_t candidates;
+	uint32_t dir_gen = 0, size_class = 0;
+	int memo = 0;
+	unsigned i;
 
 	cls = cas_get_classifier(cache);
 	if (!cls)
@@ -1273,18 +1833,44 @@ ocf_part_id_t cas_cls_classify(ocf_cache_t cache, struct bio *bio)
 
 	_cas_cls_get_bio_context(bio, &io);
 
-	read_lock(&cls->lock);
+	rcu_read_lock();
+	rs = rcu_dereference(cls->ruleset);
+	if (!rs || !rs->nr_rules)
+		goto unlock;
+
+	if (rs->memoizable && io.inode) {
+		/* Read generation before evaluating directory conditions, so
+		 * that result based on outdated resolution is not reused */
+		dir_gen = atomic_read(&cls->dir_gen);
+		smp_rmb();
+		size_class = _cas_cls_memo_size_class(rs, io.inode);
+		if (_cas_cls_memo_lookup(cls, rs, io.inode, dir_gen,
+				size_class, &part_id)) {
+			goto unlock;
+		}
+		memo = 1;
+	}
+
 	CAS_CLS_DEBUG_TRACE("%s\n", "Starting processing");
-	list_for_each(item, &cls->rules) {
-		r = list_entry(item, struct cas_cls_rule, list);
+	candidates = _cas_cls_ruleset_candidates(rs, &io);
+	for (i = 0; i < rs->nr_rules; i++) {
+		if (!(candidates & (1ULL << i)))
+			continue;
+		r = rs->rules[i];
 		ret = cas_cls_process_rule(cls, r, &io, &part_id);
 		if (ret.yes)
 			part_id = r->part_id;
 		if (ret.stop)
 			break;
 	}
-	read_unlock(&cls->lock);
+
+	if (memo) {
+		_cas_cls_memo_store(cls, rs, io.inode, dir_gen, size_class,
+				part_id);
+	}
+
+unlock:
+	rcu_read_unlock();
 
 	return part_id;
 }
-
@@ -22,9 +22,8 @@ int cas_cls_rule_create(ocf_cache_t cache,
 /* Deinit classification rule */
 void cas_cls_rule_destroy(ocf_cache_t cache, struct cas_cls_rule *r);
 
-/* Bind classification rule to io class */
-void cas_cls_rule_apply(ocf_cache_t cache, ocf_part_id_t part_id,
-		struct cas_cls_rule *r);
+/* Bind classification rules to all io classes, indexed by io class id */
+void cas_cls_rules_apply(ocf_cache_t cache, struct cas_cls_rule **rules);
 
 /* Determine I/O class for bio */
 ocf_part_id_t cas_cls_classify(ocf_cache_t cache, struct bio *bio);
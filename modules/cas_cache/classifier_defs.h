@@ -8,6 +8,39 @@
 
 #define MAX_STRING_SPECIFIER_LEN 256
 
+/* Number of buckets in rule set string hash table */
+#define CAS_CLS_HASH_SIZE 64
+
+struct cas_cls_string;
+struct cas_cls_condition;
+
+/* Condition kinds which can be resolved by rule set index instead of
+ * calling condition test for each rule */
+enum cas_cls_index {
+	cas_cls_index_none = 0,
+	cas_cls_index_extension,
+	cas_cls_index_file_name_prefix,
+	cas_cls_index_file_size,
+	cas_cls_index_lba,
+	cas_cls_index_request_size,
+};
+
+/* Number of entries in per-CPU inode classification cache */
+#define CAS_CLS_MEMO_SIZE 256
+
+/* Max number of distinct file size boundaries for memoized rule set */
+#define CAS_CLS_SIZE_BOUNDS_MAX 64
+
+/* Numeric conditions are folded into one interval per kind */
+#define CAS_CLS_RANGE(index) ((index) - cas_cls_index_file_size)
+#define CAS_CLS_RANGE_MAX CAS_CLS_RANGE(cas_cls_index_request_size + 1)
+
+/* Closed interval of accepted values, empty if lo > hi */
+struct cas_cls_range {
+	uint64_t lo;
+	uint64_t hi;
+};
+
 /* Rule matches 1:1 with io class. It contains multiple conditions with
  * associated logical operator (and/or) */
 struct cas_cls_rule {
@@ -19,6 +52,123 @@ struct cas_cls_rule {
 
 	/* Conditions for this rule */
 	struct list_head conditions;
+
+	/* 1 if rule is plain conjunction of conditions. Only such rules are
+	 * compiled, others are evaluated by walking conditions list */
+	int and_chain;
+
+	/* Extension required by compiled rule, NULL if any */
+	struct cas_cls_string *extension;
+
+	/* File name prefix required by compiled rule, NULL if any */
+	struct cas_cls_string *prefix;
+
+	/* Bitmask of intervals constraining compiled rule */
+	unsigned range_mask;
+
+	/* Intervals of numeric conditions, indexed with CAS_CLS_RANGE() */
+	struct cas_cls_range range[CAS_CLS_RANGE_MAX];
+
+	/* Conditions of compiled rule not resolved by index, cheapest first,
+	 * "done" condition (if any) last */
+	struct cas_cls_condition **conds;
+
+	/* Number of conditions in @conds */
+	unsigned nr_conds;
+};
+
+/* String index entry - extension or file name prefix required by rules */
+struct cas_cls_key {
+	/* Next entry in hash bucket */
+	struct cas_cls_key *next;
+
+	/* Indexed string, owned by rule condition */
+	struct cas_cls_string *string;
+
+	/* Either extension or file name prefix */
+	enum cas_cls_index index;
+
+	/* Hash of the string */
+	uint32_t hash;
+
+	/* Rules requiring this string */
+	uint64_t mask;
+};
+
+/* Rule set compiled from rules list, published to I/O path via RCU. Rules
+ * are identified by their position in @rules, which is also bit number
+ * in rule masks. */
+struct cas_cls_ruleset {
+	/* Rules in evaluation order (ascending part_id) */
+	struct cas_cls_rule *rules[OCF_USER_IO_CLASS_MAX];
+
+	/* Number of rules in @rules */
+	unsigned nr_rules;
+
+	/* Rules requiring particular extension */
+	uint64_t extension_mask;
+
+	/* Rules requiring particular file name prefix */
+	uint64_t prefix_mask;
+
+	/* Distinct lengths of indexed file name prefixes */
+	uint32_t prefix_lens[OCF_USER_IO_CLASS_MAX];
+
+	/* Number of entries in @prefix_lens */
+	unsigned nr_prefix_lens;
+
+	/* String index hash table */
+	struct cas_cls_key *buckets[CAS_CLS_HASH_SIZE];
+
+	/* Storage for string index entries, up to two per rule */
+	struct cas_cls_key keys[2 * OCF_USER_IO_CLASS_MAX];
+
+	/* Number of used entries in @keys */
+	unsigned nr_keys;
+
+	/* Rule set version, distinct for each published rule set */
+	uint32_t version;
+
+	/* 1 if all rules depend only on I/O target inode, so classification
+	 * result can be memoized per inode */
+	int memoizable;
+
+	/* Sorted file sizes at which result of file_size condition might
+	 * change */
+	uint64_t size_bounds[CAS_CLS_SIZE_BOUNDS_MAX];
+
+	/* Number of entries in @size_bounds */
+	unsigned nr_size_bounds;
+};
+
+/* Memoized classification result for single inode */
+struct cas_cls_memo_entry {
+	/* Inode, used only for comparison */
+	struct inode *inode;
+
+	/* Inode number and generation, to tell apart reused inode objects */
+	unsigned long i_ino;
+	uint32_t i_generation;
+
+	/* Rule set version the result was computed with */
+	uint32_t version;
+
+	/* Directory resolution generation the result was computed with */
+	uint32_t dir_gen;
+
+	/* Index of file size interval between rule set size bounds */
+	uint32_t size_class;
+
+	/* Time (jiffies) after which entry is not valid */
+	unsigned long expires;
+
+	/* Classification result */
+	ocf_part_id_t part_id;
+};
+
+/* Per-CPU direct mapped inode classification cache */
+struct cas_cls_memo {
+	struct cas_cls_memo_entry entries[CAS_CLS_MEMO_SIZE];
 };
 
 /* Classifier context - one per cache instance. */
@@ -29,8 +179,24 @@ struct cas_classifier {
 	/* Directory inode resolving workqueue */
 	struct workqueue_struct *wq;
 
-	/* Lock for rules list */
-	rwlock_t lock __attribute__((aligned(64)));
+	/* Rule set currently used by I/O path */
+	struct cas_cls_ruleset __rcu *ruleset;
+
+	/* Lock serializing rules list updates */
+	struct mutex lock;
+
+	/* Version of last built rule set */
+	uint32_t version;
+
+	/* Incremented whenever directory condition resolves to other inode */
+	atomic_t dir_gen;
+
+	/* Per-inode classification results */
+	struct cas_cls_memo __percpu *memo;
+
+	/* Two rule sets used alternately - the one not published is rebuilt
+	 * on rules update, after readers of it are done */
+	struct cas_cls_ruleset rulesets[2];
 };
 
 struct cas_cls_condition_handler;
@@ -99,6 +265,15 @@ struct cas_cls_condition_handler {
 
 	/* Condition destructor */
 	void (*dtr)(struct cas_classifier *cls, struct cas_cls_condition *c);
+
+	/* Relative evaluation cost, used to order conditions within rule */
+	unsigned cost;
+
+	/* Rule set index able to resolve this condition */
+	enum cas_cls_index index;
+
+	/* 1 if condition result depends only on I/O target inode */
+	int per_inode;
 };
 
 /* Numeric condition numeric operators */
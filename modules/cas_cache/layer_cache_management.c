@@ -1753,8 +1753,7 @@ int cache_mngt_set_partitions(const char *cache_name, size_t name_len,
 	if (result)
 		goto out_configure;
 
-	for (class_id = 0; class_id < OCF_USER_IO_CLASS_MAX; class_id++)
-		cas_cls_rule_apply(cache, class_id, cls_rule[class_id]);
+	cas_cls_rules_apply(cache, cls_rule);
 
 out_configure:
 	ocf_mngt_cache_unlock(cache);
@@ -0,0 +1,299 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import base64
+import threading
+import uuid
+
+from core.test_run import TestRun
+from connection.utils.output import CmdException, Output
+
+
+class BatchFuture:
+    """Result of a command queued in CommandBatch, available after the batch is flushed."""
+
+    def __init__(self, batch, resolve=None):
+        self._batch = batch
+        self._resolve = resolve
+        self._done = False
+        self._value = None
+        self._exception = None
+
+    def _set_result(self, output):
+        self._done = True
+        try:
+            self._value = self._resolve(output) if self._resolve else output
+        except Exception as e:
+            self._exception = e
+
+    def _set_exception(self, exception):
+        self._done = True
+        self._exception = exception
+
+    def done(self) -> bool:
+        return self._done
+
+    def result(self):
+        if not self._done:
+            self._batch.flush()
+        if self._exception is not None:
+            raise self._exception
+        return self._value
+
+
+class LazyOutput(BatchFuture):
+    """Output of a queued command, accessing any of its fields flushes the batch."""
+
+    def __init__(self, batch):
+        super().__init__(batch)
+
+    @property
+    def stdout(self) -> str:
+        return self.result().stdout
+
+    @property
+    def stderr(self) -> str:
+        return self.result().stderr
+
+    @property
+    def exit_code(self) -> int:
+        return self.result().exit_code
+
+
+class CommandBatch:
+    """
+    Queues commands run through run_cmd() and executes them in a single remote shell script
+    with per-command delimited output and exit codes. Commands are run in order and the
+    script stops at the first failed command queued with an error message - CmdException
+    for it is raised on flush and remaining commands are not executed.
+
+    The batch is flushed when leaving the context, when output of any queued command
+    is accessed, or before any other command is run with TestRun.executor by the thread
+    which opened the batch. Commands of other threads (e.g. StatsSampler) are neither
+    queued nor delayed.
+    """
+
+    # Scripts are passed to the DUT shell as a single argument, which is limited to
+    # 128KiB on Linux, larger ones are uploaded in chunks of this size first
+    script_chunk_size = 64 * 1024
+
+    __local = threading.local()
+
+    def __init__(self):
+        self.queue = []
+        self.previous = None
+        self.executor = None
+        self.__thread = None
+        self.__executor_run = None
+        self.__patched_run = None
+
+    @classmethod
+    def current(cls) -> "CommandBatch":
+        """Batch opened by the calling thread, None if there is none"""
+        return getattr(cls.__local, "batch", None)
+
+    @classmethod
+    def __set_current(cls, batch) -> None:
+        cls.__local.batch = batch
+
+    def __enter__(self):
+        self.previous = CommandBatch.current()
+        self.executor = TestRun.executor
+        self.__thread = threading.get_ident()
+        self.__patched_run = self.executor.__dict__.get("run")
+        self.__executor_run = self.executor.run
+        # Commands run directly with the executor must see effects of the queued ones
+        self.executor.run = self.__run_unbatched
+        CommandBatch.__set_current(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.flush()
+            else:
+                self.__abort()
+        finally:
+            CommandBatch.__set_current(self.previous)
+            if self.__patched_run is None:
+                del self.executor.run
+            else:
+                self.executor.run = self.__patched_run
+
+    def __run_unbatched(self, command, *args, **kwargs):
+        if threading.get_ident() == self.__thread:
+            self.flush()
+        return self.__executor_run(command, *args, **kwargs)
+
+    def __abort(self) -> None:
+        queue, self.queue = self.queue, []
+        if not queue:
+            return
+
+        TestRun.LOGGER.warning(
+            f"Batch aborted, {len(queue)} queued command(s) not executed: "
+            + "; ".join(command for command, _, _, _ in queue)
+        )
+        for command, _, _, futures in queue:
+            exception = Exception(f"Command not executed, batch aborted: {command}")
+            for future in futures:
+                future._set_exception(exception)
+
+    def add(
+        self, command: str, error_message: str = None, resolve=None, on_success=None
+    ) -> BatchFuture:
+        futures = [LazyOutput(self)]
+        if resolve is not None:
+            futures.append(BatchFuture(self, resolve))
+        self.queue.append((command, error_message, on_success, futures))
+        return futures[-1]
+
+    @classmethod
+    def shared(cls, key, fetch):
+        """
+        Return fetch() result shared by all futures resolved in the same flush, e.g. single
+        listing of CAS devices for all added cores. Outside of resolving fetch() is called.
+        """
+        results = getattr(cls.__local, "shared", None)
+        if results is None:
+            return fetch()
+        if key not in results:
+            results[key] = fetch()
+        return results[key]
+
+    @staticmethod
+    def _build_script(marker: str, queue: list) -> str:
+        lines = ['d=$(mktemp -d) || exit 1', 'trap \'rm -rf "$d"\' EXIT']
+        for i, (command, error_message, _, _) in enumerate(queue):
+            lines += [
+                # Subshell, as each command would run in its own shell without the batch
+                f'(\n{command}\n) </dev/null >"$d/out" 2>"$d/err"',
+                "rc=$?",
+                f'echo "{marker} stdout {i}"; cat "$d/out"; echo',
+                f'echo "{marker} stderr {i}"; cat "$d/err"; echo',
+                f'echo "{marker} exit_code {i} $rc"',
+            ]
+            if error_message is not None:
+                lines.append('[ "$rc" -eq 0 ] || exit 0')
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _parse_output(marker: str, stdout: str) -> dict:
+        outputs = {}
+        field, index, lines = None, None, []
+        for line in stdout.split("\n"):
+            if not line.startswith(marker + " "):
+                lines.append(line)
+                continue
+            words = line.split()
+            # Newline echoed after each output is the one preceding the marker line
+            if field is not None:
+                outputs.setdefault(index, {})[field] = "\n".join(lines)
+            field, index, lines = words[1], int(words[2]), []
+            if field == "exit_code":
+                outputs.setdefault(index, {})["exit_code"] = int(words[3])
+                field = None
+        return outputs
+
+    def __run_script(self, script: str) -> Output:
+        script = base64.b64encode(script.encode()).decode()
+        chunk_size = self.script_chunk_size
+        if len(script) <= chunk_size:
+            return self.__executor_run(f"echo {script} | base64 -d | bash")
+
+        path = f"/tmp/cas-batch-{uuid.uuid4().hex}"
+        for offset in range(0, len(script), chunk_size):
+            redirect = ">" if offset == 0 else ">>"
+            chunk = script[offset:offset + chunk_size]
+            output = self.__executor_run(f"echo {chunk} {redirect} {path}")
+            if output.exit_code != 0:
+                self.__executor_run(f"rm -f {path}")
+                raise CmdException("Failed to upload batch script.", output)
+        return self.__executor_run(f'base64 -d {path} | bash; rm -f {path}')
+
+    def flush(self) -> None:
+        queue, self.queue = self.queue, []
+        if not queue:
+            return
+
+        marker = f"@@batch-{uuid.uuid4().hex}@@"
+        try:
+            output = self.__run_script(self._build_script(marker, queue))
+        except Exception as e:
+            for _, _, _, futures in queue:
+                for future in futures:
+                    future._set_exception(e)
+            raise
+        outputs = self._parse_output(marker, output.stdout)
+
+        # Results are resolved outside of the batch, with commands run directly, and
+        # after all commands were executed, so resolving can share e.g. device listing
+        current = CommandBatch.current()
+        shared = getattr(CommandBatch.__local, "shared", None)
+        CommandBatch.__set_current(None)
+        CommandBatch.__local.shared = {}
+        try:
+            failed = self.__resolve(queue, outputs, output)
+        finally:
+            CommandBatch.__local.shared = shared
+            CommandBatch.__set_current(current)
+
+        if failed is not None:
+            raise failed
+
+    @staticmethod
+    def __resolve(queue: list, outputs: dict, output: Output) -> CmdException:
+        failed = None
+        for i, (command, error_message, on_success, futures) in enumerate(queue):
+            if "exit_code" not in outputs.get(i, {}):
+                exception = CmdException(f"Command not executed in batch: {command}", output)
+                failed = failed or (exception if error_message is not None else None)
+            else:
+                result = Output(
+                    outputs[i].get("stdout", ""),
+                    outputs[i].get("stderr", ""),
+                    outputs[i]["exit_code"],
+                )
+                exception = None
+                if error_message is not None and result.exit_code != 0:
+                    exception = CmdException(error_message, result)
+                    failed = failed or exception
+                elif on_success is not None:
+                    try:
+                        on_success(result)
+                    except Exception as e:
+                        exception = e
+                        failed = failed or exception
+
+            for future in futures:
+                if exception is None:
+                    future._set_result(result)
+                else:
+                    future._set_exception(exception)
+
+        return failed
+
+
+def batch() -> CommandBatch:
+    return CommandBatch()
+
+
+def run_cmd(command: str, error_message: str = None, resolve=None, on_success=None):
+    """
+    Run command and raise CmdException with error_message if it fails. Inside of a batch
+    the command is queued and LazyOutput (or BatchFuture of resolve(output)) is returned.
+    on_success(output) is meant for side effects, like updating TestRun.dut, and inside
+    of a batch it's deferred until the command has actually succeeded.
+    """
+    current = CommandBatch.current()
+    if current is not None:
+        return current.add(command, error_message, resolve, on_success)
+
+    output = TestRun.executor.run(command)
+    if error_message is not None and output.exit_code != 0:
+        raise CmdException(error_message, output)
+    if on_success is not None:
+        on_success(output)
+    return resolve(output) if resolve else output
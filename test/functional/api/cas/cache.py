@@ -8,6 +8,7 @@ from datetime import timedelta
 from typing import List
 
 from api.cas import casadm
+from api.cas.batch import CommandBatch
 from api.cas.cache_config import (
     CacheLineSize,
     CleaningPolicy,
@@ -26,7 +27,7 @@ from api.cas.casadm_parser import (get_cas_devices_dict, get_cores, get_flush_pa
                                    get_flush_parameters_acp, get_io_class_list)
 from api.cas.core import Core
 from api.cas.dmesg import get_metadata_size_on_device
-from api.cas.statistics import CacheStats, CacheIoClassStats
+from api.cas.statistics import CacheStats, CacheIoClassStats, StatsSnapshot, invalidates_stats
 from connection.utils.output import Output
 from storage_devices.device import Device
 from test_tools.os_tools import sync
@@ -34,15 +35,33 @@ from type_def.size import Size
 
 
 class Cache:
+    # How long statistics fetched by getters may be reused, None - until refresh() or
+    # a command changing the cache is issued by this object
+    stats_ttl: timedelta | None = timedelta(0)
+
     def __init__(
-        self, cache_id: int, device: Device = None, cache_line_size: CacheLineSize = None
+        self,
+        cache_id: int,
+        device: Device = None,
+        cache_line_size: CacheLineSize = None,
+        cache_info: dict = None,
     ) -> None:
+        """
+        cache_info - cache entry of get_cas_devices_dict(), when given the cache device
+        is taken from it instead of listing CAS devices again
+        """
         self.cache_id = cache_id
-        self.cache_device = device if device else self.__get_cache_device()
+        if device is None and cache_info is not None:
+            device = Device(cache_info["device_path"]) if cache_info["device_path"] != "-" else None
+        elif device is None:
+            device = self.__get_cache_device()
+        self.cache_device = device
         self.__cache_line_size = cache_line_size
+        self.__stats = StatsSnapshot(lambda stat_filter: self.get_statistics(stat_filter))
 
     def __get_cache_device(self) -> Device | None:
-        caches_dict = get_cas_devices_dict()["caches"]
+        # Caches resolved from the same batch share single listing
+        caches_dict = CommandBatch.shared("cas_devices", get_cas_devices_dict)["caches"]
         cache = next(
             iter([cache for cache in caches_dict.values() if cache["id"] == self.cache_id])
         )
@@ -58,51 +77,51 @@ class Cache:
     def get_core_devices(self) -> list:
         return get_cores(self.cache_id)
 
+    def refresh(self) -> None:
+        """Drop statistics cached by getters, so that they are fetched again on next call"""
+        self.__stats.invalidate()
+
+    def __get_stats(self, section: StatsFilter):
+        return self.__stats.get(section, self.stats_ttl)
+
     def get_cache_line_size(self) -> CacheLineSize:
         if self.__cache_line_size is None:
-            stats = self.get_statistics()
-            stats_line_size = stats.config_stats.cache_line_size
+            stats_line_size = self.__get_stats(StatsFilter.conf).cache_line_size
             self.__cache_line_size = CacheLineSize(stats_line_size)
         return self.__cache_line_size
 
     def get_cleaning_policy(self) -> CleaningPolicy:
-        stats = self.get_statistics()
-        cp = stats.config_stats.cleaning_policy
+        cp = self.__get_stats(StatsFilter.conf).cleaning_policy
         return CleaningPolicy[cp]
 
     def get_metadata_size_in_ram(self) -> Size:
-        stats = self.get_statistics()
-        return stats.config_stats.metadata_memory_footprint
+        return self.__get_stats(StatsFilter.conf).metadata_memory_footprint
 
     def get_metadata_size_on_disk(self) -> Size:
         return get_metadata_size_on_device(cache_id=self.cache_id)
 
     def get_occupancy(self):
-        return self.get_statistics().usage_stats.occupancy
+        return self.__get_stats(StatsFilter.usage).occupancy
 
     def get_status(self) -> CacheStatus:
-        status = (
-            self.get_statistics(stat_filter=[StatsFilter.conf])
-            .config_stats.status.replace(" ", "_")
-            .lower()
-        )
+        status = self.__get_stats(StatsFilter.conf).status.replace(" ", "_").lower()
         return CacheStatus[status]
 
     @property
     def size(self) -> Size:
-        return self.get_statistics().config_stats.cache_size
+        return self.__get_stats(StatsFilter.conf).cache_size
 
     def get_cache_mode(self) -> CacheMode:
-        return CacheMode[self.get_statistics().config_stats.write_policy.upper()]
+        return CacheMode[self.__get_stats(StatsFilter.conf).write_policy.upper()]
 
     def get_dirty_blocks(self) -> Size:
-        return self.get_statistics().usage_stats.dirty
+        return self.__get_stats(StatsFilter.usage).dirty
 
     def get_dirty_for(self) -> timedelta:
-        return self.get_statistics().config_stats.dirty_for
+        return self.__get_stats(StatsFilter.conf).dirty_for
 
     def get_clean_blocks(self) -> Size:
-        return self.get_statistics().usage_stats.clean
+        return self.__get_stats(StatsFilter.usage).clean
 
     def get_flush_parameters_alru(self) -> FlushParametersAlru:
         return get_flush_parameters_alru(self.cache_id)
@@ -136,40 +155,50 @@ class Cache:
             percentage_val=percentage_val,
         )
 
+    @invalidates_stats
     def flush_cache(self) -> Output:
         output = casadm.flush_cache(cache_id=self.cache_id)
         sync()
         return output
 
+    @invalidates_stats
     def purge_cache(self) -> Output:
         output = casadm.purge_cache(cache_id=self.cache_id)
         sync()
         return output
 
+    @invalidates_stats
     def stop(self, no_data_flush: bool = False) -> Output:
         return casadm.stop_cache(self.cache_id, no_data_flush)
 
+    @invalidates_stats
     def add_core(self, core_dev, core_id: int = None) -> Core:
         return casadm.add_core(self, core_dev, core_id)
 
+    @invalidates_stats
     def remove_core(self, core_id: int, force: bool = False) -> Output:
         return casadm.remove_core(self.cache_id, core_id, force)
 
+    @invalidates_stats
     def remove_inactive_core(self, core_id: int, force: bool = False) -> Output:
         return casadm.remove_inactive(self.cache_id, core_id, force)
 
+    @invalidates_stats
     def reset_counters(self) -> Output:
         return casadm.reset_counters(self.cache_id)
 
+    @invalidates_stats
     def set_cache_mode(self, cache_mode: CacheMode, flush=None) -> Output:
         return casadm.set_cache_mode(cache_mode, self.cache_id, flush)
 
+    @invalidates_stats
     def load_io_class(self, file_path: str) -> Output:
         return casadm.load_io_classes(self.cache_id, file_path)
 
     def list_io_classes(self) -> list:
         return get_io_class_list(self.cache_id)
 
+    @invalidates_stats
     def set_seq_cutoff_parameters(self, seq_cutoff_param: SeqCutOffParameters) -> Output:
         return casadm.set_param_cutoff(
             self.cache_id,
@@ -178,15 +207,19 @@ class Cache:
             promotion_count=seq_cutoff_param.promotion_count,
         )
 
+    @invalidates_stats
     def set_seq_cutoff_threshold(self, threshold: Size) -> Output:
         return casadm.set_param_cutoff(self.cache_id, threshold=threshold, policy=None)
 
+    @invalidates_stats
     def set_seq_cutoff_policy(self, policy: SeqCutOffPolicy) -> Output:
         return casadm.set_param_cutoff(self.cache_id, threshold=None, policy=policy)
 
+    @invalidates_stats
     def set_cleaning_policy(self, cleaning_policy: CleaningPolicy) -> Output:
         return casadm.set_param_cleaning(self.cache_id, cleaning_policy)
 
+    @invalidates_stats
     def set_params_acp(self, acp_params: FlushParametersAcp) -> Output:
         return casadm.set_param_cleaning_acp(
             self.cache_id,
@@ -194,6 +227,7 @@ class Cache:
             int(acp_params.flush_max_buffers) if acp_params.flush_max_buffers else None,
         )
 
+    @invalidates_stats
     def set_params_alru(self, alru_params: FlushParametersAlru) -> Output:
         return casadm.set_param_cleaning_alru(
             self.cache_id,
@@ -211,9 +245,11 @@ class Cache:
             ),
         )
 
+    @invalidates_stats
     def set_promotion_policy(self, policy: PromotionPolicy) -> Output:
         return casadm.set_param_promotion(self.cache_id, policy)
 
+    @invalidates_stats
     def set_params_nhit(self, promotion_params_nhit: PromotionParametersNhit) -> Output:
         return casadm.set_param_promotion_nhit(
             self.cache_id,
@@ -228,18 +264,22 @@ class Cache:
             self.get_cleaning_policy(),
         )
 
+    @invalidates_stats
     def standby_detach(self, shortcut: bool = False) -> Output:
         return casadm.standby_detach_cache(cache_id=self.cache_id, shortcut=shortcut)
 
+    @invalidates_stats
     def standby_activate(self, device: Device, shortcut: bool = False) -> Output:
         return casadm.standby_activate_cache(
             cache_id=self.cache_id, cache_dev=device, shortcut=shortcut
         )
 
+    @invalidates_stats
     def attach(self, device: Device, force: bool = False) -> Output:
         cmd_output = casadm.attach_cache(cache_id=self.cache_id, device=device, force=force)
         return cmd_output
 
+    @invalidates_stats
     def detach(self) -> Output:
         cmd_output = casadm.detach_cache(cache_id=self.cache_id)
         return cmd_output
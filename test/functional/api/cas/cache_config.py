@@ -6,7 +6,6 @@
 
 from enum import Enum, IntFlag
 
-from test_tools.os_tools import get_kernel_module_parameter
 from type_def.size import Size, Unit
 from type_def.time import Time
 
@@ -336,6 +335,9 @@ class KernelParameters:
 
     @staticmethod
     def read_current_settings():
+        # Imported here, so that configuration enums are usable without test_tools (DUT access)
+        from test_tools.os_tools import get_kernel_module_parameter
+
         module = "cas_cache"
         return KernelParameters(
             UnalignedIo(int(get_kernel_module_parameter(module, "unaligned_io"))),
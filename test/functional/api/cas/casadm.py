@@ -6,6 +6,7 @@
 
 from typing import List
 
+from api.cas.batch import batch, run_cmd  # noqa: F401
 from api.cas.cache import Cache
 from api.cas.cache_config import (
     CacheLineSize,
@@ -21,7 +22,7 @@ from api.cas.core import Core
 from core.test_run import TestRun
 from storage_devices.device import Device
 from test_tools.os_tools import reload_kernel_module
-from connection.utils.output import CmdException, Output
+from connection.utils.output import Output
 from type_def.size import Size, Unit
 
 
@@ -49,7 +50,27 @@ def start_cache(
     _cache_id = str(cache_id) if cache_id is not None else None
     _cache_mode = cache_mode.name.lower() if cache_mode else None
 
-    output = TestRun.executor.run(
+    def create_cache(output: Output) -> Cache:
+        cache_id = _cache_id
+        if not cache_id:
+            from api.cas.casadm_parser import get_caches
+
+            cache_list = get_caches()
+            attached_cache_list = [cache for cache in cache_list if cache.cache_device is not None]
+            # compare path of old and new caches, returning the only one created now.
+            # This will be needed in case cache_id not present in cli command
+
+            new_cache = next(
+                cache for cache in attached_cache_list if cache.cache_device.path == cache_dev.path
+            )
+            cache_id = new_cache.cache_id
+
+        cache = Cache(cache_id=int(cache_id), device=cache_dev, cache_line_size=_cache_line_size)
+        TestRun.dut.cache_list.append(cache)
+        return cache
+
+    # Inside of a batch returns future of the Cache
+    return run_cmd(
         start_cmd(
             cache_dev=cache_dev.path,
             cache_mode=_cache_mode,
@@ -58,90 +79,82 @@ def start_cache(
             force=force,
             load=load,
             shortcut=shortcut,
-        )
+        ),
+        "Failed to start cache.",
+        resolve=create_cache,
     )
 
-    if output.exit_code != 0:
-        raise CmdException("Failed to start cache.", output)
-
-    if not _cache_id:
-        from api.cas.casadm_parser import get_caches
-
-        cache_list = get_caches()
-        attached_cache_list = [cache for cache in cache_list if cache.cache_device is not None]
-        # compare path of old and new caches, returning the only one created now.
-        # This will be needed in case cache_id not present in cli command
-
-        new_cache = next(
-            cache for cache in attached_cache_list if cache.cache_device.path == cache_dev.path
-        )
-        _cache_id = new_cache.cache_id
-
-    cache = Cache(cache_id=int(_cache_id), device=cache_dev, cache_line_size=_cache_line_size)
-    TestRun.dut.cache_list.append(cache)
-    return cache
-
 
 def load_cache(device: Device, shortcut: bool = False) -> Cache:
     from api.cas.casadm_parser import get_caches
 
     caches_before_load = get_caches()
-    output = TestRun.executor.run(load_cmd(cache_dev=device.path, shortcut=shortcut))
-
-    if output.exit_code != 0:
-        raise CmdException("Failed to load cache.", output)
 
-    caches_after_load = get_caches()
-    new_cache = next(cache for cache in caches_after_load if cache.cache_id not in
-                     [cache.cache_id for cache in caches_before_load])
-    cache = Cache(cache_id=new_cache.cache_id, device=new_cache.cache_device)
-    TestRun.dut.cache_list.append(cache)
-    return cache
+    def create_cache(output: Output) -> Cache:
+        caches_after_load = get_caches()
+        new_cache = next(cache for cache in caches_after_load if cache.cache_id not in
+                         [cache.cache_id for cache in caches_before_load])
+        cache = Cache(cache_id=new_cache.cache_id, device=new_cache.cache_device)
+        TestRun.dut.cache_list.append(cache)
+        return cache
+
+    # Inside of a batch returns future of the Cache
+    return run_cmd(
+        load_cmd(cache_dev=device.path, shortcut=shortcut),
+        "Failed to load cache.",
+        resolve=create_cache,
+    )
 
 
 def attach_cache(
     cache_id: int, device: Device, force: bool = False, shortcut: bool = False
 ) -> Output:
-    output = TestRun.executor.run(
+    def update_dut(output: Output) -> None:
+        attached_cache = next(
+            cache for cache in TestRun.dut.cache_list if cache.cache_id == cache_id
+        )
+        attached_cache.cache_device = device
+
+    output = run_cmd(
         attach_cache_cmd(
             cache_dev=device.path, cache_id=str(cache_id), force=force, shortcut=shortcut
-        )
+        ),
+        "Failed to attach cache.",
+        on_success=update_dut,
     )
-
-    if output.exit_code != 0:
-        raise CmdException("Failed to attach cache.", output)
-
-    attached_cache = next(cache for cache in TestRun.dut.cache_list if cache.cache_id == cache_id)
-    attached_cache.cache_device = device
-
     return output
 
 
 def detach_cache(cache_id: int, shortcut: bool = False) -> Output:
-    output = TestRun.executor.run(detach_cache_cmd(cache_id=str(cache_id), shortcut=shortcut))
-
-    if output.exit_code != 0:
-        raise CmdException("Failed to detach cache.", output)
+    def update_dut(output: Output) -> None:
+        detached_cache = next(
+            cache for cache in TestRun.dut.cache_list if cache.cache_id == cache_id
+        )
+        detached_cache.cache_device = None
 
-    detached_cache = next(cache for cache in TestRun.dut.cache_list if cache.cache_id == cache_id)
-    detached_cache.cache_device = None
+    output = run_cmd(
+        detach_cache_cmd(cache_id=str(cache_id), shortcut=shortcut),
+        "Failed to detach cache.",
+        on_success=update_dut,
+    )
     return output
 
 
 def stop_cache(cache_id: int, no_data_flush: bool = False, shortcut: bool = False) -> Output:
-    output = TestRun.executor.run(
-        stop_cmd(cache_id=str(cache_id), no_data_flush=no_data_flush, shortcut=shortcut)
+    def update_dut(output: Output) -> None:
+        TestRun.dut.cache_list = [
+            cache for cache in TestRun.dut.cache_list if cache.cache_id != cache_id
+        ]
+
+        TestRun.dut.core_list = [
+            core for core in TestRun.dut.core_list if core.cache_id != cache_id
+        ]
+
+    output = run_cmd(
+        stop_cmd(cache_id=str(cache_id), no_data_flush=no_data_flush, shortcut=shortcut),
+        "Failed to stop cache.",
+        on_success=update_dut,
     )
-
-    if output.exit_code != 0:
-        raise CmdException("Failed to stop cache.", output)
-
-    TestRun.dut.cache_list = [
-        cache for cache in TestRun.dut.cache_list if cache.cache_id != cache_id
-    ]
-
-    TestRun.dut.core_list = [core for core in TestRun.dut.core_list if core.cache_id != cache_id]
-
     return output
 
 
@@ -165,18 +178,15 @@ def set_param_cutoff(
         promotion_count=_promotion_count,
         shortcut=shortcut,
     )
-    output = TestRun.executor.run(command)
-    if output.exit_code != 0:
-        raise CmdException("Error while setting sequential cut-off params.", output)
+    output = run_cmd(command, "Error while setting sequential cut-off params.")
     return output
 
 
 def set_param_cleaning(cache_id: int, policy: CleaningPolicy, shortcut: bool = False) -> Output:
-    output = TestRun.executor.run(
-        set_param_cleaning_cmd(cache_id=str(cache_id), policy=policy.name, shortcut=shortcut)
+    output = run_cmd(
+        set_param_cleaning_cmd(cache_id=str(cache_id), policy=policy.name, shortcut=shortcut),
+        "Error while setting cleaning policy.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Error while setting cleaning policy.", output)
     return output
 
 
@@ -192,7 +202,7 @@ def set_param_cleaning_alru(
     _staleness_time = str(staleness_time) if staleness_time is not None else None
     _flush_max_buffers = str(flush_max_buffers) if flush_max_buffers is not None else None
     _activity_threshold = str(activity_threshold) if activity_threshold is not None else None
-    output = TestRun.executor.run(
+    output = run_cmd(
         set_param_cleaning_alru_cmd(
             cache_id=str(cache_id),
             wake_up=_wake_up,
@@ -200,10 +210,9 @@ def set_param_cleaning_alru(
             flush_max_buffers=_flush_max_buffers,
             activity_threshold=_activity_threshold,
             shortcut=shortcut,
-        )
+        ),
+        "Error while setting alru cleaning policy parameters.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Error while setting alru cleaning policy parameters.", output)
     return output
 
 
@@ -212,29 +221,27 @@ def set_param_cleaning_acp(
 ) -> Output:
     _wake_up = str(wake_up) if wake_up is not None else None
     _flush_max_buffers = str(flush_max_buffers) if flush_max_buffers is not None else None
-    output = TestRun.executor.run(
+    output = run_cmd(
         set_param_cleaning_acp_cmd(
             cache_id=str(cache_id),
             wake_up=_wake_up,
             flush_max_buffers=_flush_max_buffers,
             shortcut=shortcut,
-        )
+        ),
+        "Error while setting acp cleaning policy parameters.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Error while setting acp cleaning policy parameters.", output)
     return output
 
 
 def set_param_promotion(cache_id: int, policy: PromotionPolicy, shortcut: bool = False) -> Output:
-    output = TestRun.executor.run(
+    output = run_cmd(
         set_param_promotion_cmd(
             cache_id=str(cache_id),
             policy=policy.name,
             shortcut=shortcut,
-        )
+        ),
+        "Error while setting promotion policy.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Error while setting promotion policy.", output)
     return output
 
 
@@ -243,16 +250,15 @@ def set_param_promotion_nhit(
 ) -> Output:
     _threshold = str(threshold) if threshold is not None else None
     _trigger = str(trigger) if trigger is not None else None
-    output = TestRun.executor.run(
+    output = run_cmd(
         set_param_promotion_nhit_cmd(
             cache_id=str(cache_id),
             threshold=_threshold,
             trigger=_trigger,
             shortcut=shortcut,
-        )
+        ),
+        "Error while setting promotion policy.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Error while setting promotion policy.", output)
     return output
 
 
@@ -260,28 +266,26 @@ def get_param_cutoff(
     cache_id: int, core_id: int, output_format: OutputFormat = None, shortcut: bool = False
 ) -> Output:
     _output_format = output_format.name if output_format else None
-    output = TestRun.executor.run(
+    output = run_cmd(
         get_param_cutoff_cmd(
             cache_id=str(cache_id),
             core_id=str(core_id),
             output_format=_output_format,
             shortcut=shortcut,
-        )
+        ),
+        "Getting sequential cutoff params failed.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Getting sequential cutoff params failed.", output)
     return output
 
 
 def get_param_cleaning(cache_id: int, output_format: OutputFormat = None, shortcut: bool = False):
     _output_format = output_format.name if output_format else None
-    output = TestRun.executor.run(
+    output = run_cmd(
         get_param_cleaning_cmd(
             cache_id=str(cache_id), output_format=_output_format, shortcut=shortcut
-        )
+        ),
+        "Getting cleaning policy failed.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Getting cleaning policy failed.", output)
     return output
 
 
@@ -289,13 +293,12 @@ def get_param_cleaning_alru(
     cache_id: int, output_format: OutputFormat = None, shortcut: bool = False
 ):
     _output_format = output_format.name if output_format else None
-    output = TestRun.executor.run(
+    output = run_cmd(
         get_param_cleaning_alru_cmd(
             cache_id=str(cache_id), output_format=_output_format, shortcut=shortcut
-        )
+        ),
+        "Getting alru cleaning policy params failed.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Getting alru cleaning policy params failed.", output)
     return output
 
 
@@ -303,13 +306,12 @@ def get_param_cleaning_acp(
     cache_id: int, output_format: OutputFormat = None, shortcut: bool = False
 ):
     _output_format = output_format.name if output_format else None
-    output = TestRun.executor.run(
+    output = run_cmd(
         get_param_cleaning_acp_cmd(
             cache_id=str(cache_id), output_format=_output_format, shortcut=shortcut
-        )
+        ),
+        "Getting acp cleaning policy params failed.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Getting acp cleaning policy params failed.", output)
     return output
 
 
@@ -317,13 +319,12 @@ def get_param_promotion(
     cache_id: int, output_format: OutputFormat = None, shortcut: bool = False
 ) -> Output:
     _output_format = output_format.name if output_format else None
-    output = TestRun.executor.run(
+    output = run_cmd(
         get_param_promotion_cmd(
             cache_id=str(cache_id), output_format=_output_format, shortcut=shortcut
-        )
+        ),
+        "Getting promotion policy failed.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Getting promotion policy failed.", output)
     return output
 
 
@@ -331,13 +332,12 @@ def get_param_promotion_nhit(
     cache_id: int, output_format: OutputFormat = None, shortcut: bool = False
 ) -> Output:
     _output_format = output_format.name if output_format else None
-    output = TestRun.executor.run(
+    output = run_cmd(
         get_param_promotion_nhit_cmd(
             cache_id=str(cache_id), output_format=_output_format, shortcut=shortcut
-        )
+        ),
+        "Getting promotion policy nhit params failed.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Getting promotion policy nhit params failed.", output)
     return output
 
 
@@ -347,74 +347,74 @@ def set_cache_mode(
     flush_cache = None
     if flush is not None:
         flush_cache = "yes" if flush else "no"
-    output = TestRun.executor.run(
+    output = run_cmd(
         set_cache_mode_cmd(
             cache_mode=cache_mode.name.lower(),
             cache_id=str(cache_id),
             flush_cache=flush_cache,
             shortcut=shortcut,
-        )
+        ),
+        "Set cache mode command failed.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Set cache mode command failed.", output)
     return output
 
 
 def add_core(cache: Cache, core_dev: Device, core_id: int = None, shortcut: bool = False) -> Core:
     _core_id = str(core_id) if core_id is not None else None
-    output = TestRun.executor.run(
+
+    def create_core(output: Output) -> Core:
+        core = Core(core_dev.path, cache.cache_id)
+        TestRun.dut.core_list.append(core)
+        return core
+
+    # Inside of a batch returns future of the Core
+    return run_cmd(
         add_core_cmd(
             cache_id=str(cache.cache_id),
             core_dev=core_dev.path,
             core_id=_core_id,
             shortcut=shortcut,
-        )
+        ),
+        "Failed to add core.",
+        resolve=create_core,
     )
-    if output.exit_code != 0:
-        raise CmdException("Failed to add core.", output)
-
-    core = Core(core_dev.path, cache.cache_id)
-    TestRun.dut.core_list.append(core)
-
-    return core
 
 
 def remove_core(cache_id: int, core_id: int, force: bool = False, shortcut: bool = False) -> Output:
-    output = TestRun.executor.run(
+    def update_dut(output: Output) -> None:
+        TestRun.dut.core_list = [
+            core
+            for core in TestRun.dut.core_list
+            if core.cache_id != cache_id or core.core_id != core_id
+        ]
+
+    output = run_cmd(
         remove_core_cmd(
             cache_id=str(cache_id), core_id=str(core_id), force=force, shortcut=shortcut
-        )
+        ),
+        "Failed to remove core.",
+        on_success=update_dut,
     )
-    if output.exit_code != 0:
-        raise CmdException("Failed to remove core.", output)
-
-    TestRun.dut.core_list = [
-        core
-        for core in TestRun.dut.core_list
-        if core.cache_id != cache_id or core.core_id != core_id
-    ]
     return output
 
 
 def remove_inactive(
     cache_id: int, core_id: int, force: bool = False, shortcut: bool = False
 ) -> Output:
-    output = TestRun.executor.run(
+    output = run_cmd(
         remove_inactive_cmd(
             cache_id=str(cache_id), core_id=str(core_id), force=force, shortcut=shortcut
-        )
+        ),
+        "Failed to remove inactive core.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Failed to remove inactive core.", output)
     return output
 
 
 def remove_detached(core_device: Device, shortcut: bool = False) -> Output:
-    output = TestRun.executor.run(
-        remove_detached_cmd(core_device=core_device.path, shortcut=shortcut)
+    output = run_cmd(
+        remove_detached_cmd(core_device=core_device.path, shortcut=shortcut),
+        "Failed to remove detached core.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Failed to remove detached core.", output)
     return output
 
 
@@ -422,11 +422,10 @@ def list_caches(
     output_format: OutputFormat = None, by_id_path: bool = True, shortcut: bool = False
 ) -> Output:
     _output_format = output_format.name if output_format else None
-    output = TestRun.executor.run(
-        list_caches_cmd(output_format=_output_format, by_id_path=by_id_path, shortcut=shortcut)
+    output = run_cmd(
+        list_caches_cmd(output_format=_output_format, by_id_path=by_id_path, shortcut=shortcut),
+        "Failed to list caches.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Failed to list caches.", output)
     return output
 
 
@@ -448,7 +447,7 @@ def print_statistics(
     else:
         names = (x.name for x in filter)
         _filter = ",".join(names)
-    output = TestRun.executor.run(
+    output = run_cmd(
         print_statistics_cmd(
             cache_id=str(cache_id),
             core_id=_core_id,
@@ -457,63 +456,85 @@ def print_statistics(
             output_format=_output_format,
             by_id_path=by_id_path,
             shortcut=shortcut,
-        )
+        ),
+        "Printing statistics failed.",
+    )
+    return output
+
+
+def print_statistics_all(
+    cache_id: int = None,
+    io_class_id: int = None,
+    filter: List[StatsFilter] = None,
+    output_format: OutputFormat = None,
+    by_id_path: bool = True,
+    io_class: bool = False,
+    shortcut: bool = False,
+) -> Output:
+    _output_format = output_format.name if output_format else None
+    _io_class_id = str(io_class_id) if io_class_id is not None else "" if io_class else None
+    _cache_id = str(cache_id) if cache_id is not None else None
+    _filter = ",".join(x.name for x in filter) if filter is not None else None
+    output = run_cmd(
+        print_statistics_all_cmd(
+            cache_id=_cache_id,
+            io_class_id=_io_class_id,
+            filter=_filter,
+            output_format=_output_format,
+            by_id_path=by_id_path,
+            shortcut=shortcut,
+        ),
+        "Printing statistics failed.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Printing statistics failed.", output)
     return output
 
 
 def reset_counters(cache_id: int, core_id: int = None, shortcut: bool = False) -> Output:
     _core_id = str(core_id) if core_id is not None else None
-    output = TestRun.executor.run(
-        reset_counters_cmd(cache_id=str(cache_id), core_id=_core_id, shortcut=shortcut)
+    output = run_cmd(
+        reset_counters_cmd(cache_id=str(cache_id), core_id=_core_id, shortcut=shortcut),
+        "Failed to reset counters.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Failed to reset counters.", output)
     return output
 
 
 def flush_cache(cache_id: int, shortcut: bool = False) -> Output:
     command = flush_cache_cmd(cache_id=str(cache_id), shortcut=shortcut)
-    output = TestRun.executor.run(command)
-    if output.exit_code != 0:
-        raise CmdException("Flushing cache failed.", output)
+    output = run_cmd(command, "Flushing cache failed.")
     return output
 
 
 def flush_core(cache_id: int, core_id: int, shortcut: bool = False) -> Output:
     command = flush_core_cmd(cache_id=str(cache_id), core_id=str(core_id), shortcut=shortcut)
-    output = TestRun.executor.run(command)
-    if output.exit_code != 0:
-        raise CmdException("Flushing core failed.", output)
+    output = run_cmd(command, "Flushing core failed.")
     return output
 
 
 def load_io_classes(cache_id: int, file: str, shortcut: bool = False) -> Output:
-    output = TestRun.executor.run(
-        load_io_classes_cmd(cache_id=str(cache_id), file=file, shortcut=shortcut)
+    output = run_cmd(
+        load_io_classes_cmd(cache_id=str(cache_id), file=file, shortcut=shortcut),
+        "Load IO class command failed.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Load IO class command failed.", output)
     return output
 
 
 def list_io_classes(cache_id: int, output_format: OutputFormat, shortcut: bool = False) -> Output:
     _output_format = output_format.name if output_format else None
-    output = TestRun.executor.run(
-        list_io_classes_cmd(cache_id=str(cache_id), output_format=_output_format, shortcut=shortcut)
+    output = run_cmd(
+        list_io_classes_cmd(
+            cache_id=str(cache_id), output_format=_output_format, shortcut=shortcut
+        ),
+        "List IO class command failed.",
     )
-    if output.exit_code != 0:
-        raise CmdException("List IO class command failed.", output)
     return output
 
 
 def print_version(output_format: OutputFormat = None, shortcut: bool = False) -> Output:
     _output_format = output_format.name if output_format else None
-    output = TestRun.executor.run(version_cmd(output_format=_output_format, shortcut=shortcut))
-    if output.exit_code != 0:
-        raise CmdException("Failed to print version.", output)
+    output = run_cmd(
+        version_cmd(output_format=_output_format, shortcut=shortcut),
+        "Failed to print version.",
+    )
     return output
 
 
@@ -533,18 +554,16 @@ def standby_init(
         reload_kernel_module("cas_cache", kernel_params.get_parameter_dictionary())
     _cache_line_size = str(int(cache_line_size.value.get_value(Unit.KibiByte)))
 
-    output = TestRun.executor.run(
+    run_cmd(
         standby_init_cmd(
             cache_dev=cache_dev.path,
             cache_id=str(cache_id),
             cache_line_size=_cache_line_size,
             force=force,
             shortcut=shortcut,
-        )
+        ),
+        "Failed to init standby cache.",
     )
-
-    if output.exit_code != 0:
-        raise CmdException("Failed to init standby cache.", output)
     return Cache(cache_id=cache_id, device=cache_dev)
 
 
@@ -552,53 +571,62 @@ def standby_load(cache_dev: Device, shortcut: bool = False) -> Cache:
     from api.cas.casadm_parser import get_caches
 
     caches_before_load = get_caches()
-    output = TestRun.executor.run(standby_load_cmd(cache_dev=cache_dev.path, shortcut=shortcut))
 
-    if output.exit_code != 0:
-        raise CmdException("Failed to load cache.", output)
-    caches_after_load = get_caches()
-    # compare ids of old and new caches, returning the only one created now
-    new_cache = next(
-        cache
-        for cache in caches_after_load
-        if cache.cache_id not in [cache.cache_id for cache in caches_before_load]
+    def create_cache(output: Output) -> Cache:
+        caches_after_load = get_caches()
+        # compare ids of old and new caches, returning the only one created now
+        new_cache = next(
+            cache
+            for cache in caches_after_load
+            if cache.cache_id not in [cache.cache_id for cache in caches_before_load]
+        )
+        cache = Cache(cache_id=new_cache.cache_id, device=new_cache.cache_device)
+        TestRun.dut.cache_list.append(cache)
+        return cache
+
+    # Inside of a batch returns future of the Cache
+    return run_cmd(
+        standby_load_cmd(cache_dev=cache_dev.path, shortcut=shortcut),
+        "Failed to load cache.",
+        resolve=create_cache,
     )
-    cache = Cache(cache_id=new_cache.cache_id, device=new_cache.cache_device)
-    TestRun.dut.cache_list.append(cache)
-
-    return cache
 
 
 def standby_detach_cache(cache_id: int, shortcut: bool = False) -> Output:
-    output = TestRun.executor.run(standby_detach_cmd(cache_id=str(cache_id), shortcut=shortcut))
-    if output.exit_code != 0:
-        raise CmdException("Failed to detach standby cache.", output)
-
-    detached_cache = next(cache for cache in TestRun.dut.cache_list if cache.cache_id == cache_id)
-    detached_cache.cache_device = None
+    def update_dut(output: Output) -> None:
+        detached_cache = next(
+            cache for cache in TestRun.dut.cache_list if cache.cache_id == cache_id
+        )
+        detached_cache.cache_device = None
 
+    output = run_cmd(
+        standby_detach_cmd(cache_id=str(cache_id), shortcut=shortcut),
+        "Failed to detach standby cache.",
+        on_success=update_dut,
+    )
     return output
 
 
 def standby_activate_cache(cache_dev: Device, cache_id: int, shortcut: bool = False) -> Output:
-    output = TestRun.executor.run(
-        standby_activate_cmd(cache_dev=cache_dev.path, cache_id=str(cache_id), shortcut=shortcut)
-    )
-    if output.exit_code != 0:
-        raise CmdException("Failed to activate standby cache.", output)
-
-    activated_cache = next(cache for cache in TestRun.dut.cache_list if cache.cache_id == cache_id)
-    activated_cache.cache_device = cache_dev
+    def update_dut(output: Output) -> None:
+        activated_cache = next(
+            cache for cache in TestRun.dut.cache_list if cache.cache_id == cache_id
+        )
+        activated_cache.cache_device = cache_dev
 
+    output = run_cmd(
+        standby_activate_cmd(cache_dev=cache_dev.path, cache_id=str(cache_id), shortcut=shortcut),
+        "Failed to activate standby cache.",
+        on_success=update_dut,
+    )
     return output
 
 
 def zero_metadata(cache_dev: Device, force: bool = False, shortcut: bool = False) -> Output:
-    output = TestRun.executor.run(
-        zero_metadata_cmd(cache_dev=cache_dev.path, force=force, shortcut=shortcut)
+    output = run_cmd(
+        zero_metadata_cmd(cache_dev=cache_dev.path, force=force, shortcut=shortcut),
+        "Failed to wipe metadata.",
     )
-    if output.exit_code != 0:
-        raise CmdException("Failed to wipe metadata.", output)
     return output
 
 
@@ -606,37 +634,37 @@ def zero_metadata(cache_dev: Device, force: bool = False, shortcut: bool = False
 
 
 def try_add(core_device: Device, cache_id: int, core_id: int) -> Core:
-    output = TestRun.executor.run(script_try_add_cmd(str(cache_id), core_device.path, str(core_id)))
-    if output.exit_code != 0:
-        raise CmdException("Failed to execute try add script command.", output)
-    return Core(core_device.path, cache_id)
+    # Inside of a batch returns future of the Core
+    return run_cmd(
+        script_try_add_cmd(str(cache_id), core_device.path, str(core_id)),
+        "Failed to execute try add script command.",
+        resolve=lambda output: Core(core_device.path, cache_id),
+    )
 
 
 def purge_cache(cache_id: int) -> Output:
-    output = TestRun.executor.run(script_purge_cache_cmd(str(cache_id)))
-    if output.exit_code != 0:
-        raise CmdException("Purge cache failed.", output)
+    output = run_cmd(script_purge_cache_cmd(str(cache_id)), "Purge cache failed.")
     return output
 
 
 def purge_core(cache_id: int, core_id: int) -> Output:
-    output = TestRun.executor.run(script_purge_core_cmd(str(cache_id), str(core_id)))
-    if output.exit_code != 0:
-        raise CmdException("Purge core failed.", output)
+    output = run_cmd(script_purge_core_cmd(str(cache_id), str(core_id)), "Purge core failed.")
     return output
 
 
 def detach_core(cache_id: int, core_id: int) -> Output:
-    output = TestRun.executor.run(script_detach_core_cmd(str(cache_id), str(core_id)))
-    if output.exit_code != 0:
-        raise CmdException("Failed to execute detach core script command.", output)
+    output = run_cmd(
+        script_detach_core_cmd(str(cache_id), str(core_id)),
+        "Failed to execute detach core script command.",
+    )
     return output
 
 
 def remove_core_with_script_command(cache_id: int, core_id: int, no_flush: bool = False) -> Output:
-    output = TestRun.executor.run(script_remove_core_cmd(str(cache_id), str(core_id), no_flush))
-    if output.exit_code != 0:
-        raise CmdException("Failed to execute remove core script command.", output)
+    output = run_cmd(
+        script_remove_core_cmd(str(cache_id), str(core_id), no_flush),
+        "Failed to execute remove core script command.",
+    )
     return output
 
 
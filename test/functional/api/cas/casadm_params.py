@@ -22,6 +22,7 @@ class ParamName(Enum):
 class OutputFormat(Enum):
     table = 0
     csv = 1
+    json = 2
 
 
 class StatsFilter(Enum):
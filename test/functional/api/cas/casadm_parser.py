@@ -18,7 +18,6 @@ from api.cas.core_config import CoreStatus
 from api.cas.ioclass_config import IoClass
 from api.cas.version import CasVersion
 from core.test_run_utils import TestRun
-from storage_devices.device import Device
 from connection.utils.output import CmdException
 
 
@@ -44,12 +43,7 @@ def get_caches() -> list:
     caches_list = []
 
     for cache in caches_dict.values():
-        caches_list.append(
-            Cache(
-                device=(Device(cache["device_path"]) if cache["device_path"] != "-" else None),
-                cache_id=cache["id"],
-            )
-        )
+        caches_list.append(Cache(cache_id=cache["id"], cache_info=cache))
 
     return caches_list
 
@@ -63,7 +57,7 @@ def get_cores(cache_id: int) -> list:
         return core["status"] == CoreStatus.active
 
     return [
-        Core(core["device_path"], core["cache_id"])
+        Core(core["device_path"], core["cache_id"], core_info=core)
         for core in cores_dict
         if is_active(core) and core["cache_id"] == cache_id
     ]
@@ -78,7 +72,7 @@ def get_inactive_cores(cache_id: int) -> list:
         return core["status"] == CoreStatus.inactive
 
     return [
-        Core(core["device_path"], core["cache_id"])
+        Core(core["device_path"], core["cache_id"], core_info=core)
         for core in cores_dict
         if is_inactive(core) and core["cache_id"] == cache_id
     ]
@@ -93,29 +87,28 @@ def get_detached_cores(cache_id: int) -> list:
         return core["status"] == CoreStatus.detached
 
     return [
-        Core(core["device_path"], core["cache_id"])
+        Core(core["device_path"], core["cache_id"], core_info=core)
         for core in cores_dict
         if is_detached(core) and core["cache_id"] == cache_id
     ]
 
 
 def get_cas_devices_dict() -> dict:
-    device_list = list(csv.DictReader(casadm.list_caches(OutputFormat.csv).stdout.split("\n")))
     devices = {"caches": {}, "cores": {}, "core_pool": {}}
-    cache_id = -1
-    core_pool = False
-    for device in device_list:
-        if device["type"] == "cache":
-            cache_id = int(device["id"])
-            core_pool = False
+    for branch in get_json_records(casadm.list_caches(OutputFormat.json)).get("devices", []):
+        core_pool = branch["type"] == "core pool"
+        if branch["type"] == "cache":
+            cache_id = int(branch["id"])
             params = [
                 ("id", cache_id),
-                ("device_path", device["disk"]),
-                ("status", CacheStatus(device["status"].lower())),
+                ("device_path", branch["disk"]),
+                ("status", CacheStatus(branch["status"].lower())),
             ]
             devices["caches"][cache_id] = dict([(key, value) for key, value in params])
+        else:
+            cache_id = -1
 
-        elif device["type"] == "core":
+        for device in branch.get("children", []):
             params = [
                 ("cache_id", cache_id),
                 ("core_id", (int(device["id"]) if device["id"] != "-" else device["id"])),
@@ -131,31 +124,40 @@ def get_cas_devices_dict() -> dict:
                     [(key, value) for key, value in params]
                 )
 
-        elif device["type"] == "core pool":
-            core_pool = True
-
     return devices
 
 
+def get_json_records(casadm_output) -> dict:
+    """Return the first record of casadm --output-format json output."""
+    records = json.loads(casadm_output.stdout)["records"]
+    return records[0] if records else {}
+
+
+def get_json_params(casadm_output) -> dict:
+    """Map parameter names to values of casadm get-param json output."""
+    return {
+        row["Parameter name"]: row["Value"]
+        for row in get_json_records(casadm_output).get("Parameter name", [])
+    }
+
+
 def get_flushing_progress(cache_id: int, core_id: int = None):
-    casadm_output = casadm.list_caches(OutputFormat.csv)
-    lines = casadm_output.stdout.splitlines()
-    for line in lines:
-        line_elements = line.split(",")
-        if (
-            core_id is not None
-            and line_elements[0] == "core"
-            and int(line_elements[1]) == core_id
-            or core_id is None
-            and line_elements[0] == "cache"
-            and int(line_elements[1]) == cache_id
-        ):
-            try:
-                flush_line_elements = line_elements[3].split()
-                flush_percent = flush_line_elements[1][1:]
-                return float(flush_percent)
-            except Exception:
-                break
+    casadm_output = casadm.list_caches(OutputFormat.json)
+    for branch in get_json_records(casadm_output).get("devices", []):
+        if branch["type"] != "cache" or int(branch["id"]) != cache_id:
+            continue
+        if core_id is None:
+            device = branch
+        else:
+            device = next(
+                (child for child in branch.get("children", []) if child["id"] == core_id), None
+            )
+        try:
+            flush_status_elements = device["status"].split()
+            flush_percent = flush_status_elements[1][1:]
+            return float(flush_percent)
+        except Exception:
+            break
     raise CmdException(
         f"There is no flushing progress in casadm list output. (cache {cache_id}"
         f"{' core ' + str(core_id) if core_id is not None else ''})",
@@ -175,47 +177,33 @@ def wait_for_flushing(cache, core, timeout: timedelta = timedelta(seconds=30)):
 
 
 def get_flush_parameters_alru(cache_id: int):
-    casadm_output = casadm.get_param_cleaning_alru(
-        cache_id, casadm.OutputFormat.csv
-    ).stdout.splitlines()
+    params = get_json_params(casadm.get_param_cleaning_alru(cache_id, casadm.OutputFormat.json))
     flush_parameters = FlushParametersAlru()
-    for line in casadm_output:
-        if "max buffers" in line:
-            flush_parameters.flush_max_buffers = int(line.split(",")[1])
-        if "Activity threshold" in line:
-            flush_parameters.activity_threshold = Time(milliseconds=int(line.split(",")[1]))
-        if "Stale buffer time" in line:
-            flush_parameters.staleness_time = Time(seconds=int(line.split(",")[1]))
-        if "Wake up time" in line:
-            flush_parameters.wake_up_time = Time(seconds=int(line.split(",")[1]))
+    flush_parameters.flush_max_buffers = int(params["Flush max buffers"])
+    flush_parameters.activity_threshold = Time(milliseconds=int(params["Activity threshold"]))
+    flush_parameters.staleness_time = Time(seconds=int(params["Stale buffer time"]))
+    flush_parameters.wake_up_time = Time(seconds=int(params["Wake up time"]))
     return flush_parameters
 
 
 def get_flush_parameters_acp(cache_id: int):
-    casadm_output = casadm.get_param_cleaning_acp(
-        cache_id, casadm.OutputFormat.csv
-    ).stdout.splitlines()
+    params = get_json_params(casadm.get_param_cleaning_acp(cache_id, casadm.OutputFormat.json))
     flush_parameters = FlushParametersAcp()
-    for line in casadm_output:
-        if "max buffers" in line:
-            flush_parameters.flush_max_buffers = int(line.split(",")[1])
-        if "Wake up time" in line:
-            flush_parameters.wake_up_time = Time(milliseconds=int(line.split(",")[1]))
+    flush_parameters.flush_max_buffers = int(params["Flush max buffers"])
+    flush_parameters.wake_up_time = Time(milliseconds=int(params["Wake up time"]))
     return flush_parameters
 
 
 def get_seq_cut_off_parameters(cache_id: int, core_id: int):
-    casadm_output = casadm.get_param_cutoff(
-        cache_id, core_id, casadm.OutputFormat.csv
-    ).stdout.splitlines()
+    params = get_json_params(casadm.get_param_cutoff(cache_id, core_id, casadm.OutputFormat.json))
     seq_cut_off_params = SeqCutOffParameters()
-    for line in casadm_output:
-        if "Sequential cutoff threshold" in line:
-            seq_cut_off_params.threshold = Size(int(line.split(",")[1]), Unit.KibiByte)
-        if "Sequential cutoff policy" in line:
-            seq_cut_off_params.policy = SeqCutOffPolicy.from_name(line.split(",")[1])
-        if "Sequential cutoff promotion request count threshold" in line:
-            seq_cut_off_params.promotion_count = int(line.split(",")[1])
+    seq_cut_off_params.threshold = Size(
+        int(params["Sequential cutoff threshold"]), Unit.KibiByte
+    )
+    seq_cut_off_params.policy = SeqCutOffPolicy.from_name(params["Sequential cutoff policy"])
+    seq_cut_off_params.promotion_count = int(
+        params["Sequential cutoff promotion request count threshold"]
+    )
     return seq_cut_off_params
 
 
@@ -317,6 +317,29 @@ def print_statistics_cmd(
     return casadm_bin + command
 
 
+def print_statistics_all_cmd(
+    cache_id: str = None,
+    io_class_id: str = None,
+    filter: str = None,
+    output_format: str = None,
+    by_id_path: bool = True,
+    shortcut: bool = False,
+) -> str:
+    command = " -P" if shortcut else " --stats"
+    command += " -a" if shortcut else " --all"
+    if cache_id:
+        command += (" -i " if shortcut else " --cache-id ") + cache_id
+    if io_class_id is not None:  # might be empty string when printing all io classes
+        command += (" -d " if shortcut else " --io-class-id ") + io_class_id
+    if filter:
+        command += (" -f " if shortcut else " --filter ") + filter
+    if output_format:
+        command += (" -o " if shortcut else " --output-format ") + output_format
+    if by_id_path:
+        command += " -b " if shortcut else " --by-id-path "
+    return casadm_bin + command
+
+
 def reset_counters_cmd(cache_id: str, core_id: str = None, shortcut: bool = False) -> str:
     command = " -Z" if shortcut else " --reset-counters"
     command += (" -i " if shortcut else " --cache-id ") + cache_id
@@ -140,22 +140,22 @@ get_params_help = [
     r"-i  --cache-id \<ID\>                 Identifier of cache instance \<1-16384\>",
     r"-j  --core-id \<ID\>                  Identifier of core \<0-4095\> within given cache "
     r"instance",
-    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv\}",
+    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv|json\}",
     r"Options that are valid with --get-param \(-G\) --name \(-n\) cleaning are:",
     r"-i  --cache-id \<ID\>                 Identifier of cache instance \<1-16384\>",
-    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv\}",
+    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv|json\}",
     r"Options that are valid with --get-param \(-G\) --name \(-n\) cleaning-alru are:",
     r"-i  --cache-id \<ID\>                 Identifier of cache instance \<1-16384\>",
-    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv\}",
+    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv|json\}",
     r"Options that are valid with --get-param \(-G\) --name \(-n\) cleaning-acp are:",
     r"-i  --cache-id \<ID\>                 Identifier of cache instance \<1-16384\>",
-    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv\}",
+    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv|json\}",
     r"Options that are valid with --get-param \(-G\) --name \(-n\) promotion are:",
     r"-i  --cache-id \<ID\>                 Identifier of cache instance \<1-16384\>",
-    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv\}",
+    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv|json\}",
     r"Options that are valid with --get-param \(-G\) --name \(-n\) promotion-nhit are:",
     r"-i  --cache-id \<ID\>                 Identifier of cache instance \<1-16384\>",
-    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv\}",
+    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv|json\}",
 ]
 
 
@@ -214,11 +214,11 @@ list_caches_help = [
     r"Usage: casadm --list-caches \[option\.\.\.\]",
     r"List all cache instances and core devices",
     r"Options that are valid with --list-caches \(-L\) are:",
-    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv\}",
+    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv|json\}",
 ]
 
 stats_help = [
-    r"Usage: casadm --stats --cache-id \<ID\> \[option\.\.\.\]",
+    r"Usage: casadm --stats \[option\.\.\.\]",
     r"Print statistics for cache instance",
     r"Options that are valid with --stats \(-P\) are:",
     r"-i  --cache-id \<ID\>                 Identifier of cache instance \<1-16384\>",
@@ -228,7 +228,9 @@ stats_help = [
     r"-d  --io-class-id \[\<ID\>\]            Display per IO class statistics",
     r"-f  --filter \<FILTER-SPEC\>          Apply filters from the following set: "
     r"\{all, conf, usage, req, blk, err\}",
-    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv\}",
+    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv|json\}",
+    r"-a  --all                           Display statistics of all caches \(or only given "
+    r"cache\), all their cores and, if --io-class-id is given, IO classes at once",
 ]
 
 
@@ -263,7 +265,7 @@ ioclass_help = [
     r"Usage: casadm --io-class --list --cache-id \<ID\> \[option\.\.\.\]",
     r"Options that are valid with --list \(-L\) are:",
     r"-i  --cache-id \<ID\>                 Identifier of cache instance \<1-16384\>",
-    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv\}",
+    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv|json\}",
 ]
 
 
@@ -271,7 +273,7 @@ version_help = [
     r"Usage: casadm --version \[option\.\.\.\]",
     r"Print CAS version",
     r"Options that are valid with --version \(-V\) are:"
-    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv\}",
+    r"-o  --output-format \<FORMAT\>        Output format: \{table|csv|json\}",
 ]
 
 help_help = [
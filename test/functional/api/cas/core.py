@@ -8,11 +8,12 @@ from datetime import timedelta
 from typing import List
 
 from api.cas import casadm
+from api.cas.batch import CommandBatch
 from api.cas.cache_config import SeqCutOffParameters, SeqCutOffPolicy
 from api.cas.casadm_params import StatsFilter
 from api.cas.casadm_parser import get_seq_cut_off_parameters, get_cas_devices_dict
 from api.cas.core_config import CoreStatus
-from api.cas.statistics import CoreStats, CoreIoClassStats
+from api.cas.statistics import CoreStats, CoreIoClassStats, StatsSnapshot, invalidates_stats
 from core.test_run_utils import TestRun
 from storage_devices.device import Device
 from test_tools.fs_tools import Filesystem, ls_item
@@ -26,11 +27,21 @@ SEQ_CUT_OFF_THRESHOLD_DEFAULT = Size(1, Unit.MebiByte)
 
 
 class Core(Device):
-    def __init__(self, core_device: str, cache_id: int):
+    # How long statistics fetched by getters may be reused, None - until refresh() or
+    # a command changing the core is issued by this object
+    stats_ttl: timedelta | None = timedelta(0)
+
+    def __init__(self, core_device: str, cache_id: int, core_info: dict = None):
+        """
+        core_info - core entry of get_cas_devices_dict(), when given the core is
+        constructed from it instead of listing CAS devices again
+        """
+        self.__stats = StatsSnapshot(lambda stat_filter: self.get_statistics(stat_filter))
         self.core_device = Device(core_device)
         self.path = None
         self.cache_id = cache_id
-        core_info = self.__get_core_info()
+        if core_info is None:
+            core_info = self.__get_core_info()
         # "-" is special case for cores in core pool
         if core_info["core_id"] != "-":
             self.core_id = int(core_info["core_id"])
@@ -40,7 +51,9 @@ class Core(Device):
         self.block_size = None
 
     def __get_core_info(self) -> dict | None:
-        core_dicts = get_cas_devices_dict()["cores"].values()
+        # Cores resolved from the same batch share single listing
+        devices = CommandBatch.shared("cas_devices", get_cas_devices_dict)
+        core_dicts = devices["cores"].values()
         # for core
         core_device = [
             core
@@ -51,7 +64,7 @@ class Core(Device):
             return core_device[0]
 
         # for core pool
-        core_pool_dicts = get_cas_devices_dict()["core_pool"].values()
+        core_pool_dicts = devices["core_pool"].values()
         core_pool_device = [
             core for core in core_pool_dicts if core["device_path"] == self.core_device.path
         ]
@@ -97,34 +110,44 @@ class Core(Device):
     def get_seq_cut_off_threshold(self):
         return get_seq_cut_off_parameters(self.cache_id, self.core_id).threshold
 
+    def refresh(self) -> None:
+        """Drop statistics cached by getters, so that they are fetched again on next call"""
+        self.__stats.invalidate()
+
     def get_dirty_blocks(self):
-        return self.get_statistics().usage_stats.dirty
+        return self.__stats.get(StatsFilter.usage, self.stats_ttl).dirty
 
     def get_clean_blocks(self):
-        return self.get_statistics().usage_stats.clean
+        return self.__stats.get(StatsFilter.usage, self.stats_ttl).clean
 
     def get_occupancy(self):
-        return self.get_statistics().usage_stats.occupancy
+        return self.__stats.get(StatsFilter.usage, self.stats_ttl).occupancy
 
     # Casadm methods:
 
+    @invalidates_stats
     def remove_core(self, force: bool = False):
         return casadm.remove_core(self.cache_id, self.core_id, force)
 
+    @invalidates_stats
     def remove_inactive(self, force: bool = False):
         return casadm.remove_inactive(self.cache_id, self.core_id, force)
 
+    @invalidates_stats
     def reset_counters(self):
         return casadm.reset_counters(self.cache_id, self.core_id)
 
+    @invalidates_stats
     def flush_core(self):
         casadm.flush_core(self.cache_id, self.core_id)
         sync()
 
+    @invalidates_stats
     def purge_core(self):
         casadm.purge_core(self.cache_id, self.core_id)
         sync()
 
+    @invalidates_stats
     def set_seq_cutoff_parameters(self, seq_cutoff_param: SeqCutOffParameters):
         return casadm.set_param_cutoff(
             self.cache_id,
@@ -134,12 +157,15 @@ class Core(Device):
             seq_cutoff_param.promotion_count,
         )
 
+    @invalidates_stats
     def set_seq_cutoff_threshold(self, threshold: Size):
         return casadm.set_param_cutoff(self.cache_id, self.core_id, threshold=threshold)
 
+    @invalidates_stats
     def set_seq_cutoff_policy(self, policy: SeqCutOffPolicy):
         return casadm.set_param_cutoff(self.cache_id, self.core_id, policy=policy)
 
+    @invalidates_stats
     def set_seq_cutoff_promotion_count(self, promotion_count: int):
         return casadm.set_param_cutoff(self.cache_id, self.core_id, promotion_count=promotion_count)
 
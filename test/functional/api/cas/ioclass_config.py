@@ -13,6 +13,7 @@ import string
 from datetime import timedelta
 from packaging import version
 
+from api.cas.batch import run_cmd
 from core.test_run import TestRun
 from test_tools.fs_tools import write_file
 from test_tools.os_tools import get_kernel_version
@@ -206,32 +207,22 @@ def create_ioclass_config(
     add_default_rule: bool = True, ioclass_config_path: str = default_config_file_path
 ):
     TestRun.LOGGER.info(f"Creating config file {ioclass_config_path}")
-    output = TestRun.executor.run(f"echo {IO_CLASS_CONFIG_HEADER} > {ioclass_config_path}")
-    if output.exit_code != 0:
-        raise Exception(
-            "Failed to create ioclass config file. "
-            + f"stdout: {output.stdout} \n stderr :{output.stderr}"
-        )
+    run_cmd(
+        f"echo {IO_CLASS_CONFIG_HEADER} > {ioclass_config_path}",
+        "Failed to create ioclass config file.",
+    )
 
     if add_default_rule:
-        output = TestRun.executor.run(
+        run_cmd(
             f'echo "{DEFAULT_IO_CLASS_ID},{DEFAULT_IO_CLASS_RULE},{DEFAULT_IO_CLASS_PRIORITY},"'
-            + f'"1.00" >> {ioclass_config_path}'
+            + f'"1.00" >> {ioclass_config_path}',
+            "Failed to create ioclass config file.",
         )
-        if output.exit_code != 0:
-            raise Exception(
-                "Failed to create ioclass config file. "
-                + f"stdout: {output.stdout} \n stderr :{output.stderr}"
-            )
 
 
 def remove_ioclass_config(ioclass_config_path: str = default_config_file_path):
     TestRun.LOGGER.info(f"Removing config file {ioclass_config_path}")
-    output = TestRun.executor.run(f"rm -f {ioclass_config_path}")
-    if output.exit_code != 0:
-        raise Exception(
-            f"Failed to remove config file. stdout: {output.stdout} \n stderr :{output.stderr}"
-        )
+    run_cmd(f"rm -f {ioclass_config_path}", "Failed to remove config file.")
 
 
 def add_ioclass(
@@ -244,12 +235,10 @@ def add_ioclass(
     new_ioclass = f"{ioclass_id},{rule},{eviction_priority},{allocation}"
     TestRun.LOGGER.info(f"Adding rule {new_ioclass} to config file {ioclass_config_path}")
 
-    output = TestRun.executor.run(f'echo "{new_ioclass}" >> {ioclass_config_path}')
-    if output.exit_code != 0:
-        raise Exception(
-            "Failed to append ioclass to config file. "
-            + f"stdout: {output.stdout} \n stderr :{output.stderr}"
-        )
+    run_cmd(
+        f'echo "{new_ioclass}" >> {ioclass_config_path}',
+        "Failed to append ioclass to config file.",
+    )
 
 
 def get_ioclass(ioclass_id: int, ioclass_config_path: str = default_config_file_path):
@@ -270,31 +259,9 @@ def get_ioclass(ioclass_id: int, ioclass_config_path: str = default_config_file_
 
 def remove_ioclass(ioclass_id: int, ioclass_config_path: str = default_config_file_path):
     TestRun.LOGGER.info(f"Removing rule no.{ioclass_id} from config file {ioclass_config_path}")
-    output = TestRun.executor.run(f"cat {ioclass_config_path}")
-    if output.exit_code != 0:
-        raise Exception(
-            "Failed to read ioclass config file. "
-            + f"stdout: {output.stdout} \n stderr :{output.stderr}"
-        )
-
-    old_ioclass_config = output.stdout.splitlines()
-    config_header = old_ioclass_config[0]
-
-    # First line in valid config file is always a header, not a rule - it is
-    # already extracted above
-    new_ioclass_config = [x for x in old_ioclass_config[1:] if int(x.split(",")[0]) != ioclass_id]
-
-    new_ioclass_config.insert(0, config_header)
-
-    if len(new_ioclass_config) == len(old_ioclass_config):
-        raise Exception(
-            f"Failed to remove ioclass {ioclass_id} from config file {ioclass_config_path}"
-        )
-
-    new_ioclass_config_str = "\n".join(new_ioclass_config)
-    output = TestRun.executor.run(f'echo "{new_ioclass_config_str}" > {ioclass_config_path}')
-    if output.exit_code != 0:
-        raise Exception(
-            "Failed to save new ioclass config. "
-            + f"stdout: {output.stdout} \n stderr :{output.stderr}"
-        )
+    # First line in valid config file is always a header, not a rule, so it never matches
+    run_cmd(
+        f"grep -q '^{ioclass_id},' {ioclass_config_path} && "
+        f"sed -i '/^{ioclass_id},/d' {ioclass_config_path}",
+        f"Failed to remove ioclass {ioclass_id} from config file {ioclass_config_path}",
+    )
@@ -4,11 +4,18 @@
 # SPDX-License-Identifier: BSD-3-Clause
 #
 
-import csv
+import copy
+import functools
+import json
+import threading
+import time
 
 from datetime import timedelta
 from enum import Enum
 from typing import List
+
+import numpy as np
+
 from api.cas import casadm
 from api.cas.casadm_params import StatsFilter
 from connection.utils.output import CmdException
@@ -37,6 +44,50 @@ class OperationType(Enum):
         return self.value
 
 
+class StatsSnapshot:
+    """
+    Statistics of a single cache or core fetched section by section, on demand.
+    Fetched sections are reused until invalidated or older than ttl (None - until invalidated).
+    """
+
+    section_attrs = {
+        StatsFilter.conf: "config_stats",
+        StatsFilter.usage: "usage_stats",
+        StatsFilter.req: "request_stats",
+        StatsFilter.blk: "block_stats",
+        StatsFilter.err: "error_stats",
+    }
+
+    def __init__(self, fetch):
+        # fetch(filter) returns CacheStats/CoreStats object with given sections
+        self.__fetch = fetch
+        self.__sections = {}
+
+    def get(self, section: StatsFilter, ttl: timedelta | None = timedelta(0)):
+        now = time.monotonic()
+        fetched = self.__sections.get(section)
+        if fetched is None or (ttl is not None and now - fetched[0] >= ttl.total_seconds()):
+            stats = self.__fetch([section])
+            fetched = self.__sections[section] = (now, getattr(stats, self.section_attrs[section]))
+        return fetched[1]
+
+    def invalidate(self):
+        self.__sections.clear()
+
+
+def invalidates_stats(method):
+    """Decorator for Cache/Core methods issuing commands which may change their statistics"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.refresh()
+
+    return wrapper
+
+
 class CacheStats:
     def __init__(
         self,
@@ -511,6 +562,9 @@ class RequestStats:
             and self.requests_total == other.requests_total
         )
 
+    def __sub__(self, other):
+        return _subtract_stats(self, other)
+
     def __iter__(self):
         return iter([getattr(self, stats_item) for stats_item in self.__dict__])
 
@@ -545,6 +599,9 @@ class RequestStatsChunk:
             and self.total == other.total
         )
 
+    def __sub__(self, other):
+        return _subtract_stats(self, other)
+
     def __iter__(self):
         return iter([getattr(self, stats_item) for stats_item in self.__dict__])
 
@@ -584,6 +641,9 @@ class BlockStats:
             self.core == other.core and self.cache == other.cache and self.exp_obj == other.exp_obj
         )
 
+    def __sub__(self, other):
+        return _subtract_stats(self, other)
+
     def __iter__(self):
         return iter([getattr(self, stats_item) for stats_item in self.__dict__])
 
@@ -623,6 +683,9 @@ class ErrorStats:
             and self.total_errors == other.total_errors
         )
 
+    def __sub__(self, other):
+        return _subtract_stats(self, other)
+
     def __iter__(self):
         return iter([getattr(self, stats_item) for stats_item in self.__dict__])
 
@@ -644,6 +707,9 @@ class BasicStatsChunk:
             self.reads == other.reads and self.writes == other.writes and self.total == other.total
         )
 
+    def __sub__(self, other):
+        return _subtract_stats(self, other)
+
     def __iter__(self):
         return iter([getattr(self, stats_item) for stats_item in self.__dict__])
 
@@ -665,16 +731,35 @@ class BasicStatsChunkError:
             self.reads == other.reads and self.writes == other.writes and self.total == other.total
         )
 
+    def __sub__(self, other):
+        return _subtract_stats(self, other)
+
     def __iter__(self):
         return iter([getattr(self, stats_item) for stats_item in self.__dict__])
 
 
+def _subtract_stats(stats, other):
+    difference = copy.copy(stats)
+    for name, value in vars(stats).items():
+        setattr(difference, name, value - getattr(other, name))
+    return difference
+
+
 def get_stat_value(stat_dict: dict, key: str):
     idx = key.index("[")
     unit = UnitType(key[idx:])
     return parse_value(stat_dict[key], unit)
 
 
+def get_unit_type(key: str) -> UnitType | None:
+    """Return unit of a stat from its name, e.g. "Dirty [4KiB Blocks]", None if it has no unit"""
+    idx = key.rfind(" [")
+    try:
+        return UnitType(key[idx + 1:]) if idx != -1 else None
+    except ValueError:
+        return None
+
+
 def parse_value(value: str, unit_type: UnitType) -> int | float | Size | timedelta | str:
     match unit_type:
         case UnitType.requests:
@@ -696,6 +781,261 @@ def parse_value(value: str, unit_type: UnitType) -> int | float | Size | timedel
     return stat_unit
 
 
+class StatsTable:
+    """
+    Columnar statistics of many objects or samples, one row per get_stats_dict() result.
+
+    Stats with numeric units are stored as NumPy arrays in the unit reported by casadm
+    (int64 for requests, float64 otherwise, NaN where the stat is missing), the rest
+    as object arrays. Values are converted to Size/timedelta objects only on row(i)
+    or with column(key, unit), so computations over thousands of samples don't
+    construct an object per value.
+    """
+
+    size_units = {
+        UnitType.block_4k: Unit.Blocks4096,
+        UnitType.kibibyte: Unit.KibiByte,
+        UnitType.mebibyte: Unit.MebiByte,
+        UnitType.gibibyte: Unit.GibiByte,
+        UnitType.byte: Unit.Byte,
+    }
+
+    def __init__(self, columns: dict, length: int):
+        self.__columns = columns
+        self.__units = {key: get_unit_type(key) for key in columns}
+        self.__length = length
+
+    @classmethod
+    def from_dicts(cls, rows: List[dict]) -> "StatsTable":
+        keys = dict.fromkeys(key for row in rows for key in row)
+        columns = {
+            key: cls.__to_array([row.get(key) for row in rows], get_unit_type(key))
+            for key in keys
+        }
+        return cls(columns, len(rows))
+
+    @classmethod
+    def concat(cls, tables: List["StatsTable"]) -> "StatsTable":
+        """Join tables row-wise, e.g. samples of the same object collected over time"""
+        keys = dict.fromkeys(key for table in tables for key in table.keys())
+        columns = {}
+        for key in keys:
+            unit = get_unit_type(key)
+            parts = [
+                table[key] if key in table else cls.__to_array([None] * len(table), unit)
+                for table in tables
+            ]
+            columns[key] = np.concatenate(parts) if parts else cls.__to_array([], unit)
+        return cls(columns, sum(len(table) for table in tables))
+
+    @staticmethod
+    def __to_array(values: list, unit: UnitType | None) -> np.ndarray:
+        if unit is None:
+            return np.array(values, dtype=object)
+        if unit is UnitType.requests and None not in values:
+            return np.array([int(value) for value in values], dtype=np.int64)
+        return np.array(
+            [np.nan if value is None else float(value) for value in values], dtype=np.float64
+        )
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__columns
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.__columns[key]
+
+    def keys(self) -> List[str]:
+        return list(self.__columns)
+
+    def unit(self, key: str) -> UnitType | None:
+        return self.__units[key]
+
+    def column(self, key: str, unit: Unit = None) -> np.ndarray:
+        """Return stat column, size stats converted to given unit if one is passed"""
+        values = self.__columns[key]
+        if unit is None:
+            return values
+        stat_unit = self.__units[key]
+        if stat_unit not in self.size_units:
+            raise ValueError(f"Stat {key} is not a size")
+        return values * (self.size_units[stat_unit].value / unit.value)
+
+    def select(self, mask: np.ndarray) -> "StatsTable":
+        """Return table with rows for which mask (boolean array or indices) is set"""
+        columns = {key: values[mask] for key, values in self.__columns.items()}
+        return StatsTable(columns, np.arange(self.__length)[mask].size)
+
+    def row(self, index: int) -> dict:
+        """Return single row with get_stats_dict() keys, numeric stats as plain numbers"""
+        if not -self.__length <= index < self.__length:
+            raise IndexError(f"Stats row {index} out of range")
+        row = {}
+        for key, values in self.__columns.items():
+            value = values[index]
+            if self.__units[key] is not None:
+                if np.isnan(value):
+                    continue
+                value = value.item()
+            elif value is None:
+                continue
+            row[key] = value
+        return row
+
+    def value(self, key: str, index: int):
+        """Return single stat parsed with parse_value(), e.g. as Size or timedelta"""
+        unit = self.__units[key]
+        value = self.__columns[key][index]
+        return parse_value(value.item() if unit is not None else value, unit)
+
+
+class StatsSampler:
+    """
+    Samples statistics of a cache, core or io class at fixed interval in background thread.
+
+    Usage:
+        with StatsSampler(cache_id=1, core_id=1, interval=timedelta(seconds=1)) as sampler:
+            run_fio()
+        assert all(sampler.rates()["iops"] > 1000)
+    """
+
+    default_filter = [StatsFilter.usage, StatsFilter.req, StatsFilter.blk]
+    block_stat_prefixes = ("Reads from ", "Writes to ", "Total to/from ")
+
+    def __init__(
+        self,
+        cache_id: int,
+        core_id: int = None,
+        io_class_id: int = None,
+        interval: timedelta = timedelta(seconds=1),
+        filter: List[StatsFilter] = None,
+    ):
+        self.cache_id = cache_id
+        self.core_id = core_id
+        self.io_class_id = io_class_id
+        self.interval = interval
+        self.filter = filter if filter else self.default_filter
+        self.__timestamps = []
+        self.__rows = []
+        self.__table = None
+        self.__error = None
+        self.__stop = threading.Event()
+        self.__thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop(raise_error=exc_type is None)
+
+    def start(self) -> None:
+        if self.__thread is not None:
+            raise Exception("Stats sampler already started")
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self, raise_error: bool = True) -> None:
+        """Stop sampling after taking final sample, re-raise error of sampling thread if any"""
+        if self.__thread is None:
+            return
+        self.__stop.set()
+        self.__thread.join()
+        self.__thread = None
+        if self.__error is None:
+            self.sample()
+        if raise_error and self.__error is not None:
+            raise self.__error
+
+    def __run(self) -> None:
+        next_sample = time.monotonic()
+        try:
+            while True:
+                self.sample()
+                next_sample += self.interval.total_seconds()
+                if self.__stop.wait(max(0.0, next_sample - time.monotonic())):
+                    break
+        except Exception as e:
+            self.__error = e
+
+    def sample(self) -> None:
+        """Take single sample, may be also called directly without starting the thread"""
+        stats_dict = get_stats_dict(
+            filter=self.filter,
+            cache_id=self.cache_id,
+            core_id=self.core_id,
+            io_class_id=self.io_class_id,
+        )
+        # Only stats with units are kept, e.g. policy names are the same in each sample
+        stats_dict = {key: value for key, value in stats_dict.items() if get_unit_type(key)}
+        # Timestamp goes first, so that there is one for each row seen by other threads
+        self.__timestamps.append(time.monotonic())
+        self.__rows.append(stats_dict)
+
+    def __len__(self) -> int:
+        return len(self.__timestamps)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Monotonic clock time of each sample in seconds"""
+        return np.array(self.__timestamps, dtype=np.float64)
+
+    @property
+    def table(self) -> StatsTable:
+        """Collected samples, one row per sample"""
+        if self.__table is None or len(self.__table) != len(self.__rows):
+            self.__table = StatsTable.from_dicts(self.__rows[:])
+        return self.__table
+
+    def deltas(self) -> StatsTable:
+        """
+        Difference of each stat between consecutive samples (n-1 rows), except for
+        percentages. Interval lengths are in "Interval [s]" column. Differences of
+        counters which went down (e.g. counters were reset) are NaN.
+        """
+        table = self.table
+        timestamps = self.timestamps[: len(table)]
+        columns = {"Interval [s]": np.diff(timestamps)}
+        for key in table.keys():
+            if table.unit(key) is UnitType.percentage:
+                continue
+            delta = np.diff(table[key].astype(np.float64))
+            if table.unit(key) is UnitType.requests or key.startswith(self.block_stat_prefixes):
+                delta[delta < 0] = np.nan
+            columns[key] = delta
+        return StatsTable(columns, max(len(table) - 1, 0))
+
+    def rates(self) -> dict:
+        """
+        Per interval rates computed from deltas(), each as array of n-1 values:
+        "iops" - serviced requests per second,
+        "hit_ratio" - read and write hits to read and write requests (NaN if no requests),
+        "dirty_growth" - dirty data growth in bytes per second (negative when cleaned),
+        "cleaner_throughput" - data written to core in bytes per second, for cache in
+        write-back mode these are flushed/cleaned writes.
+        """
+        deltas = self.deltas()
+        interval = deltas["Interval [s]"]
+
+        def delta(key, unit=None):
+            if key not in deltas:
+                return np.full(len(deltas), np.nan)
+            return deltas.column(key, unit)
+
+        hits = delta("Read hits [Requests]") + delta("Write hits [Requests]")
+        total = delta("Read total [Requests]") + delta("Write total [Requests]")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {
+                "iops": delta("Serviced requests [Requests]") / interval,
+                "hit_ratio": np.where(total > 0, hits / total, np.nan),
+                "dirty_growth": delta("Dirty [4KiB Blocks]", Unit.Byte) / interval,
+                "cleaner_throughput": delta("Writes to core [4KiB Blocks]", Unit.Byte) / interval,
+            }
+
+
 def _get_section_filters(filter: List[StatsFilter], io_class_stats: bool = False):
     if filter is None or StatsFilter.all in filter:
         filters = [
@@ -718,18 +1058,114 @@ def get_stats_dict(
     core_id: int = None,
     io_class_id: int = None,
 ):
-    csv_stats = casadm.print_statistics(
+    json_stats = casadm.print_statistics(
         cache_id=cache_id,
         core_id=core_id,
         io_class_id=io_class_id,
         filter=filter,
-        output_format=casadm.OutputFormat.csv,
-    ).stdout.splitlines()
-    stat_keys, stat_values = csv.reader(csv_stats)
+        output_format=casadm.OutputFormat.json,
+    ).stdout
+    records = _load_records(json_stats)
+    return _flatten_record(records[0] if records else {})
+
+
+def get_all_stats(
+    filter: List[StatsFilter] = None,
+    cache_id: int = None,
+    io_classes: bool = False,
+) -> dict:
+    """
+    Retrieve statistics of all caches (or of a single cache), all their cores and optionally
+    all their io classes with a single casadm invocation.
+
+    Returns {"caches": table, "cores": table, "cache_io_classes": table, "core_io_classes":
+    table}, where each StatsTable has one row per object with "cache_id", "core_id" and
+    "io_class_id" columns next to stats (same as get_stats_dict() keys). Stats missing
+    for an object (e.g. cache in standby) are NaN or None.
+    """
+    try:
+        records = _get_all_records(filter, cache_id, io_classes)
+    except CmdException:
+        if cache_id is not None:
+            raise
+        # Cache stopped in the meantime fails whole bulk query, so query caches one by one
+        # and skip only the ones which are not running anymore
+        from api.cas.casadm_parser import get_cas_devices_dict
+
+        records = []
+        for running_cache_id in get_cas_devices_dict()["caches"]:
+            try:
+                records += _get_all_records(filter, running_cache_id, io_classes)
+            except CmdException:
+                if running_cache_id in get_cas_devices_dict()["caches"]:
+                    raise
+
+    rows = {"caches": [], "cores": [], "cache_io_classes": [], "core_io_classes": []}
+    for record in records:
+        stats_dict = _flatten_record(record)
+        ids = {
+            "cache_id": stats_dict.pop("Target Cache Id"),
+            "core_id": stats_dict.pop("Target Core Id"),
+            "io_class_id": stats_dict.pop("Target IO class Id"),
+        }
+        ids = {name: None if value == "-" else int(value) for name, value in ids.items()}
+        kind = (
+            ("caches" if ids["core_id"] is None else "cores")
+            if ids["io_class_id"] is None
+            else ("cache_io_classes" if ids["core_id"] is None else "core_io_classes")
+        )
+        rows[kind].append({**ids, **stats_dict})
+
+    return {kind: StatsTable.from_dicts(kind_rows) for kind, kind_rows in rows.items()}
+
+
+def _get_all_records(filter: List[StatsFilter], cache_id: int, io_classes: bool) -> list:
+    json_stats = casadm.print_statistics_all(
+        cache_id=cache_id,
+        filter=filter,
+        io_class=io_classes,
+        output_format=casadm.OutputFormat.json,
+    ).stdout
+    return _load_records(json_stats)
+
+
+def _load_records(json_stats: str) -> list:
+    # Numbers are kept in casadm's textual form, as they were in csv output, so that
+    # values are strings regardless of output format (e.g. "IO class ID", "Max size")
+    return json.loads(json_stats, parse_int=str, parse_float=str)["records"]
+
+
+def _flatten_record(record: dict) -> dict:
+    stats_dict = {}
+    for title, entries in record.items():
+        if entries and title in entries[0]:
+            stats_dict.update(_flatten_table(title, entries))
+        else:
+            for entry in entries:
+                key = f"{title} [{entry['unit']}]" if entry["unit"] else title
+                # First value of a unit is the exact one, e.g. "Dirty for [s]" is
+                # followed by human readable "Dirty for" duration
+                stats_dict.setdefault(key, entry["value"])
     # Unify names in block stats for core and cache to easier compare
     # cache vs core stats using unified key
     # cache stats: Reads from core(s)
     # core stats: Reads from core
-    stat_keys = [x.replace("(s)", "") for x in stat_keys]
-    stats_dict = dict(zip(stat_keys, stat_values))
-    return stats_dict
+    return {key.replace("(s)", ""): value for key, value in stats_dict.items()}
+
+
+def _flatten_table(title: str, rows: list) -> dict:
+    """
+    Flatten json table rows to "<row name> [<column>]" keys, the first value column
+    is keyed with row unit instead, e.g. "Occupancy [4KiB Blocks]", "Occupancy [%]".
+    """
+    flat = {}
+    for row in rows:
+        name = row[title]
+        columns = [column for column in row if column not in (title, "unit")]
+        for i, column in enumerate(columns):
+            if i == 0:
+                key = f"{name} [{row['unit']}]" if row["unit"] else name
+            else:
+                key = f"{name} [{column}]"
+            flat[key] = row[column]
+    return flat
@@ -9,6 +9,7 @@ import json
 import pytest
 
 from utils.performance import PerfContainer, ConfigParameter, BuildTypes
+from utils.perf_db import PerfDatabase
 from core.test_run import TestRun
 from api.cas.casadm_parser import get_casadm_version
 
@@ -23,25 +24,34 @@ def perf_collector(request):
         TestRun.LOGGER.warning("No performance metrics collected by test using perf_collector")
         return
 
-    container.insert_config_param(request.node.name.split("[")[0], ConfigParameter.TEST_NAME)
-    container.insert_config_param(get_casadm_version(), ConfigParameter.CAS_VERSION)
-    container.insert_config_param(TestRun.disks["cache"].disk_type, ConfigParameter.CACHE_TYPE)
-    container.insert_config_param(TestRun.disks["core"].disk_type, ConfigParameter.CORE_TYPE)
-    container.insert_config_param(dt.now(), ConfigParameter.TIMESTAMP)
-    container.insert_config_param(
-        request.config.getoption("--build-type"), ConfigParameter.BUILD_TYPE
-    )
+    config_params = {
+        ConfigParameter.TEST_NAME: request.node.name.split("[")[0],
+        ConfigParameter.CAS_VERSION: get_casadm_version(),
+        ConfigParameter.CACHE_TYPE: TestRun.disks["cache"].disk_type,
+        ConfigParameter.CORE_TYPE: TestRun.disks["core"].disk_type,
+        ConfigParameter.TIMESTAMP: dt.now(),
+        ConfigParameter.BUILD_TYPE: request.config.getoption("--build-type"),
+    }
     if TestRun.dut.ip:
-        container.insert_config_param(TestRun.dut.ip, ConfigParameter.DUT)
+        config_params[ConfigParameter.DUT] = TestRun.dut.ip
+    container.insert_config_params(config_params)
 
     perf_log_path = os.path.join(TestRun.LOGGER.base_dir, "perf.json")
 
     with open(perf_log_path, "w") as dump_file:
         json.dump(container.to_serializable_dict(), dump_file, indent=4)
 
+    perf_db_path = request.config.getoption("--perf-db")
+    if perf_db_path:
+        with PerfDatabase(perf_db_path) as perf_db:
+            perf_db.ingest_file(perf_log_path)
+
 
 def pytest_addoption(parser):
     parser.addoption("--build-type", choices=BuildTypes, default="other")
+    parser.addoption(
+        "--perf-db", default=None, help="SQLite database to store performance results in"
+    )
 
 
 def pytest_configure(config):
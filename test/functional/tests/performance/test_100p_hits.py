@@ -16,7 +16,7 @@ from api.cas.cache_config import (
 from core.test_run import TestRun
 from storage_devices.disk import DiskTypeSet, DiskTypeLowerThan, DiskType
 from test_tools.fio.fio import Fio
-from test_tools.fio.fio_param import IoEngine, ReadWrite
+from test_tools.fio.fio_param import FioOutput, IoEngine, ReadWrite
 from test_tools.os_tools import set_wbt_lat, get_dut_cpu_physical_cores
 from test_tools.udev import Udev
 from connection.utils.output import CmdException
@@ -47,7 +47,7 @@ def test_4k_100p_hit_reads_wt(queue_depth, numjobs, cache_line_size, perf_collec
 
     fio_cfg = (
         Fio()
-        .create_command()
+        .create_command(FioOutput.jsonplus)
         .io_engine(IoEngine.libaio)
         .block_size(Size(4, Unit.KiB))
         .read_write(ReadWrite.randread)
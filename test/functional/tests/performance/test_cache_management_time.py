@@ -0,0 +1,158 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+from datetime import timedelta
+
+import pytest
+
+from api.cas import casadm
+from api.cas.cache import Cache
+from api.cas.cache_config import CacheMode, CacheLineSize, CleaningPolicy, SeqCutOffPolicy
+from api.cas.cli import (
+    load_cmd,
+    standby_activate_cmd,
+    standby_detach_cmd,
+    standby_load_cmd,
+    start_cmd,
+    stop_cmd,
+)
+from connection.utils.output import CmdException
+from core.test_run import TestRun
+from storage_devices.device import Device
+from storage_devices.disk import DiskType, DiskTypeSet, DiskTypeLowerThan
+from test_tools.fio.fio import Fio
+from test_tools.fio.fio_param import IoEngine, ReadWrite
+from test_tools.udev import Udev
+from type_def.size import Size, Unit
+from utils.performance import ManagementMetric, WorkloadParameter
+
+cache_id = 1
+
+
+@pytest.mark.os_dependent
+@pytest.mark.performance()
+@pytest.mark.require_disk("cache", DiskTypeSet([DiskType.optane, DiskType.nand]))
+@pytest.mark.require_disk("core", DiskTypeLowerThan("cache"))
+@pytest.mark.parametrize(
+    "cache_size",
+    [Size(4, Unit.GibiByte), Size(32, Unit.GibiByte), Size(128, Unit.GibiByte),
+     Size(512, Unit.GibiByte)],
+)
+@pytest.mark.parametrizex("cache_line_size", CacheLineSize)
+def test_cache_management_time(cache_size, cache_line_size, perf_collector):
+    """
+    title: Cache start, stop, load and activation time vs cache size
+    description: |
+      Measure wall time of cache start, stop with and without flush, load of dirty and
+      clean cache and standby cache activation for given cache size and cache line size.
+      Times are measured on DUT, so they don't include connection latency.
+      Use "python3 -m utils.perf_db DB scaling" on collected results to fit scaling
+      curves and predict times for bigger caches.
+    pass_criteria:
+      - always passes
+    """
+
+    with TestRun.step("Prepare cache and core devices"):
+        cache_device = TestRun.disks["cache"]
+        core_device = TestRun.disks["core"]
+        check_disk_size(cache_device, cache_size)
+        check_disk_size(core_device, cache_size)
+
+        cache_device.create_partitions([cache_size])
+        cache_device = cache_device.partitions[0]
+        core_device.create_partitions([cache_size])
+        core_device = core_device.partitions[0]
+
+    with TestRun.step("Disable udev"):
+        Udev.disable()
+
+    with TestRun.step("Start cache in WB mode"):
+        start_time = measure_time(
+            start_cmd(
+                cache_dev=cache_device.path,
+                cache_mode=CacheMode.WB.name.lower(),
+                cache_line_size=str(int(cache_line_size.value.get_value(Unit.KibiByte))),
+                cache_id=str(cache_id),
+                force=True,
+            )
+        )
+        # Started with raw command to measure its time only, so registered on DUT here
+        cache = Cache(cache_id=cache_id, device=cache_device)
+        TestRun.dut.cache_list.append(cache)
+        cache.set_seq_cutoff_policy(SeqCutOffPolicy.never)
+        cache.set_cleaning_policy(CleaningPolicy.nop)
+        core = cache.add_core(core_device)
+
+    with TestRun.step("Fill cache with dirty data"):
+        (
+            Fio()
+            .create_command()
+            .io_engine(IoEngine.libaio)
+            .block_size(Size(1, Unit.MebiByte))
+            .read_write(ReadWrite.write)
+            .io_depth(16)
+            .direct()
+            .target(core)
+            .size(core.size)
+            .run()
+        )
+        metadata_size = cache.get_metadata_size_on_disk()
+        TestRun.LOGGER.info(f"Dirty data: {cache.get_dirty_blocks()}, metadata: {metadata_size}")
+        perf_collector.insert_config_from_cache(cache)
+
+    with TestRun.step("Stop cache without flushing dirty data"):
+        stop_time = measure_time(stop_cmd(cache_id=str(cache_id), no_data_flush=True))
+
+    with TestRun.step("Load dirty cache"):
+        load_time = measure_time(load_cmd(cache_dev=cache_device.path))
+
+    with TestRun.step("Stop cache with flush"):
+        stop_flush_time = measure_time(stop_cmd(cache_id=str(cache_id)), timedelta(hours=2))
+
+    with TestRun.step("Load clean cache"):
+        load_clean_time = measure_time(load_cmd(cache_dev=cache_device.path))
+
+    with TestRun.step("Stop cache and load it as standby"):
+        measure_time(stop_cmd(cache_id=str(cache_id), no_data_flush=True))
+        measure_time(standby_load_cmd(cache_dev=cache_device.path))
+        measure_time(standby_detach_cmd(cache_id=str(cache_id)))
+
+    with TestRun.step("Activate standby cache"):
+        activate_time = measure_time(
+            standby_activate_cmd(cache_dev=cache_device.path, cache_id=str(cache_id))
+        )
+
+    with TestRun.step("Stop cache"):
+        casadm.stop_cache(cache_id=cache_id, no_data_flush=True)
+
+    for kind, duration in [
+        (ManagementMetric.START_TIME_US, start_time),
+        (ManagementMetric.STOP_TIME_US, stop_time),
+        (ManagementMetric.LOAD_TIME_US, load_time),
+        (ManagementMetric.STOP_FLUSH_TIME_US, stop_flush_time),
+        (ManagementMetric.LOAD_CLEAN_TIME_US, load_clean_time),
+        (ManagementMetric.ACTIVATE_TIME_US, activate_time),
+    ]:
+        TestRun.LOGGER.info(f"{kind}: {duration}")
+        perf_collector.insert_management_metric(duration / timedelta(microseconds=1), kind)
+    perf_collector.insert_management_metric(metadata_size.value, ManagementMetric.METADATA_SIZE)
+    perf_collector.insert_workload_param(
+        int(cache_size.get_value(Unit.MebiByte)), WorkloadParameter.CACHE_SIZE
+    )
+
+
+def measure_time(command: str, timeout: timedelta = timedelta(minutes=30)) -> timedelta:
+    output = TestRun.executor.run(
+        f"start=$(date +%s%N); {command}; rc=$?; echo $(($(date +%s%N) - start)); exit $rc",
+        timeout,
+    )
+    if output.exit_code != 0:
+        raise CmdException(f"Command failed: {command}", output)
+    return timedelta(microseconds=int(output.stdout.splitlines()[-1]) / 1000)
+
+
+def check_disk_size(device: Device, size: Size):
+    if device.size < size:
+        pytest.skip(f"Not enough space on device {device.path}.")
@@ -0,0 +1,116 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+from datetime import datetime
+
+import pytest
+
+from api.cas import casadm
+from api.cas.cache_config import CacheMode, CacheLineSize, CleaningPolicy, SeqCutOffPolicy
+from core.test_run import TestRun
+from storage_devices.disk import DiskType, DiskTypeSet, DiskTypeLowerThan
+from test_tools.fio.fio import Fio
+from test_tools.fio.fio_param import IoEngine, ReadWrite
+from test_tools.os_tools import set_wbt_lat
+from test_tools.udev import Udev
+from connection.utils.output import CmdException
+from type_def.size import Size, Unit
+from utils.performance import ManagementMetric
+
+cache_size = Size(16, Unit.GibiByte)
+core_size = Size(16, Unit.GibiByte)
+
+
+@pytest.mark.os_dependent
+@pytest.mark.performance()
+@pytest.mark.require_disk("cache", DiskTypeSet([DiskType.optane, DiskType.nand]))
+@pytest.mark.require_disk("core", DiskTypeLowerThan("cache"))
+@pytest.mark.parametrize("read_write", [ReadWrite.write, ReadWrite.randwrite])
+@pytest.mark.parametrizex("cache_line_size", CacheLineSize)
+def test_flush_purge_throughput(read_write, cache_line_size, perf_collector):
+    """
+    title: Cache flush and purge performance
+    description: |
+      Fill write-back cache with dirty data and measure time of flushing it to core,
+      then fill it again and measure time of purging it.
+    pass_criteria:
+      - always passes
+    """
+
+    with TestRun.step("Prepare cache and core devices"):
+        cache_device = TestRun.disks["cache"]
+        cache_device.create_partitions([cache_size])
+        cache_device = cache_device.partitions[0]
+
+        core_device = TestRun.disks["core"]
+        core_device.create_partitions([core_size])
+        core_device = core_device.partitions[0]
+
+    with TestRun.step("Disable udev"):
+        Udev.disable()
+
+    with TestRun.step("Start cache in WB mode with NOP cleaning policy"):
+        cache = casadm.start_cache(
+            cache_device, cache_mode=CacheMode.WB, cache_line_size=cache_line_size, force=True
+        )
+        cache.set_seq_cutoff_policy(SeqCutOffPolicy.never)
+        cache.set_cleaning_policy(CleaningPolicy.nop)
+        core = cache.add_core(core_device)
+
+    with TestRun.step("Fill cache with dirty data"):
+        fill_dirty(core, read_write)
+        dirty = cache.get_dirty_blocks()
+
+    with TestRun.step("Flush cache"):
+        start_time = datetime.now()
+        cache.flush_cache()
+        flush_time = datetime.now() - start_time
+        flush_bw = Size(dirty.value / flush_time.total_seconds(), Unit.Byte)
+        TestRun.LOGGER.info(f"Flushed {dirty} in {flush_time} ({flush_bw}/s)")
+
+    with TestRun.step("Fill cache with dirty data again"):
+        fill_dirty(core, read_write)
+        dirty = cache.get_dirty_blocks()
+
+    with TestRun.step("Purge cache"):
+        start_time = datetime.now()
+        cache.purge_cache()
+        purge_time = datetime.now() - start_time
+        TestRun.LOGGER.info(f"Purged {dirty} in {purge_time}")
+
+    perf_collector.insert_management_metric(
+        flush_time.total_seconds() * 1_000_000, ManagementMetric.FLUSH_TIME_US
+    )
+    perf_collector.insert_management_metric(
+        purge_time.total_seconds() * 1_000_000, ManagementMetric.PURGE_TIME_US
+    )
+    perf_collector.insert_management_metric(
+        int(flush_bw.get_value(Unit.KibiByte)), ManagementMetric.FLUSH_BW
+    )
+    perf_collector.insert_config_from_cache(cache)
+
+
+def fill_dirty(core, read_write):
+    (
+        Fio()
+        .create_command()
+        .io_engine(IoEngine.libaio)
+        .block_size(Size(64, Unit.KibiByte))
+        .read_write(read_write)
+        .io_depth(32)
+        .direct()
+        .target(core)
+        .size(core.size)
+        .run()
+    )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def disable_wbt_throttling():
+    try:
+        set_wbt_lat(TestRun.disks["cache"], 0)
+        set_wbt_lat(TestRun.disks["core"], 0)
+    except CmdException:
+        TestRun.LOGGER.warning("Couldn't disable write-back throttling for cache or core device")
@@ -0,0 +1,109 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import pytest
+
+from api.cas import casadm
+from api.cas.cache_config import CacheMode, CacheLineSize, CleaningPolicy, SeqCutOffPolicy
+from core.test_run import TestRun
+from storage_devices.disk import DiskType, DiskTypeSet, DiskTypeLowerThan
+from test_tools.fio.fio import Fio
+from test_tools.fio.fio_param import FioOutput, IoEngine, ReadWrite
+from test_tools.os_tools import set_wbt_lat, get_dut_cpu_physical_cores
+from test_tools.udev import Udev
+from connection.utils.output import CmdException
+from type_def.size import Size, Unit
+from utils.performance import WorkloadParameter
+
+cache_size = Size(16, Unit.GibiByte)
+# Whole core fits in cache, so each read is a miss inserted without eviction
+core_size = Size(8, Unit.GibiByte)
+numjobs = 4
+queue_depth = 32
+
+
+@pytest.mark.os_dependent
+@pytest.mark.performance()
+@pytest.mark.require_disk("cache", DiskTypeSet([DiskType.optane, DiskType.nand]))
+@pytest.mark.require_disk("core", DiskTypeLowerThan("cache"))
+@pytest.mark.parametrize("cache_mode", [CacheMode.WT, CacheMode.WB, CacheMode.WA])
+@pytest.mark.parametrize("read_write", [ReadWrite.read, ReadWrite.randread])
+@pytest.mark.parametrize("block_size", [Size(4, Unit.KibiByte), Size(64, Unit.KibiByte)])
+@pytest.mark.parametrize("cache_line_size", [CacheLineSize.LINE_4KiB, CacheLineSize.LINE_64KiB])
+def test_miss_insertion_throughput(
+    cache_mode, read_write, block_size, cache_line_size, perf_collector
+):
+    """
+    title: Cache miss insertion performance
+    description: |
+      Read whole core once through empty cache, so that each request is a miss inserted
+      into cache, and compare throughput with reading the core device directly.
+    pass_criteria:
+      - always passes
+    """
+
+    with TestRun.step("Prepare cache and core devices"):
+        cache_device = TestRun.disks["cache"]
+        cache_device.create_partitions([cache_size])
+        cache_device = cache_device.partitions[0]
+
+        core_device = TestRun.disks["core"]
+        core_device.create_partitions([core_size])
+        core_device = core_device.partitions[0]
+
+    fio_cfg = (
+        Fio()
+        .create_command(FioOutput.jsonplus)
+        .io_engine(IoEngine.libaio)
+        .block_size(block_size)
+        .read_write(read_write)
+        .io_depth(queue_depth)
+        .cpus_allowed(get_dut_cpu_physical_cores())
+        .direct()
+    )
+    offset = (core_size / numjobs).align_down(Unit.Blocks512.value)
+    for i in range(numjobs):
+        fio_cfg.add_job(f"job_{i+1}").offset(offset * i).size(offset)
+
+    with TestRun.step("Read core device directly"):
+        core_results = fio_cfg.target(core_device).run()[0]
+
+    with TestRun.step("Disable udev"):
+        Udev.disable()
+
+    with TestRun.step(f"Start cache in {cache_mode} mode"):
+        cache = casadm.start_cache(
+            cache_device, cache_mode=cache_mode, cache_line_size=cache_line_size, force=True
+        )
+        cache.set_seq_cutoff_policy(SeqCutOffPolicy.never)
+        cache.set_cleaning_policy(CleaningPolicy.nop)
+        core = cache.add_core(core_device)
+
+    with TestRun.step("Read exported object through empty cache"):
+        cache_results = fio_cfg.target(core).run()[0]
+
+    with TestRun.step("Check that all reads were inserted"):
+        stats = cache.get_statistics()
+        TestRun.LOGGER.info(
+            f"Read full misses: {stats.request_stats.read.full_misses}, "
+            f"read hits: {stats.request_stats.read.hits}, occupancy: {stats.usage_stats.occupancy}"
+        )
+
+    perf_collector.insert_workload_param(numjobs, WorkloadParameter.NUM_JOBS)
+    perf_collector.insert_workload_param(queue_depth, WorkloadParameter.QUEUE_DEPTH)
+    perf_collector.insert_workload_param(block_size.value, WorkloadParameter.BLOCK_SIZE)
+    perf_collector.insert_workload_param(read_write.name, WorkloadParameter.READ_WRITE)
+    perf_collector.insert_core_metrics_from_fio_job(core_results)
+    perf_collector.insert_exp_obj_metrics_from_fio_job(cache_results)
+    perf_collector.insert_config_from_cache(cache)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def disable_wbt_throttling():
+    try:
+        set_wbt_lat(TestRun.disks["cache"], 0)
+        set_wbt_lat(TestRun.disks["core"], 0)
+    except CmdException:
+        TestRun.LOGGER.warning("Couldn't disable write-back throttling for cache or core device")
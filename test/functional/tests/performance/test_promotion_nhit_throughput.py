@@ -0,0 +1,125 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+from datetime import timedelta
+
+import pytest
+
+from api.cas import casadm
+from api.cas.cache_config import (
+    CacheMode,
+    CacheLineSize,
+    CleaningPolicy,
+    PromotionParametersNhit,
+    PromotionPolicy,
+    SeqCutOffPolicy,
+)
+from core.test_run import TestRun
+from storage_devices.disk import DiskType, DiskTypeSet, DiskTypeLowerThan
+from test_tools.fio.fio import Fio
+from test_tools.fio.fio_param import FioOutput, IoEngine, ReadWrite
+from test_tools.os_tools import set_wbt_lat, get_dut_cpu_physical_cores
+from test_tools.udev import Udev
+from connection.utils.output import CmdException
+from type_def.size import Size, Unit
+from utils.performance import WorkloadParameter
+
+runtime = timedelta(minutes=5)
+cache_size = Size(8, Unit.GibiByte)
+# Working set twice as big as cache, so that promotion policy decides what stays in cache
+core_size = Size(16, Unit.GibiByte)
+numjobs = 4
+queue_depth = 32
+
+
+@pytest.mark.os_dependent
+@pytest.mark.performance()
+@pytest.mark.require_disk("cache", DiskTypeSet([DiskType.optane, DiskType.nand]))
+@pytest.mark.require_disk("core", DiskTypeLowerThan("cache"))
+@pytest.mark.parametrize(
+    "promotion_policy, nhit_threshold",
+    [(PromotionPolicy.always, None)] + [(PromotionPolicy.nhit, t) for t in [2, 3, 10]],
+)
+@pytest.mark.parametrize("read_write", [ReadWrite.randread, ReadWrite.randrw])
+def test_promotion_nhit_throughput(promotion_policy, nhit_threshold, read_write, perf_collector):
+    """
+    title: Promotion policy performance
+    description: |
+      Measure throughput of random workload with working set larger than cache for
+      "always" promotion policy and "nhit" policy with various thresholds.
+    pass_criteria:
+      - always passes
+    """
+
+    with TestRun.step("Prepare cache and core devices"):
+        cache_device = TestRun.disks["cache"]
+        cache_device.create_partitions([cache_size])
+        cache_device = cache_device.partitions[0]
+
+        core_device = TestRun.disks["core"]
+        core_device.create_partitions([core_size])
+        core_device = core_device.partitions[0]
+
+    with TestRun.step("Disable udev"):
+        Udev.disable()
+
+    with TestRun.step(f"Start cache with {promotion_policy} promotion policy"):
+        cache = casadm.start_cache(
+            cache_device,
+            cache_mode=CacheMode.WT,
+            cache_line_size=CacheLineSize.LINE_4KiB,
+            force=True,
+        )
+        cache.set_seq_cutoff_policy(SeqCutOffPolicy.never)
+        cache.set_cleaning_policy(CleaningPolicy.nop)
+        cache.set_promotion_policy(promotion_policy)
+        if nhit_threshold:
+            # Trigger 0% - nhit is in effect from the beginning, not only on full cache
+            cache.set_params_nhit(PromotionParametersNhit(threshold=nhit_threshold, trigger=0))
+        core = cache.add_core(core_device)
+
+    with TestRun.step("Run random workload on the exported object"):
+        cache_results = (
+            Fio()
+            .create_command(FioOutput.jsonplus)
+            .io_engine(IoEngine.libaio)
+            .block_size(Size(4, Unit.KiB))
+            .read_write(read_write)
+            .io_depth(queue_depth)
+            .num_jobs(numjobs)
+            .cpus_allowed(get_dut_cpu_physical_cores())
+            .direct()
+            .target(core)
+            .size(core.size)
+            .run_time(runtime)
+            .time_based()
+            .run()[0]
+        )
+
+    with TestRun.step("Log hit ratio"):
+        stats = cache.get_statistics(percentage_val=True)
+        TestRun.LOGGER.info(
+            f"Read hits: {stats.request_stats.read.hits}%, "
+            f"occupancy: {stats.usage_stats.occupancy}%"
+        )
+
+    perf_collector.insert_workload_param(numjobs, WorkloadParameter.NUM_JOBS)
+    perf_collector.insert_workload_param(queue_depth, WorkloadParameter.QUEUE_DEPTH)
+    perf_collector.insert_workload_param(read_write.name, WorkloadParameter.READ_WRITE)
+    perf_collector.insert_workload_param(
+        promotion_policy.value, WorkloadParameter.PROMOTION_POLICY
+    )
+    perf_collector.insert_workload_param(nhit_threshold or 0, WorkloadParameter.NHIT_THRESHOLD)
+    perf_collector.insert_exp_obj_metrics_from_fio_job(cache_results)
+    perf_collector.insert_config_from_cache(cache)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def disable_wbt_throttling():
+    try:
+        set_wbt_lat(TestRun.disks["cache"], 0)
+        set_wbt_lat(TestRun.disks["core"], 0)
+    except CmdException:
+        TestRun.LOGGER.warning("Couldn't disable write-back throttling for cache or core device")
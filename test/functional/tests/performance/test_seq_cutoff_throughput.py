@@ -0,0 +1,118 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+from datetime import timedelta
+
+import pytest
+
+from api.cas import casadm
+from api.cas.cache_config import CacheMode, CacheLineSize, CleaningPolicy, SeqCutOffPolicy
+from core.test_run import TestRun
+from storage_devices.disk import DiskType, DiskTypeSet, DiskTypeLowerThan
+from test_tools.fio.fio import Fio
+from test_tools.fio.fio_param import FioOutput, IoEngine, ReadWrite
+from test_tools.os_tools import set_wbt_lat, get_dut_cpu_physical_cores
+from test_tools.udev import Udev
+from connection.utils.output import CmdException
+from type_def.size import Size, Unit
+from utils.performance import WorkloadParameter
+
+runtime = timedelta(minutes=5)
+cache_size = Size(16, Unit.GibiByte)
+core_size = Size(64, Unit.GibiByte)
+block_size = Size(128, Unit.KibiByte)
+queue_depth = 16
+
+
+@pytest.mark.os_dependent
+@pytest.mark.performance()
+@pytest.mark.require_disk("cache", DiskTypeSet([DiskType.optane, DiskType.nand]))
+@pytest.mark.require_disk("core", DiskTypeLowerThan("cache"))
+@pytest.mark.parametrize(
+    "policy, threshold",
+    [(SeqCutOffPolicy.never, None)]
+    + [
+        (policy, Size(threshold, Unit.KibiByte))
+        for policy in [SeqCutOffPolicy.full, SeqCutOffPolicy.always]
+        for threshold in [64, 1024, 4096]
+    ],
+)
+@pytest.mark.parametrize("numjobs", [1, 8])
+@pytest.mark.parametrize("cache_mode", [CacheMode.WT, CacheMode.WB])
+def test_seq_cutoff_throughput(policy, threshold, numjobs, cache_mode, perf_collector):
+    """
+    title: Sequential cutoff performance
+    description: |
+      Measure throughput of sequential writes of multiple streams to the exported object
+      for sequential cutoff policies and thresholds.
+    pass_criteria:
+      - always passes
+    """
+
+    with TestRun.step("Prepare cache and core devices"):
+        cache_device = TestRun.disks["cache"]
+        cache_device.create_partitions([cache_size])
+        cache_device = cache_device.partitions[0]
+
+        core_device = TestRun.disks["core"]
+        core_device.create_partitions([core_size])
+        core_device = core_device.partitions[0]
+
+    with TestRun.step("Disable udev"):
+        Udev.disable()
+
+    with TestRun.step(f"Start cache in {cache_mode} mode and set sequential cutoff"):
+        cache = casadm.start_cache(
+            cache_device,
+            cache_mode=cache_mode,
+            cache_line_size=CacheLineSize.LINE_4KiB,
+            force=True,
+        )
+        cache.set_cleaning_policy(CleaningPolicy.nop)
+        core = cache.add_core(core_device)
+        core.set_seq_cutoff_policy(policy)
+        if threshold:
+            core.set_seq_cutoff_threshold(threshold)
+
+    with TestRun.step("Run sequential writes on the exported object"):
+        fio_cfg = (
+            Fio()
+            .create_command(FioOutput.jsonplus)
+            .io_engine(IoEngine.libaio)
+            .block_size(block_size)
+            .read_write(ReadWrite.write)
+            .io_depth(queue_depth)
+            .cpus_allowed(get_dut_cpu_physical_cores())
+            .direct()
+            .target(core)
+            .run_time(runtime)
+            .time_based()
+        )
+        # Each job writes its own sequential stream
+        offset = (core.size / numjobs).align_down(Unit.Blocks512.value)
+        for i in range(numjobs):
+            fio_cfg.add_job(f"job_{i+1}").offset(offset * i).size(offset)
+        cache_results = fio_cfg.run()[0]
+
+    perf_collector.insert_workload_param(numjobs, WorkloadParameter.NUM_JOBS)
+    perf_collector.insert_workload_param(queue_depth, WorkloadParameter.QUEUE_DEPTH)
+    perf_collector.insert_workload_param(block_size.value, WorkloadParameter.BLOCK_SIZE)
+    perf_collector.insert_workload_param(ReadWrite.write.name, WorkloadParameter.READ_WRITE)
+    perf_collector.insert_workload_param(policy.value, WorkloadParameter.SEQ_CUTOFF_POLICY)
+    perf_collector.insert_workload_param(
+        int(threshold.get_value(Unit.KibiByte)) if threshold else 0,
+        WorkloadParameter.SEQ_CUTOFF_THRESHOLD,
+    )
+    perf_collector.insert_exp_obj_metrics_from_fio_job(cache_results)
+    perf_collector.insert_config_from_cache(cache)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def disable_wbt_throttling():
+    try:
+        set_wbt_lat(TestRun.disks["cache"], 0)
+        set_wbt_lat(TestRun.disks["core"], 0)
+    except CmdException:
+        TestRun.LOGGER.warning("Couldn't disable write-back throttling for cache or core device")
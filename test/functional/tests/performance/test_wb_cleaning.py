@@ -0,0 +1,135 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from api.cas import casadm
+from api.cas.cache_config import (
+    CacheMode,
+    CacheLineSize,
+    CleaningPolicy,
+    FlushParametersAlru,
+    SeqCutOffPolicy,
+)
+from api.cas.casadm_params import StatsFilter
+from api.cas.statistics import StatsSampler
+from core.test_run import TestRun
+from storage_devices.disk import DiskType, DiskTypeSet, DiskTypeLowerThan
+from test_tools.fio.fio import Fio
+from test_tools.fio.fio_param import FioOutput, IoEngine, ReadWrite
+from test_tools.os_tools import set_wbt_lat, get_dut_cpu_physical_cores
+from test_tools.udev import Udev
+from connection.utils.output import CmdException
+from type_def.size import Size, Unit
+from type_def.time import Time
+from utils.performance import WorkloadParameter, ManagementMetric
+
+runtime = timedelta(minutes=10)
+cache_size = Size(16, Unit.GibiByte)
+# Working set larger than cache, so that sustained writes need cleaning to make room
+core_size = Size(48, Unit.GibiByte)
+numjobs = 4
+queue_depth = 32
+
+
+@pytest.mark.os_dependent
+@pytest.mark.performance()
+@pytest.mark.require_disk("cache", DiskTypeSet([DiskType.optane, DiskType.nand]))
+@pytest.mark.require_disk("core", DiskTypeLowerThan("cache"))
+@pytest.mark.parametrize(
+    "cleaning_policy", [CleaningPolicy.alru, CleaningPolicy.acp, CleaningPolicy.nop]
+)
+@pytest.mark.parametrize("cache_line_size", [CacheLineSize.LINE_4KiB, CacheLineSize.LINE_64KiB])
+def test_wb_cleaning_sustained_writes(cleaning_policy, cache_line_size, perf_collector):
+    """
+    title: Write-back performance with cleaning under sustained writes
+    description: |
+      Run sustained random writes, with working set larger than cache, on write-back cache
+      with each cleaning policy and measure exported object throughput together with
+      throughput of cleaning (data written to core).
+    pass_criteria:
+      - always passes
+    """
+
+    with TestRun.step("Prepare cache and core devices"):
+        cache_device = TestRun.disks["cache"]
+        cache_device.create_partitions([cache_size])
+        cache_device = cache_device.partitions[0]
+
+        core_device = TestRun.disks["core"]
+        core_device.create_partitions([core_size])
+        core_device = core_device.partitions[0]
+
+    with TestRun.step("Disable udev"):
+        Udev.disable()
+
+    with TestRun.step(f"Start cache in WB mode with {cleaning_policy} cleaning policy"):
+        cache = casadm.start_cache(
+            cache_device, cache_mode=CacheMode.WB, cache_line_size=cache_line_size, force=True
+        )
+        cache.set_seq_cutoff_policy(SeqCutOffPolicy.never)
+        cache.set_cleaning_policy(cleaning_policy)
+        if cleaning_policy == CleaningPolicy.alru:
+            # Default activity threshold would stop ALRU from cleaning during sustained I/O
+            cache.set_params_alru(
+                FlushParametersAlru(
+                    activity_threshold=Time(milliseconds=0),
+                    wake_up_time=Time(seconds=0),
+                    staleness_time=Time(seconds=1),
+                )
+            )
+        core = cache.add_core(core_device)
+
+    with TestRun.step("Run sustained random writes and sample cache statistics"):
+        fio_cfg = (
+            Fio()
+            .create_command(FioOutput.jsonplus)
+            .io_engine(IoEngine.libaio)
+            .block_size(Size(4, Unit.KiB))
+            .read_write(ReadWrite.randwrite)
+            .io_depth(queue_depth)
+            .num_jobs(numjobs)
+            .cpus_allowed(get_dut_cpu_physical_cores())
+            .direct()
+            .target(core)
+            .size(core.size)
+            .run_time(runtime)
+            .time_based()
+        )
+        with StatsSampler(
+            cache_id=cache.cache_id,
+            interval=timedelta(seconds=10),
+            filter=[StatsFilter.usage, StatsFilter.blk],
+        ) as sampler:
+            cache_results = fio_cfg.run()[0]
+
+    with TestRun.step("Compute cleaning throughput"):
+        rates = sampler.rates()
+        cleaner_throughput = Size(float(np.nanmean(rates["cleaner_throughput"])), Unit.Byte)
+        dirty_growth = Size(float(np.nanmean(rates["dirty_growth"])), Unit.Byte)
+        TestRun.LOGGER.info(
+            f"Cleaning throughput: {cleaner_throughput}/s, dirty growth: {dirty_growth}/s"
+        )
+
+    perf_collector.insert_workload_param(numjobs, WorkloadParameter.NUM_JOBS)
+    perf_collector.insert_workload_param(queue_depth, WorkloadParameter.QUEUE_DEPTH)
+    perf_collector.insert_workload_param(ReadWrite.randwrite.name, WorkloadParameter.READ_WRITE)
+    perf_collector.insert_exp_obj_metrics_from_fio_job(cache_results)
+    perf_collector.insert_management_metric(
+        int(cleaner_throughput.get_value(Unit.KibiByte)), ManagementMetric.CLEANING_BW
+    )
+    perf_collector.insert_config_from_cache(cache)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def disable_wbt_throttling():
+    try:
+        set_wbt_lat(TestRun.disks["cache"], 0)
+        set_wbt_lat(TestRun.disks["core"], 0)
+    except CmdException:
+        TestRun.LOGGER.warning("Couldn't disable write-back throttling for cache or core device")
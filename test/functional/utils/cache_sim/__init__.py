@@ -0,0 +1,16 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+"""
+Trace driven cache simulator estimating hit ratio, dirty data footprint and backend write
+amplification for combinations of cache mode, cache line size, promotion policy, sequential
+cutoff and IO classes, before choosing casadm parameters for deployment:
+
+    python3 -m utils.cache_sim trace.txt --cache-size 400GiB --cache-mode wt wb \
+        --cache-line-size 4 64 --promotion always nhit:3:80 --seq-cutoff full:1024 never
+
+Configurations use enums from api.cas.cache_config, so results map directly to casadm
+parameters. Traces are read with utils.ioclass_eval readers.
+"""
@@ -0,0 +1,128 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../test-framework"))
+
+from api.cas.cache_config import (  # noqa: E402
+    CacheLineSize,
+    CacheMode,
+    CleaningPolicy,
+    PromotionParametersNhit,
+    PromotionPolicy,
+    SeqCutOffParameters,
+    SeqCutOffPolicy,
+)
+from type_def.size import Size, Unit  # noqa: E402
+from utils.cache_sim.grid import TraceSpec, config_grid, simulate_grid  # noqa: E402
+from utils.ioclass_eval.config import IoClassConfig, IoClassConfigError  # noqa: E402
+from utils.perf_db import parse_size  # noqa: E402
+
+
+def parse_enum(enum):
+    def parse(value: str):
+        try:
+            return next(e for e in enum if e.name.lower() == value.lower())
+        except StopIteration:
+            raise argparse.ArgumentTypeError(f"Invalid {enum.__name__}: {value}")
+    return parse
+
+
+def parse_cache_line_size(value: str) -> CacheLineSize:
+    try:
+        return CacheLineSize[f"LINE_{int(value)}KiB"]
+    except (KeyError, ValueError):
+        raise argparse.ArgumentTypeError(f"Invalid cache line size: {value}")
+
+
+def parse_promotion(value: str) -> tuple:
+    """Parse "always" or "nhit[:THRESHOLD[:TRIGGER]]" """
+    policy, *params = value.split(":")
+    try:
+        policy = PromotionPolicy(policy)
+        if len(params) > 2 or (params and policy != PromotionPolicy.nhit):
+            raise ValueError
+        params = [int(p) for p in params] + [None] * (2 - len(params))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid promotion policy: {value}")
+    return policy, PromotionParametersNhit(*params)
+
+
+def parse_seq_cutoff(value: str) -> SeqCutOffParameters:
+    """Parse "POLICY[:THRESHOLD_KIB]" """
+    policy, _, threshold = value.partition(":")
+    try:
+        return SeqCutOffParameters(
+            SeqCutOffPolicy(policy),
+            Size(int(threshold), Unit.KibiByte) if threshold else None,
+        )
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid sequential cutoff: {value}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cache_sim", description="Simulate cache on I/O trace")
+    parser.add_argument("trace", help="blkparse text output or fio iolog")
+    parser.add_argument("--format", choices=["blkparse", "fio"], default="blkparse")
+    parser.add_argument("--files", help="file metadata CSV (path,size[,type])")
+    parser.add_argument("--extents", help="file extents CSV (path,lba,sectors,file_offset)")
+    parser.add_argument("--cache-size", type=parse_size, required=True,
+                        help="cache size, e.g. 400GiB")
+    parser.add_argument("--cache-mode", type=parse_enum(CacheMode), nargs="+",
+                        default=[CacheMode.DEFAULT])
+    parser.add_argument("--cache-line-size", type=parse_cache_line_size, nargs="+",
+                        default=[CacheLineSize.DEFAULT], help="cache line sizes in KiB")
+    parser.add_argument("--promotion", type=parse_promotion, nargs="+",
+                        default=[(PromotionPolicy.DEFAULT, None)],
+                        help="always or nhit[:THRESHOLD[:TRIGGER]]")
+    parser.add_argument("--seq-cutoff", type=parse_seq_cutoff, nargs="+", default=[None],
+                        help="POLICY[:THRESHOLD_KIB], e.g. full:1024 or never")
+    parser.add_argument("--cleaning-policy", type=parse_enum(CleaningPolicy), nargs="+",
+                        default=[CleaningPolicy.DEFAULT])
+    parser.add_argument("--io-class-config", help="IO class configuration CSV file")
+    parser.add_argument("--processes", type=int, help="parallel simulations (default: CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        io_classes = IoClassConfig.from_csv(args.io_class_config) \
+            if args.io_class_config else None
+    except IoClassConfigError as e:
+        print(f"Invalid IO class configuration: {e}", file=sys.stderr)
+        return 1
+
+    configs = config_grid(
+        Size(args.cache_size, Unit.MebiByte),
+        args.cache_mode,
+        args.cache_line_size,
+        args.promotion,
+        args.seq_cutoff,
+        args.cleaning_policy,
+        io_classes,
+    )
+    trace = TraceSpec(args.trace, args.format, args.files, args.extents,
+                      chunk_size=args.chunk_size)
+    results = simulate_grid(configs, trace, args.processes)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    for config, result in zip(configs, results):
+        print(
+            f"{config}: hit ratio {result['hit_ratio']:.2%} "
+            f"(sectors {result['sector_hit_ratio']:.2%}), "
+            f"dirty {result['dirty_bytes']} (peak {result['peak_dirty_bytes']}), "
+            f"write amplification {result['write_amplification']:.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
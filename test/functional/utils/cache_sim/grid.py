@@ -0,0 +1,81 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+"""
+Replay of one trace for a grid of cache configurations, one configuration per process.
+Each process streams the trace on its own, so memory use doesn't grow with trace length.
+"""
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from api.cas.cache_config import (
+    CacheLineSize,
+    CacheMode,
+    CleaningPolicy,
+    PromotionPolicy,
+)
+from type_def.size import Size
+from utils.cache_sim.simulator import CacheSimulator, SimConfig
+from utils.ioclass_eval.config import IoClassConfig
+from utils.ioclass_eval.evaluator import IoClassEvaluator
+from utils.ioclass_eval.trace import BlkparseReader, ExtentMap, FileTable, FioIologReader
+
+
+class TraceSpec:
+    """Picklable description of trace to be opened in worker process"""
+
+    def __init__(self, path: str, trace_format: str = "blkparse", files: str = None,
+                 extents: str = None, **reader_args):
+        if trace_format not in ["blkparse", "fio"]:
+            raise ValueError(f"Unsupported trace format {trace_format}")
+        self.path = path
+        self.format = trace_format
+        self.files = files
+        self.extents = extents
+        self.reader_args = reader_args
+
+    def open(self):
+        files = FileTable.from_csv(self.files) if self.files else FileTable()
+        extents = ExtentMap.from_csv(self.extents, files) if self.extents else None
+        reader = BlkparseReader if self.format == "blkparse" else FioIologReader
+        return reader(self.path, files, extents, **self.reader_args)
+
+
+def config_grid(
+    cache_size: Size,
+    cache_modes: list = (CacheMode.DEFAULT,),
+    cache_line_sizes: list = (CacheLineSize.DEFAULT,),
+    promotions: list = ((PromotionPolicy.DEFAULT, None),),
+    seq_cutoffs: list = (None,),
+    cleaning_policies: list = (CleaningPolicy.DEFAULT,),
+    io_classes: IoClassConfig = None,
+) -> list:
+    """
+    Cartesian product of parameters. Promotions are (PromotionPolicy, PromotionParametersNhit)
+    pairs and sequential cutoffs are SeqCutOffParameters (None - default parameters).
+    """
+    return [
+        SimConfig(cache_size, cache_mode, cache_line_size, promotion_policy, promotion_nhit,
+                  seq_cutoff, cleaning_policy, io_classes)
+        for cache_mode, cache_line_size, (promotion_policy, promotion_nhit), seq_cutoff,
+        cleaning_policy in itertools.product(
+            cache_modes, cache_line_sizes, promotions, seq_cutoffs, cleaning_policies
+        )
+    ]
+
+
+def simulate(config: SimConfig, trace: TraceSpec) -> dict:
+    simulator = CacheSimulator(config)
+    evaluator = IoClassEvaluator(config.io_classes) if config.io_classes else None
+    for batch in trace.open():
+        simulator.replay(batch, evaluator.classify(batch) if evaluator else None)
+    return {**config.to_dict(), **simulator.result()}
+
+
+def simulate_grid(configs: list, trace: TraceSpec, processes: int = None) -> list:
+    """Get simulation results of all configurations, in order of configurations"""
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(simulate, configs, itertools.repeat(trace)))
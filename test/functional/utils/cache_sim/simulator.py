@@ -0,0 +1,372 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+"""
+Trace driven model of OCF cache behaviour. Each IO class (partition) keeps separate clean
+and dirty LRU lists, lines are allocated from free space, from partitions exceeding their
+allocation and then from the lowest priority partitions. Clean lines are evicted first, dirty
+ones are written back on eviction (with NOP cleaning policy synchronously, in the request path).
+Lines keep valid and dirty sector masks, so partial hits and write-back volume are exact
+for sector granularity.
+
+Not modelled: timing (ALRU/ACP wake-ups are approximated by cleaning LRU dirty lines on
+eviction), per-CPU sequential cutoff streams (promotion_count), and per IO class cache mode.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from api.cas.cache_config import (
+    CacheLineSize,
+    CacheMode,
+    CacheModeTrait,
+    CleaningPolicy,
+    PromotionParametersNhit,
+    PromotionPolicy,
+    SeqCutOffParameters,
+    SeqCutOffPolicy,
+)
+from type_def.size import Size, Unit
+from utils.ioclass_eval.config import IoClassConfig
+from utils.ioclass_eval.trace import SECTOR_SIZE, TraceBatch
+
+# Sequential cutoff streams tracked per core and direction (OCF_SEQ_CUTOFF_MAX_STREAMS)
+MAX_SEQ_CUTOFF_STREAMS = 128
+DEFAULT_IO_CLASS_PRIORITY = 255
+
+
+class SimConfig:
+    def __init__(
+        self,
+        cache_size: Size,
+        cache_mode: CacheMode = CacheMode.DEFAULT,
+        cache_line_size: CacheLineSize = CacheLineSize.DEFAULT,
+        promotion_policy: PromotionPolicy = PromotionPolicy.DEFAULT,
+        promotion_nhit: PromotionParametersNhit = None,
+        seq_cutoff: SeqCutOffParameters = None,
+        cleaning_policy: CleaningPolicy = CleaningPolicy.DEFAULT,
+        io_classes: IoClassConfig = None,
+    ):
+        default_nhit = PromotionParametersNhit.default_nhit_params()
+        default_seq_cutoff = SeqCutOffParameters.default_seq_cut_off_params()
+        promotion_nhit = promotion_nhit or default_nhit
+        seq_cutoff = seq_cutoff or default_seq_cutoff
+
+        self.cache_size = cache_size
+        self.cache_mode = cache_mode
+        self.cache_line_size = cache_line_size
+        self.promotion_policy = promotion_policy
+        self.promotion_nhit = PromotionParametersNhit(
+            promotion_nhit.threshold or default_nhit.threshold,
+            promotion_nhit.trigger if promotion_nhit.trigger is not None
+            else default_nhit.trigger,
+        )
+        self.seq_cutoff = SeqCutOffParameters(
+            seq_cutoff.policy or default_seq_cutoff.policy,
+            seq_cutoff.threshold or default_seq_cutoff.threshold,
+            seq_cutoff.promotion_count or default_seq_cutoff.promotion_count,
+        )
+        self.cleaning_policy = cleaning_policy
+        self.io_classes = io_classes
+
+    def to_dict(self) -> dict:
+        """Parameters named after casadm options"""
+        params = {
+            "cache_size_mib": int(self.cache_size.get_value(Unit.MebiByte)),
+            "cache_mode": self.cache_mode.name.lower(),
+            "cache_line_size_kib": int(self.cache_line_size.value.get_value(Unit.KibiByte)),
+            "promotion_policy": self.promotion_policy.value,
+            "seq_cutoff_policy": self.seq_cutoff.policy.value,
+            "seq_cutoff_threshold_kib": int(self.seq_cutoff.threshold.get_value(Unit.KibiByte)),
+            "cleaning_policy": self.cleaning_policy.name,
+        }
+        if self.promotion_policy == PromotionPolicy.nhit:
+            params["nhit_threshold"] = self.promotion_nhit.threshold
+            params["nhit_trigger"] = self.promotion_nhit.trigger
+        return params
+
+    def __str__(self):
+        return " ".join(f"{name}={value}" for name, value in self.to_dict().items())
+
+
+class Partition:
+    def __init__(self, class_id: int, priority: int | None, max_lines: int):
+        self.id = class_id
+        # None - pinned, never evicted by other partitions
+        self.priority = priority
+        self.max_lines = max_lines
+        # line key -> valid sectors mask
+        self.clean = OrderedDict()
+        # line key -> (valid sectors mask, dirty sectors mask)
+        self.dirty = OrderedDict()
+
+    def __len__(self):
+        return len(self.clean) + len(self.dirty)
+
+
+class CacheSimulator:
+    def __init__(self, config: SimConfig):
+        self.config = config
+        self.traits = CacheMode.get_traits(config.cache_mode)
+        self.line_size = int(config.cache_line_size)
+        self.line_sectors = self.line_size // SECTOR_SIZE
+        self.capacity = int(config.cache_size.get_value(Unit.Byte)) // self.line_size
+        self.seq_cutoff_threshold = int(config.seq_cutoff.threshold.get_value(Unit.Byte))
+
+        io_classes = config.io_classes.io_classes if config.io_classes else []
+        self.partitions = {
+            io_class.id: Partition(io_class.id, io_class.priority,
+                                   int(io_class.allocation * self.capacity))
+            for io_class in io_classes
+        }
+        self.partitions.setdefault(0, Partition(0, DEFAULT_IO_CLASS_PRIORITY, self.capacity))
+
+        # line key -> id of partition the line belongs to
+        self.mapping = {}
+        # core line key -> nhit access counter, bounded by number of cache lines
+        self.nhit_counters = OrderedDict()
+        # (core, write) -> stream end sector -> stream length in bytes
+        self.streams = {}
+
+        self.stats = {
+            "reads": 0,
+            "writes": 0,
+            "read_hits": 0,
+            "read_partial_misses": 0,
+            "read_misses": 0,
+            "pass_through_reads": 0,
+            "pass_through_writes": 0,
+            "read_sectors": 0,
+            "read_hit_sectors": 0,
+            "host_write_bytes": 0,
+            "backend_write_bytes": 0,
+            "writeback_bytes": 0,
+            # Part of writeback_bytes written back in the request path
+            "sync_writeback_bytes": 0,
+            "evictions": 0,
+        }
+        self.dirty_sectors = 0
+        self.peak_dirty_sectors = 0
+
+    def replay(self, batch: TraceBatch, io_class: np.ndarray = None):
+        """Replay batch of trace records classified into given IO classes (default: 0)"""
+        if io_class is None:
+            io_class = np.zeros(len(batch), dtype=np.uint8)
+
+        # Records addressed by file offset only get address space of their file
+        use_lba = batch.lba_valid
+        selected = (use_lba | (batch.file >= 0)) & (batch.size > 0)
+        core = np.where(use_lba, np.maximum(batch.core_id, 0), -1 - batch.file)[selected]
+        start = np.where(use_lba, batch.lba, batch.file_offset // np.uint64(SECTOR_SIZE))[selected]
+        end = np.where(
+            use_lba,
+            batch.lba * np.uint64(SECTOR_SIZE) + batch.size,
+            batch.file_offset + batch.size,
+        )[selected]
+        sectors = (end + np.uint64(SECTOR_SIZE - 1)) // np.uint64(SECTOR_SIZE) - start
+        write = batch.write[selected]
+        size = batch.size[selected]
+        io_class = io_class[selected]
+
+        for args in zip(core.tolist(), start.tolist(), sectors.tolist(), write.tolist(),
+                        size.tolist(), io_class.tolist()):
+            self.request(*args)
+
+    def request(self, core: int, start: int, sectors: int, write: bool, size: int,
+                class_id: int):
+        if class_id not in self.partitions:
+            class_id = 0
+        lines = self.__split(core, start, sectors)
+
+        if write:
+            self.stats["writes"] += 1
+            self.stats["host_write_bytes"] += size
+        else:
+            self.stats["reads"] += 1
+            self.stats["read_sectors"] += sectors
+
+        if not self.traits or self.__seq_cutoff(core, start, sectors, write):
+            self.__pass_through(lines, write, size)
+        elif write:
+            self.__write(lines, class_id, size)
+        else:
+            self.__read(lines, class_id)
+
+        self.peak_dirty_sectors = max(self.peak_dirty_sectors, self.dirty_sectors)
+
+    def __split(self, core: int, start: int, sectors: int) -> list:
+        """Split request into (line key, sectors mask) pairs"""
+        lines = []
+        end = start + sectors
+        for line in range(start // self.line_sectors, (end - 1) // self.line_sectors + 1):
+            first = max(start, line * self.line_sectors) - line * self.line_sectors
+            last = min(end, (line + 1) * self.line_sectors) - line * self.line_sectors
+            lines.append(((core, line), ((1 << (last - first)) - 1) << first))
+        return lines
+
+    def __seq_cutoff(self, core: int, start: int, sectors: int, write: bool) -> bool:
+        streams = self.streams.setdefault((core, write), OrderedDict())
+        length = streams.pop(start, 0) + sectors * SECTOR_SIZE
+        streams[start + sectors] = length
+        if len(streams) > MAX_SEQ_CUTOFF_STREAMS:
+            streams.popitem(last=False)
+
+        match self.config.seq_cutoff.policy:
+            case SeqCutOffPolicy.never:
+                return False
+            case SeqCutOffPolicy.full if len(self.mapping) < self.capacity:
+                return False
+        return length >= self.seq_cutoff_threshold
+
+    def __promote(self, lines: list) -> bool:
+        if self.config.promotion_policy != PromotionPolicy.nhit:
+            return True
+        promote = True
+        for key, _ in lines:
+            count = self.nhit_counters.pop(key, 0) + 1
+            self.nhit_counters[key] = count
+            if key not in self.mapping and count < self.config.promotion_nhit.threshold:
+                promote = False
+        while len(self.nhit_counters) > self.capacity:
+            self.nhit_counters.popitem(last=False)
+        # nhit is in effect only after cache occupancy reaches trigger threshold
+        if len(self.mapping) * 100 < self.capacity * self.config.promotion_nhit.trigger:
+            return True
+        return promote
+
+    def __lookup(self, key) -> tuple:
+        partition = self.partitions[self.mapping[key]]
+        if key in partition.clean:
+            return partition.clean[key], 0
+        return partition.dirty[key]
+
+    def __remove(self, key) -> tuple:
+        partition = self.partitions[self.mapping.pop(key)]
+        if key in partition.clean:
+            return partition.clean.pop(key), 0
+        valid, dirty = partition.dirty.pop(key)
+        self.dirty_sectors -= dirty.bit_count()
+        return valid, dirty
+
+    def __store(self, key, class_id: int, valid: int, dirty: int):
+        """Set line state and move it to MRU position of the partition of request"""
+        if key in self.mapping:
+            old_valid, old_dirty = self.__remove(key)
+            valid |= old_valid
+            dirty |= old_dirty
+        self.mapping[key] = class_id
+        if dirty:
+            self.partitions[class_id].dirty[key] = (valid, dirty)
+            self.dirty_sectors += dirty.bit_count()
+        else:
+            self.partitions[class_id].clean[key] = valid
+
+    def __evict(self, partition: Partition) -> bool:
+        if partition.clean:
+            key = next(iter(partition.clean))
+        elif partition.dirty:
+            key = next(iter(partition.dirty))
+        else:
+            return False
+        _, dirty = self.__remove(key)
+        writeback = dirty.bit_count() * SECTOR_SIZE
+        self.stats["writeback_bytes"] += writeback
+        if self.config.cleaning_policy == CleaningPolicy.nop:
+            # No cleaner ran before, so request waits for dirty line to be flushed
+            self.stats["sync_writeback_bytes"] += writeback
+        self.stats["backend_write_bytes"] += writeback
+        self.stats["evictions"] += 1
+        return True
+
+    def __allocate(self, class_id: int) -> bool:
+        partition = self.partitions[class_id]
+        if len(partition) >= partition.max_lines:
+            return self.__evict(partition)
+        if len(self.mapping) < self.capacity:
+            return True
+
+        overflown = [p for p in self.partitions.values() if len(p) > p.max_lines]
+        by_priority = sorted(
+            (p for p in self.partitions.values() if p.priority is not None and len(p)),
+            key=lambda p: -p.priority,
+        )
+        return any(self.__evict(victim) for victim in overflown + by_priority)
+
+    def __read(self, lines: list, class_id: int):
+        missing = 0
+        for key, mask in lines:
+            if key not in self.mapping:
+                missing += mask.bit_count()
+            else:
+                missing += (mask & ~self.__lookup(key)[0]).bit_count()
+        hit_sectors = sum(mask.bit_count() for _, mask in lines) - missing
+        self.stats["read_hit_sectors"] += hit_sectors
+
+        if not missing:
+            self.stats["read_hits"] += 1
+        elif hit_sectors:
+            self.stats["read_partial_misses"] += 1
+        else:
+            self.stats["read_misses"] += 1
+
+        # Missing sectors of mapped lines are filled regardless of promotion policy
+        fill = CacheModeTrait.InsertRead in self.traits
+        insert = missing and fill and self.__promote(lines)
+        for key, mask in lines:
+            if key in self.mapping:
+                self.__store(key, class_id, mask if fill else 0, 0)
+            elif insert and self.__allocate(class_id):
+                self.__store(key, class_id, mask, 0)
+
+    def __write(self, lines: list, class_id: int, size: int):
+        lazy = CacheModeTrait.LazyWrites in self.traits
+        insert = CacheModeTrait.InsertWrite in self.traits and self.__promote(lines)
+        core_sectors = 0
+        for key, mask in lines:
+            if key in self.mapping or (insert and self.__allocate(class_id)):
+                self.__store(key, class_id, mask, mask if lazy else 0)
+                if lazy:
+                    continue
+            core_sectors += mask.bit_count()
+        if core_sectors:
+            self.stats["backend_write_bytes"] += min(core_sectors * SECTOR_SIZE, size)
+
+    def __pass_through(self, lines: list, write: bool, size: int):
+        if not write:
+            self.stats["pass_through_reads"] += 1
+            return
+        self.stats["pass_through_writes"] += 1
+        self.stats["backend_write_bytes"] += size
+        # Written sectors are invalidated in cache, including their dirty data
+        for key, mask in lines:
+            if key not in self.mapping:
+                continue
+            class_id = self.mapping[key]
+            valid, dirty = self.__remove(key)
+            valid &= ~mask
+            dirty &= ~mask
+            if valid:
+                self.__store(key, class_id, valid, dirty)
+
+    def result(self) -> dict:
+        stats = dict(self.stats)
+        dirty_bytes = self.dirty_sectors * SECTOR_SIZE
+        stats.update(
+            hit_ratio=stats["read_hits"] / stats["reads"] if stats["reads"] else 0.0,
+            sector_hit_ratio=stats["read_hit_sectors"] / stats["read_sectors"]
+            if stats["read_sectors"] else 0.0,
+            dirty_bytes=dirty_bytes,
+            peak_dirty_bytes=self.peak_dirty_sectors * SECTOR_SIZE,
+            occupancy_bytes=len(self.mapping) * self.line_size,
+            # Dirty data left in cache is eventually written to core as well
+            write_amplification=(stats["backend_write_bytes"] + dirty_bytes)
+            / stats["host_write_bytes"] if stats["host_write_bytes"] else 0.0,
+        )
+        stats["occupancy_by_io_class"] = {
+            class_id: len(partition) * self.line_size
+            for class_id, partition in sorted(self.partitions.items()) if len(partition)
+        }
+        return stats
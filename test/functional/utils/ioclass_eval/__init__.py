@@ -0,0 +1,36 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+"""
+Offline IO class configuration evaluator. Classifies I/O from block traces or fio iologs
+with the ioclass CSV grammar of casadm and the kernel classifier, and reports per class I/O
+share and expected cache occupancy:
+
+    python3 -m utils.ioclass_eval ioclass-config.csv trace.txt --format blkparse \
+        --files files.csv --extents extents.csv --cache-size 400GiB
+
+It can also be used by io_class tests as an oracle of expected classification:
+
+    config = IoClassConfig.from_io_classes(IoClass.csv_to_list(csv))
+    io_class = IoClassEvaluator(config).classify(batch)
+"""
+
+from utils.ioclass_eval.config import (
+    Condition,
+    IoClassConfig,
+    IoClassConfigError,
+    IoClassRule,
+    parse_rule,
+)
+from utils.ioclass_eval.evaluator import IoClassEvaluator, IoClassReport
+from utils.ioclass_eval.trace import (
+    BlkparseReader,
+    ExtentMap,
+    FileInfo,
+    FileTable,
+    FioIologReader,
+    NameTable,
+    TraceBatch,
+)
@@ -0,0 +1,84 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import argparse
+import json
+import sys
+
+from utils.ioclass_eval.config import IoClassConfig, IoClassConfigError
+from utils.ioclass_eval.evaluator import IoClassEvaluator, IoClassReport
+from utils.ioclass_eval.trace import BlkparseReader, ExtentMap, FileTable, FioIologReader
+from utils.perf_db import parse_size
+
+MiB = 1024 * 1024
+
+
+def parse_core_device(value: str) -> tuple:
+    """Parse "MAJOR:MINOR=CORE_ID" mapping of traced device to core id"""
+    try:
+        device, core_id = value.split("=")
+        major, minor = device.split(":")
+        return (int(major), int(minor)), int(core_id)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid core device mapping: {value}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ioclass_eval", description="Evaluate IO class configuration against I/O trace"
+    )
+    parser.add_argument("config", help="IO class configuration CSV file")
+    parser.add_argument("trace", help="blkparse text output or fio iolog")
+    parser.add_argument("--format", choices=["blkparse", "fio"], default="blkparse")
+    parser.add_argument("--files", help="file metadata CSV (path,size[,type])")
+    parser.add_argument("--extents", help="file extents CSV (path,lba,sectors,file_offset)")
+    parser.add_argument("--cache-size", type=parse_size, help="cache size, e.g. 400GiB")
+    parser.add_argument("--cache-line-size", type=int, default=4, choices=[4, 8, 16, 32, 64],
+                        help="cache line size in KiB (default: 4)")
+    parser.add_argument("--chunk-size", type=int, default=65536,
+                        help="trace records processed in one batch (default: 65536)")
+    parser.add_argument("--no-wlth", action="store_true",
+                        help="reject wlth condition, as kernels without write hints do")
+    parser.add_argument("--direct", action="store_true", help="treat all I/O as direct I/O")
+    parser.add_argument("--actions", default="Q",
+                        help="blkparse actions counted as I/O (default: Q)")
+    parser.add_argument("--core-device", type=parse_core_device, action="append", default=[],
+                        help="core id of traced device, e.g. 8:16=1 (blkparse)")
+    parser.add_argument("--pid", type=int, default=0, help="process id of I/O (fio)")
+    parser.add_argument("--process-name", help="process name of I/O (fio)")
+    parser.add_argument("--core-id", type=int, default=-1, help="core id of I/O (fio)")
+    parser.add_argument("--json", action="store_true", help="print report as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        config = IoClassConfig.from_csv(args.config, wlth_support=not args.no_wlth)
+    except IoClassConfigError as e:
+        print(f"Invalid IO class configuration: {e}", file=sys.stderr)
+        return 1
+
+    files = FileTable.from_csv(args.files) if args.files else FileTable()
+    extents = ExtentMap.from_csv(args.extents, files) if args.extents else None
+    if args.format == "blkparse":
+        reader = BlkparseReader(args.trace, files, extents, args.chunk_size, args.actions,
+                                dict(args.core_device), args.direct)
+    else:
+        reader = FioIologReader(args.trace, files, extents, args.chunk_size, args.pid,
+                                args.process_name, args.core_id, args.direct)
+
+    evaluator = IoClassEvaluator(config)
+    report = IoClassReport(
+        config,
+        args.cache_line_size * 1024,
+        int(args.cache_size * MiB) if args.cache_size else None,
+    )
+    for batch in reader:
+        report.add(batch, evaluator.classify(batch))
+
+    print(json.dumps(report.rows(), indent=2) if args.json else report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
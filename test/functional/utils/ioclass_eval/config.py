@@ -0,0 +1,297 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+"""
+IO class configuration parser following casadm (cas_lib.c: partition_get_config) for CSV
+layout and the kernel classifier (classifier.c: _cas_cls_parse_conditions, _handlers[])
+for rule grammar, so that configurations rejected by casadm or the kernel are rejected here.
+"""
+
+import csv
+import re
+from enum import Enum
+
+MAX_IO_CLASS_ID = 32
+MAX_IO_CLASS_PRIORITY = 255
+MAX_IO_CLASS_NAME_LEN = 1024
+MAX_STRING_SPECIFIER_LEN = 256
+MAX_CORE_ID = 4095
+MAX_U64 = 2**64 - 1
+CSV_COLUMNS = ["IO class id", "IO class name", "Eviction priority", "Allocation"]
+DEFAULT_IO_CLASS_RULE = "unclassified"
+PINNED_PRIORITY = None
+
+# kstrtou64() with base 10: optional '+', digits and optional trailing newline
+_U64_PATTERN = re.compile(r"\+?[0-9]+\n?")
+
+
+class IoClassConfigError(ValueError):
+    pass
+
+
+class LogicalOperator(Enum):
+    AND = "&"
+    OR = "|"
+
+
+class NumericOperator(Enum):
+    eq = "eq"
+    ne = "ne"
+    lt = "lt"
+    gt = "gt"
+    le = "le"
+    ge = "ge"
+
+
+class OperandType(Enum):
+    none = 0
+    numeric = 1
+    string = 2
+    direction = 3
+    directory = 4
+    core_id = 5
+
+
+class Condition:
+    """Single condition of a rule with logical operator joining it with preceding ones"""
+
+    # Condition token -> operand type, in the same order as _handlers[] in classifier.c
+    HANDLERS = {
+        "done": OperandType.none,
+        "metadata": OperandType.none,
+        "direct": OperandType.none,
+        "io_class": OperandType.numeric,
+        "file_size": OperandType.numeric,
+        "directory": OperandType.directory,
+        "core_id": OperandType.core_id,
+        "extension": OperandType.string,
+        "file_name_prefix": OperandType.string,
+        "lba": OperandType.numeric,
+        "pid": OperandType.numeric,
+        "process_name": OperandType.string,
+        "file_offset": OperandType.numeric,
+        "request_size": OperandType.numeric,
+        "io_direction": OperandType.direction,
+        "wlth": OperandType.numeric,
+    }
+
+    def __init__(self, token: str, operand: str | None, l_op: LogicalOperator,
+                 wlth_support: bool = True):
+        if token not in self.HANDLERS or (token == "wlth" and not wlth_support):
+            raise IoClassConfigError(f"Unknown condition '{token}'")
+        self.token = token
+        self.l_op = l_op
+        self.operator = None
+        self.value = None
+
+        match self.HANDLERS[token]:
+            case OperandType.none:
+                if operand is not None:
+                    raise IoClassConfigError(f"Unexpected operand in condition '{token}'")
+            case OperandType.numeric | OperandType.core_id:
+                self.operator, self.value = self.__parse_numeric(token, operand)
+                if self.HANDLERS[token] == OperandType.core_id and self.value > MAX_CORE_ID:
+                    raise IoClassConfigError(f"Core id have to be within <0-{MAX_CORE_ID}> range")
+            case OperandType.string:
+                if operand is None:
+                    raise IoClassConfigError(f"Missing string specifier in '{token}'")
+                if not operand:
+                    raise IoClassConfigError(f"String specifier in '{token}' is empty")
+                if len(operand) >= MAX_STRING_SPECIFIER_LEN:
+                    raise IoClassConfigError(f"String specifier in '{token}' is too long")
+                self.value = operand
+            case OperandType.direction:
+                if operand is None:
+                    raise IoClassConfigError("Missing IO direction specifier")
+                if operand not in ["read", "write"]:
+                    raise IoClassConfigError(
+                        f"Invalid IO direction specifier '{operand}', "
+                        f"allowed specifiers: 'read', 'write'"
+                    )
+                self.operator, self.value = NumericOperator.eq, operand
+            case OperandType.directory:
+                if not operand:
+                    raise IoClassConfigError("Missing directory specifier")
+                self.value = operand
+
+    @staticmethod
+    def __parse_numeric(token: str, operand: str | None) -> tuple:
+        if not operand:
+            raise IoClassConfigError(f"Missing numeric operand in '{token}'")
+        operator, separator, number = operand.partition(":")
+        if not separator:
+            operator, number = NumericOperator.eq.value, operand
+        try:
+            operator = NumericOperator(operator)
+        except ValueError:
+            raise IoClassConfigError(f"Invalid numeric operator '{operator}' in '{token}'")
+        if not _U64_PATTERN.fullmatch(number) or int(number) > MAX_U64:
+            raise IoClassConfigError(f"Invalid numeric operand '{number}' in '{token}'")
+        return operator, int(number)
+
+    @property
+    def stops(self) -> bool:
+        return self.token == "done"
+
+    def __str__(self):
+        if self.value is None:
+            return self.token
+        if self.operator is None or self.HANDLERS[self.token] == OperandType.direction:
+            return f"{self.token}:{self.value}"
+        return f"{self.token}:{self.operator.value}:{self.value}"
+
+    def __repr__(self):
+        return f"Condition({self.l_op.value}{self})"
+
+
+def parse_rule(rule: str, wlth_support: bool = True) -> list:
+    """
+    Split rule (IO class name) into conditions the same way as _cas_cls_parse_condition():
+    token ends at first ':', '&' or '|', operand at first '&' or '|', and the operator ending
+    a condition applies to the next one. There is no operator precedence.
+    """
+    conditions = []
+    l_op = LogicalOperator.OR
+    pos = 0
+    while pos < len(rule):
+        separator = re.compile("[:&|]").search(rule, pos)
+        operand = None
+        op = None
+        if not separator:
+            token, pos = rule[pos:], len(rule)
+        else:
+            token = rule[pos:separator.start()]
+            pos = separator.end()
+            if separator.group() == ":":
+                end = re.compile("[&|]").search(rule, pos)
+                if end:
+                    operand, op, pos = rule[pos:end.start()], end.group(), end.end()
+                else:
+                    operand, pos = rule[pos:], len(rule)
+            else:
+                op = separator.group()
+        conditions.append(Condition(token, operand, l_op, wlth_support))
+        l_op = LogicalOperator.OR if op == "|" else LogicalOperator.AND
+    return conditions
+
+
+class IoClassRule:
+    def __init__(self, class_id: int, name: str, priority: int | None = PINNED_PRIORITY,
+                 allocation: float = 1.0, wlth_support: bool = True):
+        self.id = class_id
+        self.name = name
+        self.priority = priority
+        self.allocation = allocation
+        # Class 0 is default for all unclassified I/O and has no rule
+        self.conditions = parse_rule(name, wlth_support) if class_id else []
+
+    def __str__(self):
+        priority = "" if self.priority is None else self.priority
+        return f"{self.id},{self.name},{priority},{self.allocation:g}"
+
+
+class IoClassConfig:
+    """IO classes ordered by id, which is also the order of rule evaluation"""
+
+    def __init__(self, io_classes: list):
+        self.io_classes = sorted(io_classes, key=lambda io_class: io_class.id)
+        ids = [io_class.id for io_class in self.io_classes]
+        if len(set(ids)) != len(ids):
+            raise IoClassConfigError("Double configuration for IO class id")
+
+    @property
+    def rules(self) -> list:
+        return [io_class for io_class in self.io_classes if io_class.conditions]
+
+    def get(self, class_id: int) -> IoClassRule | None:
+        return next((c for c in self.io_classes if c.id == class_id), None)
+
+    @classmethod
+    def from_csv(cls, path: str, wlth_support: bool = True):
+        with open(path, newline="") as csv_file:
+            return cls.from_lines(csv_file, wlth_support)
+
+    @classmethod
+    def from_lines(cls, lines, wlth_support: bool = True):
+        reader = csv.reader(lines)
+        header = next(reader, None)
+        if header is None:
+            raise IoClassConfigError("Empty IO Classes configuration file supplied")
+        for column in header:
+            if column not in CSV_COLUMNS:
+                raise IoClassConfigError(f'Unknown column "{column}"')
+        for column in CSV_COLUMNS:
+            if column not in header:
+                raise IoClassConfigError(f'Missing column "{column}"')
+        positions = [header.index(column) for column in CSV_COLUMNS]
+
+        io_classes = []
+        seen = set()
+        for line, row in enumerate(reader, start=2):
+            if len(row) != len(CSV_COLUMNS):
+                if not any(row):
+                    continue
+                raise IoClassConfigError(f"Error in line {line}")
+            try:
+                io_class = cls.__parse_row([row[p] for p in positions], wlth_support)
+            except IoClassConfigError as e:
+                raise IoClassConfigError(f"Error in line {line}: {e}")
+            if io_class.id in seen:
+                raise IoClassConfigError(f"Double configuration for IO class id {io_class.id}")
+            seen.add(io_class.id)
+            io_classes.append(io_class)
+
+        if not io_classes:
+            raise IoClassConfigError("Empty configuration file")
+        return cls(io_classes)
+
+    @classmethod
+    def from_io_classes(cls, io_classes: list, wlth_support: bool = True):
+        """Create from api.cas.ioclass_config.IoClass list, as used by io_class tests"""
+        return cls([
+            IoClassRule(
+                io_class.id,
+                io_class.rule,
+                io_class.priority,
+                float(io_class.allocation),
+                wlth_support,
+            )
+            for io_class in io_classes
+        ])
+
+    @staticmethod
+    def __parse_row(row: list, wlth_support: bool) -> IoClassRule:
+        class_id, name, priority, allocation = row
+
+        if not re.fullmatch("[0-9]+", class_id) or int(class_id) > MAX_IO_CLASS_ID:
+            raise IoClassConfigError(f"Invalid IO class id '{class_id}'")
+        class_id = int(class_id)
+
+        if not 0 < len(name) < MAX_IO_CLASS_NAME_LEN:
+            raise IoClassConfigError("Empty or too long IO class name")
+        if any(c == '"' or not 32 <= ord(c) <= 126 for c in name):
+            raise IoClassConfigError("Invalid character in IO class name")
+        if class_id == 0 and name != DEFAULT_IO_CLASS_RULE:
+            raise IoClassConfigError(
+                f"IO class 0 must have the default name '{DEFAULT_IO_CLASS_RULE}'"
+            )
+
+        if not priority:
+            priority = PINNED_PRIORITY
+        elif re.fullmatch("[0-9]+", priority) and int(priority) <= MAX_IO_CLASS_PRIORITY:
+            priority = int(priority)
+        else:
+            raise IoClassConfigError(f"Invalid eviction priority '{priority}'")
+
+        try:
+            if not allocation or len(allocation) > 4:
+                raise ValueError
+            allocation = float(allocation)
+        except ValueError:
+            raise IoClassConfigError(f"Invalid allocation '{allocation}'")
+        if not 0 <= allocation <= 1:
+            raise IoClassConfigError(f"Invalid allocation '{allocation}'")
+
+        return IoClassRule(class_id, name, priority, allocation, wlth_support)
@@ -0,0 +1,269 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+"""
+Vectorized evaluation of IO class rules with the same semantics as cas_cls_classify():
+rules are evaluated in IO class id order, a matching rule overrides the class of previous
+ones and "done" stops evaluation. Within a rule conditions are folded left to right, and
+evaluation ends at the first "and" following a false result.
+"""
+
+import os
+
+import numpy as np
+
+from utils.ioclass_eval.config import IoClassConfig, LogicalOperator, NumericOperator
+from utils.ioclass_eval.trace import FILE_KEY_SHIFT, SECTOR_SIZE, TraceBatch
+
+NUMERIC_TESTS = {
+    NumericOperator.eq: np.equal,
+    NumericOperator.ne: np.not_equal,
+    NumericOperator.lt: np.less,
+    NumericOperator.gt: np.greater,
+    NumericOperator.le: np.less_equal,
+    NumericOperator.ge: np.greater_equal,
+}
+
+
+def test_numeric(condition, values: np.ndarray) -> np.ndarray:
+    return NUMERIC_TESTS[condition.operator](values, np.uint64(condition.value))
+
+
+class IoClassEvaluator:
+    def __init__(self, config: IoClassConfig):
+        self.config = config
+        # Per-file results of file conditions, extended as file table grows
+        self.__file_results = {}
+
+    def classify(self, batch: TraceBatch) -> np.ndarray:
+        """Get IO class id of each trace record"""
+        io_class = np.zeros(len(batch), dtype=np.uint8)
+        pending = np.ones(len(batch), dtype=bool)
+        for rule in self.config.rules:
+            yes, stop = self.__evaluate_rule(rule, batch, io_class)
+            io_class[pending & yes] = rule.id
+            pending &= ~stop
+            if not pending.any():
+                break
+        return io_class
+
+    def __evaluate_rule(self, rule, batch: TraceBatch, io_class: np.ndarray) -> tuple:
+        yes = np.zeros(len(batch), dtype=bool)
+        stop = np.zeros(len(batch), dtype=bool)
+        active = np.ones(len(batch), dtype=bool)
+        for condition in rule.conditions:
+            if condition.l_op == LogicalOperator.AND:
+                active &= yes
+            if not active.any():
+                break
+            if condition.stops:
+                # "done" accepts and stops evaluation of remaining conditions and rules
+                yes |= active
+                stop |= active
+                break
+            result = self.__test(condition, batch, io_class)
+            if condition.l_op == LogicalOperator.AND:
+                yes = np.where(active, result & yes, yes)
+            else:
+                yes = np.where(active, result | yes, yes)
+        return yes, stop
+
+    def __test(self, condition, batch: TraceBatch, io_class: np.ndarray) -> np.ndarray:
+        # Direct I/O pages are anonymous, so classifier sees no inode for them
+        file = np.where(batch.direct, -1, batch.file)
+        has_file = file >= 0
+
+        match condition.token:
+            case "metadata":
+                file_metadata = self.__file_result(condition, batch.files,
+                                                   lambda f: f.kind in ["dir", "blk"])
+                return batch.metadata | (has_file & file_metadata[np.maximum(file, 0)])
+            case "direct":
+                return batch.direct.copy()
+            case "io_class":
+                return test_numeric(condition, io_class.astype(np.uint64))
+            case "core_id":
+                return (batch.core_id >= 0) & test_numeric(
+                    condition, np.maximum(batch.core_id, 0).astype(np.uint64))
+            case "lba":
+                return batch.lba_valid & test_numeric(condition, batch.lba)
+            case "pid":
+                return test_numeric(condition, batch.pid)
+            case "request_size":
+                return test_numeric(condition, batch.size)
+            case "io_direction":
+                return batch.write == (condition.value == "write")
+            case "wlth":
+                return test_numeric(condition, batch.wlth)
+            case "process_name":
+                names = np.array([name == condition.value for name in batch.processes.names]
+                                 + [False])
+                return names[batch.process]
+            case "file_offset":
+                return has_file & self.__file_result(
+                    condition, batch.files, lambda f: f.kind != "dir"
+                )[np.maximum(file, 0)] & test_numeric(condition, batch.file_offset)
+            case _:
+                return has_file & self.__file_result(
+                    condition, batch.files, self.__file_test(condition)
+                )[np.maximum(file, 0)]
+
+    @staticmethod
+    def __file_test(condition):
+        """Per-file test of conditions depending only on I/O target file"""
+        match condition.token:
+            case "file_size":
+                return lambda f: f.kind == "file" and f.size is not None \
+                    and bool(test_numeric(condition, np.array([f.size], dtype=np.uint64))[0])
+            case "extension":
+                return lambda f: f.kind != "dir" and "." in f.name \
+                    and f.name.rsplit(".", 1)[1] == condition.value
+            case "file_name_prefix":
+                return lambda f: f.kind != "dir" and f.name.startswith(condition.value)
+            case "directory":
+                # Directory condition matches files at any depth below the directory,
+                # I/O to directory inodes (directory metadata) is not matched
+                directory = os.path.normpath(condition.value)
+                prefix = directory.rstrip("/") + "/"
+                return lambda f: f.kind != "dir" \
+                    and (f.path == directory or f.path.startswith(prefix))
+        raise ValueError(f"Unsupported condition {condition}")
+
+    def __file_result(self, condition, files, test) -> np.ndarray:
+        results = self.__file_results.get(id(condition), np.zeros(0, dtype=bool))
+        if len(results) < len(files):
+            results = np.concatenate([
+                results,
+                np.array([test(files[i]) for i in range(len(results), len(files))], dtype=bool)
+            ])
+            self.__file_results[id(condition)] = results
+        # Extra element for records without file (index clamped to 0 is masked by caller)
+        return results if len(results) else np.zeros(1, dtype=bool)
+
+
+class DistinctCounter:
+    """Count of distinct uint64 keys, merging sorted unique arrays as they double in size"""
+
+    def __init__(self):
+        self.__merged = np.zeros(0, dtype=np.uint64)
+        self.__pending = []
+        self.__pending_len = 0
+
+    def add(self, keys: np.ndarray):
+        keys = np.unique(keys)
+        self.__pending.append(keys)
+        self.__pending_len += len(keys)
+        if self.__pending_len > len(self.__merged):
+            self.__merge()
+
+    def __merge(self):
+        self.__merged = np.unique(np.concatenate([self.__merged] + self.__pending))
+        self.__pending = []
+        self.__pending_len = 0
+
+    def __len__(self):
+        self.__merge()
+        return len(self.__merged)
+
+
+class IoClassStats:
+    def __init__(self):
+        self.requests = [0, 0]
+        self.bytes = [0, 0]
+        self.lines = DistinctCounter()
+
+    def add(self, batch: TraceBatch, mask: np.ndarray, keys: np.ndarray):
+        for write in [False, True]:
+            selected = mask & (batch.write == write)
+            self.requests[write] += int(np.count_nonzero(selected))
+            self.bytes[write] += int(batch.size[selected].sum())
+        self.lines.add(keys)
+
+
+class IoClassReport:
+    """
+    Per IO class share of requests and bytes and cache footprint (distinct cache lines
+    touched). Expected occupancy is the footprint capped by class allocation of the cache
+    and scaled down proportionally when all classes don't fit in the cache.
+    """
+
+    def __init__(self, config: IoClassConfig, cache_line_size: int = 4096,
+                 cache_size: int = None):
+        self.config = config
+        self.cache_line_size = cache_line_size
+        self.cache_size = cache_size
+        self.stats = {io_class.id: IoClassStats() for io_class in config.io_classes}
+        self.stats.setdefault(0, IoClassStats())
+
+    def add(self, batch: TraceBatch, io_class: np.ndarray):
+        keys, key_class = self.__line_keys(batch, io_class)
+        for class_id, stats in self.stats.items():
+            stats.add(batch, io_class == class_id, keys[key_class == class_id])
+
+    def __line_keys(self, batch: TraceBatch, io_class: np.ndarray) -> tuple:
+        """Get keys of cache lines touched by each request, expanded to one key per line"""
+        line_size = np.uint64(self.cache_line_size)
+        has_file = batch.file >= 0
+        use_lba = batch.lba_valid
+        use_file = ~use_lba & has_file
+        selected = (use_lba | use_file) & (batch.size > 0)
+
+        start = np.where(use_lba, batch.lba * np.uint64(SECTOR_SIZE), batch.file_offset)[selected]
+        end = start + batch.size[selected] - np.uint64(1)
+        first, last = start // line_size, end // line_size
+        space = np.where(use_file, np.maximum(batch.file, 0) + 1, 0)[selected].astype(np.uint64)
+
+        counts = (last - first + np.uint64(1)).astype(np.int64)
+        total = int(counts.sum())
+        offsets = np.arange(total, dtype=np.uint64) \
+            - np.repeat((np.cumsum(counts) - counts).astype(np.uint64), counts)
+        keys = (np.repeat(space, counts) << np.uint64(FILE_KEY_SHIFT)) \
+            | (np.repeat(first, counts) + offsets)
+        return keys, np.repeat(io_class[selected], counts)
+
+    def rows(self) -> list:
+        total_requests = sum(sum(s.requests) for s in self.stats.values()) or 1
+        total_bytes = sum(sum(s.bytes) for s in self.stats.values()) or 1
+        rows = []
+        for class_id, stats in sorted(self.stats.items()):
+            io_class = self.config.get(class_id)
+            footprint = len(stats.lines) * self.cache_line_size
+            occupancy = footprint
+            if self.cache_size is not None:
+                allocation = io_class.allocation if io_class else 1.0
+                occupancy = min(footprint, int(allocation * self.cache_size))
+            rows.append({
+                "id": class_id,
+                "name": io_class.name if io_class else "unclassified",
+                "requests": sum(stats.requests),
+                "read_requests": stats.requests[0],
+                "write_requests": stats.requests[1],
+                "bytes": sum(stats.bytes),
+                "request_share": sum(stats.requests) / total_requests,
+                "byte_share": sum(stats.bytes) / total_bytes,
+                "footprint": footprint,
+                "occupancy": occupancy,
+            })
+
+        total_occupancy = sum(row["occupancy"] for row in rows)
+        if self.cache_size is not None and total_occupancy > self.cache_size:
+            for row in rows:
+                row["occupancy"] = int(row["occupancy"] * self.cache_size / total_occupancy)
+        return rows
+
+    def __str__(self):
+        lines = [
+            f"{'id':>3} {'name':<40} {'requests':>12} {'req %':>7} {'bytes':>16} "
+            f"{'bytes %':>7} {'footprint':>16} {'occupancy':>16}"
+        ]
+        for row in self.rows():
+            if not row["requests"]:
+                continue
+            lines.append(
+                f"{row['id']:>3} {row['name'][:40]:<40} {row['requests']:>12} "
+                f"{row['request_share']:>7.2%} {row['bytes']:>16} {row['byte_share']:>7.2%} "
+                f"{row['footprint']:>16} {row['occupancy']:>16}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,338 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+"""
+Streaming readers of block traces (blkparse text output) and fio iologs (version 2 and 3).
+Records are returned in batches of numpy columns, together with file metadata which the
+kernel classifier would get from the page cache (inode, dentry).
+"""
+
+import csv
+import os
+import re
+
+import numpy as np
+
+SECTOR_SIZE = 512
+# Kernel truncates process name (comm) to TASK_COMM_LEN - 1 characters
+TASK_COMM_LEN = 16
+# Bits of cache line key reserved for line number within file address space
+FILE_KEY_SHIFT = 44
+
+BLKPARSE_PATTERN = re.compile(
+    r"\s*(?P<major>\d+),(?P<minor>\d+)\s+\d+\s+\d+\s+[\d.]+\s+(?P<pid>\d+)\s+(?P<action>\S+)"
+    r"\s+(?P<rwbs>\S+)\s+(?P<sector>\d+)\s+\+\s+(?P<sectors>\d+)(?:\s+\[(?P<process>.*)\])?"
+)
+
+
+class FileInfo:
+    def __init__(self, path: str, size: int | None = None, kind: str = "file"):
+        if kind not in ["file", "dir", "blk"]:
+            raise ValueError(f"Invalid file type '{kind}' of {path}")
+        self.path = os.path.normpath(path)
+        self.name = os.path.basename(self.path)
+        self.size = size
+        self.kind = kind
+
+    def __repr__(self):
+        return f"FileInfo({self.path}, {self.size}, {self.kind})"
+
+
+class NameTable:
+    """Strings referenced from trace columns by index"""
+
+    def __init__(self):
+        self.names = []
+        self.__index = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index: int) -> str:
+        return self.names[index]
+
+    def add(self, name: str) -> int:
+        if name not in self.__index:
+            self.__index[name] = len(self.names)
+            self.names.append(name)
+        return self.__index[name]
+
+
+class FileTable:
+    """
+    Files referenced from trace records by index. Files missing in metadata are added
+    on first reference with unknown size, so only path based conditions apply to them.
+    """
+
+    def __init__(self, files: list = ()):
+        self.files = []
+        self.__index = {}
+        for file in files:
+            self.add(file)
+
+    def __len__(self):
+        return len(self.files)
+
+    def __getitem__(self, index: int) -> FileInfo:
+        return self.files[index]
+
+    def add(self, file: FileInfo) -> int:
+        if file.path in self.__index:
+            self.files[self.__index[file.path]] = file
+        else:
+            self.__index[file.path] = len(self.files)
+            self.files.append(file)
+        return self.__index[file.path]
+
+    def lookup(self, path: str) -> int:
+        path = os.path.normpath(path)
+        if path not in self.__index:
+            return self.add(FileInfo(path))
+        return self.__index[path]
+
+    @classmethod
+    def from_csv(cls, path: str):
+        """Read file metadata CSV with "path,size" and optional "type" (file/dir/blk) columns"""
+        with open(path, newline="") as csv_file:
+            return cls([
+                FileInfo(row["path"], int(row["size"]) if row.get("size") else None,
+                         row.get("type") or "file")
+                for row in csv.DictReader(csv_file)
+            ])
+
+
+class ExtentMap:
+    """
+    Mapping between device sectors and file offsets, e.g. converted from "filefrag -v"
+    or "xfs_bmap -v" output. CSV columns: path, lba, sectors (both in 512B sectors) and
+    file_offset (bytes).
+    """
+
+    def __init__(self, files: FileTable, extents: list):
+        extents = sorted(extents, key=lambda e: e[1])
+        self.file = np.array([e[0] for e in extents], dtype=np.int64)
+        self.lba = np.array([e[1] for e in extents], dtype=np.uint64)
+        self.sectors = np.array([e[2] for e in extents], dtype=np.uint64)
+        self.file_offset = np.array([e[3] for e in extents], dtype=np.uint64)
+        self.files = files
+
+        by_file = np.lexsort((self.file_offset, self.file))
+        self.__file_keys = (self.file[by_file].astype(np.uint64) << np.uint64(FILE_KEY_SHIFT)) \
+            | self.file_offset[by_file]
+        self.__by_file = by_file
+
+    @classmethod
+    def from_csv(cls, path: str, files: FileTable):
+        with open(path, newline="") as csv_file:
+            return cls(files, [
+                (files.lookup(row["path"]), int(row["lba"]), int(row["sectors"]),
+                 int(row.get("file_offset") or 0))
+                for row in csv.DictReader(csv_file)
+            ])
+
+    def locate(self, lba: np.ndarray) -> tuple:
+        """Get (file, file_offset) for sectors, file is -1 for sectors not mapped to any file"""
+        file = np.full(len(lba), -1, dtype=np.int64)
+        file_offset = np.zeros(len(lba), dtype=np.uint64)
+        if not len(self.lba):
+            return file, file_offset
+        i = np.searchsorted(self.lba, lba, side="right") - 1
+        found = (i >= 0)
+        i = np.maximum(i, 0)
+        found &= lba < self.lba[i] + self.sectors[i]
+        file[found] = self.file[i[found]]
+        file_offset[found] = self.file_offset[i[found]] \
+            + (lba[found] - self.lba[i[found]]) * np.uint64(SECTOR_SIZE)
+        return file, file_offset
+
+    def to_lba(self, file: np.ndarray, file_offset: np.ndarray) -> tuple:
+        """Get (lba, valid) for file offsets, invalid where offset is not mapped"""
+        lba = np.zeros(len(file), dtype=np.uint64)
+        valid = np.zeros(len(file), dtype=bool)
+        if not len(self.lba):
+            return lba, valid
+        keys = (np.maximum(file, 0).astype(np.uint64) << np.uint64(FILE_KEY_SHIFT)) | file_offset
+        i = np.searchsorted(self.__file_keys, keys, side="right") - 1
+        i = np.maximum(i, 0)
+        e = self.__by_file[i]
+        start = self.file_offset[e]
+        valid = (file >= 0) & (self.file[e] == file) & (file_offset >= start) \
+            & (file_offset < start + self.sectors[e] * np.uint64(SECTOR_SIZE))
+        lba[valid] = self.lba[e[valid]] + (file_offset[valid] - start[valid]) // SECTOR_SIZE
+        return lba, valid
+
+
+class TraceBatch:
+    """
+    Trace records as numpy columns:
+      lba, lba_valid - first sector and whether it is known (file I/O without extent map)
+      size - request size in bytes
+      write - I/O direction
+      pid, process - process id and index in processes table (-1 if unknown)
+      core_id - core id (-1 if unknown)
+      file, file_offset - index in files table (-1 if none) and offset within file in bytes
+      metadata, direct - filesystem metadata and direct I/O flags
+      wlth - write lifetime hint
+    """
+
+    COLUMNS = {
+        "lba": np.uint64,
+        "lba_valid": bool,
+        "size": np.uint64,
+        "write": bool,
+        "pid": np.uint64,
+        "process": np.int64,
+        "core_id": np.int64,
+        "file": np.int64,
+        "file_offset": np.uint64,
+        "metadata": bool,
+        "direct": bool,
+        "wlth": np.uint64,
+    }
+
+    def __init__(self, files: FileTable, processes: NameTable, **columns):
+        self.files = files
+        self.processes = processes
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("Trace columns differ in length")
+        length = lengths.pop() if lengths else 0
+        for name, dtype in self.COLUMNS.items():
+            default = -1 if name in ["process", "core_id", "file"] else 0
+            values = columns.get(name)
+            setattr(self, name, np.asarray(values, dtype=dtype) if values is not None
+                    else np.full(length, default, dtype=dtype))
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+
+class TraceReader:
+    """Base of trace readers - builds batches from records parsed from consecutive lines"""
+
+    def __init__(self, path: str, files: FileTable = None, extents: ExtentMap = None,
+                 chunk_size: int = 65536):
+        self.path = path
+        self.files = files if files is not None else FileTable()
+        self.processes = NameTable()
+        self.extents = extents
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        records = []
+        with open(self.path) as trace:
+            for line in trace:
+                record = self.parse_line(line)
+                if record is None:
+                    continue
+                records.append(record)
+                if len(records) == self.chunk_size:
+                    yield self.make_batch(records)
+                    records = []
+        if records:
+            yield self.make_batch(records)
+
+    def parse_line(self, line: str) -> dict | None:
+        raise NotImplementedError()
+
+    def make_batch(self, records: list) -> TraceBatch:
+        columns = {name: [r[name] for r in records] for name in records[0]}
+        return TraceBatch(self.files, self.processes, **columns)
+
+
+class BlkparseReader(TraceReader):
+    """
+    Reader of blkparse default text output. Each bio is counted once, on queue (Q) action by
+    default. Files are resolved from sectors with extent map, since block traces have none.
+    """
+
+    def __init__(self, path: str, files: FileTable = None, extents: ExtentMap = None,
+                 chunk_size: int = 65536, actions: str = "Q", core_ids: dict = None,
+                 direct: bool = False):
+        super().__init__(path, files, extents, chunk_size)
+        self.actions = set(actions)
+        self.core_ids = core_ids or {}
+        self.direct = direct
+
+    def parse_line(self, line: str) -> dict | None:
+        match = BLKPARSE_PATTERN.match(line)
+        if not match or match["action"] not in self.actions:
+            return None
+        rwbs = match["rwbs"]
+        if "W" not in rwbs and "R" not in rwbs:
+            # Discard, flush and other requests without data
+            return None
+        process = match["process"]
+        return {
+            "lba": int(match["sector"]),
+            "size": int(match["sectors"]) * SECTOR_SIZE,
+            "write": "W" in rwbs,
+            "pid": int(match["pid"]),
+            "process": self.processes.add(process[:TASK_COMM_LEN - 1]) if process else -1,
+            "core_id": self.core_ids.get((int(match["major"]), int(match["minor"])), -1),
+            "metadata": "M" in rwbs,
+        }
+
+    def make_batch(self, records: list) -> TraceBatch:
+        batch = super().make_batch(records)
+        batch.lba_valid[:] = True
+        batch.direct[:] = self.direct
+        if self.extents:
+            batch.file, batch.file_offset = self.extents.locate(batch.lba)
+        return batch
+
+
+class FioIologReader(TraceReader):
+    """
+    Reader of fio iolog (write_iolog) version 2 and 3. I/O to block devices is addressed by
+    sector, I/O to files by file offset (and by sector if extent map is given).
+    """
+
+    def __init__(self, path: str, files: FileTable = None, extents: ExtentMap = None,
+                 chunk_size: int = 65536, pid: int = 0, process_name: str = None,
+                 core_id: int = -1, direct: bool = False):
+        super().__init__(path, files, extents, chunk_size)
+        self.pid = pid
+        self.process = self.processes.add(process_name[:TASK_COMM_LEN - 1]) \
+            if process_name else -1
+        self.core_id = core_id
+        self.direct = direct
+        self.version = None
+
+    def parse_line(self, line: str) -> dict | None:
+        fields = line.split()
+        if self.version is None:
+            match = re.fullmatch(r"fio version (\d) iolog", line.strip())
+            if not match or match.group(1) not in ["2", "3"]:
+                raise ValueError(f"{self.path} is not fio iolog version 2 or 3")
+            self.version = int(match.group(1))
+            return None
+        if self.version == 3:
+            fields = fields[1:]
+        if len(fields) != 4 or fields[1] not in ["read", "write"]:
+            # File actions (add, open, close), sync, trim and wait entries
+            return None
+        path, action, offset, length = fields
+        record = {"size": int(length), "write": action == "write"}
+        if path.startswith("/dev/"):
+            record.update(lba=int(offset) // SECTOR_SIZE, lba_valid=True, file=-1, file_offset=0)
+        else:
+            record.update(lba=0, lba_valid=False, file=self.files.lookup(path),
+                          file_offset=int(offset))
+        return record
+
+    def make_batch(self, records: list) -> TraceBatch:
+        batch = super().make_batch(records)
+        batch.pid[:] = self.pid
+        batch.process[:] = self.process
+        batch.core_id[:] = self.core_id
+        batch.direct[:] = self.direct
+        if self.extents:
+            lba, valid = self.extents.to_lba(batch.file, batch.file_offset)
+            mapped = valid & ~batch.lba_valid
+            batch.lba[mapped] = lba[mapped]
+            batch.lba_valid |= mapped
+        return batch
@@ -0,0 +1,466 @@
+#
+# Copyright(c) 2025 Huawei Technologies Co., Ltd.
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+"""
+Local store of performance test results (perf.json files written by perf_collector)
+and comparison of CAS versions against each other:
+
+    python3 -m utils.perf_db perf.db ingest logs/
+    python3 -m utils.perf_db perf.db compare --baseline 22.12.0.0 --candidate 24.9.0.0
+    python3 -m utils.perf_db perf.db scaling --metric LOAD_TIME_US --predict-size 7.68TB
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import re
+import sqlite3
+import sys
+from statistics import mean
+
+from utils.performance import LatencyHistogram
+
+# perf.json sections with IOMetric and ManagementMetric values
+IO_TARGETS = ["cache_io", "core_io", "exp_obj_io", "management"]
+
+# Metrics compared between versions and whether higher value is better
+COMPARED_METRICS = {
+    "read_IOPS": True,
+    "write_IOPS": True,
+    "read_BW": True,
+    "write_BW": True,
+    "read_CLAT_AVG": False,
+    "write_CLAT_AVG": False,
+    "read_CLAT_PERCENTILES": False,
+    "write_CLAT_PERCENTILES": False,
+    "read_CLAT_HISTOGRAM": False,
+    "write_CLAT_HISTOGRAM": False,
+    "START_TIME_US": False,
+    "LOAD_TIME_US": False,
+    "LOAD_CLEAN_TIME_US": False,
+    "STOP_TIME_US": False,
+    "STOP_FLUSH_TIME_US": False,
+    "ACTIVATE_TIME_US": False,
+    "FLUSH_TIME_US": False,
+    "PURGE_TIME_US": False,
+    "CLEANING_BW": True,
+    "FLUSH_BW": True,
+}
+
+# Tail quantiles stored for each latency histogram
+HISTOGRAM_QUANTILES = (0.99, 0.999, 0.9999)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    test_name TEXT NOT NULL,
+    cas_version TEXT NOT NULL,
+    cache_config TEXT,
+    cache_type TEXT,
+    core_type TEXT,
+    build_type TEXT,
+    dut TEXT,
+    timestamp TEXT,
+    workload TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    target TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS runs_unique
+    ON runs (test_name, IFNULL(dut, ''), IFNULL(timestamp, ''), IFNULL(workload, ''));
+CREATE INDEX IF NOT EXISTS runs_version ON runs (cas_version);
+CREATE INDEX IF NOT EXISTS metrics_run ON metrics (run_id);
+"""
+
+# Run parameters, besides CAS version, which have to match for results to be comparable
+CONFIG_COLUMNS = ["test_name", "cache_config", "cache_type", "core_type", "workload"]
+
+# Runs of each version needed to test significance of a difference
+MIN_RUNS = 2
+
+
+class Regression:
+    """
+    Metric worse in candidate than in baseline. p_value is None if there are too few runs
+    of either version to test significance of the change.
+    """
+
+    def __init__(self, config: dict, target: str, metric: str, baseline: list, candidate: list,
+                 p_value: float | None):
+        self.config = config
+        self.target = target
+        self.metric = metric
+        self.baseline = baseline
+        self.candidate = candidate
+        self.p_value = p_value
+
+    @property
+    def change(self) -> float:
+        """Relative change of candidate mean vs baseline mean"""
+        return mean(self.candidate) / mean(self.baseline) - 1
+
+    @property
+    def significant(self) -> bool:
+        return self.p_value is not None
+
+    def __str__(self):
+        config = ", ".join(f"{k}={v}" for k, v in self.config.items() if v is not None)
+        p_value = f"p={self.p_value:.3f}" if self.significant else "p=n/a"
+        return (
+            f"{config}: {self.target} {self.metric} {mean(self.baseline):g} -> "
+            f"{mean(self.candidate):g} ({self.change:+.1%}, {p_value}, "
+            f"n={len(self.baseline)}/{len(self.candidate)})"
+        )
+
+
+class ScalingFit:
+    """
+    Least squares fits of metric value vs cache size: linear (value = intercept + slope * size)
+    and power law (value = coefficient * size ^ exponent). Exponent notably above 1 means
+    that the metric grows faster than linearly with cache size.
+    """
+
+    def __init__(self, points: list):
+        if len({size for size, _ in points}) < 2:
+            raise ValueError("At least two different cache sizes are needed to fit scaling")
+        self.points = sorted(points)
+        self.slope, self.intercept = self.__least_squares(points)
+        positive = [(math.log(x), math.log(y)) for x, y in points if x > 0 and y > 0]
+        if len({x for x, _ in positive}) >= 2:
+            self.exponent, log_coefficient = self.__least_squares(positive)
+            self.coefficient = math.exp(log_coefficient)
+        else:
+            self.exponent = self.coefficient = None
+
+    @staticmethod
+    def __least_squares(points: list) -> tuple:
+        x_mean = mean(x for x, _ in points)
+        y_mean = mean(y for _, y in points)
+        slope = sum((x - x_mean) * (y - y_mean) for x, y in points) / sum(
+            (x - x_mean) ** 2 for x, _ in points
+        )
+        return slope, y_mean - slope * x_mean
+
+    def predict(self, size: float) -> float:
+        return self.intercept + self.slope * size
+
+    def predict_power(self, size: float) -> float | None:
+        return self.coefficient * size**self.exponent if self.exponent is not None else None
+
+
+class PerfDatabase:
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def ingest(self, perf: dict) -> bool:
+        """
+        Store results from perf.json dictionary (PerfContainer.to_serializable_dict()).
+        Returns False if the same run was already stored.
+        """
+
+        def serialize(value):
+            return json.dumps(value, sort_keys=True) if value is not None else None
+
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT OR IGNORE INTO runs (test_name, cas_version, cache_config, cache_type, "
+                "core_type, build_type, dut, timestamp, workload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    perf["TEST_NAME"],
+                    perf["CAS_VERSION"],
+                    serialize(perf.get("CACHE_CONFIG")),
+                    perf.get("CACHE_TYPE"),
+                    perf.get("CORE_TYPE"),
+                    perf.get("BUILD_TYPE"),
+                    perf.get("DUT"),
+                    perf.get("TIMESTAMP"),
+                    serialize(perf.get("workload_params")),
+                ),
+            )
+            if cursor.rowcount == 0:
+                return False
+
+            run_id = cursor.lastrowid
+            rows = []
+            for target in IO_TARGETS:
+                for metric, value in perf.get(target, {}).items():
+                    if isinstance(value, dict) and "counts" in value:
+                        rows += [
+                            (run_id, target, f"{metric}.{percentile}", latency)
+                            for percentile, latency in histogram_tails(value).items()
+                        ]
+                    elif isinstance(value, dict):
+                        # Percentiles are stored as separate metrics, e.g. read_CLAT_PERCENTILES.p99
+                        rows += [(run_id, target, f"{metric}.{k}", v) for k, v in value.items()]
+                    else:
+                        rows.append((run_id, target, metric, value))
+            self.connection.executemany(
+                "INSERT INTO metrics (run_id, target, metric, value) VALUES (?, ?, ?, ?)", rows
+            )
+        return True
+
+    def ingest_file(self, path: str) -> bool:
+        with open(path) as perf_file:
+            return self.ingest(json.load(perf_file))
+
+    def versions(self, build_type: str = None) -> list:
+        """Return [(cas_version, runs count)] ordered by the time of the first run"""
+        query = "SELECT cas_version, COUNT(*) FROM runs"
+        params = []
+        if build_type:
+            query += " WHERE build_type = ?"
+            params.append(build_type)
+        query += " GROUP BY cas_version ORDER BY MIN(timestamp)"
+        return self.connection.execute(query, params).fetchall()
+
+    def results(self, cas_version: str, build_type: str = None) -> dict:
+        """Return {(config..., target, metric): [values]} for given CAS version"""
+        query = (
+            f"SELECT {', '.join(f'r.{c}' for c in CONFIG_COLUMNS)}, m.target, m.metric, m.value "
+            "FROM runs r JOIN metrics m ON m.run_id = r.id WHERE r.cas_version = ?"
+        )
+        params = [cas_version]
+        if build_type:
+            query += " AND r.build_type = ?"
+            params.append(build_type)
+
+        results = {}
+        for row in self.connection.execute(query, params):
+            results.setdefault(tuple(row[:-1]), []).append(row[-1])
+        return results
+
+    def compare(self, baseline: str, candidate: str, build_type: str = None,
+                threshold: float = 0.05, alpha: float = 0.05) -> list:
+        """
+        Find metrics for which candidate version is worse than baseline by more than
+        threshold (relative change of means) with statistical significance (one-sided
+        permutation test p-value below alpha). At least two runs of each version for
+        the same configuration are needed to test significance, changes with fewer runs
+        are returned with p_value None.
+        """
+        baseline_results = self.results(baseline, build_type)
+        candidate_results = self.results(candidate, build_type)
+
+        regressions = []
+        for key in sorted(baseline_results.keys() & candidate_results.keys(), key=str):
+            *config, target, metric = key
+            higher_is_better = COMPARED_METRICS.get(metric.split(".")[0])
+            if higher_is_better is None:
+                continue
+
+            baseline_values = baseline_results[key]
+            candidate_values = candidate_results[key]
+            if not higher_is_better:
+                baseline_values = [-v for v in baseline_values]
+                candidate_values = [-v for v in candidate_values]
+
+            base_mean = mean(baseline_values)
+            if base_mean == 0 or (mean(candidate_values) - base_mean) / abs(base_mean) > -threshold:
+                continue
+
+            if min(len(baseline_values), len(candidate_values)) < MIN_RUNS:
+                p_value = None
+            else:
+                p_value = permutation_test(baseline_values, candidate_values)
+            if p_value is None or p_value < alpha:
+                regressions.append(
+                    Regression(
+                        config=dict(zip(CONFIG_COLUMNS, config)),
+                        target=target,
+                        metric=metric,
+                        baseline=baseline_results[key],
+                        candidate=candidate_results[key],
+                        p_value=p_value,
+                    )
+                )
+        return regressions
+
+    def scaling_points(self, metric: str, cas_version: str = None,
+                       build_type: str = None) -> dict:
+        """
+        Return {(test_name, cache_config): [(cache size in MiB, value)]} of management
+        metric, for runs with WorkloadParameter.CACHE_SIZE.
+        """
+        query = (
+            "SELECT r.test_name, r.cache_config, r.workload, m.value "
+            "FROM runs r JOIN metrics m ON m.run_id = r.id "
+            "WHERE m.target = 'management' AND m.metric = ?"
+        )
+        params = [metric]
+        if cas_version:
+            query += " AND r.cas_version = ?"
+            params.append(cas_version)
+        if build_type:
+            query += " AND r.build_type = ?"
+            params.append(build_type)
+
+        points = {}
+        for test_name, cache_config, workload, value in self.connection.execute(query, params):
+            cache_size = json.loads(workload or "{}").get("CACHE_SIZE")
+            if cache_size is not None:
+                points.setdefault((test_name, cache_config), []).append((cache_size, value))
+        return points
+
+
+SIZE_UNITS = {
+    "": 1, "M": 1, "MIB": 1, "G": 1024, "GIB": 1024, "T": 1024**2, "TIB": 1024**2,
+    "MB": 1000**2 / 1024**2, "GB": 1000**3 / 1024**2, "TB": 1000**4 / 1024**2,
+}
+
+
+def parse_size(size: str) -> float:
+    """Parse cache size, e.g. "7.68TB" or "512GiB" (plain number - MiB), to MiB"""
+    match = re.fullmatch(r"\s*([0-9.]+)\s*([a-zA-Z]*)\s*", size)
+    if not match or match.group(2).upper() not in SIZE_UNITS:
+        raise argparse.ArgumentTypeError(f"Invalid size: {size}")
+    return float(match.group(1)) * SIZE_UNITS[match.group(2).upper()]
+
+
+def histogram_tails(histogram: dict) -> dict:
+    """Return {"p99_99": latency} of serialized LatencyHistogram for resolvable quantiles"""
+    histogram = LatencyHistogram.from_serializable_dict(histogram)
+    return {
+        str(percentile): latency
+        for percentile, latency in histogram.percentiles(HISTOGRAM_QUANTILES).items()
+        if histogram.total * (1 - percentile.value / 100) >= 1
+    }
+
+
+def permutation_test(baseline: list, candidate: list, rounds: int = 10000) -> float:
+    """
+    One-sided p-value of candidate mean being lower than baseline mean by chance.
+    All splits are checked when there are no more than rounds of them, random ones otherwise.
+    """
+    if min(len(baseline), len(candidate)) < MIN_RUNS:
+        raise ValueError(f"At least {MIN_RUNS} values of each sample are needed")
+    values = baseline + candidate
+    n = len(baseline)
+    observed = mean(baseline) - mean(candidate)
+    total = sum(values)
+
+    def difference(indices):
+        baseline_sum = sum(values[i] for i in indices)
+        return baseline_sum / n - (total - baseline_sum) / (len(values) - n)
+
+    if math.comb(len(values), n) <= rounds:
+        splits = list(itertools.combinations(range(len(values)), n))
+    else:
+        generator = random.Random(0)
+        splits = [generator.sample(range(len(values)), n) for _ in range(rounds)]
+
+    # Small tolerance so that splits equal to the observed one are counted
+    extreme = sum(1 for split in splits if difference(split) >= observed - 1e-9 * abs(observed))
+    return extreme / len(splits)
+
+
+def find_perf_files(paths: list) -> list:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in sorted(os.walk(path)):
+                files += [os.path.join(directory, n) for n in sorted(names) if n == "perf.json"]
+        else:
+            files.append(path)
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="perf_db", description="Open CAS performance results")
+    parser.add_argument("database", help="path to SQLite database, created if missing")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="store perf.json files")
+    ingest.add_argument("paths", nargs="+", help="perf.json files or directories to search")
+
+    versions = commands.add_parser("versions", help="list stored CAS versions")
+    versions.add_argument("--build-type")
+
+    compare = commands.add_parser("compare", help="report regressions of candidate vs baseline")
+    compare.add_argument("--baseline", required=True, help="baseline CAS version")
+    compare.add_argument("--candidate", required=True, help="compared CAS version")
+    compare.add_argument("--build-type")
+    compare.add_argument("--threshold", type=float, default=0.05,
+                         help="minimal relative change reported (default: 0.05)")
+    compare.add_argument("--alpha", type=float, default=0.05,
+                         help="significance level (default: 0.05)")
+
+    scaling = commands.add_parser("scaling", help="fit management metric vs cache size")
+    scaling.add_argument("--metric", default="LOAD_TIME_US",
+                         help="ManagementMetric name (default: LOAD_TIME_US)")
+    scaling.add_argument("--cas-version")
+    scaling.add_argument("--build-type")
+    scaling.add_argument("--predict-size", type=parse_size,
+                         help="predict metric for cache size, e.g. 7.68TB or 4TiB")
+
+    args = parser.parse_args(argv)
+
+    with PerfDatabase(args.database) as db:
+        match args.command:
+            case "ingest":
+                for path in find_perf_files(args.paths):
+                    stored = db.ingest_file(path)
+                    print(f"{path}: {'stored' if stored else 'already stored'}")
+            case "versions":
+                for version, runs in db.versions(args.build_type):
+                    print(f"{version}: {runs} runs")
+            case "compare":
+                regressions = db.compare(
+                    args.baseline, args.candidate, args.build_type, args.threshold, args.alpha
+                )
+                significant = [r for r in regressions if r.significant]
+                inconclusive = [r for r in regressions if not r.significant]
+                for regression in significant:
+                    print(regression)
+                if inconclusive:
+                    print(f"Not tested for significance, less than {MIN_RUNS} runs of a version:")
+                    for regression in inconclusive:
+                        print(f"  {regression}")
+                print(
+                    f"{len(significant)} regression(s) found, "
+                    f"{len(inconclusive)} change(s) with too few runs"
+                )
+                return 1 if significant else 0
+            case "scaling":
+                points = db.scaling_points(args.metric, args.cas_version, args.build_type)
+                for (test_name, cache_config), config_points in sorted(points.items()):
+                    print(f"{test_name} {cache_config}:")
+                    try:
+                        fit = ScalingFit(config_points)
+                    except ValueError as e:
+                        print(f"  {e}")
+                        continue
+                    print(f"  linear: {fit.intercept:g} + {fit.slope:g} * size[MiB]")
+                    if fit.exponent is not None:
+                        print(f"  power: {fit.coefficient:g} * size[MiB] ^ {fit.exponent:.3f}")
+                    if args.predict_size:
+                        power = fit.predict_power(args.predict_size)
+                        print(
+                            f"  predicted for {args.predict_size:g} MiB: "
+                            f"{fit.predict(args.predict_size):g} (linear)"
+                            + (f", {power:g} (power)" if power is not None else "")
+                        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
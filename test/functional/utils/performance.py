@@ -3,11 +3,15 @@
 # SPDX-License-Identifier: BSD-3-Clause
 #
 
+import bisect
+import json
+import re
 from enum import Enum
-from types import MethodType
+from types import MethodType, SimpleNamespace
 from datetime import datetime
 
-from schema import Schema, Use, And, SchemaError, Or
+import numpy as np
+from schema import Schema, Use, And, SchemaError, Or, Optional
 
 
 class ValidatableParameter(Enum):
@@ -58,6 +62,150 @@ class PercentileMetric:
         return f"p{self.value:g}".replace(".", "_")
 
 
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram using fio bucketing (FIO_IO_U_PLAT_BITS sub-bucket bits),
+    so that fio histograms are converted without loss: values below 2 * 2^bits ns have
+    own buckets, each further power of two is split into 2^bits buckets (~1.6% error).
+    Only non-empty buckets are kept. Histograms of jobs and runs can be merged.
+    """
+
+    BITS = 6
+    VAL = 1 << BITS
+    NR = 29 * VAL
+
+    def __init__(self, counts: dict = None):
+        # bucket index -> number of samples
+        self.counts = {int(k): int(v) for k, v in (counts or {}).items() if int(v)}
+
+    @classmethod
+    def value_to_index(cls, value: int) -> int:
+        value = int(value)
+        msb = value.bit_length() - 1 if value else 0
+        if msb <= cls.BITS:
+            return value
+        error_bits = msb - cls.BITS
+        index = ((error_bits + 1) << cls.BITS) + ((cls.VAL - 1) & (value >> error_bits))
+        return min(index, cls.NR - 1)
+
+    @classmethod
+    def index_to_value(cls, index: int) -> int:
+        """Representative value (in ns) of bucket, same as fio's plat_idx_to_val()"""
+        if index < (cls.VAL << 1):
+            return index
+        error_bits = (index >> cls.BITS) - 1
+        base = 1 << (error_bits + cls.BITS)
+        return int(base + ((index % cls.VAL) + 0.5) * (1 << error_bits))
+
+    @classmethod
+    def from_fio_bins(cls, bins):
+        """Create from fio json+ "clat_ns"/"lat_ns" "bins" ({latency in ns: count})"""
+        bins = bins if isinstance(bins, dict) else vars(bins)
+        histogram = cls()
+        for value, count in bins.items():
+            if int(count):
+                histogram.add(int(value), int(count))
+        return histogram
+
+    @classmethod
+    def from_fio_hist_log(cls, lines, direction: int = None, coarseness: int = 0):
+        """
+        Create from fio --write_hist_log file lines ("msec, direction, bs, bin0, bin1, ...").
+        Bins of all intervals are summed up, direction 0 - reads, 1 - writes, None - both.
+        With --log_hist_coarseness each column covers 2^coarseness buckets, its samples
+        are put in the first of them.
+        """
+        histogram = cls()
+        for line in lines:
+            fields = [field.strip() for field in line.split(",")]
+            if len(fields) < 4 or (direction is not None and int(fields[1]) != direction):
+                continue
+            for column, count in enumerate(fields[3:]):
+                if int(count):
+                    index = column << coarseness
+                    histogram.counts[index] = histogram.counts.get(index, 0) + int(count)
+        return histogram
+
+    @classmethod
+    def merge(cls, histograms):
+        merged = cls()
+        for histogram in histograms:
+            merged += histogram
+        return merged
+
+    def add(self, value: int, count: int = 1):
+        index = self.value_to_index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+
+    def __iadd__(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        return self
+
+    def __add__(self, other):
+        return LatencyHistogram.merge([self, other])
+
+    def __eq__(self, other):
+        return isinstance(other, LatencyHistogram) and self.counts == other.counts
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def quantile(self, q: float) -> int:
+        """Latency (in ns) below or equal to which is q fraction of samples, e.g. q=0.9999"""
+        if not 0 <= q <= 1:
+            raise ValueError(f"Invalid quantile {q}")
+        indices = sorted(self.counts)
+        if not indices:
+            raise ValueError("Empty latency histogram")
+        cumulative = []
+        total = 0
+        for index in indices:
+            total += self.counts[index]
+            cumulative.append(total)
+        position = bisect.bisect_left(cumulative, max(1, q * total))
+        return self.index_to_value(indices[min(position, len(indices) - 1)])
+
+    def percentiles(self, quantiles=(0.5, 0.99, 0.999, 0.9999)) -> dict:
+        """Return {PercentileMetric: latency in ns}, same as IOMetric CLAT_PERCENTILES"""
+        return {PercentileMetric(q * 100): self.quantile(q) for q in quantiles}
+
+    def compare_tails(self, other, quantiles=(0.99, 0.999, 0.9999)) -> dict:
+        """
+        Compare tail latency of other (candidate) histogram against this one (baseline).
+        Returns {PercentileMetric: (baseline ns, candidate ns, candidate / baseline)}.
+        Quantiles beyond the resolution of the smaller histogram (fewer than one sample
+        above) are skipped, as they are determined by a single sample.
+        """
+        samples = min(self.total, other.total)
+        result = {}
+        for q in quantiles:
+            if samples * (1 - q) < 1:
+                continue
+            baseline, candidate = self.quantile(q), other.quantile(q)
+            result[PercentileMetric(q * 100)] = (
+                baseline,
+                candidate,
+                candidate / baseline if baseline else float("inf"),
+            )
+        return result
+
+    def to_serializable_dict(self):
+        indices = sorted(self.counts)
+        return {
+            "bits": self.BITS,
+            "indices": indices,
+            "counts": [self.counts[index] for index in indices],
+        }
+
+    @classmethod
+    def from_serializable_dict(cls, d: dict):
+        if d["bits"] != cls.BITS:
+            raise ValueError(f"Unsupported latency histogram bucketing: {d['bits']} bits")
+        return cls(dict(zip(d["indices"], d["counts"])))
+
+
 class IOMetric(ValidatableParameter):
     read_IOPS = Schema(Use(int))
     write_IOPS = Schema(Use(int))
@@ -67,9 +215,188 @@ class IOMetric(ValidatableParameter):
     write_CLAT_AVG = Schema(Use(int))
     read_CLAT_PERCENTILES = Schema({Use(PercentileMetric): Use(int)})
     write_CLAT_PERCENTILES = Schema({Use(PercentileMetric): Use(int)})
+    read_CLAT_HISTOGRAM = Schema(LatencyHistogram)
+    write_CLAT_HISTOGRAM = Schema(LatencyHistogram)
+
 
 BuildTypes = ["master", "pr", "other"]
 
+
+class FioJobsMetrics:
+    """
+    IOMetric values of each job of fio json (or json+) output, kept in per-job arrays.
+
+    Jobs are decoded one by one from the "jobs" array (see iter_fio_jobs()), only needed
+    values are extracted and the rest of each job is dropped right away, so outputs of
+    many jobs without --group_reporting don't have to be materialized as a whole.
+    """
+
+    directions = ["read", "write"]
+
+    def __init__(self):
+        self.job_names = []
+        self.__values = {
+            f"{d}_{m}": [] for d in self.directions for m in ["IOPS", "BW", "CLAT_AVG", "IOS"]
+        }
+        # direction -> percentile (as in fio output) -> per-job latencies
+        self.__percentiles = {d: {} for d in self.directions}
+        self.__histograms = {d: None for d in self.directions}
+        self.__arrays = None
+
+    @classmethod
+    def from_json(cls, source, chunk_size: int = 1 << 20):
+        """source - fio json output as string or file object"""
+        metrics = cls()
+        for job in iter_fio_jobs(source, chunk_size):
+            metrics.add_job(job)
+        return metrics
+
+    def add_job(self, job: dict):
+        self.__arrays = None
+        self.job_names.append(job.get("jobname"))
+        for direction in self.directions:
+            stats = job[direction]
+            clat = stats["clat_ns"]
+            self.__values[f"{direction}_IOPS"].append(stats["iops"])
+            self.__values[f"{direction}_BW"].append(stats["bw"])
+            self.__values[f"{direction}_CLAT_AVG"].append(clat["mean"])
+            self.__values[f"{direction}_IOS"].append(stats["total_ios"])
+            percentiles = self.__percentiles[direction]
+            for percentile, latency in clat.get("percentile", {}).items():
+                # Jobs without this percentile (different --percentile_list) get NaN
+                column = percentiles.setdefault(percentile, [np.nan] * (len(self.job_names) - 1))
+                column.append(latency)
+            for column in percentiles.values():
+                if len(column) < len(self.job_names):
+                    column.append(np.nan)
+            if "bins" in clat:
+                histogram = LatencyHistogram.from_fio_bins(clat["bins"])
+                if self.__histograms[direction] is None:
+                    self.__histograms[direction] = histogram
+                else:
+                    self.__histograms[direction] += histogram
+
+    def __len__(self):
+        return len(self.job_names)
+
+    def __get_arrays(self) -> dict:
+        if self.__arrays is None:
+            self.__arrays = {
+                name: np.array(values, dtype=np.float64) for name, values in self.__values.items()
+            }
+        return self.__arrays
+
+    def per_job(self, kind: IOMetric) -> np.ndarray:
+        """Per-job values of IOPS, BW or CLAT_AVG metric"""
+        return self.__get_arrays()[kind.name]
+
+    def per_job_percentiles(self, direction: str) -> dict:
+        """{percentile: per-job latencies in ns} of "read" or "write" direction"""
+        return {
+            percentile: np.array(latencies, dtype=np.float64)
+            for percentile, latencies in self.__percentiles[direction].items()
+        }
+
+    def histogram(self, direction: str):
+        """Latency histogram of all jobs merged, None if fio didn't report bins (json+)"""
+        return self.__histograms[direction]
+
+    def aggregate(self) -> dict:
+        """
+        {IOMetric: value} for all jobs together: summed IOPS and bandwidth, completion
+        latency average weighted by number of I/Os. Percentiles of many jobs are only
+        reported when fio reported bins (json+), as percentiles of separate jobs can't be
+        merged, percentiles of a single job (e.g. with --group_reporting) are taken as they are.
+        """
+        arrays = self.__get_arrays()
+        metrics = {}
+        for direction in self.directions:
+            ios = arrays[f"{direction}_IOS"]
+            metrics[IOMetric[f"{direction}_IOPS"]] = arrays[f"{direction}_IOPS"].sum()
+            metrics[IOMetric[f"{direction}_BW"]] = arrays[f"{direction}_BW"].sum()
+            clat = arrays[f"{direction}_CLAT_AVG"]
+            metrics[IOMetric[f"{direction}_CLAT_AVG"]] = (
+                (clat * ios).sum() / ios.sum() if ios.sum() else clat.mean() if len(clat) else 0
+            )
+            histogram = self.__histograms[direction]
+            percentiles = {
+                percentile: latencies
+                for percentile, latencies in self.__percentiles[direction].items()
+                if 0 < float(percentile) < 100
+            }
+            if len(self) == 1 and percentiles:
+                metrics[IOMetric[f"{direction}_CLAT_PERCENTILES"]] = {
+                    percentile: latencies[0] for percentile, latencies in percentiles.items()
+                }
+            elif histogram is not None and histogram.total:
+                metrics[IOMetric[f"{direction}_CLAT_PERCENTILES"]] = {
+                    percentile: histogram.quantile(float(percentile) / 100)
+                    for percentile in percentiles
+                }
+            if histogram is not None and histogram.total:
+                metrics[IOMetric[f"{direction}_CLAT_HISTOGRAM"]] = histogram
+        return metrics
+
+
+def namespace_to_dict(value):
+    """Convert json parsed into SimpleNamespace objects (e.g. FioResult.job) to plain dicts"""
+    if isinstance(value, SimpleNamespace):
+        return {key: namespace_to_dict(item) for key, item in vars(value).items()}
+    if isinstance(value, list):
+        return [namespace_to_dict(item) for item in value]
+    return value
+
+
+def iter_fio_jobs(source, chunk_size: int = 1 << 20):
+    """
+    Yield jobs of fio json output one by one. source is a string or a file object,
+    which is read in chunks - only the currently decoded job has to fit in memory.
+    """
+    read = source.read if hasattr(source, "read") else None
+    buffer = "" if read else source
+    decoder = json.JSONDecoder()
+    jobs_start = re.compile(r'"jobs"\s*:\s*\[')
+    eof = read is None
+
+    def read_more():
+        nonlocal buffer, eof
+        chunk = read(chunk_size) if not eof else ""
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode()
+        eof = not chunk
+        buffer += chunk
+        return bool(chunk)
+
+    # Text before json (e.g. fio warnings) and global part are skipped
+    while (match := jobs_start.search(buffer)) is None:
+        # keep the tail in case the pattern is split between chunks
+        buffer = buffer[-16:]
+        if not read_more():
+            raise ValueError("No jobs in fio json output")
+    buffer = buffer[match.end():]
+
+    pos = 0
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos == len(buffer):
+            buffer, pos = "", 0
+            if not read_more():
+                raise ValueError("Unterminated jobs array in fio json output")
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            job, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            buffer, pos = buffer[pos:], 0
+            if not read_more():
+                raise
+            continue
+        yield job
+        buffer, pos = buffer[end:], 0
+
+
 class ConfigParameter(ValidatableParameter):
     CAS_VERSION = Schema(Use(str))
     DUT = Schema(Use(str))
@@ -86,12 +413,40 @@ class ConfigParameter(ValidatableParameter):
 class WorkloadParameter(ValidatableParameter):
     NUM_JOBS = Schema(Use(int))
     QUEUE_DEPTH = Schema(Use(int))
+    BLOCK_SIZE = Schema(Use(int))
+    READ_WRITE = Schema(Use(str))
+    CACHE_SIZE = Schema(Use(int))
+    SEQ_CUTOFF_POLICY = Schema(Use(str))
+    SEQ_CUTOFF_THRESHOLD = Schema(Use(int))
+    PROMOTION_POLICY = Schema(Use(str))
+    NHIT_THRESHOLD = Schema(Use(int))
+
+
+class ManagementMetric(ValidatableParameter):
+    # Durations of cache management operations in microseconds
+    START_TIME_US = Schema(Use(int))
+    # Load of dirty cache stopped without flush
+    LOAD_TIME_US = Schema(Use(int))
+    LOAD_CLEAN_TIME_US = Schema(Use(int))
+    # Stop without flush
+    STOP_TIME_US = Schema(Use(int))
+    STOP_FLUSH_TIME_US = Schema(Use(int))
+    ACTIVATE_TIME_US = Schema(Use(int))
+    FLUSH_TIME_US = Schema(Use(int))
+    PURGE_TIME_US = Schema(Use(int))
+    # Size of metadata on cache device in bytes
+    METADATA_SIZE = Schema(Use(int))
+    # Throughput of background cleaning (dirty data written to core by cleaner) in KiB/s
+    CLEANING_BW = Schema(Use(int))
+    # Throughput of flush (dirty data written to core on request) in KiB/s
+    FLUSH_BW = Schema(Use(int))
 
 
 class MetricContainer:
     def __init__(self, metric_type):
         self.metrics = {}
         self.metric_type = metric_type
+        self.batch_schema = None
 
     def insert_metric(self, metric, kind):
         if not isinstance(kind, self.metric_type):
@@ -102,6 +457,25 @@ class MetricContainer:
 
         self.metrics[kind] = metric
 
+    def insert_metrics(self, metrics: dict):
+        """Insert {kind: metric}, validating all of them with a single schema"""
+        for kind in metrics:
+            if not isinstance(kind, self.metric_type):
+                raise Exception(
+                    f"Invalid metric type. Expected: {self.metric_type}, got: {type(kind)}"
+                )
+
+        if self.batch_schema is None:
+            # Keyed by names, as kinds themselves would be taken for validators by Schema
+            self.batch_schema = Schema(
+                {
+                    Optional(kind.name): kind.schema if kind.schema else object
+                    for kind in self.metric_type
+                }
+            )
+        validated = self.batch_schema.validate({kind.name: m for kind, m in metrics.items()})
+        self.metrics.update({self.metric_type[name]: m for name, m in validated.items()})
+
     @property
     def is_empty(self):
         return len(self.metrics) == 0
@@ -115,6 +489,8 @@ class MetricContainer:
 
                 if isinstance(v, dict):
                     v = stringify_dict(v)
+                elif isinstance(v, LatencyHistogram):
+                    v = v.to_serializable_dict()
                 elif isinstance(v, int):
                     pass
                 elif isinstance(v, float):
@@ -139,9 +515,15 @@ class PerfContainer:
         self.core_metrics = MetricContainer(IOMetric)
         self.exp_obj_metrics = MetricContainer(IOMetric)
 
+        self.management_metrics = MetricContainer(ManagementMetric)
+
     def insert_config_param(self, param, kind: ConfigParameter):
         self.conf_params.insert_metric(param, kind)
 
+    def insert_config_params(self, params: dict):
+        """Insert {ConfigParameter: param}, validated together"""
+        self.conf_params.insert_metrics(params)
+
     def insert_config_from_cache(self, cache):
         cache_config = {
             "cache_mode": cache.get_cache_mode(),
@@ -155,41 +537,48 @@ class PerfContainer:
         self.workload_params.insert_metric(param, kind)
 
     @staticmethod
-    def _insert_metrics_from_fio(container, result):
-        result = result.job
-
-        container.insert_metric(result.read.iops, IOMetric.read_IOPS)
-        container.insert_metric(result.write.iops, IOMetric.write_IOPS)
-        container.insert_metric(result.read.bw, IOMetric.read_BW)
-        container.insert_metric(result.write.bw, IOMetric.write_BW)
-        container.insert_metric(result.read.clat_ns.mean, IOMetric.read_CLAT_AVG)
-        container.insert_metric(result.write.clat_ns.mean, IOMetric.write_CLAT_AVG)
-        if hasattr(result.read.clat_ns, "percentile"):
-            container.insert_metric(
-                vars(result.read.clat_ns.percentile), IOMetric.read_CLAT_PERCENTILES
-            )
-        if hasattr(result.write.clat_ns, "percentile"):
-            container.insert_metric(
-                vars(result.write.clat_ns.percentile), IOMetric.write_CLAT_PERCENTILES
-            )
+    def _insert_metrics_from_fio(container, result) -> FioJobsMetrics:
+        # FioResult holds the job parsed into namespaces, FioJobsMetrics takes decoded json
+        jobs = FioJobsMetrics()
+        jobs.add_job(namespace_to_dict(result.job))
+        container.insert_metrics(jobs.aggregate())
+        return jobs
+
+    @staticmethod
+    def _insert_metrics_from_fio_json(container, source) -> FioJobsMetrics:
+        jobs = FioJobsMetrics.from_json(source)
+        container.insert_metrics(jobs.aggregate())
+        return jobs
 
     def insert_cache_metric(self, metric, kind: IOMetric):
         self.cache_metrics.insert_metric(metric, kind)
 
-    def insert_cache_metrics_from_fio_job(self, fio_results):
-        self._insert_metrics_from_fio(self.cache_metrics, fio_results)
+    def insert_cache_metrics_from_fio_job(self, fio_results) -> FioJobsMetrics:
+        return self._insert_metrics_from_fio(self.cache_metrics, fio_results)
+
+    def insert_cache_metrics_from_fio_json(self, source) -> FioJobsMetrics:
+        return self._insert_metrics_from_fio_json(self.cache_metrics, source)
 
     def insert_core_metric(self, metric, kind: IOMetric):
         self.core_metrics.insert_metric(metric, kind)
 
-    def insert_core_metrics_from_fio_job(self, fio_results):
-        self._insert_metrics_from_fio(self.core_metrics, fio_results)
+    def insert_core_metrics_from_fio_job(self, fio_results) -> FioJobsMetrics:
+        return self._insert_metrics_from_fio(self.core_metrics, fio_results)
+
+    def insert_core_metrics_from_fio_json(self, source) -> FioJobsMetrics:
+        return self._insert_metrics_from_fio_json(self.core_metrics, source)
 
     def insert_exp_obj_metric(self, metric, kind: IOMetric):
         self.exp_obj_metrics.insert_metric(metric, kind)
 
-    def insert_exp_obj_metrics_from_fio_job(self, fio_results):
-        self._insert_metrics_from_fio(self.exp_obj_metrics, fio_results)
+    def insert_exp_obj_metrics_from_fio_job(self, fio_results) -> FioJobsMetrics:
+        return self._insert_metrics_from_fio(self.exp_obj_metrics, fio_results)
+
+    def insert_exp_obj_metrics_from_fio_json(self, source) -> FioJobsMetrics:
+        return self._insert_metrics_from_fio_json(self.exp_obj_metrics, source)
+
+    def insert_management_metric(self, metric, kind: ManagementMetric):
+        self.management_metrics.insert_metric(metric, kind)
 
     @property
     def is_empty(self):
@@ -199,6 +588,7 @@ class PerfContainer:
             and self.cache_metrics.is_empty
             and self.core_metrics.is_empty
             and self.exp_obj_metrics.is_empty
+            and self.management_metrics.is_empty
         )
 
     def to_serializable_dict(self):
@@ -212,5 +602,7 @@ class PerfContainer:
             ret["core_io"] = self.core_metrics.to_serializable_dict()
         if not self.exp_obj_metrics.is_empty:
             ret["exp_obj_io"] = self.exp_obj_metrics.to_serializable_dict()
+        if not self.management_metrics.is_empty:
+            ret["management"] = self.management_metrics.to_serializable_dict()
 
         return ret
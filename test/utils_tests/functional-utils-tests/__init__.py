@@ -0,0 +1,4 @@
+#
+# Copyright(c) 2025 Huawei Technologies
+# SPDX-License-Identifier: BSD-3-Clause
+#
@@ -0,0 +1,16 @@
+#
+# Copyright(c) 2025 Huawei Technologies
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import os
+import sys
+
+
+def pytest_configure(config):
+    functional_dir = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "..", "functional"
+    )
+
+    sys.path.append(os.path.realpath(functional_dir))
+    sys.path.append(os.path.realpath(os.path.join(functional_dir, "test-framework")))
@@ -0,0 +1,120 @@
+#
+# Copyright(c) 2025 Huawei Technologies
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import subprocess
+import threading
+import unittest.mock as mock
+
+import pytest
+
+# api.cas needs test-framework submodule
+pytest.importorskip("core.test_run")
+batch = pytest.importorskip("api.cas.batch")
+from connection.utils.output import CmdException, Output
+
+
+class LocalExecutor:
+    def __init__(self):
+        self.commands = []
+
+    def run(self, command, *args, **kwargs):
+        self.commands.append(command)
+        process = subprocess.run(["bash", "-c", command], capture_output=True, text=True)
+        return Output(process.stdout, process.stderr, process.returncode)
+
+
+@pytest.fixture
+def executor():
+    executor = LocalExecutor()
+    with mock.patch.object(batch.TestRun, "executor", executor, create=True):
+        yield executor
+
+
+def test_batch_single_round_trip(executor):
+    with batch.batch():
+        first = batch.run_cmd("echo first")
+        second = batch.run_cmd("printf 'a\\n\\n\\n'; echo err >&2; exit 3")
+        assert executor.commands == []
+
+    assert len(executor.commands) == 1
+    assert first.stdout == "first\n"
+    assert first.exit_code == 0
+    # Trailing blank lines are kept as they are
+    assert second.stdout == "a\n\n\n"
+    assert second.stderr == "err\n"
+    assert second.exit_code == 3
+
+
+def test_batch_stops_at_failed_command(executor):
+    with pytest.raises(CmdException):
+        with batch.batch():
+            batch.run_cmd("false", "Command failed.")
+            skipped = batch.run_cmd("echo skipped")
+
+    with pytest.raises(CmdException):
+        skipped.result()
+
+
+def test_batch_on_success_deferred(executor):
+    applied = []
+
+    with batch.batch():
+        batch.run_cmd("true", "Command failed.", on_success=applied.append)
+        assert applied == []
+
+    assert len(applied) == 1
+
+
+def test_batch_shared_fetch_per_flush(executor):
+    fetch = mock.Mock(side_effect=lambda: batch.run_cmd("echo listing").stdout)
+
+    def resolve(output):
+        return batch.CommandBatch.shared("listing", fetch)
+
+    with batch.batch():
+        futures = [batch.run_cmd("true", resolve=resolve) for _ in range(3)]
+
+    assert [future.result() for future in futures] == ["listing\n"] * 3
+    fetch.assert_called_once()
+    # Batch script and single listing run directly, outside of the batch
+    assert len(executor.commands) == 2
+
+
+def test_batch_other_thread_not_queued(executor):
+    results = []
+
+    with batch.batch():
+        queued = batch.run_cmd("echo queued")
+        thread = threading.Thread(target=lambda: results.append(batch.run_cmd("echo other")))
+        thread.start()
+        thread.join()
+
+        assert results[0].stdout == "other\n"
+        assert not queued.done()
+
+    assert queued.stdout == "queued\n"
+
+
+def test_batch_aborted(executor):
+    with mock.patch.object(batch.TestRun, "LOGGER", create=True) as logger:
+        with pytest.raises(RuntimeError):
+            with batch.batch():
+                dropped = batch.run_cmd("echo dropped")
+                raise RuntimeError()
+
+    assert executor.commands == []
+    assert dropped.done()
+    with pytest.raises(Exception, match="batch aborted"):
+        dropped.result()
+    logger.warning.assert_called_once()
+
+
+def test_batch_large_script(executor):
+    with mock.patch.object(batch.CommandBatch, "script_chunk_size", 64):
+        with batch.batch():
+            outputs = [batch.run_cmd(f"echo {i}") for i in range(10)]
+
+    assert [output.stdout for output in outputs] == [f"{i}\n" for i in range(10)]
+    assert all(len(command) < 128 for command in executor.commands)
@@ -0,0 +1,208 @@
+#
+# Copyright(c) 2025 Huawei Technologies
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import numpy as np
+import pytest
+
+# Sizes come from test-framework submodule
+pytest.importorskip("type_def.size")
+from api.cas.cache_config import (
+    CacheLineSize,
+    CacheMode,
+    CleaningPolicy,
+    PromotionParametersNhit,
+    PromotionPolicy,
+    SeqCutOffParameters,
+    SeqCutOffPolicy,
+)
+from type_def.size import Size, Unit
+from utils.cache_sim.grid import TraceSpec, config_grid, simulate
+from utils.cache_sim.simulator import CacheSimulator, SimConfig
+from utils.ioclass_eval import FileTable, IoClassConfig, IoClassRule, NameTable, TraceBatch
+
+LINE = 4096
+LINE_SECTORS = LINE // 512
+NO_SEQ_CUTOFF = SeqCutOffParameters(SeqCutOffPolicy.never)
+
+
+def get_batch(lines, write=False):
+    """Single line requests to given cache lines"""
+    return TraceBatch(
+        FileTable(),
+        NameTable(),
+        lba=[line * LINE_SECTORS for line in lines],
+        lba_valid=[True] * len(lines),
+        size=[LINE] * len(lines),
+        write=[write] * len(lines),
+    )
+
+
+def run(batches, cache_lines=1024, io_class=None, **config):
+    config.setdefault("seq_cutoff", NO_SEQ_CUTOFF)
+    simulator = CacheSimulator(SimConfig(Size(cache_lines * LINE, Unit.Byte), **config))
+    for batch in batches:
+        simulator.replay(batch, io_class)
+    return simulator.result()
+
+
+@pytest.mark.parametrize(
+    "cache_mode, hit_ratio", [(CacheMode.WT, 0.5), (CacheMode.WB, 0.5), (CacheMode.WA, 0.5),
+                              (CacheMode.WO, 0), (CacheMode.PT, 0)]
+)
+def test_read_hit_ratio(cache_mode, hit_ratio):
+    result = run([get_batch(range(4)), get_batch(range(4))], cache_mode=cache_mode)
+
+    assert result["reads"] == 8
+    assert result["hit_ratio"] == hit_ratio
+    assert result["sector_hit_ratio"] == hit_ratio
+
+
+@pytest.mark.parametrize(
+    "cache_mode, hit_ratio", [(CacheMode.WT, 1), (CacheMode.WB, 1), (CacheMode.WO, 1),
+                              (CacheMode.WA, 0), (CacheMode.PT, 0)]
+)
+def test_read_after_write_hit_ratio(cache_mode, hit_ratio):
+    result = run([get_batch(range(4), write=True), get_batch(range(4))], cache_mode=cache_mode)
+
+    assert result["hit_ratio"] == hit_ratio
+
+
+def test_write_back_dirty_data():
+    result = run([get_batch(range(4), write=True), get_batch([0], write=True)],
+                 cache_mode=CacheMode.WB)
+
+    assert result["host_write_bytes"] == 5 * LINE
+    assert result["backend_write_bytes"] == 0
+    assert result["dirty_bytes"] == 4 * LINE
+    assert result["peak_dirty_bytes"] == 4 * LINE
+    # Dirty data is counted as eventually written to core
+    assert result["write_amplification"] == pytest.approx(4 / 5)
+
+
+def test_write_through_backend_writes():
+    result = run([get_batch(range(4), write=True)], cache_mode=CacheMode.WT)
+
+    assert result["backend_write_bytes"] == 4 * LINE
+    assert result["dirty_bytes"] == 0
+    assert result["write_amplification"] == 1
+
+
+def test_partial_hit():
+    partial = TraceBatch(FileTable(), NameTable(), lba=[0], lba_valid=[True], size=[2 * LINE])
+
+    result = run([get_batch([0]), partial])
+
+    assert result["read_partial_misses"] == 1
+    assert result["read_hit_sectors"] == LINE_SECTORS
+
+
+def test_lru_eviction():
+    # Cyclic access to more lines than cache holds never hits with LRU
+    result = run([get_batch([0, 1, 2] * 3)], cache_lines=2)
+
+    assert result["hit_ratio"] == 0
+    assert result["evictions"] == 7
+    assert result["occupancy_bytes"] == 2 * LINE
+    assert run([get_batch([0, 1] * 3)], cache_lines=2)["hit_ratio"] == pytest.approx(4 / 6)
+
+
+def test_nhit_promotion():
+    batches = [get_batch([0] * 4)]
+
+    always = run(batches, promotion_policy=PromotionPolicy.always)
+    nhit = run(batches, promotion_policy=PromotionPolicy.nhit,
+               promotion_nhit=PromotionParametersNhit(threshold=3, trigger=0))
+
+    assert always["read_hits"] == 3
+    # Line is inserted on third access
+    assert nhit["read_hits"] == 1
+
+
+def test_nhit_trigger():
+    # Below trigger occupancy all lines are promoted
+    result = run([get_batch([0] * 4)], promotion_policy=PromotionPolicy.nhit,
+                 promotion_nhit=PromotionParametersNhit(threshold=3, trigger=50))
+
+    assert result["read_hits"] == 3
+
+
+def test_seq_cutoff():
+    seq_cutoff = SeqCutOffParameters(SeqCutOffPolicy.always, Size(2 * LINE, Unit.Byte))
+
+    result = run([get_batch(range(4)), get_batch(range(4))], seq_cutoff=seq_cutoff)
+
+    # Only the first line of each sequential stream is below threshold
+    assert result["pass_through_reads"] == 6
+    assert result["read_hits"] == 1
+
+
+def test_seq_cutoff_full():
+    seq_cutoff = SeqCutOffParameters(SeqCutOffPolicy.full, Size(2 * LINE, Unit.Byte))
+
+    # Sequential streams are cut off only when cache is full
+    assert run([get_batch(range(4))], seq_cutoff=seq_cutoff)["pass_through_reads"] == 0
+    result = run([get_batch(range(4))], cache_lines=2, seq_cutoff=seq_cutoff)
+    assert result["pass_through_reads"] == 2
+
+
+@pytest.mark.parametrize(
+    "cleaning_policy, sync_writeback", [(CleaningPolicy.alru, 0), (CleaningPolicy.nop, LINE)]
+)
+def test_cleaning_policy(cleaning_policy, sync_writeback):
+    result = run([get_batch(range(3), write=True)], cache_lines=2,
+                 cache_mode=CacheMode.WB, cleaning_policy=cleaning_policy)
+
+    # Evicted dirty line is written back, with NOP in the request path
+    assert result["evictions"] == 1
+    assert result["backend_write_bytes"] == LINE
+    assert result["writeback_bytes"] == LINE
+    assert result["sync_writeback_bytes"] == sync_writeback
+    assert result["dirty_bytes"] == 2 * LINE
+
+
+def test_io_class_allocation():
+    io_classes = IoClassConfig([
+        IoClassRule(0, "unclassified", 255),
+        IoClassRule(1, "io_direction:write", 1, 0.5),
+    ])
+    writes = get_batch(range(4), write=True)
+
+    result = run([writes], cache_lines=4, io_classes=io_classes,
+                 io_class=np.ones(4, dtype=np.uint8))
+
+    # Class 1 is limited to half of the cache and evicts its own lines
+    assert result["occupancy_by_io_class"] == {1: 2 * LINE}
+    assert result["evictions"] == 2
+
+
+def test_config_grid():
+    configs = config_grid(
+        Size(1, Unit.GibiByte),
+        cache_modes=[CacheMode.WT, CacheMode.WB],
+        cache_line_sizes=[CacheLineSize.LINE_4KiB, CacheLineSize.LINE_64KiB],
+        promotions=[(PromotionPolicy.always, None),
+                    (PromotionPolicy.nhit, PromotionParametersNhit(5, 10))],
+    )
+
+    assert len(configs) == 8
+    params = configs[-1].to_dict()
+    assert params["cache_mode"] == "wb"
+    assert params["cache_line_size_kib"] == 64
+    assert (params["nhit_threshold"], params["nhit_trigger"]) == (5, 10)
+    assert params["cache_size_mib"] == 1024
+
+
+def test_simulate_trace(tmp_path):
+    trace = tmp_path / "iolog"
+    trace.write_text(
+        "fio version 2 iolog\n"
+        + "".join(f"/dev/sdb read {offset} 4096\n" for offset in [0, 4096, 0, 4096])
+    )
+    config = SimConfig(Size(1, Unit.MebiByte), seq_cutoff=NO_SEQ_CUTOFF)
+
+    result = simulate(config, TraceSpec(str(trace), "fio"))
+
+    assert result["cache_mode"] == "wt"
+    assert result["hit_ratio"] == 0.5
@@ -0,0 +1,307 @@
+#
+# Copyright(c) 2025 Huawei Technologies
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from utils.ioclass_eval import (
+    BlkparseReader,
+    ExtentMap,
+    FileInfo,
+    FileTable,
+    FioIologReader,
+    IoClassConfig,
+    IoClassConfigError,
+    IoClassEvaluator,
+    IoClassReport,
+    IoClassRule,
+    NameTable,
+    TraceBatch,
+    parse_rule,
+)
+from utils.ioclass_eval.config import LogicalOperator, NumericOperator
+
+CSV_HEADER = "IO class id,IO class name,Eviction priority,Allocation"
+
+
+def get_config(*rules):
+    return IoClassConfig(
+        [IoClassRule(0, "unclassified", 255)]
+        + [IoClassRule(class_id, rule) for class_id, rule in enumerate(rules, start=1)]
+    )
+
+
+def classify(config, batch):
+    return list(IoClassEvaluator(config).classify(batch))
+
+
+def test_parse_rule():
+    conditions = parse_rule("extension:log&file_size:gt:100|done")
+
+    assert [c.token for c in conditions] == ["extension", "file_size", "done"]
+    # Operator ending a condition applies to the next one
+    assert [c.l_op for c in conditions] == [
+        LogicalOperator.OR, LogicalOperator.AND, LogicalOperator.OR
+    ]
+    assert conditions[0].value == "log"
+    assert (conditions[1].operator, conditions[1].value) == (NumericOperator.gt, 100)
+    assert [str(c) for c in conditions] == ["extension:log", "file_size:gt:100", "done"]
+
+
+def test_parse_rule_numeric_default_operator():
+    (condition,) = parse_rule("request_size:4096")
+
+    assert (condition.operator, condition.value) == (NumericOperator.eq, 4096)
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        "unknown",
+        "done:1",
+        "file_size",
+        "file_size:gt",
+        "file_size:gt:-1",
+        "file_size:gt:18446744073709551616",
+        "file_size:xx:1",
+        "core_id:4096",
+        "extension:",
+        "extension:" + "a" * 256,
+        "io_direction:trim",
+        "directory",
+    ],
+)
+def test_parse_rule_invalid(rule):
+    with pytest.raises(IoClassConfigError):
+        parse_rule(rule)
+
+
+def test_parse_rule_wlth_support():
+    assert parse_rule("wlth:2")[0].value == 2
+    with pytest.raises(IoClassConfigError, match="Unknown condition"):
+        parse_rule("wlth:2", wlth_support=False)
+
+
+def test_config_from_lines():
+    config = IoClassConfig.from_lines([
+        "IO class name,IO class id,Allocation,Eviction priority",
+        "unclassified,0,1.00,255",
+        "",
+        "direct,2,0.50,",
+        "metadata&done,1,1,1",
+    ])
+
+    assert [c.id for c in config.io_classes] == [0, 1, 2]
+    assert [c.id for c in config.rules] == [1, 2]
+    assert config.get(2).priority is None
+    assert config.get(2).allocation == 0.5
+    assert str(config.get(1)) == "1,metadata&done,1,1"
+    assert config.get(3) is None
+
+
+@pytest.mark.parametrize(
+    "lines, message",
+    [
+        ([], "Empty IO Classes configuration"),
+        ([CSV_HEADER], "Empty configuration file"),
+        (["IO class id,IO class name,Allocation"], "Missing column"),
+        ([CSV_HEADER + ",Extra"], "Unknown column"),
+        ([CSV_HEADER, "1,direct,1"], "Error in line 2"),
+        ([CSV_HEADER, "33,direct,1,1"], "Invalid IO class id"),
+        ([CSV_HEADER, "0,direct,1,1"], "default name"),
+        ([CSV_HEADER, '1,"dir""ect",1,1'], "Invalid character"),
+        ([CSV_HEADER, "1,direct,256,1"], "Invalid eviction priority"),
+        ([CSV_HEADER, "1,direct,1,1.5"], "Invalid allocation"),
+        ([CSV_HEADER, "1,direct,1,0.125"], "Invalid allocation"),
+        ([CSV_HEADER, "1,direct,1,1", "1,metadata,1,1"], "Double configuration"),
+        ([CSV_HEADER, "1,foo:1,1,1"], "Unknown condition"),
+    ],
+)
+def test_config_from_lines_invalid(lines, message):
+    with pytest.raises(IoClassConfigError, match=message):
+        IoClassConfig.from_lines(lines)
+
+
+def test_config_from_io_classes():
+    io_classes = [
+        SimpleNamespace(id=0, rule="unclassified", priority=255, allocation="1.00"),
+        SimpleNamespace(id=1, rule="direct", priority=1, allocation="0.50"),
+    ]
+
+    config = IoClassConfig.from_io_classes(io_classes)
+
+    assert [str(c) for c in config.io_classes] == ["0,unclassified,255,1", "1,direct,1,0.5"]
+
+
+def test_evaluator_class_order():
+    batch = TraceBatch(FileTable(), NameTable(), size=[4096, 8192, 512])
+
+    # Later matching rule overrides earlier one
+    assert classify(get_config("request_size:ge:4096", "request_size:8192"), batch) == [1, 2, 0]
+    # "done" stops evaluation of following rules
+    assert classify(get_config("request_size:ge:4096&done", "request_size:8192"), batch) == [
+        1, 1, 0
+    ]
+
+
+def test_evaluator_left_fold():
+    batch = TraceBatch(FileTable(), NameTable(), size=[512, 4096, 512], write=[True, True, False])
+
+    # No operator precedence: (size == 512 | size == 4096) & write
+    rule = "request_size:512|request_size:4096&io_direction:write"
+    assert classify(get_config(rule), batch) == [1, 1, 0]
+    # Evaluation ends at "and" following false result, so "|" past it isn't reached
+    rule = "request_size:4096&io_direction:write|request_size:512"
+    assert classify(get_config(rule), batch) == [0, 1, 0]
+
+
+def test_evaluator_io_class_condition():
+    batch = TraceBatch(FileTable(), NameTable(), size=[512, 4096], direct=[True, True])
+
+    assert classify(get_config("direct", "io_class:1&request_size:512"), batch) == [2, 1]
+
+
+def test_evaluator_file_conditions():
+    files = FileTable([
+        FileInfo("/data/a.log", 1000),
+        FileInfo("/data/sub/b.db", 10**6),
+        FileInfo("/other/c.log", None),
+        FileInfo("/data", kind="dir"),
+    ])
+    batch = TraceBatch(files, NameTable(), file=[0, 1, 2, 3, -1, 0],
+                       direct=[False] * 5 + [True])
+
+    assert classify(get_config("extension:log"), batch) == [1, 0, 1, 0, 0, 0]
+    assert classify(get_config("directory:/data/"), batch) == [1, 1, 0, 0, 0, 0]
+    # Size of files missing in metadata is unknown
+    assert classify(get_config("file_size:lt:2000"), batch) == [1, 0, 0, 0, 0, 0]
+    assert classify(get_config("file_name_prefix:b"), batch) == [0, 1, 0, 0, 0, 0]
+    assert classify(get_config("metadata"), batch) == [0, 0, 0, 1, 0, 0]
+
+
+def test_evaluator_file_table_grows():
+    files = FileTable([FileInfo("/a.log")])
+    evaluator = IoClassEvaluator(get_config("extension:log"))
+
+    assert list(evaluator.classify(TraceBatch(files, NameTable(), file=[0]))) == [1]
+    files.lookup("/b.log")
+    assert list(evaluator.classify(TraceBatch(files, NameTable(), file=[1, 0]))) == [1, 1]
+
+
+def test_evaluator_process_and_core():
+    processes = NameTable()
+    fio = processes.add("fio")
+    batch = TraceBatch(FileTable(), processes, process=[fio, -1, fio], core_id=[1, 1, -1])
+
+    assert classify(get_config("process_name:fio"), batch) == [1, 0, 1]
+    assert classify(get_config("core_id:1"), batch) == [1, 1, 0]
+
+
+def test_report():
+    config = get_config("io_direction:write")
+    batch = TraceBatch(FileTable(), NameTable(), lba=[0, 8, 0], lba_valid=[True] * 3,
+                       size=[8192, 4096, 4096], write=[True, True, False])
+    report = IoClassReport(config, cache_line_size=4096, cache_size=4096)
+
+    report.add(batch, IoClassEvaluator(config).classify(batch))
+
+    rows = {row["id"]: row for row in report.rows()}
+    assert rows[1]["requests"] == 2
+    assert rows[1]["bytes"] == 12288
+    assert rows[1]["request_share"] == pytest.approx(2 / 3)
+    # Lines 0, 1 (write) and line 0 again (read) - footprints are per class
+    assert rows[1]["footprint"] == 8192
+    assert rows[0]["footprint"] == 4096
+    # Capped by cache size and scaled down to fit together
+    assert rows[0]["occupancy"] + rows[1]["occupancy"] <= 4096
+
+
+def test_blkparse_reader(tmp_path):
+    trace = tmp_path / "trace.txt"
+    trace.write_text(
+        "  8,16   1        1     0.000000000  1234  Q   W 2048 + 8 [fio]\n"
+        "  8,16   1        2     0.000001000  1234  G   W 2048 + 8 [fio]\n"
+        "  8,16   1        3     0.000002000    99  Q  RM 16 + 1 [a-very-long-process-name]\n"
+        "  8,16   1        4     0.000003000  1234  Q  FN [fio]\n"
+        "  8,32   1        5     0.000004000  1234  Q   R 64 + 16 [fio]\n"
+        "CPU1 (8,16):\n"
+    )
+    files = FileTable([FileInfo("/data/a.log")])
+    extents = ExtentMap(files, [(0, 2048, 16, 4096)])
+
+    batches = list(BlkparseReader(str(trace), files, extents, chunk_size=2,
+                                  core_ids={(8, 16): 1}))
+
+    assert [len(batch) for batch in batches] == [2, 1]
+    first, second = batches
+    assert list(first.lba) == [2048, 16]
+    assert list(first.size) == [4096, 512]
+    assert list(first.write) == [True, False]
+    assert list(first.metadata) == [False, True]
+    assert list(first.core_id) == [1, 1]
+    assert list(second.core_id) == [-1]
+    assert [first.processes[p] for p in first.process] == ["fio", "a-very-long-pro"]
+    assert list(first.file) == [0, -1]
+    assert list(first.file_offset) == [4096, 0]
+
+
+def test_fio_iolog_reader(tmp_path):
+    trace = tmp_path / "iolog"
+    trace.write_text(
+        "fio version 3 iolog\n"
+        "0 /dev/sdb add\n"
+        "1 /dev/sdb open\n"
+        "2 /dev/sdb write 4096 8192\n"
+        "3 /mnt/a.log read 512 4096\n"
+        "4 /dev/sdb close\n"
+    )
+    files = FileTable()
+
+    (batch,) = FioIologReader(str(trace), files, pid=7, process_name="fio", direct=True)
+
+    assert list(batch.lba) == [8, 0]
+    assert list(batch.lba_valid) == [True, False]
+    assert list(batch.write) == [True, False]
+    assert list(batch.file) == [-1, 0]
+    assert files[0].path == "/mnt/a.log"
+    assert list(batch.file_offset) == [0, 512]
+    assert list(batch.pid) == [7, 7]
+    assert [batch.processes[p] for p in batch.process] == ["fio", "fio"]
+    assert batch.direct.all()
+
+
+def test_fio_iolog_reader_extents(tmp_path):
+    trace = tmp_path / "iolog"
+    trace.write_text("fio version 2 iolog\n/mnt/a.log read 4608 512\n/mnt/a.log read 0 512\n")
+    files = FileTable([FileInfo("/mnt/a.log")])
+    extents = ExtentMap(files, [(0, 100, 16, 4096)])
+
+    (batch,) = FioIologReader(str(trace), files, extents)
+
+    assert list(batch.lba_valid) == [True, False]
+    assert batch.lba[0] == 101
+
+
+def test_fio_iolog_reader_invalid(tmp_path):
+    trace = tmp_path / "iolog"
+    trace.write_text("fio version 1 iolog\n")
+
+    with pytest.raises(ValueError, match="not fio iolog"):
+        list(FioIologReader(str(trace)))
+
+
+def test_extent_map_round_trip():
+    files = FileTable([FileInfo("/a"), FileInfo("/b")])
+    extents = ExtentMap(files, [(1, 0, 8, 0), (0, 100, 8, 4096), (0, 8, 8, 0)])
+
+    file, file_offset = extents.locate(np.array([0, 9, 103, 200], dtype=np.uint64))
+
+    assert list(file) == [1, 0, 0, -1]
+    assert list(file_offset) == [0, 512, 4096 + 3 * 512, 0]
+    lba, valid = extents.to_lba(file, file_offset)
+    assert list(valid) == [True, True, True, False]
+    assert list(lba[valid]) == [0, 9, 103]
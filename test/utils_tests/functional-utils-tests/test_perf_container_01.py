@@ -0,0 +1,184 @@
+#
+# Copyright(c) 2025 Huawei Technologies
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import io
+import json
+import unittest.mock as mock
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from schema import SchemaError
+
+from utils.performance import (
+    ConfigParameter,
+    FioJobsMetrics,
+    IOMetric,
+    LatencyHistogram,
+    MetricContainer,
+    PerfContainer,
+    WorkloadParameter,
+    iter_fio_jobs,
+)
+
+
+def get_direction(iops, clat_mean, total_ios, percentile=None, bins=None):
+    clat_ns = {"mean": clat_mean}
+    if percentile is not None:
+        clat_ns["percentile"] = percentile
+    if bins is not None:
+        clat_ns["bins"] = bins
+    return {"iops": iops, "bw": iops * 4, "total_ios": total_ios, "clat_ns": clat_ns}
+
+
+def get_job(name, read, write=None):
+    return {"jobname": name, "read": read, "write": write or get_direction(0, 0, 0)}
+
+
+def get_fio_output(jobs):
+    return json.dumps({"fio version": "fio-3.30", "global options": {}, "jobs": jobs})
+
+
+def test_insert_metrics_batch():
+    container = MetricContainer(WorkloadParameter)
+
+    container.insert_metrics(
+        {WorkloadParameter.NUM_JOBS: "4", WorkloadParameter.READ_WRITE: "randread"}
+    )
+
+    assert container.metrics == {
+        WorkloadParameter.NUM_JOBS: 4,
+        WorkloadParameter.READ_WRITE: "randread",
+    }
+
+
+def test_insert_metrics_invalid_kind():
+    container = MetricContainer(WorkloadParameter)
+
+    with pytest.raises(Exception, match="Invalid metric type"):
+        container.insert_metrics({WorkloadParameter.NUM_JOBS: 1, IOMetric.read_IOPS: 1})
+
+    assert container.is_empty
+
+
+def test_insert_metrics_invalid_value():
+    container = MetricContainer(ConfigParameter)
+
+    with pytest.raises(SchemaError):
+        container.insert_metrics(
+            {ConfigParameter.TEST_NAME: "test", ConfigParameter.BUILD_TYPE: "nightly"}
+        )
+
+    # Nothing is inserted when any of the values is invalid
+    assert container.is_empty
+
+
+def test_insert_metrics_schema_built_once():
+    container = MetricContainer(WorkloadParameter)
+
+    container.insert_metrics({WorkloadParameter.NUM_JOBS: 1})
+    schema = container.batch_schema
+    container.insert_metrics({WorkloadParameter.QUEUE_DEPTH: 16})
+
+    assert container.batch_schema is schema
+    assert container.metrics == {WorkloadParameter.NUM_JOBS: 1, WorkloadParameter.QUEUE_DEPTH: 16}
+
+
+def test_insert_config_params():
+    container = PerfContainer()
+    timestamp = datetime(2025, 1, 1)
+
+    container.insert_config_params(
+        {ConfigParameter.TEST_NAME: "test", ConfigParameter.TIMESTAMP: timestamp}
+    )
+
+    assert container.conf_params.metrics == {
+        ConfigParameter.TEST_NAME: "test",
+        ConfigParameter.TIMESTAMP: str(timestamp),
+    }
+
+
+def test_iter_fio_jobs_chunked():
+    jobs = [get_job(f"job{i}", get_direction(i, 100, 10)) for i in range(5)]
+    output = "fio: warning before json\n" + get_fio_output(jobs)
+
+    assert list(iter_fio_jobs(output)) == jobs
+    assert list(iter_fio_jobs(io.StringIO(output), chunk_size=7)) == jobs
+    assert list(iter_fio_jobs(io.BytesIO(output.encode()), chunk_size=7)) == jobs
+
+
+def test_iter_fio_jobs_invalid():
+    with pytest.raises(ValueError, match="No jobs"):
+        list(iter_fio_jobs(io.StringIO('{"fio version": "fio-3.30"}'), chunk_size=4))
+    with pytest.raises(ValueError, match="Unterminated"):
+        list(iter_fio_jobs(io.StringIO('{"jobs": [{"jobname": "a"}, '), chunk_size=4))
+
+
+def test_fio_jobs_metrics_aggregate():
+    jobs = FioJobsMetrics.from_json(
+        get_fio_output(
+            [
+                get_job("a", get_direction(100, 1000, 300, {"50.000000": 900}, {"129": 2})),
+                get_job("b", get_direction(300, 2000, 100, {"50.000000": 1900}, {"290": 2})),
+            ]
+        ),
+        chunk_size=16,
+    )
+
+    metrics = jobs.aggregate()
+
+    assert len(jobs) == 2
+    assert jobs.job_names == ["a", "b"]
+    assert list(jobs.per_job(IOMetric.read_IOPS)) == [100, 300]
+    assert metrics[IOMetric.read_IOPS] == 400
+    assert metrics[IOMetric.read_BW] == 1600
+    # Weighted by number of I/Os of each job
+    assert metrics[IOMetric.read_CLAT_AVG] == 1250
+    # Percentiles of many jobs come from merged histogram
+    assert metrics[IOMetric.read_CLAT_HISTOGRAM] == LatencyHistogram({128: 2, 200: 2})
+    assert metrics[IOMetric.read_CLAT_PERCENTILES] == {"50.000000": 129}
+    assert IOMetric.write_CLAT_PERCENTILES not in metrics
+
+
+def test_fio_jobs_metrics_aggregate_no_bins():
+    jobs = FioJobsMetrics()
+    jobs.add_job(get_job("a", get_direction(100, 1000, 300, {"50.000000": 900})))
+    jobs.add_job(get_job("b", get_direction(300, 2000, 100, {"50.000000": 1900})))
+
+    metrics = jobs.aggregate()
+
+    # Percentiles of separate jobs can't be merged without histograms
+    assert IOMetric.read_CLAT_PERCENTILES not in metrics
+    assert IOMetric.read_CLAT_HISTOGRAM not in metrics
+    assert list(jobs.per_job_percentiles("read")["50.000000"]) == [900, 1900]
+
+
+def test_fio_jobs_metrics_aggregate_single_job():
+    jobs = FioJobsMetrics()
+    jobs.add_job(get_job("a", get_direction(100, 1000, 300, {"99.000000": 900, "100.000000": 1})))
+
+    metrics = jobs.aggregate()
+
+    assert metrics[IOMetric.read_CLAT_PERCENTILES] == {"99.000000": 900}
+
+
+def test_insert_metrics_from_fio_result():
+    job = json.loads(
+        json.dumps(get_job("a", get_direction(100, 1000, 300, {"99.000000": 900}, {"129": 2}))),
+        object_hook=lambda d: SimpleNamespace(**d),
+    )
+    container = PerfContainer()
+
+    with mock.patch.object(
+        container.exp_obj_metrics, "insert_metric", side_effect=AssertionError
+    ):
+        jobs = container.insert_exp_obj_metrics_from_fio_job(SimpleNamespace(job=job))
+
+    metrics = container.exp_obj_metrics.to_serializable_dict()
+    assert len(jobs) == 1
+    assert metrics["read_IOPS"] == 100
+    assert metrics["read_CLAT_AVG"] == 1000
+    assert metrics["read_CLAT_PERCENTILES"] == {"p99": 900}
+    assert metrics["read_CLAT_HISTOGRAM"]["counts"] == [2]
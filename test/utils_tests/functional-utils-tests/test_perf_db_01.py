@@ -0,0 +1,200 @@
+#
+# Copyright(c) 2025 Huawei Technologies
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import argparse
+
+import pytest
+
+from utils.perf_db import PerfDatabase, ScalingFit, main, parse_size, permutation_test
+
+
+def get_perf(version, iops, timestamp, dut="dut"):
+    return {
+        "TEST_NAME": "test_4k_100p_hit_reads_wt",
+        "CAS_VERSION": version,
+        "CACHE_CONFIG": {"cache_mode": "wt"},
+        "CACHE_TYPE": "nand",
+        "CORE_TYPE": "hdd",
+        "BUILD_TYPE": "release",
+        "DUT": dut,
+        "TIMESTAMP": timestamp,
+        "workload_params": {"queue_depth": 16},
+        "exp_obj_io": {
+            "read_IOPS": iops,
+            "read_CLAT_AVG": 100,
+            "read_CLAT_PERCENTILES": {"p99": 200},
+        },
+    }
+
+
+def get_management_perf(cache_size, load_time, cache_mode="wb"):
+    return {
+        "TEST_NAME": "test_cache_management_time",
+        "CAS_VERSION": "1.0",
+        "CACHE_CONFIG": {"cache_mode": cache_mode},
+        "BUILD_TYPE": "release",
+        "DUT": "dut",
+        "TIMESTAMP": f"t{cache_size}{cache_mode}",
+        "workload_params": {"CACHE_SIZE": cache_size},
+        "management": {"LOAD_TIME_US": load_time, "START_TIME_US": 1000},
+    }
+
+
+@pytest.fixture
+def perf_db():
+    with PerfDatabase(":memory:") as db:
+        yield db
+
+
+def test_perf_db_ingest(perf_db):
+    assert perf_db.ingest(get_perf("1.0", 1000, "t1"))
+    assert not perf_db.ingest(get_perf("1.0", 1000, "t1"))
+    assert perf_db.ingest(get_perf("1.0", 1100, "t2"))
+
+    assert perf_db.versions() == [("1.0", 2)]
+    results = perf_db.results("1.0")
+    metrics = {key[-1]: sorted(values) for key, values in results.items()}
+    assert metrics == {
+        "read_IOPS": [1000, 1100],
+        "read_CLAT_AVG": [100, 100],
+        "read_CLAT_PERCENTILES.p99": [200, 200],
+    }
+
+
+def test_perf_db_compare_regression(perf_db):
+    for i, iops in enumerate([1000, 1010, 990, 1005]):
+        perf_db.ingest(get_perf("1.0", iops, f"a{i}"))
+    for i, iops in enumerate([800, 810, 790, 805]):
+        perf_db.ingest(get_perf("2.0", iops, f"b{i}"))
+
+    regressions = perf_db.compare("1.0", "2.0")
+
+    assert [r.metric for r in regressions] == ["read_IOPS"]
+    assert regressions[0].significant
+    assert regressions[0].p_value < 0.05
+    assert regressions[0].change == pytest.approx(-0.2, abs=0.01)
+
+
+def test_perf_db_compare_no_regression(perf_db):
+    for i, iops in enumerate([1000, 1010, 990]):
+        perf_db.ingest(get_perf("1.0", iops, f"a{i}"))
+        perf_db.ingest(get_perf("2.0", iops + 5, f"b{i}"))
+
+    assert perf_db.compare("1.0", "2.0") == []
+
+
+def test_perf_db_compare_too_few_runs(perf_db):
+    perf_db.ingest(get_perf("1.0", 1000, "a"))
+    perf_db.ingest(get_perf("2.0", 500, "b"))
+    perf_db.ingest(get_perf("2.0", 510, "c"))
+
+    regressions = perf_db.compare("1.0", "2.0")
+
+    assert [r.metric for r in regressions] == ["read_IOPS"]
+    assert not regressions[0].significant
+    assert "p=n/a" in str(regressions[0])
+
+
+def test_perf_db_cli_too_few_runs(tmp_path, capsys):
+    path = str(tmp_path / "perf.db")
+    with PerfDatabase(path) as db:
+        db.ingest(get_perf("1.0", 1000, "a"))
+        db.ingest(get_perf("2.0", 500, "b"))
+
+    assert main([path, "compare", "--baseline", "1.0", "--candidate", "2.0"]) == 0
+    out = capsys.readouterr().out
+    assert "Not tested for significance" in out
+    assert "0 regression(s) found, 1 change(s) with too few runs" in out
+
+
+def test_permutation_test_exact():
+    # Candidate is lower in every run, only 1 of 20 splits is as extreme
+    assert permutation_test([10, 11, 12], [1, 2, 3]) == pytest.approx(1 / 20)
+    # No difference, every split is as extreme
+    assert permutation_test([5, 5], [5, 5]) == 1
+
+
+def test_permutation_test_sampled():
+    p_value = permutation_test(list(range(100, 120)), list(range(20)), rounds=1000)
+
+    assert p_value < 0.01
+
+
+def test_permutation_test_too_few_values():
+    with pytest.raises(ValueError):
+        permutation_test([1], [2, 3])
+
+
+def test_scaling_fit_linear():
+    fit = ScalingFit([(4096, 1124), (1024, 356), (2048, 612)])
+
+    assert fit.slope == pytest.approx(0.25)
+    assert fit.intercept == pytest.approx(100)
+    assert fit.predict(8192) == pytest.approx(2148)
+    assert fit.points[0] == (1024, 356)
+
+
+def test_scaling_fit_power():
+    fit = ScalingFit([(size, 3 * size**1.5) for size in [16, 64, 256, 1024]])
+
+    assert fit.exponent == pytest.approx(1.5)
+    assert fit.coefficient == pytest.approx(3)
+    assert fit.predict_power(4096) == pytest.approx(3 * 4096**1.5)
+
+
+def test_scaling_fit_invalid():
+    with pytest.raises(ValueError):
+        ScalingFit([(1024, 1), (1024, 2)])
+    # Power law can't be fit to non-positive values
+    assert ScalingFit([(0, 1), (1024, 2)]).predict_power(2048) is None
+
+
+@pytest.mark.parametrize(
+    "size, mib",
+    [("512", 512), ("1.5G", 1536), ("4TiB", 4 * 1024**2), ("7.68TB", 7.68e12 / 1024**2),
+     ("100 mb", 100e6 / 1024**2)],
+)
+def test_parse_size(size, mib):
+    assert parse_size(size) == pytest.approx(mib)
+
+
+@pytest.mark.parametrize("size", ["", "1.5X", "-1G", "G"])
+def test_parse_size_invalid(size):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_size(size)
+
+
+def test_perf_db_scaling_points(perf_db):
+    for cache_size, load_time in [(1024, 500), (2048, 700)]:
+        perf_db.ingest(get_management_perf(cache_size, load_time))
+    perf_db.ingest(get_management_perf(1024, 300, cache_mode="wt"))
+    perf_db.ingest(get_perf("1.0", 1000, "t1"))
+
+    points = perf_db.scaling_points("LOAD_TIME_US")
+
+    assert {config: sorted(values) for config, values in points.items()} == {
+        ("test_cache_management_time", '{"cache_mode": "wb"}'): [(1024, 500), (2048, 700)],
+        ("test_cache_management_time", '{"cache_mode": "wt"}'): [(1024, 300)],
+    }
+    assert perf_db.scaling_points("LOAD_TIME_US", cas_version="2.0") == {}
+
+
+def test_perf_db_cli_scaling(tmp_path, capsys):
+    path = str(tmp_path / "perf.db")
+    with PerfDatabase(path) as db:
+        for cache_size, load_time in [(1024, 356), (2048, 612), (4096, 1124)]:
+            db.ingest(get_management_perf(cache_size, load_time))
+        db.ingest(get_management_perf(1024, 300, cache_mode="wt"))
+
+    assert main([path, "scaling", "--metric", "LOAD_TIME_US", "--predict-size", "8GiB"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert out[0] == 'test_cache_management_time {"cache_mode": "wb"}:'
+    assert out[1] == "  linear: 100 + 0.25 * size[MiB]"
+    assert out[2].startswith("  power: ")
+    assert out[3].startswith("  predicted for 8192 MiB: 2148 (linear), ")
+    assert out[4:] == [
+        'test_cache_management_time {"cache_mode": "wt"}:',
+        "  At least two different cache sizes are needed to fit scaling",
+    ]
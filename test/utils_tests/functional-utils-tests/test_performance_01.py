@@ -0,0 +1,97 @@
+#
+# Copyright(c) 2025 Huawei Technologies
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import pytest
+
+from utils.performance import LatencyHistogram
+
+
+def test_latency_histogram_index_to_value():
+    # Same values as fio's plat_idx_to_val() with FIO_IO_U_PLAT_BITS = 6
+    assert LatencyHistogram.index_to_value(0) == 0
+    assert LatencyHistogram.index_to_value(127) == 127
+    assert LatencyHistogram.index_to_value(128) == 129
+    assert LatencyHistogram.index_to_value(200) == 290
+    assert LatencyHistogram.index_to_value(LatencyHistogram.NR - 1) == 17112760320
+
+
+def test_latency_histogram_value_to_index():
+    assert LatencyHistogram.value_to_index(127) == 127
+    assert LatencyHistogram.value_to_index(128) == 128
+    assert LatencyHistogram.value_to_index(129) == 128
+    assert LatencyHistogram.value_to_index(290) == 200
+    # Values beyond the last bucket are counted in it
+    assert LatencyHistogram.value_to_index(1 << 62) == LatencyHistogram.NR - 1
+
+
+def test_latency_histogram_index_round_trip():
+    for index in range(LatencyHistogram.NR):
+        value = LatencyHistogram.index_to_value(index)
+        assert LatencyHistogram.value_to_index(value) == index
+
+
+def test_latency_histogram_from_fio_bins():
+    histogram = LatencyHistogram.from_fio_bins({"129": 2, "290": 3, "1000": 0})
+
+    assert histogram.counts == {128: 2, 200: 3}
+    assert histogram.total == 5
+
+
+def test_latency_histogram_from_fio_hist_log():
+    lines = ["100, 0, 4096, 1, 0, 2", "100, 1, 4096, 5, 0, 0", "200, 0, 4096, 0, 1, 0"]
+
+    assert LatencyHistogram.from_fio_hist_log(lines, direction=0).counts == {0: 1, 1: 1, 2: 2}
+    assert LatencyHistogram.from_fio_hist_log(lines).counts == {0: 6, 1: 1, 2: 2}
+    assert LatencyHistogram.from_fio_hist_log(lines, coarseness=2).counts == {0: 6, 4: 1, 8: 2}
+
+
+def test_latency_histogram_merge():
+    first = LatencyHistogram({1: 1, 200: 2})
+    second = LatencyHistogram({200: 3, 300: 4})
+
+    merged = LatencyHistogram.merge([first, second])
+
+    assert merged.counts == {1: 1, 200: 5, 300: 4}
+    assert first + second == merged
+    # Merged histograms are left intact
+    assert first.counts == {1: 1, 200: 2}
+    assert LatencyHistogram.merge([]).total == 0
+
+
+def test_latency_histogram_quantile():
+    histogram = LatencyHistogram({index: 1 for index in range(100)})
+
+    assert histogram.quantile(0) == 0
+    assert histogram.quantile(0.5) == 49
+    assert histogram.quantile(0.99) == 98
+    assert histogram.quantile(1) == 99
+    percentiles = histogram.percentiles((0.5, 0.99))
+    assert {str(k): v for k, v in percentiles.items()} == {"p50": 49, "p99": 98}
+    with pytest.raises(ValueError):
+        histogram.quantile(1.5)
+    with pytest.raises(ValueError):
+        LatencyHistogram().quantile(0.5)
+
+
+def test_latency_histogram_compare_tails():
+    baseline = LatencyHistogram({100: 495, 200: 5})
+    candidate = LatencyHistogram({100: 490, 300: 10})
+
+    tails = baseline.compare_tails(candidate)
+
+    # p99.9 and p99.99 are beyond resolution of 500 samples
+    assert [str(percentile) for percentile in tails] == ["p99"]
+    assert list(tails.values()) == [(100, 868, 8.68)]
+
+
+def test_latency_histogram_serialization():
+    histogram = LatencyHistogram({300: 4, 1: 1})
+
+    serialized = histogram.to_serializable_dict()
+
+    assert serialized == {"bits": 6, "indices": [1, 300], "counts": [1, 4]}
+    assert LatencyHistogram.from_serializable_dict(serialized) == histogram
+    with pytest.raises(ValueError):
+        LatencyHistogram.from_serializable_dict({**serialized, "bits": 5})
@@ -0,0 +1,386 @@
+#
+# Copyright(c) 2025 Huawei Technologies
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import json
+import pytest
+import unittest.mock as mock
+from datetime import timedelta
+
+# api.cas needs test-framework submodule
+pytest.importorskip("api.cas.casadm")
+statistics = pytest.importorskip("api.cas.statistics")
+from api.cas.cache import Cache
+import numpy as np
+from type_def.size import Size, Unit
+
+CACHE_CONFIG_JSON = """{"records": [{
+    "Cache Id": [{"value": 1, "unit": null}],
+    "Cache Size": [{"value": 2490368, "unit": "4KiB Blocks"},
+                   {"value": 9.50, "unit": "GiB"}],
+    "Cache Device": [{"value": "/dev/nvme0n1", "unit": null}],
+    "Exported Object": [{"value": "-", "unit": null}],
+    "Core Devices": [{"value": 1, "unit": null}],
+    "Inactive Core Devices": [{"value": 0, "unit": null}],
+    "Write Policy": [{"value": "wb", "unit": null}],
+    "Cleaning Policy": [{"value": "alru", "unit": null}],
+    "Promotion Policy": [{"value": "always", "unit": null}],
+    "Cache line size": [{"value": 4, "unit": "KiB"}],
+    "Metadata Memory Footprint": [{"value": 123.4, "unit": "MiB"}],
+    "Dirty for": [{"value": 123, "unit": "s"},
+                  {"value": "2 [m] 3 [s]", "unit": null}],
+    "Status": [{"value": "Running", "unit": null}],
+    "Usage statistics": [
+        {"Usage statistics": "Occupancy", "Count": 10, "%": 0.5, "unit": "4KiB Blocks"},
+        {"Usage statistics": "Dirty", "Count": 0, "%": 0.0, "unit": "4KiB Blocks"}
+    ]
+}]}"""
+
+
+@mock.patch("api.cas.casadm.print_statistics")
+def test_get_stats_dict_dirty_for(mock_print):
+    mock_print.return_value.stdout = CACHE_CONFIG_JSON
+
+    stats_dict = statistics.get_stats_dict(
+        filter=[statistics.StatsFilter.conf], cache_id=1
+    )
+
+    assert stats_dict["Dirty for [s]"] == "123"
+    assert stats_dict["Dirty for"] == "2 [m] 3 [s]"
+
+    config_stats = statistics.CacheConfigStats(stats_dict)
+
+    assert config_stats.dirty_for == timedelta(seconds=123)
+    assert config_stats.cache_id == 1
+
+
+@mock.patch("api.cas.casadm.print_statistics")
+def test_get_stats_dict_textual_values(mock_print):
+    mock_print.return_value.stdout = CACHE_CONFIG_JSON
+
+    stats_dict = statistics.get_stats_dict(
+        filter=[statistics.StatsFilter.conf], cache_id=1
+    )
+
+    assert stats_dict["Cache Size [GiB]"] == "9.50"
+    assert stats_dict["Occupancy [4KiB Blocks]"] == "10"
+    assert stats_dict["Occupancy [%]"] == "0.5"
+
+
+CACHE_USAGE_JSON = """{"records": [{
+    "Usage statistics": [
+        {"Usage statistics": "Occupancy", "Count": 10, "%": 0.5, "unit": "4KiB Blocks"},
+        {"Usage statistics": "Free", "Count": 20, "%": 1.0, "unit": "4KiB Blocks"},
+        {"Usage statistics": "Clean", "Count": 6, "%": 60.0, "unit": "4KiB Blocks"},
+        {"Usage statistics": "Dirty", "Count": 4, "%": 40.0, "unit": "4KiB Blocks"}
+    ]
+}]}"""
+
+
+@mock.patch("api.cas.casadm.print_statistics")
+def test_cache_stats_reused_within_ttl(mock_print):
+    mock_print.return_value.stdout = CACHE_USAGE_JSON
+    cache = Cache(1, device=mock.Mock())
+    cache.stats_ttl = timedelta(minutes=1)
+
+    assert cache.get_dirty_blocks() == Size(4, Unit.Blocks4096)
+    assert cache.get_clean_blocks() == Size(6, Unit.Blocks4096)
+
+    mock_print.assert_called_once()
+    assert mock_print.call_args.kwargs["filter"] == [statistics.StatsFilter.usage]
+
+
+@mock.patch("api.cas.casadm.reset_counters")
+@mock.patch("api.cas.casadm.print_statistics")
+def test_cache_stats_invalidated_by_command(mock_print, mock_reset):
+    mock_print.return_value.stdout = CACHE_USAGE_JSON
+    cache = Cache(1, device=mock.Mock())
+    cache.stats_ttl = None
+
+    cache.get_dirty_blocks()
+    cache.get_dirty_blocks()
+    assert mock_print.call_count == 1
+
+    cache.reset_counters()
+    cache.get_dirty_blocks()
+
+    mock_reset.assert_called_once_with(1)
+    assert mock_print.call_count == 2
+
+
+@mock.patch("api.cas.casadm.print_statistics")
+def test_cache_stats_zero_ttl(mock_print):
+    mock_print.return_value.stdout = CACHE_USAGE_JSON
+    cache = Cache(1, device=mock.Mock())
+
+    # Default ttl keeps fetching statistics on every call
+    assert Cache.stats_ttl == timedelta(0)
+    cache.get_dirty_blocks()
+    cache.get_dirty_blocks()
+
+    assert mock_print.call_count == 2
+
+
+def test_flatten_record_keeps_first_value_of_unit():
+    record = {
+        "Dirty for": [
+            {"value": "0", "unit": "s"},
+            {"value": "Cache clean", "unit": None},
+            {"value": "5", "unit": "s"},
+        ]
+    }
+
+    stats_dict = statistics._flatten_record(record)
+
+    assert stats_dict == {"Dirty for [s]": "0", "Dirty for": "Cache clean"}
+
+
+def get_all_stats_output(cache_id):
+    record = {
+        "Target Cache Id": [{"value": cache_id, "unit": None}],
+        "Target Core Id": [{"value": "-", "unit": None}],
+        "Target IO class Id": [{"value": "-", "unit": None}],
+        "Occupancy": [{"value": 10 * cache_id, "unit": "4KiB Blocks"}],
+    }
+    return mock.Mock(stdout=json.dumps({"records": [record]}))
+
+
+@mock.patch("api.cas.casadm_parser.get_cas_devices_dict")
+@mock.patch("api.cas.casadm.print_statistics_all")
+def test_get_all_stats_cache_stopped(mock_print, mock_devices):
+    def print_statistics_all(cache_id, **kwargs):
+        if cache_id in (None, 2):
+            raise statistics.CmdException("Printing statistics failed.", mock.Mock())
+        return get_all_stats_output(cache_id)
+
+    mock_print.side_effect = print_statistics_all
+    mock_devices.side_effect = [{"caches": {1: {}, 2: {}, 3: {}}}, {"caches": {1: {}, 3: {}}}]
+
+    stats = statistics.get_all_stats()
+
+    # Cache 2 stopped during bulk query and is skipped
+    assert list(stats["caches"]["cache_id"]) == [1, 3]
+    assert list(stats["caches"]["Occupancy [4KiB Blocks]"]) == [10, 30]
+    assert len(stats["cores"]) == 0
+
+
+@mock.patch("api.cas.casadm_parser.get_cas_devices_dict")
+@mock.patch("api.cas.casadm.print_statistics_all")
+def test_get_all_stats_failure(mock_print, mock_devices):
+    mock_print.side_effect = statistics.CmdException("Printing statistics failed.", mock.Mock())
+    mock_devices.return_value = {"caches": {1: {}}}
+
+    # Failure of still running cache isn't hidden
+    with pytest.raises(statistics.CmdException):
+        statistics.get_all_stats()
+
+
+def get_table():
+    return statistics.StatsTable.from_dicts(
+        [
+            {"Occupancy [4KiB Blocks]": "256", "Read hits [Requests]": "10", "Status": "Running"},
+            {"Occupancy [4KiB Blocks]": "512", "Read hits [Requests]": "20"},
+        ]
+    )
+
+
+def test_stats_table_from_dicts():
+    table = get_table()
+
+    assert len(table) == 2
+    assert table.keys() == ["Occupancy [4KiB Blocks]", "Read hits [Requests]", "Status"]
+    assert table["Read hits [Requests]"].dtype == np.int64
+    assert table["Occupancy [4KiB Blocks]"].dtype == np.float64
+    assert list(table["Status"]) == ["Running", None]
+
+
+def test_stats_table_units():
+    table = get_table()
+
+    assert table.unit("Occupancy [4KiB Blocks]") == statistics.UnitType.block_4k
+    assert table.unit("Read hits [Requests]") == statistics.UnitType.requests
+    assert table.unit("Status") is None
+    assert list(table.column("Occupancy [4KiB Blocks]", Unit.MebiByte)) == [1.0, 2.0]
+    with pytest.raises(ValueError):
+        table.column("Read hits [Requests]", Unit.MebiByte)
+
+
+def test_stats_table_missing_values():
+    table = statistics.StatsTable.from_dicts(
+        [{"Read hits [Requests]": "1"}, {"Dirty [4KiB Blocks]": "2"}]
+    )
+
+    # Requests with missing values can't be int64
+    assert np.isnan(table["Read hits [Requests]"][1])
+    assert table.row(0) == {"Read hits [Requests]": 1.0}
+    assert table.row(1) == {"Dirty [4KiB Blocks]": 2.0}
+
+
+def test_stats_table_row_and_value():
+    table = get_table()
+
+    assert table.row(-1) == {"Occupancy [4KiB Blocks]": 512.0, "Read hits [Requests]": 20}
+    assert table.value("Occupancy [4KiB Blocks]", 0) == Size(256, Unit.Blocks4096)
+    assert table.value("Status", 0) == "Running"
+    with pytest.raises(IndexError):
+        table.row(2)
+
+
+def test_stats_table_concat_and_select():
+    table = statistics.StatsTable.concat(
+        [get_table(), statistics.StatsTable.from_dicts([{"Dirty [4KiB Blocks]": "1"}])]
+    )
+
+    assert len(table) == 3
+    assert np.isnan(table["Occupancy [4KiB Blocks]"][2])
+    assert np.isnan(table["Dirty [4KiB Blocks]"][0])
+
+    selected = table.select(table["Read hits [Requests]"] > 15)
+
+    assert len(selected) == 1
+    assert selected.row(0) == {"Occupancy [4KiB Blocks]": 512.0, "Read hits [Requests]": 20.0}
+
+
+def get_sample(serviced, read_hits, read_total, dirty, core_writes):
+    return {
+        "Serviced requests [Requests]": serviced,
+        "Read hits [Requests]": read_hits,
+        "Write hits [Requests]": 0,
+        "Read total [Requests]": read_total,
+        "Write total [Requests]": 0,
+        "Occupancy [%]": 50.0,
+        "Dirty [4KiB Blocks]": dirty,
+        "Writes to core [4KiB Blocks]": core_writes,
+        "Write Policy": "wb",
+    }
+
+
+@mock.patch("api.cas.statistics.time.monotonic")
+@mock.patch("api.cas.statistics.get_stats_dict")
+def test_stats_sampler(mock_stats, mock_time):
+    mock_stats.side_effect = [
+        get_sample(100, 10, 20, 0, 0),
+        get_sample(300, 40, 60, 256, 0),
+        # Counters were reset
+        get_sample(50, 0, 0, 0, 512),
+    ]
+    mock_time.side_effect = [0.0, 2.0, 4.0]
+    sampler = statistics.StatsSampler(cache_id=1, core_id=1)
+
+    for _ in range(3):
+        sampler.sample()
+
+    assert len(sampler) == 3
+    assert "Write Policy" not in sampler.table
+    deltas = sampler.deltas()
+    assert len(deltas) == 2
+    assert list(deltas["Interval [s]"]) == [2.0, 2.0]
+    assert "Occupancy [%]" not in deltas
+    assert deltas["Serviced requests [Requests]"][0] == 200
+    assert np.isnan(deltas["Serviced requests [Requests]"][1])
+    # Dirty data may go down, it isn't a counter
+    assert list(deltas["Dirty [4KiB Blocks]"]) == [256, -256]
+
+    rates = sampler.rates()
+    assert rates["iops"][0] == 100
+    assert np.isnan(rates["iops"][1])
+    assert rates["hit_ratio"][0] == 0.75
+    assert np.isnan(rates["hit_ratio"][1])
+    assert list(rates["dirty_growth"]) == [128 * 4096, -128 * 4096]
+    assert list(rates["cleaner_throughput"]) == [0, 256 * 4096]
+
+
+def test_stats_sampler_missing_stats():
+    sampler = statistics.StatsSampler(cache_id=1, filter=[statistics.StatsFilter.usage])
+
+    with mock.patch("api.cas.statistics.get_stats_dict", return_value={"Dirty [4KiB Blocks]": 1}):
+        sampler.sample()
+        sampler.sample()
+
+    rates = sampler.rates()
+    assert np.isnan(rates["iops"][0])
+    assert np.isnan(rates["hit_ratio"][0])
+    assert rates["dirty_growth"][0] == 0
+
+
+def get_stats_dict(names, units, value):
+    return {f"{name} {unit}": str(value) for name in names for unit in units}
+
+
+def get_request_stats_dict(value):
+    names = [
+        f"{operation} {stat}"
+        for operation in statistics.OperationType
+        for stat in ["hits", "partial misses", "full misses", "total"]
+    ]
+    names += ["Pass-Through reads", "Pass-Through writes", "Serviced requests", "Total requests"]
+    return get_stats_dict(
+        names, [statistics.UnitType.requests, statistics.UnitType.percentage], value
+    )
+
+
+def get_block_stats_dict(value):
+    names = [
+        f"{stat} {device}"
+        for device in ["core", "cache", "exported object"]
+        for stat in ["Reads from", "Writes to", "Total to/from"]
+    ]
+    return get_stats_dict(
+        names, [statistics.UnitType.block_4k, statistics.UnitType.percentage], value
+    )
+
+
+def get_error_stats_dict(value):
+    names = [
+        f"{device} {stat} errors"
+        for device in ["Cache", "Core"]
+        for stat in ["read", "write", "total"]
+    ]
+    names += ["Total errors"]
+    return get_stats_dict(
+        names, [statistics.UnitType.requests, statistics.UnitType.percentage], value
+    )
+
+
+def test_request_stats_sub():
+    before = statistics.RequestStats(get_request_stats_dict(5), False)
+    after = statistics.RequestStats(get_request_stats_dict(12), False)
+
+    difference = after - before
+
+    assert isinstance(difference.read, statistics.RequestStatsChunk)
+    assert list(difference.read) == [7] * 4
+    assert list(difference.write) == [7] * 4
+    assert difference.read == after.read - before.read
+    assert difference.requests_serviced == 7
+    assert difference.requests_total == 7
+    # Operands are left intact
+    assert before.read.hits == 5 and after.requests_total == 12
+
+
+def test_block_stats_sub():
+    before = statistics.BlockStats(get_block_stats_dict(5), False)
+    after = statistics.BlockStats(get_block_stats_dict(12), False)
+
+    difference = after - before
+
+    for chunk in difference:
+        assert isinstance(chunk, statistics.BasicStatsChunk)
+        assert list(chunk) == [Size(7, Unit.Blocks4096)] * 3
+    assert difference.core == after.core - before.core
+    assert before.core.reads == Size(5, Unit.Blocks4096)
+
+
+def test_error_stats_sub():
+    before = statistics.ErrorStats(get_error_stats_dict(5), False)
+    after = statistics.ErrorStats(get_error_stats_dict(12), False)
+
+    difference = after - before
+
+    assert isinstance(difference.cache, statistics.BasicStatsChunkError)
+    assert list(difference.cache) == [7] * 3
+    assert list(difference.core) == [7] * 3
+    assert difference.core == after.core - before.core
+    assert difference.total_errors == 7
+    assert before.total_errors == 5
@@ -476,3 +476,118 @@ def test_cas_config_from_file_insert_cache_insert_core_to_file(
     assert set(contents_hashed[cores_index + 1 :]) - set(cores_hashed) == set(
         ["51/dev/mango_core"]
     )
+
+
+def test_cas_config_device_lookup():
+    config = opencas.cas_config()
+    config.insert_cache(opencas.cas_config.cache_config(1, "/dev/dummy_cache", "WT"))
+    config.insert_core(opencas.cas_config.core_config(1, 2, "/dev/dummy_core"))
+
+    assert config.get_cache(1).device == "/dev/dummy_cache"
+    assert config.get_core(1, 2).device == "/dev/dummy_core"
+    assert config.get_core(1, 3) is None
+    assert config.get_core(2, 2) is None
+    assert config.get_device_by_path("/dev/dummy_core").core_id == 2
+    assert config.get_device_by_path("/dev/dummy_other") is None
+    assert config.find_device("/dev/sda", ["/dev/dummy_cache"]).cache_id == 1
+
+
+@patch("os.path.realpath")
+def test_cas_config_find_device_symlink_changed(mock_realpath):
+    links = {}
+    mock_realpath.side_effect = lambda x: links.get(x, x)
+
+    config = opencas.cas_config()
+    config.insert_cache(opencas.cas_config.cache_config(1, "/dev/dummy_link", "WT"))
+
+    assert config.find_device("/dev/dummy1") is None
+
+    links["/dev/dummy_link"] = "/dev/dummy1"
+    assert config.find_device("/dev/dummy1").cache_id == 1
+
+
+@patch("os.path.realpath")
+def test_cas_config_find_device_resolves_only_unresolved(mock_realpath):
+    links = {"/dev/disk/by-id/cache": "/dev/sda", "/dev/disk/by-id/core": "/dev/sdb"}
+    mock_realpath.side_effect = lambda x: links.get(x, x)
+
+    config = opencas.cas_config()
+    config.insert_cache(opencas.cas_config.cache_config(1, "/dev/disk/by-id/cache", "WT"))
+    config.insert_core(opencas.cas_config.core_config(1, 1, "/dev/disk/by-id/core"))
+    config.insert_core(opencas.cas_config.core_config(1, 2, "/dev/disk/by-id/missing"))
+    mock_realpath.reset_mock()
+
+    assert config.find_device("/dev/sdc") is None
+    mock_realpath.assert_called_once_with("/dev/disk/by-id/missing")
+
+
+def test_cas_config_reload(tmp_path):
+    config_file = tmp_path / "opencas.conf"
+    config_file.write_text(
+        dedent(
+            """
+            version=19.3.0
+            [caches]
+            1   /dev/dummy_cache1   WT
+            2   /dev/dummy_cache2   WT
+            [cores]
+            1   1   /dev/dummy_core1
+            2   1   /dev/dummy_core2
+            """
+        ).strip()
+    )
+    config = opencas.cas_config.from_file(str(config_file), allow_incomplete=True)
+    cache1 = config.get_cache(1)
+    core1 = config.get_core(1, 1)
+
+    config_file.write_text(
+        dedent(
+            """
+            version=19.3.0
+            [caches]
+            1   /dev/dummy_cache1   WT
+            2   /dev/dummy_cache2   WB
+            [cores]
+            1   1   /dev/dummy_core1
+            1   2   /dev/dummy_core3
+            """
+        ).strip()
+    )
+    with patch("opencas.cas_config.cache_config.from_line",
+               wraps=opencas.cas_config.cache_config.from_line) as mock_from_line:
+        diff = config.reload()
+
+    mock_from_line.assert_called_once()
+    assert config.get_cache(1) is cache1 and config.get_core(1, 1) is core1
+    assert list(cache1.cores) == [1, 2]
+    assert [(c.cache_id, c.core_id) for c in diff.added] == [(1, 2)]
+    assert [(c.cache_id, c.core_id) for c in diff.removed] == [(2, 1)]
+    assert [c.cache_mode for c in diff.changed] == ["wb"]
+    assert config.get_device_by_path("/dev/dummy_core2") is None
+
+    config_file.write_text("version=19.3.0\n[cores]\n3 1 /dev/dummy_core4\n")
+    with pytest.raises(KeyError):
+        config.reload()
+
+    assert config.get_core(1, 2).device == "/dev/dummy_core3"
+    assert list(cache1.cores) == [1, 2]
+
+
+@patch("opencas.cas_config.check_block_device")
+def test_cas_config_lazy_validation(mock_check, tmp_path):
+    config_file = tmp_path / "opencas.conf"
+    config_file.write_text(
+        "version=19.3.0\n[caches]\n1 /dev/dummy_cache WT\n[cores]\n1 1 /dev/dummy_core\n"
+    )
+
+    config = opencas.cas_config.from_file(str(config_file), lazy_validation=True)
+
+    mock_check.assert_not_called()
+    core = config.get_core(1, 1)
+    assert core.pending_device_check
+
+    with patch("opencas.casadm.add_core"):
+        opencas.add_core(core, False)
+
+    mock_check.assert_called_once_with("/dev/dummy_core")
+    assert not core.pending_device_check
@@ -0,0 +1,317 @@
+#
+# Copyright(c) 2025 Huawei Technologies
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import ctypes
+import errno
+import pytest
+import unittest.mock as mock
+
+import opencas
+from opencas import cas_ioctl
+
+LAYOUT = """
+version 22.12.0.0000.test
+const MAX_STR_LEN 32
+const CACHE_LIST_ID_LIMIT 4
+const OCF_CORE_ID_INVALID 4096
+const OCF_IO_CLASS_INVALID 33
+ioctl GET_CACHE_COUNT 16
+ioctl LIST_CACHE 17
+ioctl CACHE_INFO 24
+ioctl GET_CORE_POOL_COUNT 26
+ioctl GET_CORE_POOL_PATHS 27
+ioctl CACHE_CHECK_DEVICE 29
+ioctl GET_STATS 34
+ioctl CORE_INFO 40
+struct kcas_cache_count 8
+field kcas_cache_count cache_count 0 4 i 1
+field kcas_cache_count ext_err_code 4 4 i 1
+struct kcas_cache_list 20
+field kcas_cache_list id_position 0 4 u 1
+field kcas_cache_list in_out_num 4 4 u 1
+field kcas_cache_list cache_id_tab 8 8 u 4
+field kcas_cache_list ext_err_code 16 4 i 1
+struct kcas_cache_info 64
+field kcas_cache_info cache_id 0 2 u 1
+field kcas_cache_info cache_path_name 2 32 s 1
+field kcas_cache_info core_id 34 8 u 4
+field kcas_cache_info info.state 42 1 u 1
+field kcas_cache_info info.standby_detached 43 1 u 1
+field kcas_cache_info info.core_count 44 4 u 1
+field kcas_cache_info info.cache_mode 48 4 u 1
+field kcas_cache_info info.dirty 52 4 u 1
+field kcas_cache_info info.flushed 56 4 u 1
+field kcas_cache_info ext_err_code 60 4 i 1
+struct kcas_core_info 56
+field kcas_core_info core_path_name 0 32 s 1
+field kcas_core_info cache_id 32 2 u 1
+field kcas_core_info core_id 34 2 u 1
+field kcas_core_info info.dirty 36 4 u 1
+field kcas_core_info info.flushed 40 4 u 1
+field kcas_core_info state 44 4 u 1
+field kcas_core_info exp_obj_exists 48 1 u 1
+field kcas_core_info ext_err_code 52 4 i 1
+struct kcas_core_pool_count 8
+field kcas_core_pool_count core_pool_count 0 4 i 1
+field kcas_core_pool_count ext_err_code 4 4 i 1
+struct kcas_core_pool_path 16
+field kcas_core_pool_path core_path_tab 0 8 p 1
+field kcas_core_pool_path core_pool_count 8 4 i 1
+field kcas_core_pool_path ext_err_code 12 4 i 1
+struct kcas_cache_check_device 40
+field kcas_cache_check_device path_name 0 32 s 1
+field kcas_cache_check_device is_cache_device 32 1 u 1
+field kcas_cache_check_device metadata_compatible 33 1 u 1
+field kcas_cache_check_device clean_shutdown 34 1 u 1
+field kcas_cache_check_device cache_dirty 35 1 u 1
+field kcas_cache_check_device ext_err_code 36 4 i 1
+struct kcas_get_stats 48
+field kcas_get_stats cache_id 0 2 u 1
+field kcas_get_stats core_id 2 2 u 1
+field kcas_get_stats part_id 4 2 u 1
+field kcas_get_stats usage.occupancy.value 8 8 u 1
+field kcas_get_stats usage.occupancy.fraction 16 8 u 1
+field kcas_get_stats req.rd_hits.value 24 8 u 1
+field kcas_get_stats req.rd_hits.fraction 32 8 u 1
+field kcas_get_stats ext_err_code 40 4 i 1
+cache_state Running 0
+cache_state Stopping 1
+cache_state Detached 2
+cache_state Incomplete 3
+cache_state Standby 4
+core_state Active 0
+core_state Inactive 1
+cache_mode wt 0
+cache_mode wb 1
+cache_mode wa 2
+cache_mode pt 3
+cache_mode wo 5
+""".splitlines()
+
+
+@pytest.fixture
+def layout():
+    layout = cas_ioctl.layout(LAYOUT)
+    with mock.patch.object(cas_ioctl, "_layout", layout), \
+            mock.patch("os.open", return_value=100), \
+            mock.patch("os.close"):
+        yield layout
+
+
+class FakeCtrlDevice:
+    """ Answers ioctls like cas_cache module with given caches and core pool """
+
+    def __init__(self, layout, caches, core_pool=()):
+        self.layout = layout
+        self.caches = caches
+        self.core_pool = list(core_pool)
+        self.requests = {v: k for k, v in layout.ioctls.items()}
+
+    def _command(self, struct_name, buf):
+        cmd = cas_ioctl.command(self.layout, struct_name)
+        cmd.buf = buf
+        return cmd
+
+    def __call__(self, fd, request, buf, mutate):
+        name = self.requests[request]
+
+        if name == "GET_CACHE_COUNT":
+            self._command("kcas_cache_count", buf)["cache_count"] = len(self.caches)
+        elif name == "LIST_CACHE":
+            cmd = self._command("kcas_cache_list", buf)
+            ids = sorted(self.caches)[cmd["id_position"]:][:cmd["in_out_num"]]
+            cmd["in_out_num"] = len(ids)
+            for i, cache_id in enumerate(ids):
+                cmd.buf[8 + 2 * i:10 + 2 * i] = cache_id.to_bytes(2, "little")
+            if not ids:
+                raise OSError(errno.EINVAL, "Invalid argument")
+        elif name == "CACHE_INFO":
+            cmd = self._command("kcas_cache_info", buf)
+            cache = self.caches[cmd["cache_id"]]
+            for field, value in cache.items():
+                if field != "cores":
+                    cmd[field] = value
+            cmd["info.core_count"] = len(cache["cores"])
+            for i, core_id in enumerate(sorted(cache["cores"])):
+                cmd.buf[34 + 2 * i:36 + 2 * i] = core_id.to_bytes(2, "little")
+        elif name == "CORE_INFO":
+            cmd = self._command("kcas_core_info", buf)
+            for field, value in self.caches[cmd["cache_id"]]["cores"][cmd["core_id"]].items():
+                cmd[field] = value
+        elif name == "GET_CORE_POOL_COUNT":
+            self._command("kcas_core_pool_count", buf)["core_pool_count"] = len(self.core_pool)
+        elif name == "GET_CORE_POOL_PATHS":
+            cmd = self._command("kcas_core_pool_path", buf)
+            for i, path in enumerate(self.core_pool):
+                ctypes.memmove(cmd["core_path_tab"] + 32 * i, path.encode(), len(path))
+        return 0
+
+
+@mock.patch("fcntl.ioctl")
+def test_ioctl_list_caches_01(mock_ioctl, layout):
+    """ Check that rows match casadm --list-caches csv output """
+    mock_ioctl.side_effect = FakeCtrlDevice(
+        layout,
+        caches={
+            1: {
+                "cache_path_name": "/dev/nvme0n1",
+                "info.state": 1 << 0,
+                "info.cache_mode": 1,
+                "cores": {
+                    1: {"core_path_name": "/dev/sda", "state": 0, "exp_obj_exists": 1},
+                    2: {"core_path_name": "/dev/sdb", "state": 1},
+                },
+            },
+            2: {
+                "cache_path_name": "/dev/nvme1n1",
+                "info.state": 1 << 4,
+                "cores": {},
+            },
+            3: {
+                "cache_path_name": "/dev/nvme2n1",
+                "info.state": (1 << 0) | (1 << 1),
+                "info.cache_mode": 0,
+                "info.dirty": 1,
+                "info.flushed": 3,
+                "cores": {
+                    1: {"core_path_name": "/dev/sdc", "exp_obj_exists": 1},
+                },
+            },
+        },
+        core_pool=["/dev/sdd"],
+    )
+
+    rows = cas_ioctl.list_caches()
+
+    def row(type, id, disk, status, mode="-", device="-"):
+        return {"type": type, "id": id, "disk": disk, "status": status,
+                "write policy": mode, "device": device}
+
+    assert rows == [
+        row("core pool", "-", "-", "-"),
+        row("core", "-", "/dev/sdd", "Detached"),
+        row("cache", "1", "/dev/nvme0n1", "Running", "wb"),
+        row("core", "1", "/dev/sda", "Active", device="/dev/cas1-1"),
+        row("core", "2", "/dev/sdb", "Inactive"),
+        row("cache", "2", "-", "Standby", device="/dev/cas-cache-2"),
+        row("cache", "3", "/dev/nvme2n1", "Flushing (75.0 %)", "wb->wt"),
+        row("core", "1", "/dev/sdc", "Flushing (100.0 %)", device="/dev/cas3-1"),
+    ]
+
+
+@mock.patch("fcntl.ioctl")
+def test_ioctl_list_caches_02(mock_ioctl, layout):
+    """ Check that caches are listed in chunks of CACHE_LIST_ID_LIMIT """
+    mock_ioctl.side_effect = FakeCtrlDevice(
+        layout,
+        caches={i: {"cache_path_name": f"/dev/nvme{i}n1", "info.state": 1, "cores": {}}
+                for i in range(1, 10)},
+    )
+
+    rows = cas_ioctl.list_caches()
+
+    assert [r["id"] for r in rows] == [str(i) for i in range(1, 10)]
+    assert opencas.DeviceStateSnapshot(rows).get_cache(9)["disk"] == "/dev/nvme9n1"
+
+
+def test_ioctl_command_01(layout):
+    """ Check that values are stored according to layout """
+    cmd = cas_ioctl.command(layout, "kcas_get_stats", cache_id=3, core_id=1)
+
+    cmd["req.rd_hits.value"] = 2 ** 40
+    cmd["ext_err_code"] = -1
+
+    assert cmd.buf[:4] == b"\x03\x00\x01\x00"
+    assert cmd["req.rd_hits.value"] == 2 ** 40
+    assert cmd["ext_err_code"] == -1
+
+    with pytest.raises(cas_ioctl.IoctlError):
+        cmd["no_such_field"]
+
+    with pytest.raises(cas_ioctl.IoctlError):
+        cas_ioctl.command(layout, "kcas_cache_check_device", path_name="/dev/" + "x" * 32)
+
+
+@mock.patch("fcntl.ioctl")
+def test_ioctl_get_stats_01(mock_ioctl, layout):
+    def fill_stats(fd, request, buf, mutate):
+        cmd = cas_ioctl.command(layout, "kcas_get_stats")
+        cmd.buf = buf
+        assert cmd["core_id"] == 4096
+        assert cmd["part_id"] == 33
+        cmd["usage.occupancy.value"] = 100
+        cmd["usage.occupancy.fraction"] = 5000
+        cmd["req.rd_hits.value"] = 7
+        return 0
+
+    mock_ioctl.side_effect = fill_stats
+
+    stats = cas_ioctl.get_stats(1)
+
+    assert stats["usage"]["occupancy"] == {"value": 100, "fraction": 5000}
+    assert stats["req"]["rd_hits"]["value"] == 7
+
+
+@mock.patch("fcntl.ioctl")
+def test_ioctl_check_cache_device_01(mock_ioctl, layout):
+    def check_device(fd, request, buf, mutate):
+        cmd = cas_ioctl.command(layout, "kcas_cache_check_device")
+        cmd.buf = buf
+        assert cmd["path_name"] == "/dev/disk/by-id/nvme0"
+        cmd["is_cache_device"] = 1
+        cmd["metadata_compatible"] = 1
+        cmd["cache_dirty"] = 1
+        return 0
+
+    mock_ioctl.side_effect = check_device
+
+    assert cas_ioctl.check_cache_device("/dev/disk/by-id/nvme0") == {
+        "Is cache": "yes", "Clean Shutdown": "no", "Cache dirty": "yes"
+    }
+
+    with pytest.raises(cas_ioctl.IoctlError):
+        cas_ioctl.check_cache_device("/dev/nvme0n1")
+
+
+@mock.patch("opencas.casadm.run_cmd")
+@mock.patch("fcntl.ioctl")
+def test_get_caches_list_ioctl_01(mock_ioctl, mock_run, layout):
+    """ Check that ioctl backend is used when enabled """
+    mock_ioctl.side_effect = FakeCtrlDevice(layout, caches={})
+
+    with mock.patch.object(cas_ioctl, "enabled", True):
+        assert opencas.get_caches_list() == []
+
+    mock_run.assert_not_called()
+
+
+@mock.patch("opencas.casadm.list_caches")
+@mock.patch("fcntl.ioctl")
+def test_get_caches_list_ioctl_02(mock_ioctl, mock_list, layout):
+    """ Check that casadm is used if ioctl fails """
+    mock_ioctl.side_effect = OSError(errno.ENOTTY, "Inappropriate ioctl for device")
+    mock_list.return_value = mock.Mock(
+        stdout="type,id,disk,status,write policy,device\n"
+               "cache,1,/dev/nvme0n1,Running,wt,-\n"
+    )
+
+    with mock.patch.object(cas_ioctl, "enabled", True):
+        caches = opencas.get_caches_list()
+
+    assert caches[0]["disk"] == "/dev/nvme0n1"
+    mock_list.assert_called_once()
+
+
+@mock.patch("opencas.casadm.list_caches")
+def test_get_caches_list_ioctl_03(mock_list):
+    """ Check that missing layout file makes get_caches_list fall back to casadm """
+    mock_list.return_value = mock.Mock(stdout="type,id,disk,status,write policy,device\n")
+
+    with mock.patch.object(cas_ioctl, "enabled", True), \
+            mock.patch.object(cas_ioctl, "_layout", None), \
+            mock.patch.object(cas_ioctl, "layout_path", "/nonexistent/cas_ioctl_layout"):
+        assert opencas.get_caches_list() == []
+
+    mock_list.assert_called_once()
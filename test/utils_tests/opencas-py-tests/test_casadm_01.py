@@ -6,6 +6,7 @@
 import pytest
 import subprocess
 import unittest.mock as mock
+from io import BytesIO
 
 from opencas import casadm
 from helpers import get_process_mock
@@ -55,3 +56,85 @@ def test_get_version_02(mock_run):
     mock_run.return_value = get_process_mock(4, "successes", "errors")
     with pytest.raises(casadm.CasadmError):
         casadm.get_version()
+
+
+def get_session_process_mock(frames):
+    process_mock = mock.Mock()
+    process_mock.stdin = BytesIO()
+    process_mock.stdin.close = mock.Mock()
+    process_mock.stdout = BytesIO(frames)
+
+    return process_mock
+
+
+@mock.patch("subprocess.Popen")
+def test_session_run_cmds_01(mock_popen):
+    mock_popen.return_value = get_session_process_mock(
+        b"0 5 0\n0.0.1" b"1 0 6\nerrors"
+    )
+
+    with casadm.Session() as session:
+        results = session.run_cmds([["-V"], ["-L"]])
+
+    assert [r.exit_code for r in results] == [0, 1]
+    assert results[0].stdout == "0.0.1"
+    assert results[1].stderr == "errors"
+    assert mock_popen.return_value.stdin.getvalue() == b"-V\n-L\n"
+    mock_popen.assert_called_once_with(
+        [casadm.casadm_path, "--batch"], stdin=subprocess.PIPE, stdout=subprocess.PIPE
+    )
+
+
+@mock.patch("subprocess.run")
+@mock.patch("subprocess.Popen")
+def test_session_run_cmd_01(mock_popen, mock_run):
+    mock_popen.return_value = get_session_process_mock(b"4 0 6\nerrors")
+
+    with casadm.Session():
+        with pytest.raises(casadm.CasadmError):
+            casadm.get_version()
+
+    mock_run.assert_not_called()
+    assert casadm.get_session() is None
+
+
+@mock.patch("subprocess.Popen")
+def test_session_run_cmd_02(mock_popen):
+    mock_popen.return_value = get_session_process_mock(b"")
+
+    with casadm.Session():
+        with pytest.raises(casadm.SessionError):
+            casadm.get_version()
+
+
+@mock.patch("subprocess.Popen")
+def test_session_run_cmds_empty_command(mock_popen):
+    with casadm.Session() as session:
+        with pytest.raises(casadm.SessionError):
+            session.run_cmds([["-V"], []])
+
+    mock_popen.assert_not_called()
+
+
+@mock.patch("subprocess.run")
+@mock.patch("subprocess.Popen")
+def test_session_run_cmd_empty_command_not_routed(mock_popen, mock_run):
+    mock_run.return_value = get_process_mock(0, "", "")
+
+    with casadm.Session():
+        casadm.run_cmd([casadm.casadm_path])
+
+    mock_popen.assert_not_called()
+    mock_run.assert_called_once()
+
+
+@mock.patch("subprocess.Popen")
+def test_session_broken_pipe(mock_popen):
+    process_mock = get_session_process_mock(b"")
+    process_mock.stdin = mock.Mock()
+    process_mock.stdin.write.side_effect = BrokenPipeError()
+    mock_popen.return_value = process_mock
+
+    with casadm.Session():
+        with pytest.raises(casadm.SessionError):
+            casadm.get_version()
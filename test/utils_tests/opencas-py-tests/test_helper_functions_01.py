@@ -5,6 +5,7 @@
 
 import pytest
 from unittest.mock import patch, Mock
+import threading
 import time
 import subprocess
 
@@ -1015,3 +1016,237 @@ def test_start_cache(mock_run, load, force, failover):
         assert "--cache-id" not in casadm_call
         assert "--cache-mode" not in casadm_call
         assert "--cache-line-size" not in casadm_call
+
+
+def get_stacked_dev_list():
+    return [
+        {"type": "cache", "id": "1", "disk": "/dev/nvme0n1", "status": "Running",
+         "write policy": "wb", "device": "-"},
+        {"type": "core", "id": "1", "disk": "/dev/sda", "status": "Active",
+         "write policy": "-", "device": "/dev/cas1-1"},
+        {"type": "core", "id": "10", "disk": "/dev/sdb", "status": "Active",
+         "write policy": "-", "device": "/dev/cas1-10"},
+        {"type": "cache", "id": "2", "disk": "/dev/nvme1n1", "status": "Running",
+         "write policy": "wt", "device": "-"},
+        {"type": "core", "id": "1", "disk": "/dev/cas1-1", "status": "Active",
+         "write policy": "-", "device": "/dev/cas2-1"},
+        {"type": "cache", "id": "3", "disk": "/dev/nvme2n1", "status": "Running",
+         "write policy": "wt", "device": "-"},
+        {"type": "core", "id": "1", "disk": "/dev/cas2-1p1", "status": "Active",
+         "write policy": "-", "device": "/dev/cas3-1"},
+    ]
+
+
+@patch("opencas.get_caches_list")
+def test_device_state_snapshot_lookups(mock_list):
+    """
+    Check if snapshot lists devices only once and indexes them properly
+    """
+    mock_list.return_value = get_stacked_dev_list()
+
+    snapshot = opencas.DeviceStateSnapshot()
+
+    assert snapshot.get_cache(2)["disk"] == "/dev/nvme1n1"
+    assert snapshot.get_cache(4) is None
+    assert snapshot.get_core(1, 10)["disk"] == "/dev/sdb"
+    assert snapshot.get_core("3", "1")["cache_id"] == 3
+    assert snapshot.get_device_by_path("/dev/cas1-1")["device"] == "/dev/cas2-1"
+    assert snapshot.get_device_by_exp_obj("/dev/cas1-10")["disk"] == "/dev/sdb"
+    assert [d["device"] for d in snapshot.get_exp_obj_users(1, 1)] == ["/dev/cas2-1"]
+    assert [d["device"] for d in snapshot.get_exp_obj_users(2, 1)] == ["/dev/cas3-1"]
+    assert snapshot.get_exp_obj_users(1, 10) == []
+    assert mock_list.call_count == 1
+
+    snapshot.invalidate()
+    snapshot.get_cache(1)
+    assert mock_list.call_count == 2
+
+
+@patch("opencas.get_caches_list")
+@patch("opencas.casadm.remove_core")
+def test_detach_all_cores_stacked(mock_remove, mock_list):
+    """
+    Check if cores are detached from the top of the stack with a single listing
+    """
+    mock_list.return_value = get_stacked_dev_list()
+
+    opencas.detach_all_cores(flush=True)
+
+    detached = [(c[0][0], c[0][1]) for c in mock_remove.call_args_list]
+    assert sorted(detached) == sorted([(1, "1"), (1, "10"), (2, "1"), (3, "1")])
+    assert detached.index((3, "1")) < detached.index((2, "1")) < detached.index((1, "1"))
+    assert mock_list.call_count == 1
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_run_with_dependencies(jobs):
+    """
+    Check if tasks are run only after their dependencies
+    """
+    finished = []
+
+    def task(key):
+        def run():
+            time.sleep(0.01 * (5 - len(key)))
+            finished.append(key)
+            return key.upper()
+        return run
+
+    tasks = {key: task(key) for key in ["a", "b", "ab", "abc", "c"]}
+    dependencies = {"ab": ["a", "b"], "abc": ["ab", "c", "missing"]}
+
+    results = opencas.run_with_dependencies(tasks, dependencies, jobs)
+
+    assert results == {key: key.upper() for key in tasks}
+    assert finished.index("ab") > max(finished.index("a"), finished.index("b"))
+    assert finished.index("abc") > max(finished.index("ab"), finished.index("c"))
+
+
+def test_run_with_dependencies_cycle():
+    """
+    Check if dependency cycle is detected before running any task
+    """
+    task = Mock()
+    tasks = {"a": task, "b": task, "c": task}
+
+    with pytest.raises(opencas.DependencyCycleException):
+        opencas.run_with_dependencies(tasks, {"a": ["b"], "b": ["c"], "c": ["a"]}, 4)
+
+    task.assert_not_called()
+
+
+def test_device_event_monitor_parse_event():
+    """
+    Check if both udev and kernel uevent formats are parsed
+    """
+    properties = b"ACTION=add\0DEVNAME=/dev/sdb\0SUBSYSTEM=block\0"
+    header = opencas.DeviceEventMonitor._libudev_header
+    udev_event = (
+        header.pack(b"libudev\0", 0xfeedcafe, header.size, header.size, len(properties))
+        + properties
+    )
+    kernel_event = b"add@/devices/virtual/block/sdb\0" + properties
+
+    for data in [udev_event, kernel_event]:
+        event = opencas.DeviceEventMonitor.parse_event(data)
+        assert event == {"ACTION": "add", "DEVNAME": "/dev/sdb", "SUBSYSTEM": "block"}
+
+
+@patch("socket.socket")
+def test_device_event_monitor_fallback(mock_socket):
+    """
+    Check if monitor falls back to sleeping when netlink socket is unavailable
+    """
+    mock_socket.side_effect = OSError
+
+    with opencas.DeviceEventMonitor() as monitor:
+        time_start = time.time()
+        assert not monitor.wait(0.5)
+        assert 0.4 < time.time() - time_start < 1
+
+
+@patch("opencas.wait_for_cas_ctrl")
+@patch("opencas.add_core")
+@patch("opencas.start_cache")
+def test_device_loader(mock_start, mock_add, mock_ctrl, tmp_path):
+    """
+    Check if loader matches devices by path and symlinks and reloads changed config
+    """
+    config_file = tmp_path / "opencas.conf"
+    config_file.write_text(
+        "version=19.3.0\n"
+        "[caches]\n"
+        "1 /dev/disk/by-id/nvme-cache wt\n"
+        "[cores]\n"
+        "1 1 /dev/disk/by-id/wwn-core\n"
+    )
+
+    loader = opencas.DeviceLoader(str(config_file))
+    assert loader.reload()
+    assert not loader.reload()
+
+    assert loader.load_device("/dev/sdx") is None
+    assert loader.load_device("/dev/nvme0n1", ["/dev/disk/by-id/nvme-cache"]).cache_id == 1
+    mock_start.assert_called_once()
+
+    core = loader.load_device("/dev/sda", ["/dev/disk/by-path/pci-0", "/dev/disk/by-id/wwn-core"])
+    assert (core.cache_id, core.core_id) == (1, 1)
+    mock_add.assert_called_once_with(core, True)
+
+    config_file.write_text(
+        "version=19.3.0\n"
+        "[caches]\n"
+        "2 /dev/disk/by-id/nvme-other-cache wb\n"
+    )
+    assert loader.reload()
+    assert loader.find_device("/dev/nvme0n1", ["/dev/disk/by-id/nvme-cache"]) is None
+    assert loader.find_device("/dev/nvme1n1", ["/dev/disk/by-id/nvme-other-cache"]).cache_id == 2
+
+
+@patch("opencas.wait_for_cas_ctrl")
+@patch("opencas.casadm.add_core")
+@patch("opencas.casadm.start_cache")
+@patch("opencas.cas_config.cache_config.check_cache_device_empty")
+@patch("opencas.cas_config.check_block_device")
+def test_device_loader_lazy_validation(
+    mock_check, mock_empty, mock_start, mock_add, mock_ctrl, tmp_path
+):
+    """
+    Check if loader validates only the device being loaded and skips emptiness check of cache
+    """
+    config_file = tmp_path / "opencas.conf"
+    config_file.write_text(
+        "version=19.3.0\n"
+        "[caches]\n"
+        "1 /dev/nvme0n1 wt\n"
+        "[cores]\n"
+        "1 1 /dev/sda\n"
+        "1 2 /dev/sdb\n"
+    )
+
+    loader = opencas.DeviceLoader(str(config_file))
+    loader.reload()
+    mock_check.assert_not_called()
+
+    assert loader.load_device("/dev/nvme0n1").cache_id == 1
+    mock_check.assert_called_once_with("/dev/nvme0n1")
+    mock_empty.assert_not_called()
+    mock_start.assert_called_once()
+
+    mock_check.reset_mock()
+    assert loader.load_device("/dev/sda").core_id == 1
+    mock_check.assert_called_once_with("/dev/sda")
+    assert loader.config.get_core(1, 2).pending_device_check
+
+
+@patch("opencas.wait_for_cas_ctrl")
+@patch("opencas.add_core")
+@patch("opencas.start_cache")
+def test_device_loader_submit(mock_start, mock_add, mock_ctrl, tmp_path):
+    """
+    Check if slow load of one device doesn't block loading of other devices
+    """
+    config_file = tmp_path / "opencas.conf"
+    config_file.write_text(
+        "version=19.3.0\n"
+        "[caches]\n"
+        "1 /dev/nvme0n1 wt\n"
+        "[cores]\n"
+        "1 1 /dev/sda\n"
+    )
+    cache_started = threading.Event()
+    mock_start.side_effect = lambda *args: cache_started.wait(5)
+
+    loader = opencas.DeviceLoader(str(config_file), jobs=2)
+    loader.reload()
+    try:
+        cache = loader.submit("/dev/nvme0n1")
+        core = loader.submit("/dev/sda")
+
+        assert core.result(timeout=5).core_id == 1
+        assert not cache.done()
+        cache_started.set()
+        assert cache.result(timeout=5).cache_id == 1
+    finally:
+        cache_started.set()
+        loader.shutdown()
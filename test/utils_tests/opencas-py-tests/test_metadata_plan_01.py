@@ -0,0 +1,160 @@
+#
+# Copyright(c) 2025 Huawei Technologies
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import json
+import unittest.mock as mock
+
+import pytest
+
+import opencas
+from opencas import MetadataPlan
+
+MiB = 1024 * 1024
+
+
+def get_cache_record(cache_id, blocks, cache_line_size, cores, footprint, unit="MiB"):
+    return {
+        "Target Cache Id": [{"value": cache_id, "unit": None}],
+        "Target Core Id": [{"value": "-", "unit": None}],
+        "Target IO class Id": [{"value": "-", "unit": None}],
+        "Cache Id": [{"value": cache_id, "unit": None}],
+        "Cache Size": [{"value": blocks, "unit": "4KiB Blocks"},
+                       {"value": blocks * 4096 / 2**30, "unit": "GiB"}],
+        "Core Devices": [{"value": cores, "unit": None}],
+        "Cache line size": [{"value": cache_line_size, "unit": "KiB"}],
+        "Metadata Memory Footprint": [{"value": footprint, "unit": unit}],
+    }
+
+
+@pytest.mark.parametrize("cache_line_size", [4, 8, 16, 32, 64])
+def test_metadata_plan_dram_size(cache_line_size):
+    cache_size = 50 * 1024 * MiB
+    cache_lines = cache_size // (cache_line_size * 1024)
+    plan = MetadataPlan(cache_lines, cache_line_size)
+
+    # Formula of test_memory_metadata_consumption
+    expected = 250 * MiB + cache_lines * (68 + 2 * cache_line_size * 1024 / 4096)
+
+    assert plan.cache_size == cache_size
+    assert plan.dram_size == expected
+    assert plan.dram_max_size == int(1.10 * expected)
+
+
+def test_metadata_plan_disk_size():
+    # Sample cache of casadm/statistics_view.h: 4 KiB lines, metadata end offset 79025
+    plan = MetadataPlan(5425999, 4)
+
+    assert abs(plan.disk_size / (79025 * 4096) - 1) < 0.01
+    assert plan.device_size == plan.cache_size + plan.disk_size
+
+
+@pytest.mark.parametrize("cache_line_size", [4, 64])
+@pytest.mark.parametrize("device_size", [100 * MiB, 3200 * 1000**3])
+def test_metadata_plan_from_device_size(cache_line_size, device_size):
+    plan = MetadataPlan.from_device_size(device_size, cache_line_size, 8, 1)
+    bigger = MetadataPlan(plan.cache_lines + 1, cache_line_size)
+
+    assert plan.device_size <= device_size
+    assert bigger.device_size > device_size
+    assert plan.core_count == 8
+    assert plan.cache_id == 1
+
+
+def test_metadata_plan_from_device_size_too_small():
+    plan = MetadataPlan.from_device_size(MiB)
+
+    assert plan.cache_lines == 0
+    assert plan.dram_size == MetadataPlan.DRAM_FIXED
+
+
+@mock.patch("opencas.get_device_size")
+def test_metadata_plan_from_cache_config(mock_device_size):
+    mock_device_size.return_value = 3200 * 1000**3
+    cache = opencas.cas_config.cache_config(2, "/dev/nvme0n1", "WB", cache_line_size="16")
+    cache.cores = {1: mock.Mock(), 2: mock.Mock(), 3: mock.Mock()}
+
+    plan = MetadataPlan.from_cache_config(cache)
+
+    mock_device_size.assert_called_once_with("/dev/nvme0n1")
+    assert plan.cache_id == 2
+    assert plan.cache_line_size == 16
+    assert plan.core_count == 3
+    assert plan.device_size <= mock_device_size.return_value
+
+
+def test_metadata_plan_default_cache_line_size():
+    cache = opencas.cas_config.cache_config(1, "/dev/nvme0n1", "WT")
+
+    plan = MetadataPlan.from_cache_config(cache, device_size=1024 * MiB)
+
+    assert plan.cache_line_size == 4
+    assert plan.core_count == 0
+
+
+def test_metadata_plan_io_time():
+    plan = MetadataPlan(1024, 4)
+
+    assert plan.metadata_io_time(plan.disk_size / 2) == 2
+
+
+def test_metadata_plan_from_stats_record():
+    record = get_cache_record(3, 5425999 * 4, 16, 15, 1.5, "GiB")
+
+    plan, dram_size = MetadataPlan.from_stats_record(record)
+
+    assert plan.cache_id == 3
+    assert plan.cache_lines == 5425999
+    assert plan.cache_line_size == 16
+    assert plan.core_count == 15
+    assert dram_size == 1536 * MiB
+
+
+def test_get_metadata_disk_sizes():
+    dmesg = "\n".join([
+        "[   10.1] cache1: Metadata size on device: 1024 kiB",
+        "[   10.2] cache12: Metadata size on device: 300 B",
+        "[   10.3] cache2: Hash table size: 10 kiB",
+        "[   20.0] cache1: Metadata size on device: 2048 kiB",
+    ])
+
+    assert opencas.get_metadata_disk_sizes(dmesg) == {1: 2048 * 1024, 12: 300}
+
+
+def test_get_available_memory(tmp_path):
+    meminfo = tmp_path / "meminfo"
+    meminfo.write_text("MemTotal:       16303620 kB\nMemAvailable:    8000000 kB\n")
+
+    assert opencas.get_available_memory(str(meminfo)) == 8000000 * 1024
+
+
+def test_get_available_memory_missing(tmp_path):
+    meminfo = tmp_path / "meminfo"
+    meminfo.write_text("MemTotal:       16303620 kB\n")
+
+    with pytest.raises(ValueError):
+        opencas.get_available_memory(str(meminfo))
+
+
+@mock.patch("opencas.casadm.run_cmd")
+@mock.patch("opencas.casadm.get_all_stats")
+def test_get_metadata_validation(mock_stats, mock_run_cmd):
+    core_record = get_cache_record(1, 1024, 4, 1, 300.0)
+    core_record["Target Core Id"] = [{"value": 1, "unit": None}]
+    mock_stats.return_value = mock.Mock(stdout=json.dumps({"records": [
+        get_cache_record(1, 1024, 4, 1, 300.0),
+        core_record,
+        get_cache_record(2, 4096, 4, 2, 500.0),
+    ]}))
+    mock_run_cmd.return_value = mock.Mock(
+        stdout="[ 1.0] cache1: Metadata size on device: 8192 kiB\n"
+    )
+
+    result = opencas.get_metadata_validation()
+
+    mock_run_cmd.assert_called_once_with(["dmesg"])
+    assert [(plan.cache_id, dram, disk) for plan, dram, disk in result] == [
+        (1, 300 * MiB, 8 * MiB),
+        (2, 500 * MiB, None),
+    ]
@@ -0,0 +1,152 @@
+#
+# Copyright(c) 2025 Huawei Technologies
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+import json
+import unittest.mock as mock
+
+import opencas
+from opencas import StatsExporter
+
+
+def get_record(cache_id, core_id="-", io_class_id="-", dirty=0, hits=0, total=0, written=0):
+    return {
+        "Target Cache Id": [{"value": cache_id, "unit": None}],
+        "Target Core Id": [{"value": core_id, "unit": None}],
+        "Target IO class Id": [{"value": io_class_id, "unit": None}],
+        "Cache Id": [{"value": cache_id, "unit": None}],
+        "Usage statistics": [
+            {"Usage statistics": "Occupancy", "Count": dirty, "%": 0.0, "unit": "4KiB Blocks"},
+            {"Usage statistics": "Dirty", "Count": dirty, "%": 0.0, "unit": "4KiB Blocks"},
+        ],
+        "Request statistics": [
+            {"Request statistics": "Read hits", "Count": hits, "%": 0.0, "unit": "Requests"},
+            {"Request statistics": "Read total", "Count": total, "%": 0.0, "unit": "Requests"},
+            {"Request statistics": "Write hits", "Count": 0, "%": 0.0, "unit": "Requests"},
+            {"Request statistics": "Write total", "Count": 0, "%": 0.0, "unit": "Requests"},
+        ],
+        "Block statistics": [
+            {"Block statistics": "Writes to core(s)", "Count": written, "%": 0.0,
+             "unit": "4KiB Blocks"},
+        ],
+    }
+
+
+def get_samples(text):
+    samples = dict()
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        name, value = line.rsplit(" ", 1)
+        samples[name] = float(value)
+    return samples
+
+
+def test_stats_exporter_counters():
+    exporter = StatsExporter()
+    exporter.update([get_record(1, dirty=2, hits=3, total=4), get_record(1, 2)], now=0)
+
+    text = exporter.render()
+    samples = get_samples(text)
+
+    assert text.endswith("# EOF\n")
+    assert "# TYPE opencas_requests counter" in text
+    assert samples['opencas_usage_bytes{cache_id="1",stat="dirty"}'] == 2 * 4096
+    assert samples['opencas_requests_total{cache_id="1",stat="read_hits"}'] == 3
+    assert samples['opencas_blocks_bytes_total{cache_id="1",stat="writes_to_core"}'] == 0
+    assert samples['opencas_requests_total{cache_id="1",core_id="2",stat="read_total"}'] == 0
+    assert not any(name.startswith("opencas_hit_ratio") for name in samples)
+
+
+def test_stats_exporter_rates():
+    exporter = StatsExporter()
+    exporter.update([get_record(1, dirty=10, hits=10, total=20, written=0)], now=0)
+    exporter.update([get_record(1, dirty=30, hits=13, total=24, written=8)], now=2)
+
+    samples = get_samples(exporter.render())
+
+    assert samples['opencas_hit_ratio{cache_id="1"}'] == 0.75
+    assert samples['opencas_dirty_growth_bytes_per_second{cache_id="1"}'] == 10 * 4096
+    assert samples['opencas_flush_throughput_bytes_per_second{cache_id="1"}'] == 4 * 4096
+
+
+def test_stats_exporter_counters_reset():
+    exporter = StatsExporter()
+    exporter.update([get_record(1, hits=10, total=20, written=10)], now=0)
+    exporter.update([get_record(1, hits=1, total=2, written=1)], now=1)
+
+    samples = get_samples(exporter.render())
+
+    assert 'opencas_hit_ratio{cache_id="1"}' not in samples
+    assert 'opencas_flush_throughput_bytes_per_second{cache_id="1"}' not in samples
+    assert 'opencas_dirty_growth_bytes_per_second{cache_id="1"}' in samples
+
+
+def test_stats_exporter_dirty_max_window():
+    exporter = StatsExporter(dirty_window=10)
+    exporter.update([get_record(1, dirty=5)], now=0)
+    exporter.update([get_record(1, dirty=100)], now=5)
+    exporter.update([get_record(1, dirty=7)], now=10)
+
+    # Rendering doesn't reset the peak for other scrapers
+    assert get_samples(exporter.render())['opencas_dirty_max_bytes{cache_id="1"}'] == 100 * 4096
+    assert get_samples(exporter.render())['opencas_dirty_max_bytes{cache_id="1"}'] == 100 * 4096
+
+    exporter.update([get_record(1, dirty=6)], now=15)
+
+    assert get_samples(exporter.render())['opencas_dirty_max_bytes{cache_id="1"}'] == 7 * 4096
+
+
+def test_stats_exporter_max_objects():
+    exporter = StatsExporter(max_objects=2)
+    exporter.update([get_record(1), get_record(1, 1), get_record(1, 2)], now=0)
+
+    samples = get_samples(exporter.render())
+
+    assert samples["opencas_exporter_dropped_objects"] == 1
+    assert 'opencas_requests_total{cache_id="1",core_id="1",stat="read_hits"}' in samples
+    assert 'opencas_requests_total{cache_id="1",core_id="2",stat="read_hits"}' not in samples
+
+
+@mock.patch("opencas.casadm.get_all_stats")
+def test_stats_exporter_collect(mock_get_all_stats):
+    mock_get_all_stats.return_value = mock.Mock(
+        stdout=json.dumps({"records": [get_record(1, 1, 0)]}))
+    exporter = StatsExporter(io_classes=True)
+
+    assert exporter.collect()
+    mock_get_all_stats.assert_called_once_with(io_classes=True)
+
+    mock_get_all_stats.side_effect = opencas.casadm.CasadmError(mock.Mock(stderr="error"))
+    assert not exporter.collect()
+
+    samples = get_samples(exporter.render())
+    assert samples["opencas_exporter_collections_total"] == 2
+    assert samples["opencas_exporter_collection_errors_total"] == 1
+    assert 'opencas_usage_bytes{cache_id="1",core_id="1",io_class_id="0",stat="dirty"}' in samples
+
+
+@mock.patch("opencas.get_caches_list")
+@mock.patch("opencas.casadm.get_all_stats")
+def test_stats_exporter_collect_max_objects(mock_get_all_stats, mock_get_caches_list):
+    mock_get_caches_list.return_value = [
+        {"type": "core pool", "id": "-"},
+        {"type": "core", "id": "-"},
+        {"type": "cache", "id": "1"},
+        {"type": "core", "id": "1"},
+        {"type": "core", "id": "2"},
+        {"type": "cache", "id": "2"},
+        {"type": "core", "id": "1"},
+    ]
+    mock_get_all_stats.return_value = mock.Mock(
+        stdout=json.dumps({"records": [get_record(1), get_record(1, 1), get_record(1, 2)]}))
+    exporter = StatsExporter(max_objects=2)
+
+    assert exporter.collect()
+    # Cache 2 isn't queried once the limit is reached
+    mock_get_all_stats.assert_called_once_with(io_classes=False, cache_id=1)
+
+    samples = get_samples(exporter.render())
+    assert samples["opencas_exporter_dropped_objects"] == 3
+    assert 'opencas_requests_total{cache_id="1",core_id="1",stat="read_hits"}' in samples
@@ -68,11 +68,16 @@ rm -rf $RPM_BUILD_ROOT
 systemctl daemon-reload
 systemctl -q enable open-cas-shutdown
 systemctl -q enable open-cas
+systemctl -q enable open-cas-loader.socket
+systemctl -q enable open-cas-loader
 
 %preun
 if [ $1 -eq 0 ]; then
     systemctl -q disable open-cas-shutdown
     systemctl -q disable open-cas
+    systemctl -q disable open-cas-loader
+    systemctl -q disable open-cas-loader.socket
+    systemctl -q disable opencas-exporter
 
     rm -rf /lib/opencas/{__pycache__,*.py[co]} &>/dev/null
 fi
@@ -136,8 +141,11 @@ fi
 /etc/opencas/ioclass-config.csv
 /etc/dracut.conf.d/opencas.conf
 /var/lib/opencas/cas_version
+/lib/opencas/cas_ioctl_layout
 /lib/opencas/casctl
 /lib/opencas/open-cas-loader.py
+/lib/opencas/open-cas-loader-notify
+/lib/opencas/opencas-exporter.py
 /lib/opencas/opencas.py
 /lib/udev/rules.d/60-persistent-storage-cas-load.rules
 /lib/udev/rules.d/60-persistent-storage-cas.rules
@@ -146,6 +154,9 @@ fi
 /usr/lib/systemd/system-shutdown/open-cas.shutdown
 /usr/lib/systemd/system/open-cas-shutdown.service
 /usr/lib/systemd/system/open-cas.service
+/usr/lib/systemd/system/open-cas-loader.service
+/usr/lib/systemd/system/open-cas-loader.socket
+/usr/lib/systemd/system/opencas-exporter.service
 /usr/share/man/man5/opencas.conf.5.gz
 /usr/share/man/man8/casadm.8.gz
 /usr/share/man/man8/casctl.8.gz
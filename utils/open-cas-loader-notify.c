@@ -0,0 +1,88 @@
+/*
+* Copyright(c) 2025 Huawei Technologies
+* SPDX-License-Identifier: BSD-3-Clause
+*/
+
+/*
+ * Invoked by udev for every block device as:
+ *     open-cas-loader-notify DEVICE [SYMLINK...]
+ * passes the device to open-cas-loader daemon over its socket. If the daemon
+ * isn't listening, open-cas-loader.py is executed to load the device on its
+ * own. Being a small C program it avoids starting Python interpreter for each
+ * block device uevent.
+ */
+
+#include <errno.h>
+#include <stdio.h>
+#include <string.h>
+#include <sys/socket.h>
+#include <sys/time.h>
+#include <sys/un.h>
+#include <unistd.h>
+
+#define LOADER_SOCKET "/run/opencas/loader.sock"
+#define LOADER_PATH "/lib/opencas/open-cas-loader.py"
+#define MESSAGE_MAX 65536
+/* Same as NOTIFY_TIMEOUT of open-cas-loader.py */
+#define NOTIFY_TIMEOUT_S 5
+
+static char message[MESSAGE_MAX];
+
+static int notify_daemon(int argc, char *argv[])
+{
+	struct sockaddr_un addr = { .sun_family = AF_UNIX };
+	struct timeval timeout = { .tv_sec = NOTIFY_TIMEOUT_S };
+	size_t len = 0, arg_len;
+	ssize_t sent;
+	int i, fd;
+
+	for (i = 1; i < argc; i++) {
+		arg_len = strlen(argv[i]);
+		if (len + arg_len + 1 > sizeof(message))
+			return -1;
+		if (len)
+			message[len++] = ' ';
+		memcpy(message + len, argv[i], arg_len);
+		len += arg_len;
+	}
+
+	strncpy(addr.sun_path, LOADER_SOCKET, sizeof(addr.sun_path) - 1);
+
+	fd = socket(AF_UNIX, SOCK_DGRAM | SOCK_CLOEXEC, 0);
+	if (fd < 0)
+		return -1;
+
+	/* Don't block udev when daemon stalls and its socket queue is full,
+	 * the device is loaded by open-cas-loader.py instead */
+	if (setsockopt(fd, SOL_SOCKET, SO_SNDTIMEO, &timeout,
+			sizeof(timeout))) {
+		close(fd);
+		return -1;
+	}
+
+	do {
+		sent = sendto(fd, message, len, 0, (struct sockaddr *)&addr,
+				sizeof(addr));
+	} while (sent < 0 && errno == EINTR);
+
+	close(fd);
+
+	return sent == (ssize_t)len ? 0 : -1;
+}
+
+int main(int argc, char *argv[])
+{
+	if (argc < 2) {
+		fprintf(stderr, "Usage: %s DEVICE [SYMLINK...]\n", argv[0]);
+		return 1;
+	}
+
+	if (!notify_daemon(argc, argv))
+		return 0;
+
+	argv[0] = LOADER_PATH;
+	execv(LOADER_PATH, argv);
+
+	perror("Unable to execute " LOADER_PATH);
+	return 1;
+}
@@ -4,44 +4,172 @@
 # SPDX-License-Identifier: BSD-3-Clause
 #
 
-import subprocess
-import opencas
+# Invoked as:
+#     open-cas-loader.py DEVICE [SYMLINK...]
+# passes the device to open-cas-loader daemon if it's running, otherwise loads
+# the device on its own. udev runs open-cas-loader-notify instead, which
+# executes this script only if the daemon isn't listening. Started as:
+#     open-cas-loader.py --daemon
+# it runs as the daemon, on socket passed by systemd (open-cas-loader.socket)
+# or on socket bound on its own.
+#
+# Only modules required to notify the daemon are imported at the top.
+
+import socket
 import sys
-import os
-import syslog as sl
 
-try:
-    subprocess.call(['/sbin/modprobe', 'cas_cache'])
-except:
-    sl.syslog(sl.LOG_ERR, 'Unable to probe cas_cache module')
-    exit(1)
+LOADER_SOCKET = '/run/opencas/loader.sock'
+NOTIFY_TIMEOUT = 5
+# First file descriptor passed by systemd socket activation
+SD_LISTEN_FDS_START = 3
+
+
+def notify_daemon(device, links):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.settimeout(NOTIFY_TIMEOUT)
+    try:
+        sock.sendto(' '.join([device] + links).encode(), LOADER_SOCKET)
+    finally:
+        sock.close()
+
+
+def probe_module():
+    import subprocess
+    import syslog as sl
+
+    try:
+        subprocess.call(['/sbin/modprobe', 'cas_cache'])
+    except:
+        sl.syslog(sl.LOG_ERR, 'Unable to probe cas_cache module')
+        exit(1)
+
+
+def get_loader():
+    import opencas
+    import syslog as sl
+
+    loader = opencas.DeviceLoader()
+    try:
+        loader.reload()
+    except Exception as e:
+        sl.syslog(sl.LOG_ERR, f'Unable to load opencas config. Reason: {str(e)}')
+        return None
+
+    return loader
+
+
+def log_casadm_error(loader, device, links, e):
+    import opencas
+    import syslog as sl
+
+    dev = loader.find_device(device, links)
+    if type(dev) is opencas.cas_config.cache_config:
+        sl.syslog(sl.LOG_WARNING,
+                  f'Unable to load cache {dev.cache_id} ({dev.device}). '
+                  f'Reason: {e.result.stderr}')
+    else:
+        sl.syslog(sl.LOG_WARNING,
+                  f'Unable to attach core {dev.device} from cache {dev.cache_id}. '
+                  f'Reason: {e.result.stderr}')
+
+
+def load_device(loader, device, links):
+    import opencas
+    import syslog as sl
+
+    try:
+        loader.load_device(device, links)
+    except opencas.casadm.CasadmError as e:
+        log_casadm_error(loader, device, links, e)
+        return e.result.exit_code
+    except ValueError as e:
+        sl.syslog(sl.LOG_WARNING, f'Unable to load device {device}. Reason: {str(e)}')
+        return 1
+
+    return 0
+
+
+def device_loaded(loader, device, links, future):
+    import opencas
+    import syslog as sl
+
+    # Single bad event must not stop handling of the following ones
+    e = future.exception()
+    if isinstance(e, opencas.casadm.CasadmError):
+        log_casadm_error(loader, device, links, e)
+    elif e is not None:
+        sl.syslog(sl.LOG_ERR, f'Unable to load device {device}. Reason: {str(e)}')
+
+
+def get_socket():
+    import os
+
+    if (os.environ.get('LISTEN_PID') == str(os.getpid())
+            and int(os.environ.get('LISTEN_FDS', '0')) >= 1):
+        return socket.socket(fileno=SD_LISTEN_FDS_START)
+
+    os.makedirs(os.path.dirname(LOADER_SOCKET), exist_ok=True)
+    try:
+        os.unlink(LOADER_SOCKET)
+    except FileNotFoundError:
+        pass
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    # Socket is created with final permissions, so it's never accessible to others
+    umask = os.umask(0o177)
+    try:
+        sock.bind(LOADER_SOCKET)
+    finally:
+        os.umask(umask)
+
+    return sock
+
+
+def run_daemon():
+    import functools
+    import opencas
+    import syslog as sl
+
+    probe_module()
+
+    loader = get_loader()
+    sock = get_socket()
+
+    while True:
+        message = sock.recv(65536).decode(errors='replace').split()
+        if not message:
+            continue
+        device, *links = message
+
+        # Config file is checked for changes on every notification
+        if loader is None:
+            loader = opencas.DeviceLoader()
+        try:
+            loader.reload()
+        except Exception as e:
+            sl.syslog(sl.LOG_ERR, f'Unable to reload opencas config. Reason: {str(e)}')
+            if loader.config is None:
+                continue
+
+        # Devices are loaded by worker threads, so that the socket is read
+        # and other devices are handled while casadm is busy with one of them
+        future = loader.submit(device, links)
+        future.add_done_callback(functools.partial(device_loaded, loader, device, links))
+
+
+if sys.argv[1] == '--daemon':
+    run_daemon()
 
 try:
-    config = opencas.cas_config.from_file('/etc/opencas/opencas.conf',
-                                          allow_incomplete=True)
-except Exception as e:
-    sl.syslog(sl.LOG_ERR, f'Unable to load opencas config. Reason: {str(e)}')
+    notify_daemon(sys.argv[1], sys.argv[2:])
+    exit(0)
+except OSError:
+    pass
+
+probe_module()
+
+loader = get_loader()
+if loader is None:
     exit(1)
 
-for cache in config.caches.values():
-    if sys.argv[1] == os.path.realpath(cache.device):
-        try:
-            opencas.wait_for_cas_ctrl()
-            opencas.start_cache(cache, True)
-        except opencas.casadm.CasadmError as e:
-            sl.syslog(sl.LOG_WARNING,
-                      f'Unable to load cache {cache.cache_id} ({cache.device}). '
-                      f'Reason: {e.result.stderr}')
-            exit(e.result.exit_code)
-        exit(0)
-    for core in cache.cores.values():
-        if sys.argv[1] == os.path.realpath(core.device):
-            try:
-                opencas.wait_for_cas_ctrl()
-                opencas.add_core(core, True)
-            except opencas.casadm.CasadmError as e:
-                sl.syslog(sl.LOG_WARNING,
-                          f'Unable to attach core {core.device} from cache {cache.cache_id}. '
-                          f'Reason: {e.result.stderr}')
-                exit(e.result.exit_code)
-            exit(0)
+exit(load_device(loader, sys.argv[1], sys.argv[2:]))
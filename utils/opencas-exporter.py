@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+#
+# Copyright(c) 2025 Huawei Technologies
+# SPDX-License-Identifier: BSD-3-Clause
+#
+
+# Periodically collects statistics of all caches, cores and (optionally) io
+# classes with a single casadm invocation and serves them along with hit
+# ratio, dirty growth and flush throughput rates in OpenMetrics format:
+#     opencas-exporter.py [--listen ADDRESS] [--port PORT] [--interval SECONDS]
+#                         [--io-classes] [--max-objects N] [--dirty-window SECONDS]
+#
+# Scrapes are served from the latest sample, so their cost doesn't depend on
+# scrape frequency - it is bound by --interval, --io-classes and --max-objects.
+# With --max-objects caches are queried one by one until the limit is reached.
+
+import argparse
+import http.server
+import syslog as sl
+import threading
+
+import opencas
+
+DEFAULT_PORT = 9745
+
+
+class MetricsHandler(http.server.BaseHTTPRequestHandler):
+    exporter = None
+
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+
+        body = self.exporter.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', opencas.StatsExporter.CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def collect_loop(exporter, interval, stop):
+    failing = False
+    with opencas.casadm.Session():
+        while True:
+            success = exporter.collect()
+            if not success and not failing:
+                sl.syslog(sl.LOG_WARNING, 'Unable to collect opencas statistics')
+            failing = not success
+
+            if stop.wait(interval):
+                break
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='opencas-exporter')
+    parser.add_argument('--listen', default='127.0.0.1',
+                        help='address to serve metrics on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f'port to serve metrics on (default: {DEFAULT_PORT})')
+    parser.add_argument('--interval', type=float, default=5,
+                        help='statistics collection interval in seconds (default: 5)')
+    parser.add_argument('--io-classes', action='store_true',
+                        help='export statistics of io classes of each cache and core')
+    parser.add_argument('--max-objects', type=int, default=None,
+                        help='maximum number of caches, cores and io classes to export')
+    parser.add_argument('--dirty-window', type=float, default=60,
+                        help='time window of maximum dirty data size in seconds (default: 60)')
+    args = parser.parse_args()
+
+    if args.interval < 1:
+        parser.error('interval must be at least 1 second')
+
+    if args.dirty_window < args.interval:
+        parser.error('dirty window must be at least as long as interval')
+
+    exporter = opencas.StatsExporter(io_classes=args.io_classes,
+                                     max_objects=args.max_objects,
+                                     dirty_window=args.dirty_window)
+    MetricsHandler.exporter = exporter
+
+    stop = threading.Event()
+    collector = threading.Thread(target=collect_loop,
+                                 args=(exporter, args.interval, stop),
+                                 daemon=True)
+    collector.start()
+
+    server = http.server.ThreadingHTTPServer((args.listen, args.port), MetricsHandler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,18 +3,31 @@
 # SPDX-License-Identifier: BSD-3-Clause
 #
 
+import concurrent.futures
+import ctypes
+import ctypes.util
 import subprocess
 import csv
+import errno
+import fcntl
+import json
 import re
 import os
+import select
+import socket
 import stat
+import struct
+import sys
+import threading
 import time
+from collections import namedtuple
 
 # Casadm functionality
 
 
 class casadm:
     casadm_path = '/sbin/casadm'
+    _local = threading.local()
 
     class result:
         def __init__(self, cmd):
@@ -29,9 +42,120 @@ class casadm:
             super(casadm.CasadmError, self).__init__('casadm error: {}'.format(result.stderr))
             self.result = result
 
+    class SessionError(Exception):
+        pass
+
+    class Session(object):
+        """
+        Single casadm process running in batch mode. Commands are written to
+        its stdin one per line, and each of them is answered with a frame
+        consisting of '<exit code> <stdout length> <stderr length>' header
+        followed by the command output.
+
+        Used as a context manager it routes all casadm.run_cmd() calls made by
+        the current thread through the session.
+        """
+
+        class result:
+            def __init__(self, exit_code, stdout, stderr):
+                self.exit_code = exit_code
+                self.stdout = stdout
+                self.stderr = stderr
+
+        def __init__(self, casadm_path=None):
+            self.casadm_path = casadm_path or casadm.casadm_path
+            self.process = None
+            self.previous = None
+
+        def __enter__(self):
+            self.previous = casadm.get_session()
+            casadm._local.session = self
+            return self
+
+        def __exit__(self, *args):
+            casadm._local.session = self.previous
+            self.previous = None
+            self.close()
+
+        @staticmethod
+        def can_run(cmd):
+            return bool(cmd) and all(arg and not any(c.isspace() for c in arg) for arg in cmd)
+
+        def open(self):
+            if self.process is None:
+                self.process = subprocess.Popen(
+                    [self.casadm_path, '--batch'],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                )
+
+        def close(self):
+            if self.process is None:
+                return
+
+            self.process.stdin.close()
+            self.process.wait()
+            self.process.stdout.close()
+            self.process = None
+
+        def _send(self, cmds):
+            try:
+                for cmd in cmds:
+                    self.process.stdin.write(' '.join(cmd).encode() + b'\n')
+                self.process.stdin.flush()
+            except BrokenPipeError:
+                # casadm exited, reader gets EOF and reports SessionError
+                pass
+
+        def _receive(self):
+            header = self.process.stdout.readline()
+            if not header:
+                self.close()
+                raise casadm.SessionError('casadm session terminated unexpectedly')
+
+            exit_code, stdout_len, stderr_len = (int(x) for x in header.split())
+            stdout = self.process.stdout.read(stdout_len).decode()
+            stderr = self.process.stdout.read(stderr_len).decode()
+
+            return self.result(exit_code, stdout, stderr)
+
+        def run_cmds(self, cmds):
+            """
+            Pipeline commands (given without casadm path) through the session
+            and return list of results in the same order
+            """
+            cmds = list(cmds)
+            if not cmds:
+                return []
+            for cmd in cmds:
+                if not self.can_run(cmd):
+                    raise casadm.SessionError(f'Command {cmd} can\'t be run in session')
+
+            self.open()
+
+            writer = threading.Thread(target=self._send, args=(cmds,))
+            writer.start()
+            try:
+                results = [self._receive() for _ in cmds]
+            finally:
+                writer.join()
+
+            return results
+
+        def run_cmd(self, cmd):
+            return self.run_cmds([cmd])[0]
+
+    @classmethod
+    def get_session(cls):
+        return getattr(cls._local, 'session', None)
+
     @classmethod
     def run_cmd(cls, cmd):
-        result = cls.result(cmd)
+        session = cls.get_session()
+        if session is not None and cmd[0] == cls.casadm_path and session.can_run(cmd[1:]):
+            result = session.run_cmd(cmd[1:])
+        else:
+            result = cls.result(cmd)
         if result.exit_code != 0:
             raise cls.CasadmError(result)
         return result
@@ -51,6 +175,19 @@ class casadm:
                '--by-id-path']
         return cls.run_cmd(cmd)
 
+    @classmethod
+    def get_all_stats(cls, io_classes=False, cache_id=None):
+        cmd = [cls.casadm_path,
+               '--stats',
+               '--all',
+               '--output-format', 'json',
+               '--by-id-path']
+        if cache_id is not None:
+            cmd += ['--cache-id', str(cache_id)]
+        if io_classes:
+            cmd += ['--io-class-id']
+        return cls.run_cmd(cmd)
+
     @classmethod
     def check_cache_device(cls, device):
         cmd = [cls.casadm_path,
@@ -171,6 +308,355 @@ class casadm:
         return cls.run_cmd(cmd)
 
 
+# Direct ioctl interface
+
+
+class cas_ioctl:
+    """
+    Optional backend querying /dev/cas_ctrl directly instead of running casadm
+    and parsing its output. Ioctl numbers and structure layouts are read from
+    cas_ioctl_layout file generated from cas_ioctl_codes.h during casadm build.
+
+    Backend is used when enabled is set (OPENCAS_BACKEND=ioctl in environment).
+    Any failure is reported as IoctlError, so that callers can fall back to
+    casadm.
+    """
+    ctrl_device = '/dev/cas_ctrl'
+    layout_path = '/lib/opencas/cas_ioctl_layout'
+    module_version_path = '/sys/module/cas_cache/version'
+    enabled = os.environ.get('OPENCAS_BACKEND') == 'ioctl'
+    _layout = None
+
+    class IoctlError(Exception):
+        pass
+
+    class layout:
+        def __init__(self, lines):
+            self.version = None
+            self.consts = dict()
+            self.ioctls = dict()
+            self.structs = dict()
+            self.fields = dict()
+            self.enums = {'cache_state': dict(), 'core_state': dict(), 'cache_mode': dict()}
+
+            for line in lines:
+                line = line.split()
+                if not line or line[0].startswith('#'):
+                    continue
+
+                if line[0] == 'version':
+                    self.version = line[1]
+                elif line[0] == 'const':
+                    self.consts[line[1]] = int(line[2])
+                elif line[0] == 'ioctl':
+                    self.ioctls[line[1]] = int(line[2])
+                elif line[0] == 'struct':
+                    self.structs[line[1]] = int(line[2])
+                    self.fields[line[1]] = dict()
+                elif line[0] == 'field':
+                    offset, size, kind, count = line[3:7]
+                    self.fields[line[1]][line[2]] = (int(offset), int(size), kind, int(count))
+                elif line[0] in self.enums:
+                    self.enums[line[0]][int(line[2])] = line[1]
+
+        @classmethod
+        def from_file(cls, path):
+            with open(path, 'r') as f:
+                return cls(f.readlines())
+
+    class command:
+        """ Buffer holding single ioctl structure """
+
+        def __init__(self, layout, struct_name, **fields):
+            try:
+                self.buf = bytearray(layout.structs[struct_name])
+                self.fields = layout.fields[struct_name]
+            except KeyError:
+                raise cas_ioctl.IoctlError(f'Unknown structure {struct_name}')
+            self.name = struct_name
+            for name, value in fields.items():
+                self[name] = value
+
+        def _field(self, name):
+            try:
+                return self.fields[name]
+            except KeyError:
+                raise cas_ioctl.IoctlError(f'Unknown field {self.name}.{name}')
+
+        def _get_int(self, offset, size, kind):
+            return int.from_bytes(self.buf[offset:offset + size], sys.byteorder,
+                                  signed=(kind == 'i'))
+
+        def __getitem__(self, name):
+            offset, size, kind, count = self._field(name)
+            if kind == 's':
+                raw = self.buf[offset:offset + size]
+                return raw.split(b'\0', 1)[0].decode(errors='replace')
+            if count > 1:
+                return self.array(name)
+            return self._get_int(offset, size, kind)
+
+        def array(self, name, length=None):
+            """ First length elements of array field (whole array by default) """
+            offset, size, kind, count = self._field(name)
+            length = count if length is None else min(length, count)
+            item_size = size // count
+            fmt = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}[item_size]
+            if kind == 'i':
+                fmt = fmt.lower()
+            return list(struct.unpack_from(f'={length}{fmt}', self.buf, offset))
+
+        def __setitem__(self, name, value):
+            offset, size, kind, count = self._field(name)
+            if kind == 's':
+                raw = value.encode()
+                if len(raw) >= size:
+                    raise cas_ioctl.IoctlError(f'Value too long for {self.name}.{name}')
+                raw = raw.ljust(size, b'\0')
+            else:
+                raw = value.to_bytes(size, sys.byteorder, signed=(kind == 'i'))
+            self.buf[offset:offset + size] = raw
+
+    @classmethod
+    def get_layout(cls):
+        if cls._layout is None:
+            try:
+                cls._layout = cls.layout.from_file(cls.layout_path)
+            except (OSError, ValueError, IndexError) as e:
+                raise cls.IoctlError(f'Unable to read ioctl layout: {e}')
+        return cls._layout
+
+    @classmethod
+    def open_ctrl(cls):
+        try:
+            return os.open(cls.ctrl_device, os.O_RDWR)
+        except OSError as e:
+            raise cls.IoctlError(f'Unable to open {cls.ctrl_device}: {e}')
+
+    @classmethod
+    def run_ioctl(cls, fd, name, command, ignore_errno=()):
+        layout = cls.get_layout()
+        try:
+            fcntl.ioctl(fd, layout.ioctls[name], command.buf, True)
+        except KeyError:
+            raise cls.IoctlError(f'Unknown ioctl {name}')
+        except OSError as e:
+            if e.errno not in ignore_errno:
+                raise cls.IoctlError(f'{name} failed: {e}')
+        return command
+
+    @classmethod
+    def get_cache_ids(cls, fd):
+        layout = cls.get_layout()
+        limit = layout.consts['CACHE_LIST_ID_LIMIT']
+
+        cmd = cls.command(layout, 'kcas_cache_count')
+        count = cls.run_ioctl(fd, 'GET_CACHE_COUNT', cmd)['cache_count']
+
+        cache_ids = []
+        position = 0
+        while len(cache_ids) < count:
+            cmd = cls.command(layout, 'kcas_cache_list', id_position=position, in_out_num=limit)
+            cls.run_ioctl(fd, 'LIST_CACHE', cmd, ignore_errno=(errno.EINVAL,))
+            num = cmd['in_out_num']
+            cache_ids += cmd.array('cache_id_tab', num)
+            if num < limit:
+                break
+            position += limit
+
+        return cache_ids[:count]
+
+    @classmethod
+    def get_cache_info(cls, fd, cache_id):
+        cmd = cls.command(cls.get_layout(), 'kcas_cache_info', cache_id=cache_id)
+        return cls.run_ioctl(fd, 'CACHE_INFO', cmd)
+
+    @classmethod
+    def get_core_info(cls, fd, cache_id, core_id):
+        cmd = cls.command(cls.get_layout(), 'kcas_core_info', cache_id=cache_id, core_id=core_id)
+        return cls.run_ioctl(fd, 'CORE_INFO', cmd)
+
+    @classmethod
+    def get_core_pool_paths(cls, fd):
+        layout = cls.get_layout()
+        max_str_len = layout.consts['MAX_STR_LEN']
+
+        cmd = cls.command(layout, 'kcas_core_pool_count')
+        count = cls.run_ioctl(fd, 'GET_CORE_POOL_COUNT', cmd)['core_pool_count']
+        if count <= 0:
+            return []
+
+        tab = ctypes.create_string_buffer(count * max_str_len)
+        cmd = cls.command(layout, 'kcas_core_pool_path',
+                          core_path_tab=ctypes.addressof(tab), core_pool_count=count)
+        cls.run_ioctl(fd, 'GET_CORE_POOL_PATHS', cmd)
+
+        paths = []
+        for i in range(min(cmd['core_pool_count'], count)):
+            raw = tab.raw[i * max_str_len:(i + 1) * max_str_len]
+            paths.append(raw.split(b'\0', 1)[0].decode(errors='replace'))
+        return paths
+
+    @staticmethod
+    def _flush_progress(dirty, flushed):
+        if not flushed:
+            return 0
+        return 100 * flushed / (dirty + flushed)
+
+    @classmethod
+    def _cache_state_name(cls, state, standby_detached):
+        if standby_detached:
+            return 'Standby detached'
+
+        # Combined states like "running&stopping" are described by the latter
+        for value, name in sorted(cls.get_layout().enums['cache_state'].items(), reverse=True):
+            if state & (1 << value):
+                return name
+        return 'Not running'
+
+    @classmethod
+    def _get_cache_rows(cls, fd, cache_id):
+        layout = cls.get_layout()
+        cache_states = {name: value for value, name in layout.enums['cache_state'].items()}
+        info = cls.get_cache_info(fd, cache_id)
+
+        state = info['info.state']
+        standby = bool(state & (1 << cache_states['Standby']))
+        detached = standby or bool(state & (1 << cache_states['Detached']))
+        mode = layout.enums['cache_mode'].get(info['info.cache_mode'], 'Unknown')
+        device = '-'
+
+        cache_progress = cls._flush_progress(info['info.dirty'], info['info.flushed'])
+        if cache_progress:
+            status = f'Flushing ({cache_progress:3.1f} %)'
+            mode = f'wb->{mode}'
+        else:
+            status = cls._cache_state_name(state, info['info.standby_detached'])
+            if standby:
+                mode = '-'
+                if not info['info.standby_detached']:
+                    device = f'/dev/cas-cache-{cache_id}'
+
+        rows = [{
+            'type': 'cache',
+            'id': str(cache_id),
+            'disk': '-' if detached else info['cache_path_name'],
+            'status': status,
+            'write policy': mode,
+            'device': device,
+        }]
+
+        for core_id in info.array('core_id', info['info.core_count']):
+            try:
+                core = cls.get_core_info(fd, cache_id, core_id)
+            except cls.IoctlError:
+                break
+
+            core_progress = cls._flush_progress(core['info.dirty'], core['info.flushed'])
+            if not core_progress and cache_progress:
+                core_progress = 0 if core['info.dirty'] else 100
+
+            if core_progress or cache_progress:
+                status = f'Flushing ({core_progress:3.1f} %)'
+            else:
+                status = layout.enums['core_state'].get(core['state'], 'Invalid')
+
+            rows.append({
+                'type': 'core',
+                'id': str(core_id),
+                'disk': core['core_path_name'],
+                'status': status,
+                'write policy': '-',
+                'device': f'/dev/cas{cache_id}-{core_id}' if core['exp_obj_exists'] else '-',
+            })
+
+        return rows
+
+    @classmethod
+    def list_caches(cls):
+        """ Same rows as csv output of casadm --list-caches --by-id-path """
+        fd = cls.open_ctrl()
+        try:
+            rows = []
+
+            core_pool = cls.get_core_pool_paths(fd)
+            if core_pool:
+                rows.append({'type': 'core pool', 'id': '-', 'disk': '-', 'status': '-',
+                             'write policy': '-', 'device': '-'})
+            for path in core_pool:
+                rows.append({'type': 'core', 'id': '-', 'disk': path, 'status': 'Detached',
+                             'write policy': '-', 'device': '-'})
+
+            for cache_id in cls.get_cache_ids(fd):
+                rows += cls._get_cache_rows(fd, cache_id)
+
+            return rows
+        finally:
+            os.close(fd)
+
+    @classmethod
+    def check_cache_device(cls, device):
+        """ Same row as csv output of casadm --check-cache-device """
+        device = os.path.abspath(device)
+        if not device.startswith(f'{cas_config._by_id_dir}/'):
+            # Let casadm validate and report other paths
+            raise cls.IoctlError(f'{device} is not a by-id path')
+
+        cmd = cls.command(cls.get_layout(), 'kcas_cache_check_device', path_name=device)
+        fd = cls.open_ctrl()
+        try:
+            cls.run_ioctl(fd, 'CACHE_CHECK_DEVICE', cmd)
+        finally:
+            os.close(fd)
+
+        if cmd['is_cache_device'] and cmd['metadata_compatible']:
+            return {'Is cache': 'yes',
+                    'Clean Shutdown': 'yes' if cmd['clean_shutdown'] else 'no',
+                    'Cache dirty': 'yes' if cmd['cache_dirty'] else 'no'}
+        return {'Is cache': 'no', 'Clean Shutdown': '-', 'Cache dirty': '-'}
+
+    @classmethod
+    def get_stats(cls, cache_id, core_id=None, io_class_id=None):
+        """
+        Raw statistics of cache, core or io class as
+        {section: {name: {'value': ..., 'fraction': ...}}}, e.g.
+        stats['req']['rd_hits']['value']. Fractions are in hundredths of percent.
+        """
+        layout = cls.get_layout()
+        cmd = cls.command(
+            layout, 'kcas_get_stats', cache_id=cache_id,
+            core_id=core_id if core_id is not None else layout.consts['OCF_CORE_ID_INVALID'],
+            part_id=(io_class_id if io_class_id is not None
+                     else layout.consts['OCF_IO_CLASS_INVALID']))
+
+        fd = cls.open_ctrl()
+        try:
+            cls.run_ioctl(fd, 'GET_STATS', cmd)
+        finally:
+            os.close(fd)
+
+        stats = dict()
+        for name in cmd.fields:
+            path = name.split('.')
+            if len(path) != 3:
+                continue
+            section, stat, kind = path
+            stats.setdefault(section, dict()).setdefault(stat, dict())[kind] = cmd[name]
+        return stats
+
+    @classmethod
+    def get_version(cls):
+        """ Same rows as csv output of casadm --version """
+        try:
+            with open(cls.module_version_path, 'r') as f:
+                module_version = f.read().rstrip('\n')
+        except OSError:
+            module_version = 'Not Loaded'
+
+        return {'CAS Kernel Module': module_version,
+                'CAS CLI Utility': cls.get_layout().version}
+
+
 # Configuration file parser
 
 
@@ -217,6 +703,7 @@ class cas_config(object):
             self.cache_mode = cache_mode.lower()
             self.params = params
             self.cores = dict()
+            self.pending_device_check = False
 
         @classmethod
         def from_line(cls, line, allow_incomplete=False):
@@ -251,9 +738,13 @@ class cas_config(object):
                 self.validate_parameter(param_name, param_value)
 
             if not allow_incomplete:
-                cas_config.check_block_device(self.device)
-                if not force:
-                    self.check_cache_device_empty()
+                self.validate_device(force)
+
+        def validate_device(self, force=False):
+            cas_config.check_block_device(self.device)
+            if not force:
+                self.check_cache_device_empty()
+            self.pending_device_check = False
 
         def validate_parameter(self, param_name, param_value):
             if param_name == 'ioclass_file':
@@ -350,6 +841,7 @@ class cas_config(object):
             self.core_id = int(core_id)
             self.device = path
             self.params = params
+            self.pending_device_check = False
 
         @classmethod
         def from_line(cls, line, allow_incomplete=False):
@@ -388,7 +880,11 @@ class cas_config(object):
                 self.validate_parameter(param_name, param_value)
 
             if not allow_incomplete:
-                cas_config.check_block_device(self.device)
+                self.validate_device()
+
+        def validate_device(self):
+            cas_config.check_block_device(self.device)
+            self.pending_device_check = False
 
         def validate_parameter(self, param_name, param_value):
             if param_name == "lazy_startup":
@@ -426,6 +922,8 @@ class cas_config(object):
         def is_lazy(self):
             return self.params.get("lazy_startup", "false") == "true"
 
+    config_diff = namedtuple('config_diff', ['added', 'removed', 'changed'])
+
     def __init__(self, caches=None, cores=None, version_tag=None):
         self.caches = caches if caches else dict()
 
@@ -433,18 +931,78 @@ class cas_config(object):
 
         self.version_tag = version_tag
 
+        self.config_file = None
+        self.allow_incomplete = False
+        self.lazy_validation = False
+        self._parsed_lines = dict()
+
+        self._by_path = dict()
+        self._by_realpath = dict()
+        self._unresolved = dict()
+        for cache in self.caches.values():
+            self._index_device(cache)
+            for core in cache.cores.values():
+                self._index_device(core)
+
+    def _index_device(self, dev):
+        path = os.path.abspath(dev.device)
+        realpath = os.path.realpath(dev.device)
+        self._by_path[path] = dev
+        self._by_realpath[realpath] = dev
+        # Paths which didn't resolve to other path (e.g. by-id link not
+        # created yet) are the only ones which may resolve differently later
+        if realpath == path:
+            self._unresolved[path] = dev
+
     @classmethod
-    def from_file(cls, config_file, allow_incomplete=False):
-        section_caches = False
-        section_cores = False
+    def from_file(cls, config_file, allow_incomplete=False, lazy_validation=False):
+        """
+        Parse config file. With lazy_validation devices are not checked while
+        parsing, instead they're checked when cache is started or core is
+        added (see pending_device_check).
+        """
+        config = cls()
+        config.config_file = config_file
+        config.allow_incomplete = allow_incomplete
+        config.lazy_validation = lazy_validation
+        config._read()
+
+        return config
+
+    def _parse_line(self, section, line, parsed_lines):
+        entry = parsed_lines.get((section, line))
+        if entry is not None:
+            if section == 'caches':
+                entry.cores = dict()
+            return entry
+
+        allow_incomplete = self.allow_incomplete or self.lazy_validation
+        if section == 'caches':
+            entry = cas_config.cache_config.from_line(line, allow_incomplete)
+        else:
+            entry = cas_config.core_config.from_line(line, allow_incomplete)
+        entry.pending_device_check = not self.allow_incomplete and self.lazy_validation
+
+        return entry
+
+    def _read(self, parsed_lines=None):
+        parsed_lines = parsed_lines or dict()
+        section = None
+
+        self.caches = dict()
+        self.cores = list()
+        self._parsed_lines = dict()
+        self._by_path = dict()
+        self._by_realpath = dict()
+        self._unresolved = dict()
 
         try:
-            with open(config_file, 'r') as conf:
+            with open(self.config_file, 'r') as conf:
                 version_tag = conf.readline()
                 if not re.findall(r'^version=.*$', version_tag):
                     raise ValueError('No version tag found!')
 
-                config = cls(version_tag=version_tag)
+                self.version_tag = version_tag
 
                 for line in conf:
                     line = line.split('#')[0].rstrip()
@@ -452,28 +1010,104 @@ class cas_config(object):
                         continue
 
                     if line == '[caches]':
-                        section_caches = True
+                        section = 'caches'
                         continue
 
                     if line == '[cores]':
-                        section_caches = False
-                        section_cores = True
+                        section = 'cores'
                         continue
 
-                    if section_caches:
-                        cache = cas_config.cache_config.from_line(line, allow_incomplete)
-                        config.insert_cache(cache)
-                    elif section_cores:
-                        core = cas_config.core_config.from_line(line, allow_incomplete)
-                        config.insert_core(core)
-        except ValueError:
-            raise
+                    if section == 'caches':
+                        cache = self._parse_line(section, line, parsed_lines)
+                        self.insert_cache(cache)
+                    elif section == 'cores':
+                        core = self._parse_line(section, line, parsed_lines)
+                        self.insert_core(core)
+                    else:
+                        continue
+
+                    self._parsed_lines[(section, line)] = cache if section == 'caches' else core
         except IOError:
             raise Exception('Couldn\'t open config file')
-        except:
+
+    def _get_entries(self):
+        entries = dict()
+        for cache in self.caches.values():
+            entries[('cache', cache.cache_id)] = cache
+        for core in self.cores:
+            entries[('core', core.cache_id, core.core_id)] = core
+
+        return entries
+
+    def reload(self):
+        """
+        Parse config file again. Entries of lines which didn't change since
+        previous parse are reused without validating them again. Returns
+        config_diff with lists of added, removed and changed entries.
+        If parsing fails, config stays unchanged.
+        """
+        old_state = dict(self.__dict__)
+        old_cores = {cache_id: cache.cores for cache_id, cache in self.caches.items()}
+        old_entries = self._get_entries()
+
+        try:
+            self._read(old_state['_parsed_lines'])
+        except Exception:
+            self.__dict__.update(old_state)
+            for cache_id, cores in old_cores.items():
+                self.caches[cache_id].cores = cores
             raise
 
-        return config
+        new_entries = self._get_entries()
+        added = [e for k, e in new_entries.items() if k not in old_entries]
+        removed = [e for k, e in old_entries.items() if k not in new_entries]
+        changed = [
+            e for k, e in new_entries.items() if k in old_entries and old_entries[k] is not e
+        ]
+
+        return cas_config.config_diff(added, removed, changed)
+
+    def get_cache(self, cache_id):
+        return self.caches.get(int(cache_id))
+
+    def get_core(self, cache_id, core_id):
+        cache = self.get_cache(cache_id)
+        return cache.cores.get(int(core_id)) if cache else None
+
+    def get_device_by_path(self, path):
+        """
+        Find cache or core config by its configured (e.g. by-id) path or by path
+        it resolved to when it was inserted
+        """
+        dev = self._by_path.get(os.path.abspath(path))
+        if dev is not None:
+            return dev
+
+        return self._by_realpath.get(os.path.realpath(path))
+
+    def find_device(self, device, links=()):
+        """
+        Find cache or core config for device given by its path and optionally
+        list of its symlinks. Unlike get_device_by_path(), verifies that config
+        path still resolves to the device, as symlinks may change after config
+        is loaded. Returns None if device is not configured.
+        """
+        for path in [device] + list(links):
+            dev = self._by_path.get(path)
+            if dev is not None:
+                return dev
+
+        dev = self._by_realpath.get(device)
+        if dev is not None and os.path.realpath(dev.device) == device:
+            return dev
+
+        # Symlinks which didn't exist when config was loaded may point to
+        # the device now
+        for path, dev in self._unresolved.items():
+            if os.path.realpath(path) == device:
+                return dev
+
+        return None
 
     def insert_cache(self, new_cache_config):
         if new_cache_config.cache_id in self.caches:
@@ -485,18 +1119,13 @@ class cas_config(object):
                 raise cas_config.AlreadyConfiguredException(
                                 'Cache already configured')
 
-        for cache_id, cache in self.caches.items():
-            if cache_id != new_cache_config.cache_id:
-                if (os.path.realpath(new_cache_config.device)
-                        == os.path.realpath(cache.device)):
-                    raise cas_config.ConflictingConfigException(
-                            'This cache device is already configured as a cache')
-
-            for _, core in cache.cores.items():
-                if (os.path.realpath(core.device)
-                        == os.path.realpath(new_cache_config.device)):
-                    raise cas_config.ConflictingConfigException(
-                            'This cache device is already configured as a core')
+        configured = self._by_realpath.get(os.path.realpath(new_cache_config.device))
+        if type(configured) is cas_config.cache_config:
+            raise cas_config.ConflictingConfigException(
+                    'This cache device is already configured as a cache')
+        elif configured is not None:
+            raise cas_config.ConflictingConfigException(
+                    'This cache device is already configured as a core')
 
         try:
             new_cache_config.device = cas_config.get_by_id_path(new_cache_config.device)
@@ -504,35 +1133,29 @@ class cas_config(object):
             pass
 
         self.caches[new_cache_config.cache_id] = new_cache_config
+        self._index_device(new_cache_config)
 
     def insert_core(self, new_core_config):
         if new_core_config.cache_id not in self.caches:
             raise KeyError(f'Cache id {new_core_config.cache_id} doesn\'t exist')
 
-        try:
-            for cache_id, cache in self.caches.items():
-                if (os.path.realpath(cache.device)
-                        == os.path.realpath(new_core_config.device)):
-                    raise cas_config.ConflictingConfigException(
-                            'Core device already configured as a cache')
-
-                for core_id, core in cache.cores.items():
-                    if (cache_id == new_core_config.cache_id
-                            and core_id == new_core_config.core_id):
-                        if (os.path.realpath(core.device)
-                                == os.path.realpath(new_core_config.device)):
-                            raise cas_config.AlreadyConfiguredException(
-                                    'Core already configured')
-                        else:
-                            raise cas_config.ConflictingConfigException(
-                                    'Other core device configured under this id')
-                    else:
-                        if (os.path.realpath(core.device)
-                                == os.path.realpath(new_core_config.device)):
-                            raise cas_config.ConflictingConfigException(
-                                    'This core device is already configured as a core')
-        except KeyError:
-            pass
+        realpath = os.path.realpath(new_core_config.device)
+        configured = self._by_realpath.get(realpath)
+        if type(configured) is cas_config.cache_config:
+            raise cas_config.ConflictingConfigException(
+                    'Core device already configured as a cache')
+
+        core = self.caches[new_core_config.cache_id].cores.get(new_core_config.core_id)
+        if core is not None:
+            if os.path.realpath(core.device) == realpath:
+                raise cas_config.AlreadyConfiguredException(
+                        'Core already configured')
+            else:
+                raise cas_config.ConflictingConfigException(
+                        'Other core device configured under this id')
+        elif configured is not None:
+            raise cas_config.ConflictingConfigException(
+                    'This core device is already configured as a core')
 
         try:
             new_core_config.device = cas_config.get_by_id_path(new_core_config.device)
@@ -541,6 +1164,7 @@ class cas_config(object):
 
         self.caches[new_core_config.cache_id].cores[new_core_config.core_id] = new_core_config
         self.cores += [new_core_config]
+        self._index_device(new_core_config)
 
     def is_empty(self):
         if len(self.caches) > 0 or len(self.cores) > 0:
@@ -568,6 +1192,10 @@ class cas_config(object):
 
 
 def start_cache(cache, load, force=False):
+    if cache.pending_device_check:
+        # Loaded cache device is expected to hold cache metadata
+        cache.validate_device(force or load)
+
     target_state = cache.params.get("target_failover_state")
     if target_state is not None and target_state == "standby":
         casadm.start_standby_cache(
@@ -604,50 +1232,267 @@ def configure_cache(cache):
 
 
 def add_core(core, attach):
+    if core.pending_device_check:
+        core.validate_device()
+
     casadm.add_core(
             device=core.device,
             cache_id=core.cache_id,
             core_id=core.core_id,
             try_add=attach)
 
-# Another helper functions
+# Device loader
+
+
+class DeviceLoader(object):
+    """
+    Starts caches and adds cores from config file as their devices show up.
+
+    Config is parsed once and parsed again (incrementally) only when the file
+    changes. Device is matched against paths from config by its name and
+    symlinks reported by udev, then by resolved paths of configured devices.
+
+    Devices can be loaded concurrently with submit(), so that a slow casadm
+    call for one device doesn't delay the others. Loads of the same device are
+    done one after another.
+    """
+
+    def __init__(self, config_file=None, jobs=8):
+        self.config_file = config_file or cas_config.default_location
+        self.config = None
+        self.jobs = jobs
+        self._config_stamp = None
+        # Guards config, which may be reloaded while devices are being loaded
+        self._lock = threading.Lock()
+        self._device_locks = dict()
+        self._executor = None
+
+    def _get_config_stamp(self):
+        st = os.stat(self.config_file)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def reload(self, force=False):
+        """ Parse config file again if it changed. Returns True if it was parsed. """
+        with self._lock:
+            stamp = self._get_config_stamp()
+            if not force and stamp == self._config_stamp:
+                return False
+
+            if self.config is None:
+                # Only the device which showed up is validated, when it's loaded
+                self.config = cas_config.from_file(self.config_file, lazy_validation=True)
+            else:
+                self.config.reload()
+            self._config_stamp = stamp
 
+        return True
 
-def is_cache_started(cache_config):
-    dev_list = get_caches_list()
-    for dev in dev_list:
-        if dev['type'] == 'cache' and int(dev['id']) == cache_config.cache_id:
-            return True
+    def find_device(self, device, links=()):
+        """
+        Find cache or core config for device given by its path and optionally
+        list of its symlinks. Returns None if device is not configured.
+        """
+        with self._lock:
+            return self.config.find_device(device, links)
+
+    def _get_device_lock(self, device):
+        with self._lock:
+            return self._device_locks.setdefault(device, threading.Lock())
+
+    def load_device(self, device, links=()):
+        """
+        Load cache or add core for given device if it's configured.
+        Returns config of the device or None if device is not configured.
+        """
+        with self._get_device_lock(device):
+            dev = self.find_device(device, links)
+            if dev is None:
+                return None
+
+            wait_for_cas_ctrl()
+            if type(dev) is cas_config.cache_config:
+                start_cache(dev, True)
+            else:
+                add_core(dev, True)
 
-    return False
+        return dev
 
+    @staticmethod
+    def _open_worker_session():
+        # Session is used by the worker thread until the loader is shut down
+        casadm.Session().__enter__()
+
+    def submit(self, device, links=()):
+        """ Load device in a worker thread. Returns future of load_device() result. """
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.jobs, initializer=self._open_worker_session
+            )
+
+        return self._executor.submit(self.load_device, device, links)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+# Another helper functions
+
+
+def is_cache_started(cache_config, snapshot=None):
+    snapshot = snapshot if snapshot is not None else DeviceStateSnapshot()
 
-def is_core_added(core_config):
-    dev_list = get_caches_list()
-    cache_id = 0
-    for dev in dev_list:
-        if dev['type'] == 'cache':
-            cache_id = int(dev['id'])
+    return snapshot.get_cache(cache_config.cache_id) is not None
 
-        if (dev['type'] == 'core' and
-                cache_id == core_config.cache_id and
-                int(dev['id']) == core_config.core_id):
-            return True
 
-    return False
+def is_core_added(core_config, snapshot=None):
+    snapshot = snapshot if snapshot is not None else DeviceStateSnapshot()
+
+    return snapshot.get_core(core_config.cache_id, core_config.core_id) is not None
 
 
 def get_caches_list():
+    if cas_ioctl.enabled:
+        try:
+            return cas_ioctl.list_caches()
+        except cas_ioctl.IoctlError:
+            pass
+
     result = casadm.list_caches()
     return list(csv.DictReader(result.stdout.split('\n')))
 
 
+class DeviceStateSnapshot(object):
+    """
+    Runtime state of CAS devices as returned by a single casadm --list-caches
+    call, indexed for lookups by cache id, (cache id, core id), device path and
+    exported object path. Listing is done lazily on first lookup.
+
+    Snapshot doesn't follow changes made by casadm commands. Owner of the
+    snapshot is responsible for calling invalidate() (or updating core status
+    with set_core_status()) after issuing mutating commands.
+    """
+
+    _exp_obj_pattern = re.compile(r'^(/dev/cas\d+-\d+)(p\d+)?$')
+
+    def __init__(self, dev_list=None):
+        self._dev_list = dev_list
+        self._loaded = False
+
+    def invalidate(self):
+        self._dev_list = None
+        self._loaded = False
+
+    def load(self):
+        if self._loaded:
+            return
+
+        if self._dev_list is None:
+            self._dev_list = get_caches_list()
+
+        self._caches = dict()
+        self._cores = dict()
+        self._core_pool = dict()
+        self._by_path = dict()
+        self._by_exp_obj = dict()
+        self._exp_obj_users = dict()
+
+        core_pool = False
+        cache_id = -1
+
+        for dev in self._dev_list:
+            if dev['type'] == 'core pool':
+                core_pool = True
+                continue
+
+            if dev['type'] == 'cache':
+                core_pool = False
+                cache_id = int(dev['id'])
+                self._caches[cache_id] = dev
+                self._by_path[dev['disk']] = dev
+            elif dev['type'] == 'core':
+                if core_pool:
+                    try:
+                        device_path = os.path.realpath(dev['disk'])
+                    except ValueError:
+                        device_path = dev['disk']
+
+                    self._core_pool[device_path] = dev
+                    continue
+
+                dev = dict(dev, cache_id=cache_id)
+                self._cores[(cache_id, int(dev['id']))] = dev
+                self._by_path[dev['disk']] = dev
+                self._by_exp_obj[dev['device']] = dev
+
+                match = self._exp_obj_pattern.match(dev['disk'])
+                if match:
+                    self._exp_obj_users.setdefault(match.group(1), []).append(dev)
+
+        self._loaded = True
+
+    def get_cache(self, cache_id):
+        self.load()
+        return self._caches.get(int(cache_id))
+
+    def get_core(self, cache_id, core_id):
+        self.load()
+        return self._cores.get((int(cache_id), int(core_id)))
+
+    def get_core_pool_device(self, path):
+        self.load()
+        return self._core_pool.get(path)
+
+    def get_device_by_path(self, path):
+        self.load()
+        return self._by_path.get(path)
+
+    def get_device_by_exp_obj(self, path):
+        self.load()
+        return self._by_exp_obj.get(path)
+
+    def get_exp_obj_users(self, cache_id, core_id):
+        """ Cores configured on top of given core's exported object or its partitions """
+        self.load()
+        return self._exp_obj_users.get(f'/dev/cas{cache_id}-{core_id}', [])
+
+    def caches(self):
+        self.load()
+        return list(self._caches.values())
+
+    def cores(self):
+        self.load()
+        return list(self._cores.values())
+
+    def core_pool(self):
+        self.load()
+        return dict(self._core_pool)
+
+    def set_core_status(self, cache_id, core_id, status):
+        core = self.get_core(cache_id, core_id)
+        if core is not None:
+            core['status'] = status
+
+
 def check_cache_device(device):
+    if cas_ioctl.enabled:
+        try:
+            return cas_ioctl.check_cache_device(device)
+        except cas_ioctl.IoctlError:
+            pass
+
     result = casadm.check_cache_device(device)
     return list(csv.DictReader(result.stdout.split('\n')))[0]
 
 
 def get_cas_version():
+    if cas_ioctl.enabled:
+        try:
+            return cas_ioctl.get_version()
+        except cas_ioctl.IoctlError:
+            pass
+
     version = casadm.get_version()
 
     ret = {}
@@ -690,144 +1535,326 @@ class CompoundException(Exception):
             raise self
 
 
-def detach_core_recursive(cache_id, core_id, flush):
+class DependencyCycleException(ValueError):
+    def __init__(self, key):
+        super(DependencyCycleException, self).__init__(f'Dependency cycle detected at {key}')
+        self.key = key
+
+
+def _get_dependency_order(tasks, dependencies):
+    order = []
+    state = dict()
+
+    def visit(key):
+        if state.get(key) == 'done':
+            return
+        if state.get(key) == 'visiting':
+            raise DependencyCycleException(key)
+
+        state[key] = 'visiting'
+        for dependency in dependencies.get(key, []):
+            if dependency in tasks:
+                visit(dependency)
+        state[key] = 'done'
+        order.append(key)
+
+    for key in tasks:
+        visit(key)
+
+    return order
+
+
+def run_with_dependencies(tasks, dependencies, jobs=1):
+    """
+    Run callables from tasks dict, each of them only after all the tasks listed
+    under its key in dependencies dict have finished (dependencies missing
+    from tasks are ignored). Up to jobs independent tasks are run concurrently.
+    Returns dict with values returned by the tasks.
+    """
+    order = _get_dependency_order(tasks, dependencies)
+    results = dict()
+
+    if jobs <= 1:
+        for key in order:
+            results[key] = tasks[key]()
+        return results
+
+    pending = dict()
+    dependents = dict()
+    for key in order:
+        pending[key] = set(d for d in dependencies.get(key, []) if d in tasks)
+        for dependency in pending[key]:
+            dependents.setdefault(dependency, []).append(key)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        running = {executor.submit(tasks[key]): key for key in order if not pending[key]}
+
+        while running:
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                key = running.pop(future)
+                results[key] = future.result()
+
+                for dependent in dependents.get(key, []):
+                    pending[dependent].discard(key)
+                    if not pending[dependent]:
+                        running[executor.submit(tasks[dependent])] = dependent
+
+    return results
+
+
+def detach_core_recursive(cache_id, core_id, flush, snapshot=None):
     # Catching exceptions is left to uppermost caller of detach_core_recursive
     # as the immediate caller that made a recursive call depends on the callee
     # to remove core and thus release reference to lower level cache volume.
-    l_cache_id = ''
-    for dev in get_caches_list():
-        if dev['type'] == 'cache':
-            l_cache_id = dev['id']
-        elif dev['type'] == 'core' and dev['status'] == 'Active':
-            if f'/dev/cas{cache_id}-{core_id}' in dev['disk']:
-                detach_core_recursive(l_cache_id, dev['id'], flush)
-        elif l_cache_id == cache_id and dev['id'] == core_id and dev['status'] != 'Active':
-            return
+    snapshot = snapshot if snapshot is not None else DeviceStateSnapshot()
+
+    for dev in snapshot.get_exp_obj_users(cache_id, core_id):
+        if dev['status'] == 'Active':
+            detach_core_recursive(dev['cache_id'], dev['id'], flush, snapshot)
+
+    core = snapshot.get_core(cache_id, core_id)
+    if core is not None and core['status'] != 'Active':
+        return
 
     casadm.remove_core(cache_id, core_id, detach=True, force=not flush)
+    snapshot.set_core_status(cache_id, core_id, 'Detached')
 
 
-def detach_all_cores(flush):
+def detach_all_cores(flush, snapshot=None):
     error = CompoundException()
+    snapshot = snapshot if snapshot is not None else DeviceStateSnapshot()
 
     try:
-        dev_list = get_caches_list()
+        snapshot.load()
     except casadm.CasadmError as e:
         raise Exception(f'Unable to list caches. Reason:\n{e.result.stderr}')
     except:
         raise Exception('Unable to list caches.')
 
-    for dev in dev_list:
-        if dev['type'] == 'cache':
-            cache_id = dev['id']
-        elif dev['type'] == 'core' and dev['status'] == "Active":
-            # In case of exception we proceed with detaching remaining core instances
-            # to gracefully shutdown as many cache instances as possible.
-            try:
-                detach_core_recursive(cache_id, dev['id'], flush)
-            except casadm.CasadmError as e:
-                error.add_exception(Exception(
-                    f"Unable to detach core {dev['disk']}. Reason:\n{e.result.stderr}"))
-            except:
-                error.add_exception(Exception(f"Unable to detach core {dev['disk']}."))
+    for dev in snapshot.cores():
+        if dev['status'] != "Active":
+            continue
+
+        # In case of exception we proceed with detaching remaining core instances
+        # to gracefully shutdown as many cache instances as possible.
+        try:
+            detach_core_recursive(dev['cache_id'], dev['id'], flush, snapshot)
+        except casadm.CasadmError as e:
+            error.add_exception(Exception(
+                f"Unable to detach core {dev['disk']}. Reason:\n{e.result.stderr}"))
+        except:
+            error.add_exception(Exception(f"Unable to detach core {dev['disk']}."))
 
     error.raise_nonempty()
 
 
-def stop_all_caches(flush):
+def stop_all_caches(flush, snapshot=None):
     error = CompoundException()
+    snapshot = snapshot if snapshot is not None else DeviceStateSnapshot()
 
     try:
-        dev_list = get_caches_list()
+        snapshot.load()
     except casadm.CasadmError as e:
         raise Exception(f'Unable to list caches. Reason:\n{e.result.stderr}')
     except:
         raise Exception('Unable to list caches.')
 
-    for dev in dev_list:
-        if dev['type'] == 'cache':
-            # In case of exception we proceed with stopping subsequent cache instances
-            # to gracefully shutdown as many cache instances as possible.
-            try:
-                casadm.stop_cache(dev['id'], not flush)
-            except casadm.CasadmError as e:
-                error.add_exception(Exception(
-                    f"Unable to stop cache {dev['disk']}. Reason:\n{e.result.stderr}"))
-            except:
-                error.add_exception(Exception(f"Unable to stop cache {dev['disk']}."))
+    for dev in snapshot.caches():
+        # In case of exception we proceed with stopping subsequent cache instances
+        # to gracefully shutdown as many cache instances as possible.
+        try:
+            casadm.stop_cache(dev['id'], not flush)
+        except casadm.CasadmError as e:
+            error.add_exception(Exception(
+                f"Unable to stop cache {dev['disk']}. Reason:\n{e.result.stderr}"))
+        except:
+            error.add_exception(Exception(f"Unable to stop cache {dev['disk']}."))
 
     error.raise_nonempty()
 
 
 def stop(flush):
     error = CompoundException()
+    # Detaching cores doesn't change the list of caches, so the same snapshot
+    # can be used to stop them afterwards.
+    snapshot = DeviceStateSnapshot()
 
     try:
-        detach_all_cores(flush)
+        detach_all_cores(flush, snapshot)
     except Exception as e:
         error.add_exception(e)
 
     try:
-        stop_all_caches(False)
+        stop_all_caches(False, snapshot)
     except Exception as e:
         error.add_exception(e)
 
     error.raise_nonempty()
 
 
-def get_devices_state():
-    device_list = get_caches_list()
+def get_devices_state(snapshot=None):
+    snapshot = snapshot if snapshot is not None else DeviceStateSnapshot()
 
     devices = {"core_pool": {}, "caches": {}, "cores": {}}
 
-    core_pool = False
-    prev_cache_id = -1
-
-    for device in device_list:
-        if device["type"] == "core pool":
-            core_pool = True
-            continue
+    for path, dev in snapshot.core_pool().items():
+        devices["core_pool"][path] = {"device": dev["disk"], "status": dev["status"]}
 
-        if device["type"] == "cache":
-            core_pool = False
-            prev_cache_id = int(device["id"])
-            devices["caches"].update(
-                {
-                    int(device["id"]): {
-                        "device": device["disk"],
-                        "status": device["status"],
-                    }
-                }
-            )
-        elif device["type"] == "core":
-            core = {"device": device["disk"], "status": device["status"]}
-            if core_pool:
-                try:
-                    device_path = os.path.realpath(core["device"])
-                except ValueError:
-                    device_path = core["device"]
+    for dev in snapshot.caches():
+        devices["caches"][int(dev["id"])] = {"device": dev["disk"], "status": dev["status"]}
 
-                devices["core_pool"].update({device_path: core})
-            else:
-                core.update({"cache_id": prev_cache_id})
-                devices["cores"].update(
-                    {(prev_cache_id, int(device["id"])): core}
-                )
+    for dev in snapshot.cores():
+        devices["cores"][(dev["cache_id"], int(dev["id"]))] = {
+            "device": dev["disk"],
+            "status": dev["status"],
+            "cache_id": dev["cache_id"],
+        }
 
     return devices
 
 
-def wait_for_cas_ctrl():
-    for i in range(30):  # timeout 30s
+_IN_CREATE = 0x100
+_IN_MOVED_TO = 0x80
+
+
+def _wait_for_file_inotify(path, timeout):
+    """
+    Wait for file to appear using inotify watch on its parent directory.
+    Raises OSError if inotify is not available.
+    """
+    libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+
+    fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+    try:
+        if libc.inotify_add_watch(fd, os.path.dirname(path).encode(),
+                                  _IN_CREATE | _IN_MOVED_TO) < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_add_watch failed')
+
+        stop_time = time.time() + timeout
+        while not os.path.exists(path):
+            remaining = stop_time - time.time()
+            if remaining <= 0:
+                return False
+
+            select.select([fd], [], [], remaining)
+            try:
+                os.read(fd, 4096)
+            except BlockingIOError:
+                pass
+
+        return True
+    finally:
+        os.close(fd)
+
+
+def wait_for_cas_ctrl(timeout=30):
+    try:
+        _wait_for_file_inotify('/dev/cas_ctrl', timeout)
+        return
+    except (OSError, AttributeError, TypeError):
+        pass
+
+    for i in range(timeout):
         if os.path.exists('/dev/cas_ctrl'):
             return
         time.sleep(1)
 
 
-def _get_uninitialized_devices(target_dev_state):
+class DeviceEventMonitor(object):
+    """
+    Listener for block device uevents broadcast by udev over netlink socket.
+    If the socket can't be opened, wait() falls back to plain sleep.
+    """
+
+    _udev_group = 2
+    _libudev_prefix = b'libudev\0'
+    _libudev_header = struct.Struct('8sIIII')
+
+    def __init__(self):
+        try:
+            self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM,
+                                      socket.NETLINK_KOBJECT_UEVENT)
+        except (OSError, AttributeError):
+            self.sock = None
+            return
+
+        try:
+            self.sock.bind((0, self._udev_group))
+        except OSError:
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    @classmethod
+    def parse_event(cls, data):
+        if data.startswith(cls._libudev_prefix):
+            _, _, _, properties_off, properties_len = cls._libudev_header.unpack_from(data)
+            data = data[properties_off:properties_off + properties_len]
+        else:
+            # Kernel uevent starts with '<action>@<devpath>' line
+            data = data.partition(b'\0')[2]
+
+        event = dict()
+        for prop in data.split(b'\0'):
+            key, sep, value = prop.decode(errors='replace').partition('=')
+            if sep:
+                event[key] = value
+
+        return event
+
+    def _is_block_device_event(self, data):
+        event = self.parse_event(data)
+        return event.get('SUBSYSTEM') == 'block' and event.get('ACTION') in ['add', 'change']
+
+    def wait(self, timeout):
+        """
+        Wait until block device is added (or changed) or timeout expires.
+        Events queued at the moment of wakeup are consumed as well, so a burst
+        of events results in a single wakeup. Returns True if woken by event.
+        """
+        if self.sock is None:
+            time.sleep(timeout)
+            return False
+
+        stop_time = time.time() + timeout
+        woken = False
+
+        while True:
+            remaining = 0 if woken else stop_time - time.time()
+            if remaining < 0:
+                return False
+
+            ready, _, _ = select.select([self.sock], [], [], remaining)
+            if not ready:
+                return woken
+
+            try:
+                data = self.sock.recv(65536)
+            except OSError:
+                continue
+
+            woken = woken or self._is_block_device_event(data)
+
+
+def _get_uninitialized_devices(target_dev_state, snapshot=None):
     not_initialized = []
 
-    runtime_dev_state = get_devices_state()
+    runtime_dev_state = get_devices_state(snapshot)
 
     for core in target_dev_state.cores:
         try:
@@ -862,31 +1889,464 @@ def wait_for_startup(timeout=300, interval=5):
 
     try:
         config = cas_config.from_file(
-            cas_config.default_location, allow_incomplete=True
+            cas_config.default_location, lazy_validation=True
         )
     except Exception as e:
         raise Exception(f"Unable to load opencas config. Reason: {str(e)}")
 
-    not_initialized = _get_uninitialized_devices(config)
-    if not not_initialized:
-        return []
-
-    result = subprocess.run(["udevadm", "settle"])
-
-    for dev in not_initialized:
-        start_device(dev)
-
-    while stop_time > time.time():
+    # Start listening before checking devices state, so that no device added
+    # in the meantime is missed.
+    with DeviceEventMonitor() as monitor:
         not_initialized = _get_uninitialized_devices(config)
-        wait = False
+        if not not_initialized:
+            return []
+
+        result = subprocess.run(["udevadm", "settle"])
 
         for dev in not_initialized:
-            wait = wait or not dev.is_lazy()
             start_device(dev)
 
-        if not wait:
-            break
+        while stop_time > time.time():
+            not_initialized = _get_uninitialized_devices(config)
+            wait = False
 
-        time.sleep(interval)
+            for dev in not_initialized:
+                wait = wait or not dev.is_lazy()
+                start_device(dev)
+
+            if not wait:
+                break
+
+            # Recheck as soon as any block device shows up, but at least every
+            # interval seconds
+            monitor.wait(min(interval, max(stop_time - time.time(), 0)))
 
     return not_initialized
+
+
+# Statistics exporter
+
+
+class StatsExporter(object):
+    """
+    Keeps latest statistics of all caches, cores and io classes (as printed
+    by casadm --stats --all in json format) together with rates computed
+    between consecutive samples, and renders them in OpenMetrics text format.
+    """
+
+    CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+    BLOCK_SIZE = 4096
+
+    # casadm table title: (metric family, type)
+    SECTIONS = {
+        'Usage statistics': ('opencas_usage_bytes', 'gauge'),
+        'Inactive usage statistics': ('opencas_inactive_usage_bytes', 'gauge'),
+        'Request statistics': ('opencas_requests', 'counter'),
+        'Block statistics': ('opencas_blocks_bytes', 'counter'),
+        'Error statistics': ('opencas_errors', 'counter'),
+    }
+
+    RATES = [
+        ('opencas_hit_ratio',
+         'Ratio of read and write hits to all requests since previous sample'),
+        ('opencas_dirty_growth_bytes_per_second',
+         'Change of dirty data size since previous sample'),
+        ('opencas_flush_throughput_bytes_per_second',
+         'Writes to core device since previous sample'),
+        ('opencas_dirty_max_bytes',
+         'Maximum dirty data size sampled within dirty window'),
+    ]
+
+    class sample:
+        def __init__(self, labels, time, values):
+            self.labels = labels
+            self.time = time
+            # (family, stat): value
+            self.values = values
+
+        def get(self, family, stat):
+            return self.values.get((family, stat))
+
+    def __init__(self, io_classes=False, max_objects=None, dirty_window=60):
+        self.io_classes = io_classes
+        self.max_objects = max_objects
+        self.dirty_window = dirty_window
+        self.lock = threading.Lock()
+        self.samples = dict()
+        self.rates = dict()
+        # labels: [(time, dirty), ...] of samples within dirty window
+        self.dirty_history = dict()
+        self.collections = 0
+        self.errors = 0
+        self.dropped = 0
+        self.duration = 0.0
+        self.last_success = None
+
+    @staticmethod
+    def _stat_name(name):
+        return re.sub(r'[^a-z0-9]+', '_', name.replace('(s)', '').lower()).strip('_')
+
+    @classmethod
+    def _get_labels(cls, record):
+        labels = []
+        for key, label in [('Target Cache Id', 'cache_id'),
+                           ('Target Core Id', 'core_id'),
+                           ('Target IO class Id', 'io_class_id')]:
+            value = record.get(key, [{'value': '-'}])[0]['value']
+            if value != '-':
+                labels.append((label, str(value)))
+        return tuple(labels)
+
+    @classmethod
+    def _get_values(cls, record):
+        values = dict()
+        for title, (family, _) in cls.SECTIONS.items():
+            for row in record.get(title, []):
+                value = row.get('Count')
+                if not isinstance(value, (int, float)):
+                    continue
+                if row.get('unit') == '4KiB Blocks':
+                    value *= cls.BLOCK_SIZE
+                values[(family, cls._stat_name(row[title]))] = value
+        return values
+
+    @staticmethod
+    def _delta(current, previous, family, stat):
+        value, previous_value = current.get(family, stat), previous.get(family, stat)
+        if value is None or previous_value is None:
+            return None
+        return value - previous_value
+
+    def _get_rates(self, current, previous):
+        rates = dict()
+        elapsed = current.time - previous.time
+        if elapsed <= 0:
+            return rates
+
+        deltas = [self._delta(current, previous, 'opencas_requests', stat)
+                  for stat in ['read_hits', 'write_hits', 'read_total', 'write_total']]
+        # Counters going backwards mean they were reset, skip counter rates
+        if None not in deltas and min(deltas) >= 0 and deltas[2] + deltas[3] > 0:
+            rates['opencas_hit_ratio'] = (deltas[0] + deltas[1]) / (deltas[2] + deltas[3])
+
+        dirty = self._delta(current, previous, 'opencas_usage_bytes', 'dirty')
+        if dirty is not None:
+            rates['opencas_dirty_growth_bytes_per_second'] = dirty / elapsed
+
+        written = self._delta(current, previous, 'opencas_blocks_bytes', 'writes_to_core')
+        if written is not None and written >= 0:
+            rates['opencas_flush_throughput_bytes_per_second'] = written / elapsed
+
+        return rates
+
+    def update(self, records, now=None, dropped=0):
+        """
+        Update exported statistics with records of casadm json output, dropped
+        is number of objects which were already left out of records
+        """
+        now = time.monotonic() if now is None else now
+        if self.max_objects is not None and len(records) > self.max_objects:
+            dropped += len(records) - self.max_objects
+            records = records[:self.max_objects]
+
+        samples = dict()
+        for record in records:
+            labels = self._get_labels(record)
+            samples[labels] = self.sample(labels, now, self._get_values(record))
+
+        with self.lock:
+            rates = dict()
+            for labels, current in samples.items():
+                previous = self.samples.get(labels)
+                if previous is not None:
+                    rates[labels] = self._get_rates(current, previous)
+                dirty = current.get('opencas_usage_bytes', 'dirty')
+                if dirty is not None:
+                    history = self.dirty_history.setdefault(labels, [])
+                    history.append((now, dirty))
+                    while history[0][0] <= now - self.dirty_window:
+                        history.pop(0)
+
+            for labels in set(self.dirty_history) - set(samples):
+                del self.dirty_history[labels]
+
+            self.samples = samples
+            self.rates = rates
+            self.dropped = dropped
+
+    @staticmethod
+    def _list_caches():
+        """ [(cache id, number of cores), ...] of running caches """
+        caches = []
+        for row in get_caches_list():
+            if row['type'] == 'cache':
+                caches.append((int(row['id']), 0))
+            elif row['type'] == 'core pool':
+                caches.append((None, 0))
+            elif row['type'] == 'core' and caches:
+                cache_id, cores = caches[-1]
+                caches[-1] = (cache_id, cores + 1)
+        return [cache for cache in caches if cache[0] is not None]
+
+    def _get_records(self):
+        """
+        Records of all objects and number of dropped ones. With max objects
+        limit caches are queried one by one until the limit is reached, objects
+        of remaining caches are counted from cache list (without io classes).
+        """
+        if self.max_objects is None:
+            output = casadm.get_all_stats(io_classes=self.io_classes)
+            return json.loads(output.stdout)['records'], 0
+
+        records = []
+        dropped = 0
+        for cache_id, cores in self._list_caches():
+            budget = self.max_objects - len(records)
+            if budget <= 0:
+                dropped += 1 + cores
+                continue
+            output = casadm.get_all_stats(io_classes=self.io_classes, cache_id=cache_id)
+            cache_records = json.loads(output.stdout)['records']
+            records += cache_records[:budget]
+            dropped += max(len(cache_records) - budget, 0)
+        return records, dropped
+
+    def collect(self):
+        """ Take new sample of all statistics, returns True on success """
+        start = time.monotonic()
+        try:
+            records, dropped = self._get_records()
+        except (casadm.CasadmError, casadm.SessionError, OSError, ValueError, KeyError):
+            with self.lock:
+                self.collections += 1
+                self.errors += 1
+            return False
+
+        self.update(records, dropped=dropped)
+        with self.lock:
+            self.collections += 1
+            self.duration = time.monotonic() - start
+            self.last_success = time.time()
+        return True
+
+    @staticmethod
+    def _format_labels(labels):
+        if not labels:
+            return ''
+        return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+    @staticmethod
+    def _format_value(value):
+        return repr(float(value)) if isinstance(value, float) else str(value)
+
+    def render(self):
+        """
+        Return exported statistics in OpenMetrics text format. Rendering
+        doesn't change exporter state, so concurrent scrapers see the same
+        values.
+        """
+        lines = []
+
+        def family(name, metric_type, help_text, samples):
+            if not samples:
+                return
+            lines.append(f'# TYPE {name} {metric_type}')
+            lines.append(f'# HELP {name} {help_text}')
+            suffix = '_total' if metric_type == 'counter' else ''
+            for labels, value in samples:
+                lines.append(f'{name}{suffix}{self._format_labels(labels)} '
+                             f'{self._format_value(value)}')
+
+        with self.lock:
+            for title, (name, metric_type) in self.SECTIONS.items():
+                samples = []
+                for labels, sample in self.samples.items():
+                    for (sample_family, stat), value in sample.values.items():
+                        if sample_family == name:
+                            samples.append((labels + (('stat', stat),), value))
+                family(name, metric_type, f'casadm {title.lower()}', samples)
+
+            for name, help_text in self.RATES:
+                if name == 'opencas_dirty_max_bytes':
+                    samples = [(labels, max(dirty for _, dirty in history))
+                               for labels, history in self.dirty_history.items()]
+                else:
+                    samples = [(labels, rates[name])
+                               for labels, rates in self.rates.items() if name in rates]
+                family(name, 'gauge', help_text, samples)
+
+            family('opencas_exporter_collections', 'counter',
+                   'Statistics collections', [((), self.collections)])
+            family('opencas_exporter_collection_errors', 'counter',
+                   'Failed statistics collections', [((), self.errors)])
+            family('opencas_exporter_collection_duration_seconds', 'gauge',
+                   'Duration of last successful statistics collection',
+                   [((), self.duration)])
+            family('opencas_exporter_dropped_objects', 'gauge',
+                   'Objects not exported due to max objects limit', [((), self.dropped)])
+            if self.last_success is not None:
+                family('opencas_exporter_last_success_timestamp_seconds', 'gauge',
+                       'Time of last successful statistics collection',
+                       [((), self.last_success)])
+
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+# Metadata sizing
+
+
+def get_device_size(device):
+    """ Size of block device (or regular file) in bytes """
+    fd = os.open(device, os.O_RDONLY)
+    try:
+        return os.lseek(fd, 0, os.SEEK_END)
+    finally:
+        os.close(fd)
+
+
+def get_available_memory(meminfo_path='/proc/meminfo'):
+    """ MemAvailable from /proc/meminfo in bytes """
+    with open(meminfo_path, 'r') as meminfo:
+        for line in meminfo:
+            name, _, value = line.partition(':')
+            if name == 'MemAvailable':
+                return int(value.split()[0]) * 1024
+    raise ValueError(f'MemAvailable not found in {meminfo_path}')
+
+
+class MetadataPlan(object):
+    """
+    Estimate of cache metadata size in DRAM and on cache device.
+
+    DRAM size follows the formula used by test_memory_metadata_consumption:
+    fixed allocations plus 68 bytes per cache line and two status bits (valid
+    and dirty) per sector of cache line, with up to 10% more tolerated.
+    On-disk size is the persistent part of per cache line metadata plus
+    superblock and configuration of all possible cores, calibrated with
+    metadata end offset of 4 KiB line cache (casadm/statistics_view.h).
+
+    Neither size depends on number or size of core devices, since OCF sizes
+    core metadata for maximum number of cores, so core_count is informative.
+    """
+
+    SECTOR_SIZE = 512
+    KiB = 1024
+    MiB = 1024 * 1024
+
+    DRAM_FIXED = 250 * MiB
+    DRAM_PER_LINE = 68
+    DRAM_TOLERANCE = 1.10
+    DISK_FIXED = 8 * MiB
+    DISK_PER_LINE = 56
+
+    def __init__(self, cache_lines, cache_line_size=4, core_count=0, cache_id=None):
+        """ cache_line_size is in KiB, as in opencas.conf and casadm """
+        self.cache_id = cache_id
+        self.cache_lines = int(cache_lines)
+        self.cache_line_size = int(cache_line_size)
+        self.core_count = core_count
+
+    @classmethod
+    def _per_line_status(cls, cache_line_size):
+        return 2 * cache_line_size * cls.KiB // cls.SECTOR_SIZE // 8
+
+    @classmethod
+    def from_device_size(cls, device_size, cache_line_size=4, core_count=0, cache_id=None):
+        """ Plan for cache device of given size, part of which is taken by metadata """
+        per_line = (int(cache_line_size) * cls.KiB + cls.DISK_PER_LINE
+                    + cls._per_line_status(int(cache_line_size)))
+        cache_lines = max(device_size - cls.DISK_FIXED, 0) // per_line
+        return cls(cache_lines, cache_line_size, core_count, cache_id)
+
+    @classmethod
+    def from_cache_config(cls, cache, device_size=None):
+        """ Plan for cache from opencas.conf, device size is read if not given """
+        if device_size is None:
+            device_size = get_device_size(cache.device)
+        return cls.from_device_size(device_size, cache.params.get('cache_line_size', 4),
+                                    len(cache.cores), cache.cache_id)
+
+    @property
+    def cache_size(self):
+        """ Usable cache capacity in bytes """
+        return self.cache_lines * self.cache_line_size * self.KiB
+
+    @property
+    def dram_size(self):
+        per_line = self.DRAM_PER_LINE + self._per_line_status(self.cache_line_size)
+        return self.DRAM_FIXED + self.cache_lines * per_line
+
+    @property
+    def dram_max_size(self):
+        return int(self.dram_size * self.DRAM_TOLERANCE)
+
+    @property
+    def disk_size(self):
+        per_line = self.DISK_PER_LINE + self._per_line_status(self.cache_line_size)
+        return self.DISK_FIXED + self.cache_lines * per_line
+
+    @property
+    def device_size(self):
+        return self.cache_size + self.disk_size
+
+    def metadata_io_time(self, bandwidth):
+        """
+        Seconds needed to write (start) or read (load) whole on-disk metadata
+        with given bandwidth in bytes per second
+        """
+        return self.disk_size / bandwidth
+
+    @classmethod
+    def from_stats_record(cls, record):
+        """
+        Plan for running cache described by casadm --stats json record, together
+        with DRAM footprint reported by the kernel
+        """
+        def value(name):
+            return record[name][0]['value'], record[name][0]['unit']
+
+        cache_line_size, _ = value('Cache line size')
+        blocks, _ = value('Cache Size')
+        cache_lines = int(blocks) * 4 // int(cache_line_size)
+        plan = cls(cache_lines, cache_line_size, int(value('Core Devices')[0]),
+                   int(value('Cache Id')[0]))
+
+        footprint, unit = value('Metadata Memory Footprint')
+        units = {'B': 1, 'KiB': cls.KiB, 'MiB': cls.MiB, 'GiB': 1024 * cls.MiB,
+                 'TiB': 1024 * 1024 * cls.MiB}
+        return plan, int(float(footprint) * units[unit])
+
+
+def get_metadata_disk_sizes(dmesg_output):
+    """
+    Metadata sizes on cache devices printed by the kernel at cache start or
+    load, as {cache_id: bytes}; the latest message of each cache wins
+    """
+    sizes = dict()
+    pattern = re.compile(r'cache(\d+): .*Metadata size on device: (\d+) (B|kiB)')
+    for line in dmesg_output.split('\n'):
+        match = pattern.search(line)
+        if match:
+            factor = 1024 if match.group(3) == 'kiB' else 1
+            sizes[int(match.group(1))] = int(match.group(2)) * factor
+    return sizes
+
+
+def get_metadata_validation():
+    """
+    Estimates for all running caches next to metadata sizes reported by the
+    kernel, as list of (plan, dram_size, disk_size), disk_size is None when
+    it's no longer in kernel log
+    """
+    output = casadm.get_all_stats()
+    records = [record for record in json.loads(output.stdout)['records']
+               if record.get('Target Core Id', [{'value': '-'}])[0]['value'] == '-'
+               and 'Metadata Memory Footprint' in record]
+    disk_sizes = get_metadata_disk_sizes(casadm.run_cmd(['dmesg']).stdout)
+
+    result = []
+    for record in records:
+        plan, dram_size = MetadataPlan.from_stats_record(record)
+        result.append((plan, dram_size, disk_sizes.get(plan.cache_id)))
+    return result